@@ -11,6 +11,7 @@ Architecture:
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import numpy as np
 import pandas as pd
 import altair as alt
 from typing import Literal, Optional, Dict, Any
@@ -66,6 +67,101 @@ class ChartResponse(BaseModel):
     ai_defaults: ChartDefaults
 
 
+# Chart width in pixels; trend charts are downsampled to this many points per pixel
+CHART_WIDTH = 600
+TREND_POINTS_PER_PIXEL = 2
+
+
+# lttb_indices and minmax_indices mirror Main Project's backend
+# app/services/downsampling.py (this service doesn't share its package):
+# keep both copies in sync.
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of threshold points that keep the shape of (x, y).
+    Architecture: Bucket averages are vectorized (cumulative sums); only the
+    dependency on the previously picked point is a loop over buckets.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = x.astype(float) - float(x[0])
+    y = y.astype(float)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    next_x = np.append(((cum_x[ends] - cum_x[starts]) / (ends - starts))[1:], x[-1])
+    next_y = np.append(((cum_y[ends] - cum_y[starts]) / (ends - starts))[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(len(starts)):
+        s, e = starts[i], ends[i]
+        area = np.abs((x[a] - next_x[i]) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (next_y[i] - y[a]))
+        a = s + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Min/max bucketing: indices of the lowest and highest point of each X bucket.
+    Architecture: X is sorted, so buckets are contiguous runs (ufunc.reduceat, no Python loop).
+    """
+    n = len(x)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+    x = x.astype(float)
+    y = y.astype(float)
+
+    n_buckets = (threshold - 2) // 2
+    span = x[-1] - x[0]
+    if span <= 0:
+        starts = np.array([0])
+    else:
+        bounds = x[0] + span * np.arange(n_buckets) / n_buckets
+        starts = np.unique(np.searchsorted(x, bounds, side="left"))
+        starts = starts[starts < n]
+    sizes = np.diff(np.append(starts, n))
+
+    positions = np.arange(n)
+    keep = [np.array([0, n - 1])]
+    for reduce_extreme in (np.minimum, np.maximum):
+        extremes = np.repeat(reduce_extreme.reduceat(y, starts), sizes)
+        candidates = np.where(y == extremes, positions, n)
+        keep.append(np.minimum.reduceat(candidates, starts))
+    return np.unique(np.concatenate(keep))
+
+
+def downsample_trend(data: pd.DataFrame, x_col: str, y_col: str, width: int, method: str = "lttb") -> pd.DataFrame:
+    """
+    Time-sort a trend series and downsample it to the chart's pixel width.
+    Architecture: A line can't show more points than it has pixels; millions of
+    timestamps are cut to a few thousand points that keep peaks and shape.
+    Series that fit, and series over a non-numeric, non-date X, are returned
+    unchanged (keeping the requested sort and top N order).
+    """
+    threshold = int(width * TREND_POINTS_PER_PIXEL)
+    if len(data) <= threshold:
+        return data
+    x_is_date = pd.api.types.is_datetime64_any_dtype(data[x_col])
+    x_is_number = pd.api.types.is_numeric_dtype(data[x_col]) and not pd.api.types.is_bool_dtype(data[x_col])
+    if not (x_is_date or x_is_number):
+        return data
+
+    data = data.dropna(subset=[x_col, y_col]).sort_values(x_col)
+    x = data[x_col]
+    x_values = x.astype("int64").to_numpy() if x_is_date else x.to_numpy(dtype=float)
+    y_values = data[y_col].to_numpy(dtype=float)
+    if method == "minmax":
+        keep = minmax_indices(x_values, y_values, threshold)
+    else:
+        keep = lttb_indices(x_values, y_values, threshold)
+    return data.iloc[keep]
+
+
 def get_column_metadata(data: pd.DataFrame) -> dict:
     """Return column types for frontend selectors."""
     numeric_cols = data.select_dtypes(include=['number']).columns.tolist()
@@ -100,7 +196,7 @@ def generate_chart_with_params(
             y=alt.Y('count():Q', title='Frequency'),
             tooltip=['count():Q']
         ).properties(
-            width=600,
+            width=params.get('width', CHART_WIDTH),
             height=400,
             title='Value Distribution'
         )
@@ -141,6 +237,10 @@ def generate_chart_with_params(
     if top_n:
         agg_data = agg_data.head(top_n)
     
+    # Trend charts: sort by time and downsample to the chart width
+    if chart_type in ("line", "area"):
+        agg_data = downsample_trend(agg_data, x_col, y_col, params.get('width', CHART_WIDTH), params.get('downsample', 'lttb'))
+    
     # Generate chart based on type
     if chart_type == "bar":
         orientation = params.get('orientation', 'vertical')
@@ -175,7 +275,7 @@ def generate_chart_with_params(
         raise ValueError(f"Unknown chart type: {chart_type}")
     
     chart = chart.properties(
-        width=600,
+        width=params.get('width', CHART_WIDTH),
         height=400,
         title=f'{chart_type.capitalize()} Chart'
     )
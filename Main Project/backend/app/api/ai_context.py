@@ -11,6 +11,7 @@ import logging
 
 from app.services.ai_context import generate_ai_context_bundle
 from app.services.dataset_loader import dataset_exists
+from app.services.compute_executor import run_io
 
 logger = logging.getLogger(__name__)
 
@@ -25,12 +26,15 @@ class AIContextResponse(BaseModel):
     dataset_schema: Dict[str, Any] = Field(alias="schema")
     logs: Dict[str, Any]
     dataset_summary: Dict[str, Any]
+    context_budget: Optional[Dict[str, Any]] = None  # Only when max_tokens or max_columns is set
 
 
 @router.get("/{dataset_id}/ai-context", response_model=AIContextResponse)
 async def get_ai_context(
     dataset_id: str,
-    workspace_id: str = Query(..., description="Workspace identifier")
+    workspace_id: str = Query(..., description="Workspace identifier"),
+    max_tokens: Optional[int] = Query(None, ge=1, description="Token budget of the bundle (estimated)"),
+    max_columns: Optional[int] = Query(None, ge=0, description="Columns kept with full entries (most informative first)")
 ):
     """
     Get AI context bundle for a dataset.
@@ -43,9 +47,15 @@ async def get_ai_context(
     IMPORTANT: This endpoint does NOT return raw data values.
     Only metadata, statistics, and operation history are included.
     
+    With max_tokens or max_columns, the least informative columns are
+    compacted (and the oldest operations and columns left out if needed)
+    so the bundle fits; context_budget describes what was cut.
+    
     Args:
         dataset_id: Dataset filename
         workspace_id: Workspace identifier
+        max_tokens: Optional token budget
+        max_columns: Optional number of columns kept with full entries
         
     Returns:
         AI context bundle with schema, logs, and dataset summary
@@ -59,7 +69,7 @@ async def get_ai_context(
             )
         
         # Generate context bundle
-        bundle = generate_ai_context_bundle(workspace_id, dataset_id)
+        bundle = await run_io(generate_ai_context_bundle, workspace_id, dataset_id, max_tokens, max_columns)
         
         if not bundle:
             raise HTTPException(
@@ -11,11 +11,14 @@ from fastapi import APIRouter, HTTPException
 from app.models.requests import CleaningRequest
 from app.models.responses import CleaningResponse, ErrorResponse
 from app.services.dataset_loader import load_dataset, save_dataset, dataset_exists
+from app.services.compute_executor import run_io
 from app.services.missing_values import handle_missing_values
 from app.services.duplicates import handle_duplicates
 from app.services.invalid_formats import handle_invalid_formats
 from app.services.outliers import handle_outliers
+from app.services.column_sketches import get_column_sketches
 from app.services.cleaning_logs import save_cleaning_log, CleaningLog
+from app.services.decision_eda_service import update_eda_cube
 from app.utils.preview import get_preview_samples, get_affected_rows_info, get_changed_rows_info
 from app.utils.validators import validate_action_for_operation, validate_parameters
 
@@ -36,6 +39,11 @@ async def cleaning_endpoint(request: CleaningRequest):
 
     - **preview**: If True, returns preview without saving. If False, applies and saves.
     """
+    return await run_io(_run_cleaning_operation, request)
+
+
+def _run_cleaning_operation(request: CleaningRequest) -> CleaningResponse:
+    """Blocking part of cleaning_endpoint (runs in the compute executor)."""
     try:
         # Validate dataset exists in workspace
         if not dataset_exists(request.dataset_id, request.workspace_id):
@@ -136,8 +144,12 @@ async def cleaning_endpoint(request: CleaningRequest):
 
         elif request.operation.value == "outliers":
             method = request.parameters.get("method")
+            exact = bool(request.parameters.get("exact", False))
+            sketch = None
+            if method == "IQR" and not exact:
+                sketch = get_column_sketches(request.workspace_id, request.dataset_id, df).get(request.column)
             df_after, affected_rows, affected_percentage, affected_indices = handle_outliers(
-                df, request.column, method, request.action
+                df, request.column, method, request.action, sketch=sketch, exact=exact
             )
             summary = f"Applied '{request.action}' to outliers in column '{request.column}' (method: {method}). "
             if request.action == "remove":
@@ -163,6 +175,18 @@ async def cleaning_endpoint(request: CleaningRequest):
                 create_new_file=True  # Create new file instead of overwriting
             )
             summary += f" Changes have been saved as '{new_filename}'."
+
+            # Carry the decision EDA statistics cube over to the new version
+            # from the changed rows only (non-critical)
+            update_eda_cube(
+                request.workspace_id,
+                request.dataset_id,
+                new_filename,
+                df_before,
+                df_after,
+                changed_columns=[request.column] if request.column else [],
+                removed_rows=affected_indices if len(df_after) < len(df_before) else None,
+            )
             
             # Save cleaning log to workspace
             log = CleaningLog(
@@ -170,7 +194,8 @@ async def cleaning_endpoint(request: CleaningRequest):
                 operation=request.operation.value,
                 action=request.action,
                 rows_affected=affected_rows,
-                parameters=request.parameters or {}
+                parameters=request.parameters or {},
+                column=request.column
             )
             save_cleaning_log(request.workspace_id, log)
 
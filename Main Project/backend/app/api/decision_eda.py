@@ -6,29 +6,40 @@ No explanations, no recommendations, no ML models.
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import logging
 
-from app.services.decision_eda_service import compute_decision_eda_stats
+from app.services.decision_eda_service import compute_decision_eda_batch, compute_decision_eda_stats
 from app.services.dataset_loader import dataset_exists
+from app.services.jobs import Job, JobQueueFull, submit_job
+from app.services.compute_executor import run_cpu, run_io
 from app.services.insight_storage import (
     save_insight_snapshot,
     load_insight_snapshot,
     is_dataset_changed,
     get_all_versions,
     delete_all_insight_versions,
+    list_insight_snapshots,
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/decision-eda", tags=["decision-eda"])
 
+# Maximum number of metrics in one batch request
+MAX_BATCH_METRICS = 20
+
 
 class DecisionEDARequest(BaseModel):
     workspace_id: str
     dataset_id: str
     decision_metric: str
+    correlation_method: str = "pearson"  # "pearson" or "spearman" (numeric factors)
+    significance: bool = False  # Add bootstrap confidence intervals and permutation p-values to factors
+    significance_budget: Optional[float] = None  # Seconds of resampling per metric (server default if omitted)
+    background: bool = False  # Run as a background job (202 + job, result via GET /jobs/{job_id})
 
 
 class DecisionEDAResponse(BaseModel):
@@ -42,6 +53,65 @@ class DecisionEDAResponse(BaseModel):
     all_correlations: list
     all_segment_impacts: list
     decision_metric_stats: dict
+    correlation_method: str = "pearson"
+    significance: Optional[dict] = None  # Resample counts, when significance was requested
+
+
+class DecisionEDABatchRequest(BaseModel):
+    workspace_id: str
+    dataset_id: str
+    decision_metrics: List[str]
+    correlation_method: str = "pearson"  # "pearson" or "spearman" (numeric factors)
+    significance: bool = False  # Add bootstrap confidence intervals and permutation p-values to factors
+    significance_budget: Optional[float] = None  # Seconds of resampling per metric (server default if omitted)
+    background: bool = False  # Run as a background job (202 + job, result via GET /jobs/{job_id})
+
+
+class DecisionEDABatchResponse(BaseModel):
+    results: Dict[str, DecisionEDAResponse]  # decision metric -> stats
+    errors: Dict[str, str]  # decision metric -> reason it can't be analyzed
+
+
+def _decision_eda_job(
+    job: Job,
+    dataset_id: str,
+    decision_metric: str,
+    correlation_method: str = "pearson",
+    significance: bool = False,
+    significance_budget: Optional[float] = None
+) -> Dict[str, Any]:
+    """Background job: compute decision EDA stats (validated like the inline response)."""
+    job.report(0.1, f"Computing statistics for {decision_metric}")
+    stats = compute_decision_eda_stats(
+        job.workspace_id,
+        dataset_id,
+        decision_metric,
+        correlation_method=correlation_method,
+        significance=significance,
+        significance_budget=significance_budget,
+    )
+    return DecisionEDAResponse(**stats).model_dump(mode="json")
+
+
+def _decision_eda_batch_job(
+    job: Job,
+    dataset_id: str,
+    decision_metrics: List[str],
+    correlation_method: str = "pearson",
+    significance: bool = False,
+    significance_budget: Optional[float] = None
+) -> Dict[str, Any]:
+    """Background job: compute decision EDA stats for several metrics."""
+    job.report(0.1, f"Computing statistics for {len(decision_metrics)} metrics")
+    batch = compute_decision_eda_batch(
+        job.workspace_id,
+        dataset_id,
+        decision_metrics,
+        correlation_method=correlation_method,
+        significance=significance,
+        significance_budget=significance_budget,
+    )
+    return DecisionEDABatchResponse(**batch).model_dump(mode="json")
 
 
 @router.post("", response_model=DecisionEDAResponse)
@@ -57,6 +127,15 @@ async def compute_decision_eda(
     - Outputs compact summary
     
     NO explanations, NO recommendations, NO ML models.
+    
+    With significance=True each reported factor also gets a bootstrap
+    confidence interval (of its correlation or segment mean difference) and
+    a permutation p-value, computed within significance_budget seconds.
+    Factors with more than SIGNIFICANCE_MAX_CI_SEGMENTS segments get no
+    interval (null).
+    
+    With background=True the stats are computed in a background job and the
+    job is returned (202); the stats become the job result.
     """
     if not dataset_exists(request.dataset_id, request.workspace_id):
         raise HTTPException(
@@ -64,11 +143,38 @@ async def compute_decision_eda(
             detail=f"Dataset '{request.dataset_id}' not found in workspace '{request.workspace_id}'"
         )
     
+    if request.background:
+        try:
+            job = submit_job(
+                "decision_eda",
+                request.workspace_id,
+                _decision_eda_job,
+                request.dataset_id,
+                request.decision_metric,
+                request.correlation_method,
+                request.significance,
+                request.significance_budget,
+                params={
+                    "dataset_id": request.dataset_id,
+                    "decision_metric": request.decision_metric,
+                    "correlation_method": request.correlation_method,
+                    "significance": request.significance,
+                },
+            )
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(status_code=202, content=job.to_dict())
+    
     try:
-        stats = compute_decision_eda_stats(
+        # Self-contained (loads the dataset itself): runs in the CPU process pool
+        stats = await run_cpu(
+            compute_decision_eda_stats,
             request.workspace_id,
             request.dataset_id,
-            request.decision_metric
+            request.decision_metric,
+            correlation_method=request.correlation_method,
+            significance=request.significance,
+            significance_budget=request.significance_budget,
         )
         
         logger.info(
@@ -84,6 +190,85 @@ async def compute_decision_eda(
         raise HTTPException(status_code=500, detail=f"Failed to compute statistics: {str(e)}")
 
 
+@router.post("/batch", response_model=DecisionEDABatchResponse)
+async def compute_decision_eda_for_metrics(
+    request: DecisionEDABatchRequest
+):
+    """
+    Compute decision-driven EDA statistics for several candidate metrics.
+    
+    The dataset is loaded and profiled once for all metrics (column types,
+    exclusions, segment codes and the correlation matrix are shared), and
+    each metric's stats are memoized per dataset version, so repeated
+    requests are answered from the cache.
+    
+    Metrics that can't be analyzed (missing or non-numeric) are reported in
+    "errors" instead of failing the whole batch.
+    
+    With background=True the stats are computed in a background job and the
+    job is returned (202); the batch response becomes the job result.
+    """
+    metrics = list(dict.fromkeys(request.decision_metrics))
+    if not metrics:
+        raise HTTPException(status_code=400, detail="decision_metrics must not be empty")
+    if len(metrics) > MAX_BATCH_METRICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_METRICS} decision metrics can be analyzed per request"
+        )
+    
+    if not dataset_exists(request.dataset_id, request.workspace_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Dataset '{request.dataset_id}' not found in workspace '{request.workspace_id}'"
+        )
+    
+    if request.background:
+        try:
+            job = submit_job(
+                "decision_eda_batch",
+                request.workspace_id,
+                _decision_eda_batch_job,
+                request.dataset_id,
+                metrics,
+                request.correlation_method,
+                request.significance,
+                request.significance_budget,
+                params={
+                    "dataset_id": request.dataset_id,
+                    "decision_metrics": metrics,
+                    "correlation_method": request.correlation_method,
+                    "significance": request.significance,
+                },
+            )
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(status_code=202, content=job.to_dict())
+    
+    try:
+        batch = await run_cpu(
+            compute_decision_eda_batch,
+            request.workspace_id,
+            request.dataset_id,
+            metrics,
+            correlation_method=request.correlation_method,
+            significance=request.significance,
+            significance_budget=request.significance_budget,
+        )
+        
+        logger.info(
+            f"[decision-eda] Computed batch stats for {len(batch['results'])} of {len(metrics)} metrics "
+            f"in dataset {request.dataset_id} (workspace {request.workspace_id})"
+        )
+        
+        return DecisionEDABatchResponse(**batch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"[decision-eda] Error computing batch stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to compute statistics: {str(e)}")
+
+
 class SaveInsightsRequest(BaseModel):
     workspace_id: str
     dataset_id: str
@@ -99,7 +284,8 @@ async def save_insights(request: SaveInsightsRequest):
     Internal endpoint - not exposed to users.
     """
     try:
-        version = save_insight_snapshot(
+        version = await run_io(
+            save_insight_snapshot,
             request.workspace_id,
             request.dataset_id,
             request.decision_metric,
@@ -113,6 +299,32 @@ async def save_insights(request: SaveInsightsRequest):
         raise HTTPException(status_code=500, detail=f"Failed to save insights: {str(e)}")
 
 
+@router.get("/insights/{workspace_id}")
+async def list_insights(
+    workspace_id: str,
+    dataset_id: Optional[str] = Query(None, description="Only snapshots of this dataset"),
+    all_versions: bool = Query(False, description="Every version instead of the latest per metric"),
+    include_content: bool = Query(False, description="Include backend_stats and insights"),
+):
+    """
+    List insight snapshots of a workspace across decision metrics.
+    Internal endpoint - not exposed to users.
+    """
+    try:
+        snapshots = await run_io(
+            list_insight_snapshots,
+            workspace_id,
+            dataset_id,
+            not all_versions,
+            include_content
+        )
+        
+        return {"snapshots": snapshots}
+    except Exception as e:
+        logger.error(f"[decision-eda] Error listing insights: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to list insights: {str(e)}")
+
+
 @router.get("/insights/{workspace_id}/{dataset_id}/{decision_metric}")
 async def get_insights(
     workspace_id: str,
@@ -124,7 +336,7 @@ async def get_insights(
     Internal endpoint - not exposed to users.
     """
     try:
-        snapshot = load_insight_snapshot(workspace_id, dataset_id, decision_metric)
+        snapshot = await run_io(load_insight_snapshot, workspace_id, dataset_id, decision_metric)
         
         if not snapshot:
             raise HTTPException(status_code=404, detail="Insight snapshot not found")
@@ -150,7 +362,8 @@ async def check_dataset_change(request: CheckDatasetChangeRequest):
     Internal endpoint - not exposed to users.
     """
     try:
-        changed = is_dataset_changed(
+        changed = await run_io(
+            is_dataset_changed,
             request.workspace_id,
             request.dataset_id,
             request.stored_hash
@@ -175,7 +388,8 @@ async def delete_insights(request: DeleteInsightsRequest):
     Internal endpoint - used during regeneration.
     """
     try:
-        deleted_count = delete_all_insight_versions(
+        deleted_count = await run_io(
+            delete_all_insight_versions,
             request.workspace_id,
             request.dataset_id,
             request.decision_metric
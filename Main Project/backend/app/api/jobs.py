@@ -0,0 +1,91 @@
+"""
+Background job API.
+
+Heavy dataset work is submitted as jobs (see services/jobs.py). Clients get
+a job ID back and poll GET /jobs/{job_id} for status, progress and result.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import Any, List, Optional
+import logging
+
+from app.services.jobs import Job, get_job, list_jobs, cancel_job
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+class JobResponse(BaseModel):
+    """Job status response."""
+    id: str
+    type: str
+    workspace_id: str
+    status: str  # queued | running | succeeded | failed | cancelled
+    progress: float
+    message: str = ""
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+class JobListResponse(BaseModel):
+    """List of jobs for a workspace."""
+    workspace_id: str
+    jobs: List[JobResponse]
+
+
+def job_to_response(job: Job, include_result: bool = True) -> JobResponse:
+    """Convert a Job to its API response."""
+    data = job.to_dict()
+    data.pop("params", None)
+    if not include_result:
+        data["result"] = None
+    return JobResponse(**data)
+
+
+@router.get("", response_model=JobListResponse)
+async def get_workspace_jobs(workspace_id: str = Query(..., description="Workspace identifier")):
+    """
+    List background jobs of a workspace (newest first, results omitted).
+    """
+    jobs = list_jobs(workspace_id)
+    return JobListResponse(
+        workspace_id=workspace_id,
+        jobs=[job_to_response(job, include_result=False) for job in jobs],
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str, workspace_id: Optional[str] = Query(None)):
+    """
+    Get status, progress and (when finished) result of a background job.
+
+    Raises:
+        HTTPException 404: If the job doesn't exist
+    """
+    job = get_job(job_id, workspace_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job_to_response(job)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_background_job(job_id: str):
+    """
+    Cancel a background job.
+
+    Queued jobs are cancelled immediately; running jobs stop at their next
+    progress checkpoint. Finished jobs are returned unchanged.
+
+    Raises:
+        HTTPException 404: If the job doesn't exist
+    """
+    job = cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    logger.info(f"[jobs] Cancel requested via API for job {job_id} (status={job.status})")
+    return job_to_response(job)
@@ -6,10 +6,12 @@ IMPORTANT:
 - Workspace is the single source of truth
 - Overview results are persisted as JSON files in workspace
 - GET endpoint reads from file if exists, computes only if missing
+- Saved overviews carry the dataset fingerprint; stale files are recomputed
 - POST endpoint forces recomputation and saves result
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import pandas as pd
@@ -18,10 +20,20 @@ import logging
 from pathlib import Path
 
 from app.services.dataset_loader import load_dataset, dataset_exists
+from app.services.profiling_executor import profile_columns
+from app.services.column_sketches import get_distinct_sketches
+from app.services.hyperloglog import HyperLogLog, distinct_count
+from app.services.dataset_fingerprint import get_dataset_fingerprint
+from app.services.jobs import Job, JobQueueFull, submit_job
+from app.services.compute_executor import run_io
+from app.utils.cache import LRUCache, atomic_write_json
 from app.config import get_overview_file_path
 
 logger = logging.getLogger(__name__)
 
+# (workspace_id, dataset_id) -> (dataset fingerprint, parsed overview)
+_overview_cache = LRUCache(maxsize=64)
+
 router = APIRouter(prefix="/overview", tags=["overview"])
 
 
@@ -53,8 +65,10 @@ class OverviewResponse(BaseModel):
 # ----------------------------
 
 def infer_column_type(df: pd.DataFrame, col: str) -> str:
-    s = df[col]
+    return infer_series_type(df[col])
+
 
+def infer_series_type(s: pd.Series) -> str:
     # 1) numeric first
     if pd.api.types.is_numeric_dtype(s):
         return "numeric"
@@ -83,11 +97,42 @@ def infer_column_type(df: pd.DataFrame, col: str) -> str:
 # Helpers - Overview Computation
 # ----------------------------
 
-def compute_overview(df: pd.DataFrame) -> OverviewResponse:
+def profile_overview_column(
+    s: pd.Series,
+    distinct_sketch: Optional[HyperLogLog] = None,
+    exact: bool = False
+) -> Dict[str, Any]:
+    """
+    Profile a single column for the overview (runs in profiling workers).
+    """
+    # Return top 50 values to allow frontend to slice dynamically (5, 10, 20, custom)
+    vc = s.value_counts(dropna=True).head(50)
+    unique, unique_error = distinct_count(s, sketch=distinct_sketch, exact=exact)
+    return {
+        "inferred_type": infer_series_type(s),
+        "missing_count": int(s.isna().sum()),
+        "unique": unique,
+        "unique_error": unique_error,
+        "top_values": vc.to_dict(),
+    }
+
+
+def compute_overview(
+    df: pd.DataFrame,
+    workers: Optional[int] = None,
+    distinct_sketches: Optional[Dict[str, HyperLogLog]] = None,
+    exact: bool = False
+) -> OverviewResponse:
     """
     Compute overview statistics for a dataset.
-    
-    This is the core computation logic that can be reused.
+
+    This is the core computation logic that can be reused. Columns are
+    profiled in parallel (see profiling_executor); results are merged in
+    column order.
+
+    Unique counts of large columns are HyperLogLog estimates (from
+    distinct_sketches when given); column_insights then carry the relative
+    error as "unique_error". exact=True always counts exactly.
     """
     total_rows = len(df)
     total_columns = len(df.columns)
@@ -95,13 +140,18 @@ def compute_overview(df: pd.DataFrame) -> OverviewResponse:
 
     type_counts = {"numeric": 0, "categorical": 0, "datetime": 0}
     columns_meta: List[ColumnMetadata] = []
+    # Column insights (used by Overview → Column Insights UI)
+    column_insights: Dict[str, Dict[str, Any]] = {}
+
+    distinct_sketches = distinct_sketches or {}
+    column_args = {col: (distinct_sketches.get(col), exact) for col in df.columns}
+    profiles = profile_columns(df, profile_overview_column, column_args=column_args, workers=workers)
 
-    # Column metadata
-    for col in df.columns:
-        inferred = infer_column_type(df, col)
+    for col, profile in profiles.items():
+        inferred = profile["inferred_type"]
         type_counts[inferred] += 1
 
-        missing_count = int(df[col].isna().sum())
+        missing_count = profile["missing_count"]
         missing_percentage = round(
             (missing_count / total_rows * 100) if total_rows else 0.0, 2
         )
@@ -116,16 +166,12 @@ def compute_overview(df: pd.DataFrame) -> OverviewResponse:
             )
         )
 
-    # Column insights (used by Overview → Column Insights UI)
-    # Return top 50 values to allow frontend to slice dynamically (5, 10, 20, custom)
-    column_insights: Dict[str, Dict[str, Any]] = {}
-
-    for col in df.columns:
-        vc = df[col].value_counts(dropna=True).head(50)
         column_insights[col] = {
-            "unique": int(df[col].nunique(dropna=True)),
-            "top_values": vc.to_dict(),
+            "unique": profile["unique"],
+            "top_values": profile["top_values"],
         }
+        if profile["unique_error"]:
+            column_insights[col]["unique_error"] = profile["unique_error"]
 
     return OverviewResponse(
         total_rows=total_rows,
@@ -139,71 +185,48 @@ def compute_overview(df: pd.DataFrame) -> OverviewResponse:
     )
 
 
-def save_overview_to_file(workspace_id: str, dataset_id: str, overview: OverviewResponse) -> None:
+def save_overview_to_file(
+    workspace_id: str,
+    dataset_id: str,
+    overview: OverviewResponse,
+    fingerprint: Optional[str] = None
+) -> None:
     """
     Save overview result to workspace file.
     
     Format: dataset_name_overview.json
     
+    The file also stores the fingerprint of the dataset the overview was
+    computed from, so stale overviews are detected on read. It is written via
+    temp file + rename, so readers never see a partially written file.
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        overview: Computed overview
+        fingerprint: Dataset fingerprint (computed if not given)
+    
     Raises:
-        Exception: If file write fails or file cannot be verified after write
+        Exception: If file write fails
     """
     overview_path = get_overview_file_path(workspace_id, dataset_id)
     
-    logger.info(f"[save_overview_to_file] Starting save - workspace_id={workspace_id}, dataset_id={dataset_id}")
-    logger.info(f"[save_overview_to_file] Target path: {overview_path}")
-    logger.info(f"[save_overview_to_file] Path exists: {overview_path.exists()}")
-    logger.info(f"[save_overview_to_file] Parent dir: {overview_path.parent}")
+    logger.info(f"[save_overview_to_file] Saving overview - workspace_id={workspace_id}, dataset_id={dataset_id}, path={overview_path}")
     
     try:
-        # Ensure parent directory exists
-        overview_path.parent.mkdir(parents=True, exist_ok=True)
-        logger.info(f"[save_overview_to_file] Parent directory created/verified: {overview_path.parent.exists()}")
+        if fingerprint is None:
+            fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
         
-        # Serialize overview to JSON
         overview_dict = overview.model_dump()
-        logger.info(f"[save_overview_to_file] Overview serialized - keys: {list(overview_dict.keys())}")
+        overview_dict["dataset_fingerprint"] = fingerprint
         
-        # Write to file with explicit error handling
         try:
-            with open(overview_path, "w", encoding="utf-8") as f:
-                json.dump(overview_dict, f, indent=2, ensure_ascii=False)
-            logger.info(f"[save_overview_to_file] File write completed")
-        except IOError as e:
-            logger.error(f"[save_overview_to_file] IOError during file write: {e}")
-            raise Exception(f"Failed to write overview file to {overview_path}: {str(e)}") from e
+            atomic_write_json(overview_path, overview_dict, ensure_ascii=False, default=str)
         except Exception as e:
-            logger.error(f"[save_overview_to_file] Unexpected error during file write: {e}", exc_info=True)
-            raise Exception(f"Unexpected error writing overview file: {str(e)}") from e
-        
-        # Verify file was created and has content
-        if not overview_path.exists():
-            error_msg = f"Overview file was not created at {overview_path}"
-            logger.error(f"[save_overview_to_file] {error_msg}")
-            raise Exception(error_msg)
-        
-        file_size = overview_path.stat().st_size
-        logger.info(f"[save_overview_to_file] File verified - size: {file_size} bytes")
-        
-        if file_size == 0:
-            error_msg = f"Overview file is empty at {overview_path}"
-            logger.error(f"[save_overview_to_file] {error_msg}")
-            raise Exception(error_msg)
-        
-        # Verify JSON is valid by reading it back
-        try:
-            with open(overview_path, "r", encoding="utf-8") as f:
-                test_data = json.load(f)
-            if not isinstance(test_data, dict) or "total_rows" not in test_data:
-                error_msg = f"Overview file is invalid JSON at {overview_path}"
-                logger.error(f"[save_overview_to_file] {error_msg}")
-                raise Exception(error_msg)
-            logger.info(f"[save_overview_to_file] JSON validation passed")
-        except json.JSONDecodeError as e:
-            error_msg = f"Overview file contains invalid JSON at {overview_path}: {str(e)}"
-            logger.error(f"[save_overview_to_file] {error_msg}")
-            raise Exception(error_msg) from e
+            logger.error(f"[save_overview_to_file] Error during file write: {e}", exc_info=True)
+            raise Exception(f"Failed to write overview file to {overview_path}: {str(e)}") from e
         
+        _overview_cache.set((workspace_id, dataset_id), (fingerprint, overview))
         logger.info(f"[save_overview_to_file] Successfully saved overview to {overview_path}")
         
         # Register file in registry (non-critical, log but don't fail)
@@ -226,59 +249,59 @@ def save_overview_to_file(workspace_id: str, dataset_id: str, overview: Overview
 
 def load_overview_from_file(workspace_id: str, dataset_id: str) -> Optional[OverviewResponse]:
     """
-    Load overview from workspace file if it exists.
+    Load overview from workspace file if it exists and is up to date.
+    
+    Parsed overviews are kept in an in-memory LRU, so repeat calls only
+    check the dataset fingerprint (a stat call while the file is unchanged).
     
     Returns:
-        OverviewResponse if file exists, None otherwise
+        OverviewResponse if a file exists for the current dataset content,
+        None if it is missing, invalid or stale
     """
-    overview_path = get_overview_file_path(workspace_id, dataset_id)
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    if fingerprint is None:
+        return None
     
-    logger.info(f"[load_overview_from_file] Attempting to load overview from: {overview_path}")
-    logger.info(f"[load_overview_from_file] File exists: {overview_path.exists()}")
+    cached = _overview_cache.get((workspace_id, dataset_id))
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    
+    overview_path = get_overview_file_path(workspace_id, dataset_id)
     
     if not overview_path.exists():
         logger.info(f"[load_overview_from_file] Overview file does not exist at {overview_path}")
         return None
     
     try:
-        # Log file info
-        file_size = overview_path.stat().st_size
-        logger.info(f"[load_overview_from_file] File size: {file_size} bytes")
+        with open(overview_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
         
-        if file_size == 0:
-            logger.warning(f"[load_overview_from_file] Overview file is empty: {overview_path}")
+        # Validate required fields
+        if not isinstance(data, dict):
+            logger.error(f"[load_overview_from_file] Parsed data is not a dict, got {type(data)}")
             return None
         
-        with open(overview_path, "r", encoding="utf-8") as f:
-            file_content = f.read()
-            logger.info(f"[load_overview_from_file] File content length: {len(file_content)} chars")
-            
-            # Parse JSON
-            data = json.loads(file_content)
-            logger.info(f"[load_overview_from_file] JSON parsed successfully, keys: {list(data.keys()) if isinstance(data, dict) else 'not a dict'}")
-            
-            # Validate required fields
-            if not isinstance(data, dict):
-                logger.error(f"[load_overview_from_file] Parsed data is not a dict, got {type(data)}")
-                return None
-            
-            required_fields = ["total_rows", "total_columns", "columns"]
-            missing_fields = [field for field in required_fields if field not in data]
-            if missing_fields:
-                logger.error(f"[load_overview_from_file] Missing required fields: {missing_fields}")
-                return None
-            
-            overview = OverviewResponse(**data)
-            logger.info(f"[load_overview_from_file] OverviewResponse created successfully")
-            return overview
+        required_fields = ["total_rows", "total_columns", "columns"]
+        missing_fields = [field for field in required_fields if field not in data]
+        if missing_fields:
+            logger.error(f"[load_overview_from_file] Missing required fields: {missing_fields}")
+            return None
+        
+        # Overviews saved before fingerprints were stored are treated as stale
+        if data.pop("dataset_fingerprint", None) != fingerprint:
+            logger.info(f"[load_overview_from_file] Overview for '{dataset_id}' is stale (dataset changed)")
+            return None
+        
+        overview = OverviewResponse(**data)
+        _overview_cache.set((workspace_id, dataset_id), (fingerprint, overview))
+        logger.info(f"[load_overview_from_file] Loaded overview from {overview_path}")
+        return overview
             
     except json.JSONDecodeError as e:
         logger.error(f"[load_overview_from_file] JSON decode error: {e}, file: {overview_path}")
-        logger.error(f"[load_overview_from_file] Error at line {e.lineno}, column {e.colno}: {e.msg}")
         return None
     except Exception as e:
         logger.error(f"[load_overview_from_file] Failed to load overview from {overview_path}: {e}", exc_info=True)
-        logger.error(f"[load_overview_from_file] Exception type: {type(e).__name__}, message: {str(e)}")
         return None
 
 
@@ -340,7 +363,7 @@ async def get_overview(
         if not refresh:
             logger.info(f"[OVERVIEW] Attempting to load from file...")
             try:
-                cached_overview = load_overview_from_file(workspace_id, dataset_id)
+                cached_overview = await run_io(load_overview_from_file, workspace_id, dataset_id)
                 if cached_overview:
                     logger.info(f"[RESPONSE SENT] Returning cached overview for {dataset_id}")
                     return cached_overview
@@ -352,31 +375,9 @@ async def get_overview(
         # Compute overview (either missing or refresh requested)
         try:
             logger.info(f"[OVERVIEW] Computing overview for {dataset_id} (refresh={refresh})")
-            logger.info(f"[OVERVIEW] Loading dataset...")
-            df = load_dataset(dataset_id, workspace_id)
-            logger.info(f"[OVERVIEW] Dataset loaded - rows={len(df)}, columns={len(df.columns)}")
-            logger.info(f"[OVERVIEW] Computing overview statistics...")
-            overview = compute_overview(df)
+            overview = await run_io(recompute_overview, workspace_id, dataset_id)
             logger.info(f"[OVERVIEW] Overview computed - rows={overview.total_rows}, columns={overview.total_columns}")
             
-            # Save to file for future use - CRITICAL: Must succeed
-            logger.info(f"[OVERVIEW] Saving overview to file...")
-            try:
-                save_overview_to_file(workspace_id, dataset_id, overview)
-                logger.info(f"[OVERVIEW] Overview file saved successfully")
-            except Exception as save_error:
-                logger.error(f"[OVERVIEW] Failed to save overview file: {save_error}", exc_info=True)
-                # Still return overview, but log the error
-                # Frontend will get overview in response, but file won't be cached
-                logger.warning(f"[OVERVIEW] Returning overview despite file save failure - file will not be cached")
-            
-            # Verify file exists after save (double-check)
-            overview_path = get_overview_file_path(workspace_id, dataset_id)
-            if overview_path.exists():
-                logger.info(f"[OVERVIEW] Verified overview file exists at {overview_path}")
-            else:
-                logger.warning(f"[OVERVIEW] WARNING: Overview file not found after save at {overview_path}")
-            
             logger.info(f"[RESPONSE SENT] Returning overview for {dataset_id}")
             return overview
             
@@ -409,17 +410,8 @@ async def get_overview_from_file(
         # Log request payload
         logger.info(f"[OVERVIEW_FILE] Request payload - dataset_id='{dataset_id}', workspace_id='{workspace_id}'")
         
-        # Get file path for logging
-        overview_path = get_overview_file_path(workspace_id, dataset_id)
-        logger.info(f"[OVERVIEW_FILE] Overview file path: {overview_path}")
-        logger.info(f"[OVERVIEW_FILE] File exists: {overview_path.exists()}")
-        
-        if overview_path.exists():
-            file_size = overview_path.stat().st_size
-            logger.info(f"[OVERVIEW_FILE] File size: {file_size} bytes")
-        
         logger.info(f"[OVERVIEW_FILE] Loading overview from file...")
-        overview = load_overview_from_file(workspace_id, dataset_id)
+        overview = await run_io(load_overview_from_file, workspace_id, dataset_id)
         
         if not overview:
             logger.warning(f"[OVERVIEW_FILE] Overview file not found or invalid for {dataset_id}")
@@ -443,15 +435,57 @@ async def get_overview_from_file(
         )
 
 
+def recompute_overview(workspace_id: str, dataset_id: str, exact: bool = False) -> OverviewResponse:
+    """
+    Recompute the overview of a dataset and save it to file.
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        exact: Count unique values exactly (no HyperLogLog estimates)
+    
+    Returns:
+        The recomputed overview
+    """
+    # Fingerprint before loading so a concurrent write can't be attributed to this overview
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    df = load_dataset(dataset_id, workspace_id)
+    distinct_sketches = {} if exact else get_distinct_sketches(workspace_id, dataset_id, df)
+    overview = compute_overview(df, distinct_sketches=distinct_sketches, exact=exact)
+    
+    # Save to file - CRITICAL: Must succeed
+    logger.info(f"[recompute_overview] Saving overview to file...")
+    try:
+        save_overview_to_file(workspace_id, dataset_id, overview, fingerprint)
+        logger.info(f"[recompute_overview] Overview file saved successfully")
+    except Exception as save_error:
+        logger.error(f"[recompute_overview] CRITICAL: Failed to save overview file: {save_error}", exc_info=True)
+        # Still return overview, but log the error
+        logger.warning(f"[recompute_overview] Returning overview despite file save failure")
+    
+    return overview
+
+
+def _refresh_overview_job(job: Job, dataset_id: str, exact: bool) -> Dict[str, Any]:
+    """Background job: recompute and save the overview (read it via GET /overview/file)."""
+    job.report(0.1, "Computing overview")
+    overview = recompute_overview(job.workspace_id, dataset_id, exact)
+    return {"dataset_id": dataset_id, "total_rows": overview.total_rows, "total_columns": overview.total_columns}
+
+
 @router.post("/refresh", response_model=OverviewResponse)
 async def refresh_overview(
     workspace_id: str = Query(...),
-    dataset_id: str = Query(...)
+    dataset_id: str = Query(...),
+    exact: bool = Query(False, description="Count unique values exactly (no HyperLogLog estimates)"),
+    background: bool = Query(False, description="Recompute in a background job and return 202 with the job")
 ):
     """
     Force refresh/recompute overview and save to file.
     
     This endpoint is called when user explicitly requests a refresh.
+    With background=True the recomputation runs as a job (poll GET /jobs/{job_id},
+    then read the overview from file).
     """
     if not dataset_exists(dataset_id, workspace_id):
         raise HTTPException(
@@ -459,25 +493,19 @@ async def refresh_overview(
             detail=f"Dataset '{dataset_id}' not found in workspace '{workspace_id}'"
         )
 
+    if background:
+        try:
+            job = submit_job(
+                "overview_refresh",
+                workspace_id,
+                _refresh_overview_job,
+                dataset_id,
+                exact,
+                params={"dataset_id": dataset_id, "exact": exact},
+            )
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(status_code=202, content=job.to_dict())
+
     logger.info(f"[refresh_overview] Forcing recomputation for {dataset_id}")
-    df = load_dataset(dataset_id, workspace_id)
-    overview = compute_overview(df)
-    
-    # Save to file - CRITICAL: Must succeed
-    logger.info(f"[refresh_overview] Saving overview to file...")
-    try:
-        save_overview_to_file(workspace_id, dataset_id, overview)
-        logger.info(f"[refresh_overview] Overview file saved successfully")
-    except Exception as save_error:
-        logger.error(f"[refresh_overview] CRITICAL: Failed to save overview file: {save_error}", exc_info=True)
-        # Still return overview, but log the error
-        logger.warning(f"[refresh_overview] Returning overview despite file save failure")
-    
-    # Verify file exists after save
-    overview_path = get_overview_file_path(workspace_id, dataset_id)
-    if overview_path.exists():
-        logger.info(f"[refresh_overview] Verified overview file exists at {overview_path}")
-    else:
-        logger.warning(f"[refresh_overview] WARNING: Overview file not found after save at {overview_path}")
-    
-    return overview
+    return await run_io(recompute_overview, workspace_id, dataset_id, exact)
@@ -7,6 +7,7 @@ Schema is the single source of truth for column metadata.
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
+from datetime import datetime
 import logging
 
 from app.services.schema_service import (
@@ -19,7 +20,9 @@ from app.services.schema_service import (
     clean_missing_values
 )
 from app.services.dataset_loader import dataset_exists
-from app.services.operation_logs import get_operation_logs
+from app.services.compute_executor import run_io
+from app.config import LOG_PAGE_MAX
+from app.services.operation_logs import query_operation_logs
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +53,7 @@ class ColumnSchema(BaseModel):
     missing_count: int
     missing_percentage: float
     unique_count: int
+    unique_count_error: float = 0.0  # Relative standard error (HyperLogLog estimate), 0.0 when exact
     numeric_stats: Optional[NumericStats] = None
 
 
@@ -72,7 +76,8 @@ class SchemaResponse(BaseModel):
 async def get_dataset_schema(
     dataset_id: str,
     workspace_id: str = Query(..., description="Workspace identifier"),
-    use_current: bool = Query(True, description="Use current_df (True) or raw_df (False)")
+    use_current: bool = Query(True, description="Use current_df (True) or raw_df (False)"),
+    exact: bool = Query(False, description="Exact unique counts and quartiles (no sketch estimates)")
 ):
     """
     Get schema for a dataset.
@@ -91,6 +96,7 @@ async def get_dataset_schema(
         dataset_id: Dataset filename (e.g., "sample.csv")
         workspace_id: Workspace identifier
         use_current: If True, use current_df (modified); if False, use raw_df (original)
+        exact: If True, compute exact unique counts and quartiles for large columns
         
     Returns:
         Schema with column metadata (or empty schema if dataset has issues)
@@ -127,7 +133,7 @@ async def get_dataset_schema(
         try:
             # Compute schema (will auto-load into cache if needed)
             logger.info(f"[SCHEMA] Calling compute_schema...")
-            schema = compute_schema(workspace_id, dataset_id, use_current=use_current)
+            schema = await run_io(compute_schema, workspace_id, dataset_id, use_current=use_current, exact=exact)
             logger.info(f"[SCHEMA] Schema computed, schema is None: {schema is None}, schema type: {type(schema)}")
             
             if schema is None:
@@ -182,7 +188,7 @@ async def load_dataset(
                 detail=f"Dataset '{dataset_id}' not found in workspace '{workspace_id}'"
             )
         
-        success = load_dataset_to_cache(workspace_id, dataset_id)
+        success = await run_io(load_dataset_to_cache, workspace_id, dataset_id)
         
         if not success:
             raise HTTPException(
@@ -290,7 +296,8 @@ async def clean_missing_values_endpoint(
             )
         
         # Apply cleaning operation (with preview mode support)
-        cleaned_df, affected_rows, error = clean_missing_values(
+        cleaned_df, affected_rows, error = await run_io(
+            clean_missing_values,
             workspace_id=workspace_id,
             dataset_id=dataset_id,
             column=request.column,
@@ -330,7 +337,7 @@ async def clean_missing_values_endpoint(
             )
         else:
             # Apply mode: recalculate schema and return it
-            updated_schema = compute_schema(workspace_id, dataset_id, use_current=True)
+            updated_schema = await run_io(compute_schema, workspace_id, dataset_id, use_current=True)
             
             if updated_schema is None:
                 raise HTTPException(
@@ -373,6 +380,7 @@ class OperationLogResponse(BaseModel):
     column_type: Optional[str] = None
     strategy: Optional[str] = None
     affected_rows: int
+    parameters: Dict[str, Any] = Field(default_factory=dict)  # Strategy parameters (e.g. constant_value)
     timestamp: str
 
 
@@ -381,26 +389,50 @@ class DatasetLogsResponse(BaseModel):
     workspace_id: str
     dataset_id: str
     logs: List[OperationLogResponse]
+    total: int = 0  # Matching entries (all pages)
 
 
 @router.get("/{dataset_id}/logs", response_model=DatasetLogsResponse)
 async def get_dataset_logs(
     dataset_id: str,
-    workspace_id: str = Query(..., description="Workspace identifier")
+    workspace_id: str = Query(..., description="Workspace identifier"),
+    limit: Optional[int] = Query(None, ge=1, le=LOG_PAGE_MAX, description="Maximum entries to return (all if omitted)"),
+    offset: int = Query(0, ge=0, description="Matching entries to skip"),
+    since: Optional[str] = Query(None, description="Only entries after this ISO timestamp"),
+    operation_type: Optional[str] = Query(None, description="Only entries of this operation type"),
+    column: Optional[str] = Query(None, description="Only entries on this column")
 ):
     """
     Get operation logs for a dataset.
     
-    Returns all operation logs in chronological order (oldest first).
-    Logs are append-only and never deleted or modified.
+    Returns operation logs in chronological order (oldest first), all of
+    them unless a page is requested with limit/offset. since,
+    operation_type and column filter the entries; total counts every
+    matching entry. Logs are append-only and never deleted or modified.
     
     Args:
         dataset_id: Dataset filename
         workspace_id: Workspace identifier
+        limit: Page size
+        offset: Page start (among matching entries)
+        since: Only entries after this timestamp
+        operation_type: Only entries of this operation type
+        column: Only entries on this column
         
     Returns:
         List of operation log entries
     """
+    if since is not None:
+        try:
+            since_time = datetime.fromisoformat(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid 'since' timestamp: {since}")
+        if since_time.tzinfo is not None:
+            # Entries are stamped in local time, without an offset
+            since_time = since_time.astimezone().replace(tzinfo=None)
+        # Same format as the entry timestamps, which are compared as strings
+        since = since_time.isoformat()
+    
     try:
         # Verify dataset exists
         if not dataset_exists(dataset_id, workspace_id):
@@ -408,7 +440,9 @@ async def get_dataset_logs(
             pass
         
         # Get logs
-        logs_data = get_operation_logs(workspace_id, dataset_id)
+        logs_data, total = await run_io(
+            query_operation_logs, workspace_id, dataset_id, limit, offset, since, operation_type, column
+        )
         
         # Convert to response models
         logs = [
@@ -416,12 +450,15 @@ async def get_dataset_logs(
             for log_entry in logs_data
         ]
         
-        logger.info(f"Returned {len(logs)} operation logs for dataset '{dataset_id}' in workspace '{workspace_id}'")
+        logger.info(
+            f"Returned {len(logs)} of {total} operation logs for dataset '{dataset_id}' in workspace '{workspace_id}'"
+        )
         
         return DatasetLogsResponse(
             workspace_id=workspace_id,
             dataset_id=dataset_id,
-            logs=logs
+            logs=logs,
+            total=total
         )
         
     except Exception as e:
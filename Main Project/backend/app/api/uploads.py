@@ -0,0 +1,184 @@
+"""
+Resumable (chunked) dataset upload API.
+
+Protocol for very large files:
+1. POST   /workspaces/{workspace_id}/uploads                          -> upload_id, part_size
+2. PUT    /workspaces/{workspace_id}/uploads/{upload_id}/parts/{n}    (raw body, n = 1, 2, ...)
+3. GET    /workspaces/{workspace_id}/uploads/{upload_id}              -> received parts (to resume)
+4. POST   /workspaces/{workspace_id}/uploads/{upload_id}/complete     -> dataset metadata + job_id
+   DELETE /workspaces/{workspace_id}/uploads/{upload_id}              -> abort
+
+Parts are streamed straight to disk and can be sent in any order or
+retried; completion assembles them in order into the dataset file.
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from typing import List, Optional
+import logging
+
+from app.config import UPLOAD_CHUNK_SIZE, UPLOAD_PART_SIZE
+from app.services.compute_executor import run_io
+from app.services.dataset_upload import (
+    PartWriter,
+    UploadValidationError,
+    abort_upload_session,
+    complete_upload_session,
+    create_upload_session,
+    get_upload_session,
+    register_uploaded_dataset,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/workspaces", tags=["uploads"])
+
+
+class CreateUploadRequest(BaseModel):
+    """Request model for starting a resumable upload."""
+    filename: str
+    total_size: Optional[int] = None  # Expected size in bytes (checked on completion)
+
+
+class UploadPart(BaseModel):
+    part_number: int
+    size: int
+
+
+class UploadSessionResponse(BaseModel):
+    """Resumable upload session state."""
+    upload_id: str
+    workspace_id: str
+    filename: str
+    total_size: Optional[int] = None
+    part_size: int
+    created_at: str
+    parts: List[UploadPart] = []
+    received_bytes: int = 0
+
+
+class UploadPartResponse(BaseModel):
+    upload_id: str
+    part_number: int
+    size: int
+    digest: str  # BLAKE2b-128 of the part as received
+
+
+class CompleteUploadRequest(BaseModel):
+    total_parts: Optional[int] = None  # Number of parts sent (missing parts are rejected)
+
+
+@router.post("/{workspace_id}/uploads", response_model=UploadSessionResponse)
+async def create_upload(workspace_id: str, request: CreateUploadRequest):
+    """
+    Start a resumable upload.
+
+    Raises:
+        HTTPException 400: If the filename is not a valid CSV filename
+    """
+    try:
+        session = await run_io(create_upload_session, workspace_id, request.filename, request.total_size, UPLOAD_PART_SIZE)
+    except UploadValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return UploadSessionResponse(**session)
+
+
+@router.get("/{workspace_id}/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(workspace_id: str, upload_id: str):
+    """
+    Get the state of a resumable upload (received parts), e.g. to resume it.
+
+    Raises:
+        HTTPException 404: If the upload session doesn't exist
+    """
+    try:
+        session = await run_io(get_upload_session, workspace_id, upload_id)
+    except UploadValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found")
+    return UploadSessionResponse(**session)
+
+
+@router.put("/{workspace_id}/uploads/{upload_id}/parts/{part_number}", response_model=UploadPartResponse)
+async def upload_part(workspace_id: str, upload_id: str, part_number: int, request: Request):
+    """
+    Upload one part (raw request body). Re-sending a part replaces it.
+
+    Raises:
+        HTTPException 400: If the part number is invalid
+        HTTPException 404: If the upload session doesn't exist
+    """
+    try:
+        writer = await run_io(PartWriter, workspace_id, upload_id, part_number)
+    except UploadValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        buffer = bytearray()
+        async for data in request.stream():
+            buffer += data
+            if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                await run_io(writer.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await run_io(writer.write, bytes(buffer))
+        part = await run_io(writer.finalize)
+    except Exception as e:
+        writer.abort()
+        logger.error(f"[upload_part] Failed to store part {part_number} of upload {upload_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to store upload part: {str(e)}")
+
+    return UploadPartResponse(upload_id=upload_id, **part)
+
+
+@router.post("/{workspace_id}/uploads/{upload_id}/complete")
+async def complete_upload(workspace_id: str, upload_id: str, request: CompleteUploadRequest):
+    """
+    Assemble the uploaded parts into the dataset and queue post-processing.
+
+    Returns:
+        Dataset metadata (same shape as the single-request upload endpoint)
+
+    Raises:
+        HTTPException 400: If parts are missing or the file is not a valid CSV
+        HTTPException 404: If the upload session doesn't exist
+    """
+    try:
+        info = await run_io(complete_upload_session, workspace_id, upload_id, request.total_parts)
+    except UploadValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"[complete_upload] Failed to complete upload {upload_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to complete upload: {str(e)}")
+
+    job_id = await run_io(register_uploaded_dataset, workspace_id, info)
+    return {
+        "id": info["id"],
+        "rows": info["rows"],
+        "columns": len(info["columns"]),
+        "size": info["size"],
+        "job_id": job_id,
+        "message": f"Dataset '{info['id']}' uploaded successfully to workspace"
+    }
+
+
+@router.delete("/{workspace_id}/uploads/{upload_id}")
+async def abort_upload(workspace_id: str, upload_id: str):
+    """
+    Abort a resumable upload and delete its parts.
+
+    Raises:
+        HTTPException 404: If the upload session doesn't exist
+    """
+    try:
+        removed = await run_io(abort_upload_session, workspace_id, upload_id)
+    except UploadValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found")
+    return {"message": f"Upload '{upload_id}' aborted", "upload_id": upload_id}
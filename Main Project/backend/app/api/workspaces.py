@@ -5,20 +5,25 @@ All datasets belong to a workspace and are stored in workspace-specific director
 Data Cleaning reads datasets ONLY from workspace storage.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 import pandas as pd
-import io
 import json
 import logging
 import shutil
-from datetime import datetime
-from app.config import get_workspace_dir, get_workspace_datasets_dir, get_workspace_logs_dir, get_workspace_files_dir, WORKSPACES_DIR, get_outlier_analysis_file_path
+from app.config import get_workspace_dir, get_workspace_datasets_dir, get_workspace_logs_dir, get_workspace_files_dir, WORKSPACES_DIR, get_outlier_analysis_file_path, UPLOAD_CHUNK_SIZE, CHART_MAX_POINTS, CHART_WIDTH, VIZION_TIMEOUT_SECONDS
 from app.services.dataset_loader import list_workspace_datasets, list_workspace_files, load_dataset, save_dataset, dataset_exists
-from app.services.outliers import detect_outliers_for_dataset
+from app.services.outlier_analysis import load_cached_outlier_analysis, run_outlier_analysis
+from app.services.jobs import Job, JobQueueFull, submit_job
+from app.services.dataset_upload import MultipartUpload, UploadValidationError, register_uploaded_dataset
+from app.services.file_transfer import build_file_response
+from app.services.dataset_export import DEFAULT_EXPORT_FORMAT, EXPORT_FORMATS, ExportError, iter_dataset_export
+from app.services.compute_executor import ComputeTimeout, run_io, run_isolated
+from app.services.cleaning_summary import get_cached_cleaning_summary, update_cleaning_summary
+from app.services.dataset_fingerprint import get_dataset_fingerprint
 from app.services.insight_storage import compute_dataset_hash
 from app.services.file_registry import (
     delete_workspace_files,
@@ -29,7 +34,17 @@ from app.services.file_registry import (
     get_file_metadata,
     unregister_file,
 )
-from app.services.vizion_runner import run_vizion, extract_vega_spec
+from app.services.vizion_runner import (
+    extract_vega_spec,
+    load_cached_vizion_output,
+    project_dataframe,
+    run_vizion_worker,
+    save_vizion_output,
+    vizion_cache_key,
+)
+from app.services.chart_aggregation import aggregate_chart_data
+from app.services.column_intelligence import get_column_intelligence, load_column_intelligence, load_latest_column_intelligence
+from app.services.downsampling import target_points
 
 logger = logging.getLogger(__name__)
 
@@ -169,11 +184,25 @@ async def get_workspace_files(workspace_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to list workspace files: {str(e)}")
 
 
+# Content types for downloads by file extension
+DOWNLOAD_MEDIA_TYPES = {
+    ".csv": "text/csv",
+    ".json": "application/json",
+    ".log": "text/plain",
+    ".ipynb": "application/x-ipynb+json",
+}
+
+
 @router.get("/{workspace_id}/files/{file_id}/download")
-async def download_workspace_file(workspace_id: str, file_id: str):
+async def download_workspace_file(workspace_id: str, file_id: str, request: Request, compress: bool = False):
     """
     Download a file from workspace storage.
     
+    Files are streamed from disk as stored (constant memory), with support for:
+    - Range requests (206 Partial Content) for partial/resumable downloads
+    - ETag / Last-Modified with If-None-Match / If-Modified-Since (304)
+    - Optional gzip transfer (compress=true and Accept-Encoding: gzip)
+    
     Files can be located in:
     - datasets/ directory (CSV files)
     - files/ directory (JSON, overview snapshots, etc.)
@@ -183,6 +212,7 @@ async def download_workspace_file(workspace_id: str, file_id: str):
     Args:
         workspace_id: Unique workspace identifier
         file_id: Filename to download (can include subdirectory prefix like "notebooks/auto_summarize.ipynb")
+        compress: Compress text files on the fly when the client accepts gzip
         
     Returns:
         File content with appropriate content type
@@ -241,52 +271,34 @@ async def download_workspace_file(workspace_id: str, file_id: str):
                 detail=f"File '{file_id}' not found in workspace '{workspace_id}'"
             )
         
+        # Only serve files inside the workspace (file_id may contain "..")
+        if not file_path.resolve().is_relative_to(workspace_dir.resolve()):
+            raise HTTPException(
+                status_code=404,
+                detail=f"File '{file_id}' not found in workspace '{workspace_id}'"
+            )
+        
         # Determine content type based on file extension
         suffix = file_path.suffix.lower()
-        if suffix == ".ipynb":
-            # For Jupyter notebook files, read as JSON with proper content type
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            media_type = "application/x-ipynb+json"
-        elif suffix == ".csv":
-            # For CSV files, read with pandas to ensure proper formatting
-            # Try auto-detecting delimiter first
-            df = pd.read_csv(file_path, sep=None, engine="python", on_bad_lines="skip")
-            
-            # Fallback: If only one column detected, try semicolon delimiter
-            if len(df.columns) == 1:
-                try:
-                    df_semicolon = pd.read_csv(file_path, sep=";", engine="python", on_bad_lines="skip")
-                    if len(df_semicolon.columns) > 1:
-                        df = df_semicolon
-                except Exception:
-                    # If semicolon parsing also fails, keep original
-                    pass
-            output = io.StringIO()
-            df.to_csv(output, index=False)
-            output.seek(0)
-            content = output.getvalue()
-            media_type = "text/csv"
-        elif suffix == ".json":
-            # For JSON files, read and return as-is
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            media_type = "application/json"
-        elif suffix == ".log":
-            # For LOG files, read as text
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            media_type = "text/plain"
-        else:
-            # For other file types, read as binary
-            with open(file_path, "rb") as f:
-                content = f.read()
-            media_type = "application/octet-stream"
-        
-        return StreamingResponse(
-            iter([content]),
-            media_type=media_type,
-            headers={"Content-Disposition": f'attachment; filename="{file_id}"'}
+        media_type = DOWNLOAD_MEDIA_TYPES.get(suffix, "application/octet-stream")
+        
+        # Datasets: strong ETag from the content fingerprint (memoized by file stat)
+        # Other files: weak ETag from size and modification time
+        stat = file_path.stat()
+        etag = f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        if file_path.parent == datasets_dir:
+            fingerprint = await run_io(get_dataset_fingerprint, workspace_id, file_path.name)
+            if fingerprint:
+                etag = f'"{fingerprint}"'
+        
+        return await run_io(
+            build_file_response,
+            request.headers,
+            file_path,
+            media_type,
+            Path(file_id).name,
+            etag,
+            compress,
         )
     except HTTPException:
         raise
@@ -295,20 +307,90 @@ async def download_workspace_file(workspace_id: str, file_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to download file: {str(e)}")
 
 
-@router.post("/{workspace_id}/datasets/upload")
-async def upload_dataset_to_workspace(
+@router.get("/{workspace_id}/datasets/{dataset_id}/export")
+async def export_dataset(
     workspace_id: str,
-    file: UploadFile = File(...)
+    dataset_id: str,
+    format: str = DEFAULT_EXPORT_FORMAT,
+    columns: Optional[str] = None,
+    rows: Optional[str] = None,
 ):
+    """
+    Export a dataset (or a column subset / row range of it) in a columnar or streaming format.
+    
+    The export is streamed in record batches, so the dataset is never loaded
+    into memory as a whole. With pyarrow installed it is read from the
+    dataset's columnar sidecar (built on first export).
+    
+    Args:
+        workspace_id: Unique workspace identifier
+        dataset_id: Dataset filename
+        format: parquet, feather, arrow (IPC stream) or ndjson (default:
+            parquet, or ndjson when pyarrow is not installed)
+        columns: Comma-separated columns to export, in order (default: all)
+        rows: Row range "start:end", end exclusive (default: all rows)
+        
+    Returns:
+        Streaming response with the encoded dataset
+        
+    Raises:
+        HTTPException 400: If the format, columns or row range are invalid
+        HTTPException 404: If the dataset doesn't exist
+    """
+    column_list = [col.strip() for col in columns.split(",") if col.strip()] if columns else None
+    try:
+        chunks = await run_io(iter_dataset_export, workspace_id, dataset_id, format, column_list, rows)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"[export_dataset] Failed to export '{dataset_id}' from workspace '{workspace_id}': {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to export dataset: {str(e)}")
+    
+    media_type, extension, _ = EXPORT_FORMATS[format]
+    filename = f"{Path(dataset_id).stem}{extension}"
+    # Sync iterator: Starlette consumes it in the threadpool, off the event loop
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# The body is parsed by hand (see MultipartUpload), so describe it for the API docs
+_UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }
+        }
+    },
+}
+
+
+@router.post("/{workspace_id}/datasets/upload", openapi_extra={"requestBody": _UPLOAD_REQUEST_BODY})
+async def upload_dataset_to_workspace(workspace_id: str, request: Request):
     """
     Upload a dataset to workspace storage.
     
     ATOMIC OPERATION:
-    1. Validate CSV file
-    2. Save to workspace storage
+    1. Parse the multipart body as it arrives and stream the file field to
+       a temp file (hashing it and validating the CSV header from a prefix
+       sample)
+    2. Rename into workspace storage
     3. Register in file registry
-    4. Generate and save dataset overview
-    5. Return success (or rollback on any failure)
+    4. Queue post-processing job (normalization, sketches, overview, outliers)
+    5. Return success (the temp file is removed on any failure)
+    
+    The file is never held in memory as a whole, and written to disk only
+    once (not spooled by the framework first), so latency and memory are
+    bounded by the disk write. For very large files use the resumable
+    upload endpoints (/workspaces/{workspace_id}/uploads).
     
     This endpoint allows frontend to sync workspace datasets to backend storage.
     When a dataset is uploaded to a workspace in the frontend, it should also
@@ -316,87 +398,52 @@ async def upload_dataset_to_workspace(
     
     Args:
         workspace_id: Unique workspace identifier
-        file: CSV file to upload
+        request: multipart/form-data body with the CSV file in its "file" field
         
     Returns:
-        Dataset metadata with rows and columns
+        Dataset metadata with rows (estimated from the line count) and
+        columns, and the post-processing job_id
     """
-    temp_file_path = None
+    upload = None
     try:
-        if not file.filename or not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
-        
-        # Step 1: Read and validate CSV content
-        contents = await file.read()
-        if not contents:
-            raise HTTPException(status_code=400, detail="Uploaded file is empty")
-        
+        # Step 1: Stream to a temp file and validate
         try:
-            # Try auto-detecting delimiter first (pandas can detect comma, semicolon, tab, etc.)
-            df = pd.read_csv(io.BytesIO(contents), sep=None, engine="python", on_bad_lines="skip")
+            upload = MultipartUpload(workspace_id, request.headers.get("content-type", ""))
+            buffer = bytearray()
+            async for data in request.stream():
+                buffer += data
+                if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                    await run_io(upload.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await run_io(upload.write, bytes(buffer))
             
-            # Fallback: If only one column detected, try semicolon delimiter
-            if len(df.columns) == 1:
-                try:
-                    df_semicolon = pd.read_csv(io.BytesIO(contents), sep=";", engine="python", on_bad_lines="skip")
-                    if len(df_semicolon.columns) > 1:
-                        df = df_semicolon
-                except Exception:
-                    pass
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to parse CSV file: {str(e)}")
+            # Step 2: Move into workspace storage
+            info = await run_io(upload.finalize)
+        except UploadValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        # Validate parsed data
-        if len(df.columns) == 0:
-            raise HTTPException(status_code=400, detail="CSV file has no columns")
-        
-        # Step 2: Save to workspace storage
-        datasets_dir = get_workspace_datasets_dir(workspace_id)
-        file_path = datasets_dir / file.filename
-        temp_file_path = file_path  # Track for rollback if needed
-        
-        try:
-            df.to_csv(file_path, index=False)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to save dataset to workspace: {str(e)}")
-        
-        # Step 3: Register CSV file in registry (protected)
-        try:
-            from app.services.file_registry import register_file
-            register_file(
-                file_path=str(file_path),
-                workspace_id=workspace_id,
-                file_type="csv",
-                is_protected=True,
-            )
-        except Exception as e:
-            logger.warning(f"Failed to register file in registry (non-critical): {e}")
-            # Don't fail upload - registration is best-effort
-        
-        # Step 4: Generate and save overview IMMEDIATELY after upload
-        # This ensures overview always exists for newly uploaded datasets
-        try:
-            from app.api.overview import compute_overview, save_overview_to_file
-            logger.info(f"Generating overview for uploaded dataset: {file.filename}")
-            overview = compute_overview(df)
-            save_overview_to_file(workspace_id, file.filename, overview)
-            logger.info(f"Overview generated and saved for dataset: {file.filename}")
-        except Exception as e:
-            logger.error(f"Failed to generate overview after upload (non-critical): {e}")
-            # Don't fail upload - overview can be generated on-demand later
-            # But log the failure for debugging
+        # Steps 3-4: Register and post-process in the background
+        # The overview endpoint computes on demand if it isn't ready yet
+        job_id = await run_io(register_uploaded_dataset, workspace_id, info)
         
         # Step 5: Return success
         return {
-            "id": file.filename,
-            "rows": len(df),
-            "columns": len(df.columns),
-            "message": f"Dataset '{file.filename}' uploaded successfully to workspace"
+            "id": info["id"],
+            "rows": info["rows"],
+            "columns": len(info["columns"]),
+            "size": info["size"],
+            "job_id": job_id,
+            "message": f"Dataset '{info['id']}' uploaded successfully to workspace"
         }
         
     except HTTPException:
+        if upload is not None:
+            upload.abort()
         raise
     except Exception as e:
+        if upload is not None:
+            upload.abort()
         logger.error(f"Unexpected error during dataset upload: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to upload dataset: {str(e)}")
 
@@ -404,6 +451,7 @@ async def upload_dataset_to_workspace(
 class SummaryRequest(BaseModel):
     """Request model for cleaning summary."""
     dataset: str
+    exact: bool = False  # Force exact quartiles for IQR outliers (large datasets use sketches)
 
 
 class ColumnSummary(BaseModel):
@@ -434,6 +482,9 @@ async def get_cleaning_summary(workspace_id: str, request: SummaryRequest):
     - Outlier count (for numeric columns)
     - Health score
     
+    Results are cached per dataset fingerprint (memory + workspace cache
+    directory); when the dataset changed, only changed columns are recomputed.
+    
     Requirements:
     - Parameter validation: workspace_id and dataset name required
     - Returns 404 if dataset doesn't exist
@@ -481,9 +532,16 @@ async def get_cleaning_summary(workspace_id: str, request: SummaryRequest):
                 detail=f"Dataset '{request.dataset}' not found in workspace"
             )
         
-        # Step 3: Load dataset
+        # Step 3: Serve from cache if the dataset content is unchanged
+        fingerprint = await run_io(get_dataset_fingerprint, workspace_id, request.dataset)
+        cached_summary = await run_io(get_cached_cleaning_summary, workspace_id, request.dataset, fingerprint, request.exact)
+        if cached_summary is not None:
+            logger.info(f"[get_cleaning_summary] Serving cached summary (fingerprint={fingerprint})")
+            return CleaningSummaryResponse(**cached_summary)
+        
+        # Step 4: Load dataset
         try:
-            df = load_dataset(request.dataset, workspace_id)
+            df = await run_io(load_dataset, request.dataset, workspace_id)
         except Exception as e:
             logger.error(
                 f"[get_cleaning_summary] Error loading dataset '{request.dataset}': {str(e)}",
@@ -504,7 +562,7 @@ async def get_cleaning_summary(workspace_id: str, request: SummaryRequest):
         
         logger.info(f"[get_cleaning_summary] Dataset loaded - rows={len(df)}, columns={len(df.columns)}")
         
-        # Step 4: Analyze dataset
+        # Step 5: Analyze dataset
         try:
             total_rows = len(df)
             if total_rows == 0:
@@ -516,80 +574,12 @@ async def get_cleaning_summary(workspace_id: str, request: SummaryRequest):
                     overall_score=0.0
                 )
             
-            column_summaries = []
-            total_health_score = 0
-            
-            # Analyze each column
-            for col in df.columns:
-                col_data = df[col]
-                
-                # Determine column type
-                if pd.api.types.is_numeric_dtype(col_data):
-                    col_type = "numeric"
-                elif pd.api.types.is_datetime64_any_dtype(col_data):
-                    col_type = "datetime"
-                elif pd.api.types.is_bool_dtype(col_data):
-                    col_type = "boolean"
-                else:
-                    col_type = "categorical"
-                
-                # Calculate missing percentage
-                missing_count = col_data.isna().sum()
-                missing_pct = (missing_count / total_rows * 100) if total_rows > 0 else 0
-                missing_pct = max(0.0, min(100.0, missing_pct))  # Clamp to 0-100
-                
-                # Calculate duplicate contribution (percentage of rows that are duplicates)
-                duplicate_count = col_data.duplicated().sum()
-                duplicates_pct = (duplicate_count / total_rows * 100) if total_rows > 0 else 0
-                duplicates_pct = max(0.0, min(100.0, duplicates_pct))  # Clamp to 0-100
-                
-                # Calculate outliers for numeric columns
-                outliers = None
-                if col_type == "numeric" and not col_data.isna().all():
-                    try:
-                        Q1 = col_data.quantile(0.25)
-                        Q3 = col_data.quantile(0.75)
-                        IQR = Q3 - Q1
-                        if IQR > 0:
-                            lower_bound = Q1 - 1.5 * IQR
-                            upper_bound = Q3 + 1.5 * IQR
-                            outliers = int(((col_data < lower_bound) | (col_data > upper_bound)).sum())
-                        else:
-                            outliers = 0
-                    except Exception as e:
-                        logger.warning(f"[get_cleaning_summary] Error calculating outliers for column '{col}': {e}")
-                        outliers = None
-                
-                # Calculate health score (0-100)
-                # Penalize: missing values, duplicates, outliers, type inconsistencies
-                health_score = 100.0
-                health_score -= min(missing_pct * 2, 40)  # Up to 40 points for missing
-                health_score -= min(duplicates_pct * 1, 20)  # Up to 20 points for duplicates
-                if outliers is not None and outliers > 0:
-                    outlier_pct = (outliers / total_rows * 100) if total_rows > 0 else 0
-                    health_score -= min(outlier_pct * 0.5, 20)  # Up to 20 points for outliers
-                health_score = max(0.0, min(100.0, health_score))  # Clamp to 0-100
-                
-                column_summaries.append(ColumnSummary(
-                    name=col,
-                    type=col_type,
-                    missing_pct=round(missing_pct, 2),
-                    duplicates_pct=round(duplicates_pct, 2),
-                    outliers=outliers,
-                    health_score=round(health_score, 1)
-                ))
-                
-                total_health_score += health_score
-            
-            # Calculate overall score
-            overall_score = (total_health_score / len(column_summaries)) if column_summaries else 0.0
-            overall_score = round(overall_score, 1)
-            
-            response = CleaningSummaryResponse(
-                rows=total_rows,
-                columns=column_summaries,
-                overall_score=overall_score
+            # Analyze changed columns (in parallel) and cache the result
+            summary = await run_io(
+                update_cleaning_summary,
+                workspace_id, request.dataset, df, fingerprint, exact=request.exact
             )
+            response = CleaningSummaryResponse(**summary)
             
             logger.info(
                 f"[get_cleaning_summary] Success - rows={response.rows}, "
@@ -800,6 +790,11 @@ async def get_dataset_overview(workspace_id: str, request: OverviewRequest):
     
     logger.info(f"[get_dataset_overview] Request received - workspace_id={workspace_id}, dataset={request.dataset}")
     
+    return await run_io(_build_dataset_overview, workspace_id, request)
+
+
+def _build_dataset_overview(workspace_id: str, request: OverviewRequest) -> OverviewResponse:
+    """Blocking part of get_dataset_overview (runs in the compute executor)."""
     try:
         # Step 2: Validate dataset exists in workspace
         if not dataset_exists(request.dataset, workspace_id):
@@ -1304,8 +1299,19 @@ class OutlierDetectionResponse(BaseModel):
     total_outliers: int
 
 
+def _outlier_analysis_job(job: Job, dataset_id: str, method: str, threshold: float, exact: bool) -> Dict[str, Any]:
+    """Background job: run and persist outlier analysis (result served from cache)."""
+    job.report(0.1, "Detecting outliers")
+    analysis = run_outlier_analysis(job.workspace_id, dataset_id, method, threshold, exact)
+    return {
+        "dataset_id": dataset_id,
+        "method": analysis["method"],
+        "total_outliers": analysis["total_outliers"],
+    }
+
+
 @router.get("/{workspace_id}/datasets/{dataset_id}/outliers", response_model=OutlierDetectionResponse)
-async def detect_outliers(workspace_id: str, dataset_id: str, method: str = "zscore", threshold: float = 3.0, force_recompute: bool = False):
+async def detect_outliers(workspace_id: str, dataset_id: str, method: str = "zscore", threshold: float = 3.0, force_recompute: bool = False, exact: bool = False, background: bool = False):
     """
     Detect outliers in numeric columns of a dataset.
     
@@ -1317,6 +1323,10 @@ async def detect_outliers(workspace_id: str, dataset_id: str, method: str = "zsc
         dataset_id: Dataset filename (e.g., "sample.csv")
         method: Detection method ("zscore" or "iqr", default: "zscore")
         threshold: Z-score threshold (only used for zscore method, default: 3.0)
+        exact: Force exact quartiles for the iqr method (large datasets use sketches)
+        background: If True and no valid cached analysis exists, run detection as a
+                    background job and return 202 with the job (poll GET /jobs/{job_id};
+                    the result is then served from cache by this endpoint)
     
     Returns:
         List of detected outliers with:
@@ -1345,77 +1355,41 @@ async def detect_outliers(workspace_id: str, dataset_id: str, method: str = "zsc
         
         # Check for cached outlier analysis (unless force_recompute is True)
         if not force_recompute:
-            outlier_file_path = get_outlier_analysis_file_path(workspace_id, dataset_id)
-            if outlier_file_path.exists():
-                try:
-                    with open(outlier_file_path, "r") as f:
-                        cached_analysis = json.load(f)
-                    
-                    # Verify dataset hash matches (dataset hasn't changed)
-                    current_hash = compute_dataset_hash(workspace_id, dataset_id)
-                    stored_hash = cached_analysis.get("dataset_hash")
-                    
-                    if stored_hash == current_hash and cached_analysis.get("method") == method.lower():
-                        logger.info(f"[detect_outliers] Using cached outlier analysis from {outlier_file_path}")
-                        return OutlierDetectionResponse(
-                            workspace_id=workspace_id,
-                            dataset_id=dataset_id,
-                            method=cached_analysis.get("method", method.lower()),
-                            outliers=cached_analysis.get("outliers", []),
-                            total_outliers=cached_analysis.get("total_outliers", 0)
-                        )
-                    else:
-                        logger.info(f"[detect_outliers] Dataset changed or method mismatch, recomputing outliers")
-                except Exception as e:
-                    logger.warning(f"[detect_outliers] Failed to load cached analysis: {e}, recomputing")
-        
-        df = load_dataset(dataset_id, workspace_id)
-        
-        # Detect outliers
-        outliers = detect_outliers_for_dataset(df, method.lower(), threshold) if not df.empty else []
-        
-        logger.info(f"[detect_outliers] Detected {len(outliers)} outliers in dataset '{dataset_id}'")
-        
-        # Compute dataset hash for cache invalidation
-        dataset_hash = compute_dataset_hash(workspace_id, dataset_id)
-        
-        # Save outlier analysis to file for caching (even if no outliers found)
-        outlier_analysis = {
-            "workspace_id": workspace_id,
-            "dataset_id": dataset_id,
-            "dataset_hash": dataset_hash,
-            "method": method.lower(),
-            "threshold": threshold,
-            "timestamp": datetime.now().isoformat(),
-            "outliers": outliers,
-            "total_outliers": len(outliers),
-        }
-        
-        outlier_file_path = get_outlier_analysis_file_path(workspace_id, dataset_id)
-        outlier_file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(outlier_file_path, "w") as f:
-            json.dump(outlier_analysis, f, indent=2, default=str)
+            cached_analysis = await run_io(load_cached_outlier_analysis, workspace_id, dataset_id, method, exact)
+            if cached_analysis is not None:
+                return OutlierDetectionResponse(
+                    workspace_id=workspace_id,
+                    dataset_id=dataset_id,
+                    method=cached_analysis.get("method", method.lower()),
+                    outliers=cached_analysis.get("outliers", []),
+                    total_outliers=cached_analysis.get("total_outliers", 0)
+                )
         
-        logger.info(f"[detect_outliers] Saved outlier analysis to {outlier_file_path}")
+        if background:
+            job = submit_job(
+                "outlier_analysis",
+                workspace_id,
+                _outlier_analysis_job,
+                dataset_id,
+                method,
+                threshold,
+                exact,
+                params={"dataset_id": dataset_id, "method": method.lower(), "threshold": threshold, "exact": exact},
+            )
+            return JSONResponse(status_code=202, content=job.to_dict())
         
-        # Register file in registry
-        from app.services.file_registry import register_file
-        register_file(
-            file_path=str(outlier_file_path),
-            workspace_id=workspace_id,
-            file_type="overview",  # Use "overview" type so it appears in Files page as "Generated by: Outlier Analysis"
-            is_protected=False,  # Outlier analysis files can be deleted
-        )
+        outlier_analysis = await run_io(run_outlier_analysis, workspace_id, dataset_id, method, threshold, exact)
         
         return OutlierDetectionResponse(
             workspace_id=workspace_id,
             dataset_id=dataset_id,
-            method=method.lower(),
-            outliers=outliers,
-            total_outliers=len(outliers)
+            method=outlier_analysis["method"],
+            outliers=outlier_analysis["outliers"],
+            total_outliers=outlier_analysis["total_outliers"]
         )
         
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -1443,6 +1417,11 @@ async def get_cached_outlier_analysis(workspace_id: str, dataset_id: str):
     """
     logger.info(f"[get_cached_outlier_analysis] Request received - workspace_id={workspace_id}, dataset_id={dataset_id}")
     
+    return await run_io(_load_cached_outlier_response, workspace_id, dataset_id)
+
+
+def _load_cached_outlier_response(workspace_id: str, dataset_id: str) -> OutlierDetectionResponse:
+    """Blocking part of get_cached_outlier_analysis (runs in the compute executor)."""
     try:
         # Check if cached file exists
         outlier_file_path = get_outlier_analysis_file_path(workspace_id, dataset_id)
@@ -1461,13 +1440,13 @@ async def get_cached_outlier_analysis(workspace_id: str, dataset_id: str):
         stored_hash = cached_analysis.get("dataset_hash")
         
         if stored_hash != current_hash:
-            logger.info(f"[get_cached_outlier_analysis] Dataset hash mismatch, cache invalid")
+            logger.info("[get_cached_outlier_analysis] Dataset hash mismatch, cache invalid")
             raise HTTPException(
                 status_code=404,
                 detail="Cached analysis is invalid (dataset has changed)"
             )
         
-        logger.info(f"[get_cached_outlier_analysis] Returning cached analysis")
+        logger.info("[get_cached_outlier_analysis] Returning cached analysis")
         return OutlierDetectionResponse(
             workspace_id=workspace_id,
             dataset_id=dataset_id,
@@ -1524,6 +1503,8 @@ async def generate_column_intelligence(
     Generate AI-powered column intelligence explanations.
     
     This endpoint generates explanations for what each column means and why it's used.
+    The result is persisted per dataset and returned as-is on later calls unless
+    regenerate is true or the dataset's columns changed.
     
     Args:
         workspace_id: Workspace identifier
@@ -1544,64 +1525,12 @@ async def generate_column_intelligence(
                 detail=f"Dataset '{request.datasetId}' not found in workspace '{workspace_id}'"
             )
         
-        # Load dataset to get column information
-        df = load_dataset(request.datasetId, workspace_id)
-        logger.info(f"[Column Intelligence API] Dataset loaded - rows={len(df)}, columns={len(df.columns)}")
-        
-        # Generate intelligence for each column
-        columns_intelligence = []
-        for col in df.columns:
-            # Infer basic data type
-            if pd.api.types.is_numeric_dtype(df[col]):
-                data_type = "numeric"
-            elif pd.api.types.is_datetime64_any_dtype(df[col]):
-                data_type = "datetime"
-            else:
-                data_type = "categorical"
-            
-            # Generate simple explanations (can be enhanced with AI later)
-            # For now, provide basic explanations based on column name and type
-            col_name_lower = col.lower()
-            
-            # Generate meaning based on column name patterns
-            if any(word in col_name_lower for word in ['id', 'key', 'index']):
-                meaning = f"Unique identifier for each record in the dataset"
-                why_used = "Used to uniquely identify and reference individual records"
-            elif any(word in col_name_lower for word in ['date', 'time', 'timestamp']):
-                meaning = f"Date or time information"
-                why_used = "Used to track temporal information and enable time-based analysis"
-            elif any(word in col_name_lower for word in ['name', 'title', 'label']):
-                meaning = f"Descriptive text or label"
-                why_used = "Used to provide human-readable descriptions or names"
-            elif any(word in col_name_lower for word in ['price', 'cost', 'amount', 'value', 'revenue']):
-                meaning = f"Monetary or numeric value"
-                why_used = "Used to represent quantitative financial or numeric measurements"
-            elif any(word in col_name_lower for word in ['count', 'number', 'quantity', 'total']):
-                meaning = f"Numeric count or quantity"
-                why_used = "Used to represent numeric counts, quantities, or totals"
-            elif data_type == "numeric":
-                meaning = f"Numeric measurement or value"
-                why_used = "Used for quantitative analysis and mathematical operations"
-            elif data_type == "datetime":
-                meaning = f"Date or time information"
-                why_used = "Used for temporal analysis and time-based filtering"
-            else:
-                meaning = f"Categorical classification or text data"
-                why_used = "Used for grouping, filtering, and categorical analysis"
-            
-            columns_intelligence.append(ColumnIntelligenceColumn(
-                name=col,
-                data_type=data_type,
-                meaning=meaning,
-                why_used=why_used
-            ))
-        
-        intelligence = ColumnIntelligence(
-            columns=columns_intelligence,
-            generated_at=int(datetime.now().timestamp() * 1000)  # milliseconds
-        )
+        # Stored intelligence is reused unless regenerate is set or the columns changed;
+        # generation only reads the header and a small sample (schema probe)
+        intelligence = await run_io(get_column_intelligence, workspace_id, request.datasetId, request.regenerate)
+        intelligence = ColumnIntelligence(**intelligence)
         
-        logger.info(f"[Column Intelligence API] Generated intelligence for {len(columns_intelligence)} columns")
+        logger.info(f"[Column Intelligence API] Intelligence ready for {len(intelligence.columns)} columns")
         logger.info(f"[Column Intelligence API] Returning intelligence response")
         
         return ColumnIntelligenceResponse(intelligence=intelligence)
@@ -1617,29 +1546,43 @@ async def generate_column_intelligence(
 
 
 @router.get("/{workspace_id}/column-intelligence", response_model=ColumnIntelligenceResponse)
-async def get_column_intelligence(workspace_id: str):
+async def get_stored_column_intelligence(workspace_id: str, datasetId: Optional[str] = None):
     """
     Get stored column intelligence for a workspace.
     
-    This endpoint retrieves previously generated column intelligence.
-    If no intelligence exists, returns 404.
+    This endpoint retrieves previously generated column intelligence, without
+    regenerating it. Intelligence whose dataset columns changed is not returned.
     
     Args:
         workspace_id: Workspace identifier
+        datasetId: Dataset filename (default: the most recently generated intelligence in the workspace)
         
     Returns:
         Column intelligence if exists, 404 otherwise
     """
     logger.info(f"[Column Intelligence API] GET /workspaces/{workspace_id}/column-intelligence HIT")
-    logger.info(f"[Column Intelligence API] Request params: workspace_id={workspace_id}")
-    
-    # For now, return 404 as intelligence is generated on-demand
-    # In the future, this could load from a stored file
-    logger.info(f"[Column Intelligence API] No stored intelligence found, returning 404")
-    raise HTTPException(
-        status_code=404,
-        detail=f"Column intelligence not found for workspace '{workspace_id}'. Call POST endpoint to generate."
-    )
+    logger.info(f"[Column Intelligence API] Request params: workspace_id={workspace_id}, datasetId={datasetId}")
+    
+    try:
+        if datasetId:
+            intelligence = await run_io(load_column_intelligence, workspace_id, datasetId)
+        else:
+            latest = await run_io(load_latest_column_intelligence, workspace_id)
+            intelligence = latest["intelligence"] if latest else None
+    except Exception as e:
+        logger.error(f"[Column Intelligence API] Error loading column intelligence: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to load column intelligence: {str(e)}"
+        )
+    
+    if intelligence is None:
+        logger.info(f"[Column Intelligence API] No stored intelligence found, returning 404")
+        raise HTTPException(
+            status_code=404,
+            detail=f"Column intelligence not found for workspace '{workspace_id}'. Call POST endpoint to generate."
+        )
+    return ColumnIntelligenceResponse(intelligence=ColumnIntelligence(**intelligence))
 
 # ----------------------------
 # Chart Generation Endpoint
@@ -1766,76 +1709,203 @@ def generate_vega_lite_spec(
     x_col: str,
     y_col: str,
     aggregation: str,
+    params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Generate a Vega-Lite specification for the chart.
     
+    IMPORTANT: Data is aggregated on the server (see chart_aggregation); the
+    spec only carries the aggregated values (at most CHART_MAX_POINTS), so
+    its size depends on the number of groups, not on the number of rows.
+    Line and area charts are downsampled to about CHART_POINTS_PER_PIXEL
+    points per pixel of width; scatter charts on large datasets become a
+    2-D density heatmap.
+    
     Args:
         df: DataFrame with data
-        chart_type: Type of chart (bar, line, histogram, scatter, pie)
+        chart_type: Type of chart (bar, line, area, histogram, scatter, pie)
         x_col: Column name for X-axis
         y_col: Column name for Y-axis
-        aggregation: Aggregation function (count, sum, avg, etc.)
+        aggregation: Aggregation function (count, sum, avg, min, max)
+        params: Optional chart parameters (bins, top_n, max_points, width,
+            downsample = lttb / minmax for line and area charts,
+            density / density_threshold / density_bins / overlay_points for scatter)
         
     Returns:
         Vega-Lite specification dictionary
+        
+    Raises:
+        ValueError: If a column or the aggregation is invalid
     """
+    chart_data = aggregate_chart_data(df, chart_type, x_col, y_col, aggregation, params)
+    x_field, y_field = chart_data.x_field, chart_data.y_field
     
-    # Base spec with data included
+    # Base spec with pre-aggregated data included
     spec: Dict[str, Any] = {
-        "data": {"values": df.to_dict(orient="records")},
-        "width": 700,
+        "data": {"values": chart_data.values},
+        "width": (params or {}).get("width", CHART_WIDTH),
         "height": 400,
-        "encoding": {
-            "x": {"field": x_col, "type": "nominal"},
-            "y": {"field": y_col, "type": "quantitative", "aggregate": aggregation},
-        },
+        "usermeta": {"data4viz": chart_data.metadata()},
     }
     
-    # Chart-specific configuration
-    if chart_type == "bar":
-        spec["mark"] = "bar"
-        spec["encoding"]["x"] = {"field": x_col, "type": "nominal"}
-        spec["encoding"]["y"] = {"field": y_col, "type": "quantitative", "aggregate": aggregation}
-    
-    elif chart_type == "line":
-        spec["mark"] = "line"
-        spec["encoding"]["x"] = {"field": x_col, "type": "temporal"}
-        spec["encoding"]["y"] = {"field": y_col, "type": "quantitative", "aggregate": aggregation}
+    # Chart-specific configuration (values are already aggregated: no "aggregate" in encodings)
+    if chart_type in ("line", "area"):
+        spec["mark"] = chart_type
+        spec["encoding"] = {
+            "x": {"field": x_field, "type": chart_data.x_type},
+            "y": {"field": y_field, "type": "quantitative"},
+        }
+        if chart_data.x_type == "ordinal":
+            # Categories are already in order of appearance
+            spec["encoding"]["x"]["sort"] = None
     
-    elif chart_type == "histogram":
+    elif chart_type == "histogram" and x_field == "bin_start":
         spec["mark"] = "bar"
-        spec["encoding"]["x"] = {"field": x_col, "type": "quantitative", "bin": True}
-        spec["encoding"]["y"] = {"aggregate": "count", "type": "quantitative"}
+        spec["encoding"] = {
+            "x": {"field": "bin_start", "type": "quantitative", "bin": {"binned": True}, "title": x_col},
+            "x2": {"field": "bin_end"},
+            "y": {"field": "count", "type": "quantitative"},
+        }
+    
+    elif chart_type == "scatter" and chart_data.mode == "density":
+        # Heatmap of counts per grid cell, with optional sampled points on top
+        spec["layer"] = [{
+            "mark": "rect",
+            "encoding": {
+                "x": {"field": "x_start", "type": "quantitative", "bin": {"binned": True}, "title": x_col},
+                "x2": {"field": "x_end"},
+                "y": {"field": "y_start", "type": "quantitative", "bin": {"binned": True}, "title": y_col},
+                "y2": {"field": "y_end"},
+                "color": {"field": "count", "type": "quantitative", "scale": {"type": "log"}, "title": "Rows"},
+            },
+        }]
+        if chart_data.overlay:
+            spec["layer"].append({
+                "data": {"values": chart_data.overlay},
+                "mark": {"type": "point", "size": 4, "opacity": 0.4, "color": "black"},
+                "encoding": {
+                    "x": {"field": x_col, "type": "quantitative"},
+                    "y": {"field": y_col, "type": "quantitative"},
+                },
+            })
     
     elif chart_type == "scatter":
         spec["mark"] = "point"
-        spec["encoding"]["x"] = {"field": x_col, "type": "quantitative"}
-        spec["encoding"]["y"] = {"field": y_col, "type": "quantitative"}
+        spec["encoding"] = {
+            "x": {"field": x_field, "type": "quantitative"},
+            "y": {"field": y_field, "type": "quantitative"},
+        }
     
     elif chart_type == "pie":
         spec["mark"] = "arc"
-        spec["encoding"]["theta"] = {"field": y_col, "type": "quantitative", "aggregate": aggregation}
-        spec["encoding"]["color"] = {"field": x_col, "type": "nominal"}
+        spec["encoding"] = {
+            "theta": {"field": y_field, "type": "quantitative"},
+            "color": {"field": x_field, "type": "nominal", "sort": None},
+        }
     
     else:
-        # Default to bar
+        # Bar (default, also histograms of non-numeric columns)
         spec["mark"] = "bar"
+        spec["encoding"] = {
+            "x": {"field": x_field, "type": "nominal", "sort": None},
+            "y": {"field": y_field, "type": "quantitative"},
+        }
     
     return spec
 
 
+def _inline_row_count(spec: Dict[str, Any]) -> int:
+    """Number of inline data rows in a Vega-Lite spec (0 if the data isn't inline)."""
+    data = spec.get("data")
+    if isinstance(data, dict) and isinstance(data.get("values"), list):
+        return len(data["values"])
+    return 0
+
+
+async def _render_vizion_chart(workspace_id: str, dataset_id: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """
+    Load a dataset and render a chart with Vizion (isolated worker process, time-limited).
+    
+    Only the columns referenced in params are loaded into the worker.
+    
+    Returns:
+        Tuple of (Vega-Lite spec, insight text)
+        
+    Raises:
+        HTTPException 400: If the dataset is empty or a parameter is invalid
+        HTTPException 500/502/504: If Vizion fails, returns no spec or times out
+    """
+    df = await run_io(load_dataset, dataset_id, workspace_id)
+    
+    # Check if dataset is empty
+    if df.empty:
+        logger.warning(f"[generateChart] Dataset is empty: {dataset_id}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dataset '{dataset_id}' has no rows to visualize"
+        )
+    
+    # Only the referenced columns are pickled into the worker
+    df = project_dataframe(df, params)
+    
+    # Call Vizion runner with real DataFrame and parameters
+    try:
+        vizion_output = await run_isolated(run_vizion_worker, params, df, timeout=VIZION_TIMEOUT_SECONDS)
+    except ComputeTimeout:
+        logger.error(f"[generateChart] Vizion timed out after {VIZION_TIMEOUT_SECONDS}s for {dataset_id}")
+        raise HTTPException(status_code=504, detail=f"Vizion did not finish within {VIZION_TIMEOUT_SECONDS:g} seconds")
+    except Exception as e:
+        logger.error(f"[generateChart] Vizion runner failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Vizion execution failed: {str(e)}")
+
+    # Extract Vega-Lite spec from Vizion output
+    vega_spec = extract_vega_spec(vizion_output)
+    if not vega_spec:
+        # If Vizion didn't return a Vega-Lite spec, fail safely
+        logger.error("[generateChart] Vizion did not return a Vega-Lite specification")
+        raise HTTPException(status_code=502, detail="Vizion did not return a Vega-Lite specification")
+
+    # Vizion may inline every row; keep chart responses O(groups), and
+    # trend charts no denser than the chart's pixel width
+    inline_rows = _inline_row_count(vega_spec)
+    point_limit = CHART_MAX_POINTS
+    if params["chart_type"] in ("line", "area"):
+        point_limit = target_points(params.get("width", CHART_WIDTH))
+    if inline_rows > point_limit:
+        logger.info(f"[generateChart] Vizion spec inlines {inline_rows} rows, replacing with server-side aggregation")
+        try:
+            aggregated_spec = await run_io(
+                generate_vega_lite_spec,
+                df,
+                params["chart_type"],
+                params["x_column"],
+                params.get("y_column") or params["x_column"],
+                params.get("aggregation") or "count",
+                params,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        for key in ("title", "description", "width", "height", "config"):
+            if key in vega_spec:
+                aggregated_spec[key] = vega_spec[key]
+        vega_spec = aggregated_spec
+
+    insight_text = vizion_output.get("insight_text", "") if isinstance(vizion_output, dict) else ""
+    return vega_spec, insight_text
+
+
 @router.post("/{workspace_id}/datasets/{dataset_id}/chart", response_model=ChartGenerationResponse)
 async def generate_chart(workspace_id: str, dataset_id: str, request: ChartGenerationRequest):
     """
     Generate a chart for a dataset.
     
     This endpoint:
-    1. Loads the dataset from workspace storage
-    2. Loads the schema to understand column types
-    3. Infers optimal chart properties based on visualization goal
-    4. Generates a Vega-Lite specification
-    5. Returns the spec with real data rows injected
+    1. Builds the Vizion parameters from the request overrides
+    2. Returns the cached chart if the same dataset content was already
+       rendered with the same parameters (memory, then disk)
+    3. Otherwise loads the referenced columns and renders the chart with
+       Vizion in a worker process (time-limited)
+    4. Returns the spec with aggregated data (at most CHART_MAX_POINTS values)
     
     Args:
         workspace_id: Workspace identifier
@@ -1856,22 +1926,6 @@ async def generate_chart(workspace_id: str, dataset_id: str, request: ChartGener
                 detail=f"Dataset '{dataset_id}' not found in workspace '{workspace_id}'"
             )
         
-        # Load dataset
-        df = load_dataset(dataset_id, workspace_id)
-        
-        # Check if dataset is empty
-        if df.empty:
-            logger.warning(f"[generateChart] Dataset is empty: {dataset_id}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Dataset '{dataset_id}' has no rows to visualize"
-            )
-        
-        # Load schema (optional) - used only for validation hints
-        from app.api.schema import get_dataset_schema_internal
-        schema_response = get_dataset_schema_internal(dataset_id, workspace_id, use_current=True)
-        schema = schema_response.get("columns", []) if schema_response and schema_response.get("columns") else []
-
         # Build structured Vizion parameters from request.overrides
         params: Dict[str, Any] = {}
         if not request.overrides:
@@ -1895,21 +1949,21 @@ async def generate_chart(workspace_id: str, dataset_id: str, request: ChartGener
         if "chart_type" not in params or "x_column" not in params:
             raise HTTPException(status_code=400, detail="Parameters 'chart_type' and 'x_column' are required")
 
-        # Call Vizion runner with real DataFrame and parameters
-        try:
-            vizion_output = run_vizion(params, df)
-        except Exception as e:
-            logger.error(f"[generateChart] Vizion runner failed: {str(e)}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Vizion execution failed: {str(e)}")
-
-        # Extract Vega-Lite spec from Vizion output
-        vega_spec = extract_vega_spec(vizion_output)
-        if not vega_spec:
-            # If Vizion didn't return a Vega-Lite spec, fail safely
-            logger.error("[generateChart] Vizion did not return a Vega-Lite specification")
-            raise HTTPException(status_code=502, detail="Vizion did not return a Vega-Lite specification")
-
-        insight_text = vizion_output.get("insight_text", "") if isinstance(vizion_output, dict) else ""
+        # Same dataset content + same parameters -> cached output, without loading the dataset
+        fingerprint = await run_io(get_dataset_fingerprint, workspace_id, dataset_id)
+        cache_key = vizion_cache_key(fingerprint, params) if fingerprint else None
+        cached_output = await run_io(load_cached_vizion_output, workspace_id, cache_key) if cache_key else None
+        if cached_output is not None:
+            logger.info(f"[generateChart] Serving cached chart for {dataset_id} (key {cache_key})")
+            vega_spec = cached_output["vega_lite_spec"]
+            insight_text = cached_output.get("insight_text", "")
+        else:
+            vega_spec, insight_text = await _render_vizion_chart(workspace_id, dataset_id, params)
+            if cache_key:
+                await run_io(save_vizion_output, workspace_id, cache_key, {
+                    "vega_lite_spec": vega_spec,
+                    "insight_text": insight_text,
+                })
 
         response = ChartGenerationResponse(
             insight_text=insight_text,
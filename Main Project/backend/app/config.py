@@ -1,5 +1,6 @@
 """Configuration settings for the Data4Viz backend."""
 
+import os
 from pathlib import Path
 
 # Base directory
@@ -20,6 +21,130 @@ ALLOWED_ORIGINS = ["http://localhost:3000"]
 # Maximum sample rows for preview
 MAX_PREVIEW_ROWS = 5
 
+# Rows read by the schema probe (column names + dtypes without loading the dataset)
+SCHEMA_PROBE_ROWS = 1_000
+
+# Quantile sketches (KLL) for IQR bounds and quartiles
+# Target normalized rank error of the sketch (0.01 = quartiles within 1% of rank)
+QUANTILE_SKETCH_ERROR = 0.01
+# Columns with fewer non-null values than this are answered exactly with pandas
+QUANTILE_SKETCH_MIN_ROWS = 100_000
+
+# HyperLogLog distinct counts (nunique) for large columns
+# 2**14 registers -> ~0.8% relative standard error, 16 KB per column
+HLL_PRECISION = 14
+# Columns with fewer rows than this are counted exactly with pandas
+DISTINCT_SKETCH_MIN_ROWS = 100_000
+
+# Column-parallel profiling (overview, cleaning summary)
+# Number of workers; override with DATA4VIZ_PROFILE_WORKERS (1 = serial)
+PROFILE_WORKERS = int(os.environ.get("DATA4VIZ_PROFILE_WORKERS", os.cpu_count() or 1))
+# Datasets with object columns and at least this many rows are profiled in
+# worker processes instead of threads (Python-object work holds the GIL)
+PROFILE_PROCESS_MIN_ROWS = 200_000
+
+# Dataset fingerprints: files are hashed in chunks of this size, so changed
+# byte ranges can be located between versions
+FINGERPRINT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Background jobs (upload post-processing, precomputation, EDA)
+# Number of jobs that run concurrently
+JOB_WORKERS = int(os.environ.get("DATA4VIZ_JOB_WORKERS", 2))
+# Maximum number of queued (not yet running) jobs
+JOB_QUEUE_LIMIT = 100
+
+# Dataset uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# The CSV header/delimiter is validated from this many leading bytes
+UPLOAD_SAMPLE_BYTES = 256 * 1024
+# Default part size for resumable (chunked) uploads
+UPLOAD_PART_SIZE = 16 * 1024 * 1024
+# Resumable upload sessions not completed within this many hours are discarded
+UPLOAD_SESSION_TTL_HOURS = 24
+
+# Dataset exports are streamed in record batches of this many rows
+EXPORT_BATCH_ROWS = 64_000
+
+# Operation logs (append-only JSONL): appends are flushed at once and fsynced
+# in batches, at most once per file per this many seconds (0 = every append)
+LOG_FSYNC_INTERVAL = float(os.environ.get("DATA4VIZ_LOG_FSYNC_INTERVAL", 1.0))
+# Largest page of log entries returned by one request
+LOG_PAGE_MAX = 1_000
+
+# Chart generation: data is aggregated on the server before it goes into a spec
+# Hard cap on data points (rows of "data.values") in a chart spec
+CHART_MAX_POINTS = 5_000
+# Nominal X axes keep this many categories; the rest is merged into "Other"
+CHART_TOP_N = 30
+# A non-numeric line/area X is a time axis if at least this share of its
+# values parse as dates; otherwise it is drawn as ordered categories
+CHART_DATE_MIN_SHARE = 0.8
+# Default chart width in pixels; line charts are downsampled to this many points per pixel
+CHART_WIDTH = 700
+CHART_POINTS_PER_PIXEL = 2
+# Scatter charts on datasets with at least this many rows are drawn as a 2-D
+# density grid (counts per cell) instead of individual points
+CHART_DENSITY_MIN_ROWS = int(os.environ.get("DATA4VIZ_CHART_DENSITY_MIN_ROWS", 50_000))
+# Density grid size (cells along X and Y)
+CHART_DENSITY_BINS = (80, 60)
+
+# Compute executor: blocking dataset work is run off the event loop
+# Threads for I/O-heavy work (load/save datasets, most pandas operations)
+COMPUTE_IO_WORKERS = int(os.environ.get("DATA4VIZ_COMPUTE_IO_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+# Processes for CPU-heavy, self-contained work (0 = use the thread pool)
+COMPUTE_CPU_WORKERS = int(os.environ.get("DATA4VIZ_COMPUTE_CPU_WORKERS", os.cpu_count() or 1))
+# Processes for isolated work with a timeout (third-party code such as Vizion)
+COMPUTE_ISOLATED_WORKERS = int(os.environ.get("DATA4VIZ_COMPUTE_ISOLATED_WORKERS", 2))
+
+# Vizion chart rendering
+# Seconds before a Vizion run is aborted (its worker process is killed)
+VIZION_TIMEOUT_SECONDS = float(os.environ.get("DATA4VIZ_VIZION_TIMEOUT", 60))
+# Cached Vizion outputs: in-memory entries, and on-disk entries per workspace
+VIZION_CACHE_SIZE = 128
+VIZION_DISK_CACHE_ENTRIES = 500
+
+# Decision EDA segments (categorical factors)
+# Segments with fewer rows than this are ignored (their means are noise)
+SEGMENT_MIN_SUPPORT = int(os.environ.get("DATA4VIZ_SEGMENT_MIN_SUPPORT", 5))
+# Number of highest / lowest segments reported per factor
+SEGMENT_TOP_K = 3
+# Memoized decision EDA results: in-memory entries, and on-disk entries per workspace
+DECISION_EDA_CACHE_SIZE = 256
+DECISION_EDA_DISK_CACHE_ENTRIES = 1_000
+# Decision EDA statistics cube: not built when it would hold more
+# (segment, numeric column) cells than this (EDA then reads rows)
+EDA_CUBE_MAX_CELLS = 2_000_000
+
+# Decision EDA significance (bootstrap confidence intervals, permutation p-values)
+# Resamples of each kind per metric (fewer when the time budget runs out)
+SIGNIFICANCE_RESAMPLES = 1_000
+# Default seconds spent resampling per metric; override with DATA4VIZ_SIGNIFICANCE_BUDGET
+SIGNIFICANCE_TIME_BUDGET = float(os.environ.get("DATA4VIZ_SIGNIFICANCE_BUDGET", 2.0))
+# Largest time budget a request may ask for
+SIGNIFICANCE_MAX_TIME_BUDGET = 60.0
+SIGNIFICANCE_CONFIDENCE = 0.95
+# Categorical factors with more supported segments than this get no confidence
+# interval: the bootstrap range of their segment means is too biased to invert
+SIGNIFICANCE_MAX_CI_SEGMENTS = 20
+# Resamples x rows handled per matrix operation (bounds memory)
+SIGNIFICANCE_CHUNK_CELLS = 4_000_000
+# Rows x design columns kept in memory between resample blocks (float32)
+SIGNIFICANCE_DESIGN_CELLS = 50_000_000
+# Metrics with at least this many valid rows are resampled in worker processes
+SIGNIFICANCE_PROCESS_MIN_ROWS = 50_000
+
+# Replay of cleaning operations (rebuilds a dataset's current state from its log)
+# A checkpoint of the state is written every this many operations
+REPLAY_CHECKPOINT_INTERVAL = int(os.environ.get("DATA4VIZ_REPLAY_CHECKPOINT_INTERVAL", 10))
+# Checkpoints kept per dataset (the oldest are pruned)
+REPLAY_MAX_CHECKPOINTS = 20
+
+# AI context bundles
+# Characters per token when estimating the size of a bundle
+AI_CONTEXT_CHARS_PER_TOKEN = 4
+# Bundles kept in memory
+AI_CONTEXT_CACHE_SIZE = 64
+
 
 def get_workspace_dir(workspace_id: str) -> Path:
     """
@@ -61,6 +186,60 @@ def get_workspace_logs_dir(workspace_id: str) -> Path:
     return logs_dir
 
 
+def get_workspace_cache_dir(workspace_id: str) -> Path:
+    """
+    Get the cache directory for a workspace.
+    
+    This directory contains derived, rebuildable artifacts (column sketches,
+    cached summaries, ...). It is not listed as workspace files.
+    """
+    cache_dir = get_workspace_dir(workspace_id) / "cache"
+    cache_dir.mkdir(exist_ok=True)
+    return cache_dir
+
+
+def get_workspace_jobs_dir(workspace_id: str) -> Path:
+    """
+    Get the jobs directory for a workspace.
+    
+    This directory contains background job records (status, progress, result).
+    """
+    jobs_dir = get_workspace_dir(workspace_id) / "jobs"
+    jobs_dir.mkdir(exist_ok=True)
+    return jobs_dir
+
+
+def get_workspace_uploads_dir(workspace_id: str) -> Path:
+    """
+    Get the uploads directory for a workspace.
+    
+    This directory contains in-progress uploads (temp files and resumable
+    upload sessions). It is on the same filesystem as datasets/, so finished
+    uploads are moved into place with an atomic rename.
+    """
+    uploads_dir = get_workspace_dir(workspace_id) / "uploads"
+    uploads_dir.mkdir(exist_ok=True)
+    return uploads_dir
+
+
+def get_workspace_insights_dir(workspace_id: str) -> Path:
+    """
+    Get the insights directory for a workspace.
+    
+    This directory contains the decision EDA insight snapshot store: the
+    SQLite index (versions, latest pointers) and the compressed snapshot
+    contents under blobs/.
+    """
+    insights_dir = get_workspace_dir(workspace_id) / "insights"
+    insights_dir.mkdir(exist_ok=True)
+    return insights_dir
+
+
+def get_insight_index_path(workspace_id: str) -> Path:
+    """Get the path to the insight snapshot index (SQLite) of a workspace."""
+    return get_workspace_insights_dir(workspace_id) / "index.sqlite3"
+
+
 def get_workspace_files_dir(workspace_id: str) -> Path:
     """
     Get the files directory for a workspace.
@@ -116,3 +295,220 @@ def get_outlier_analysis_file_path(workspace_id: str, dataset_id: str) -> Path:
     dataset_name = Path(dataset_id).stem
     outlier_filename = f"{dataset_name}_outlier_analysis.json"
     return files_dir / outlier_filename
+
+
+def get_column_sketches_file_path(workspace_id: str, dataset_id: str) -> Path:
+    """
+    Get the path to the persisted column sketches for a dataset.
+    
+    Format: dataset_name_sketches.json (in the workspace cache directory)
+    Example: netflix.csv -> netflix_sketches.json
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        
+    Returns:
+        Path to column sketches JSON file
+    """
+    cache_dir = get_workspace_cache_dir(workspace_id)
+    dataset_name = Path(dataset_id).stem
+    return cache_dir / f"{dataset_name}_sketches.json"
+
+
+def get_cleaning_summary_cache_file_path(workspace_id: str, dataset_id: str) -> Path:
+    """
+    Get the path to the cached cleaning summary for a dataset.
+    
+    Format: dataset_name_cleaning_summary_cache.json (in the workspace cache directory)
+    Example: netflix.csv -> netflix_cleaning_summary_cache.json
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        
+    Returns:
+        Path to cleaning summary cache JSON file
+    """
+    cache_dir = get_workspace_cache_dir(workspace_id)
+    dataset_name = Path(dataset_id).stem
+    return cache_dir / f"{dataset_name}_cleaning_summary_cache.json"
+
+
+def get_fingerprint_file_path(workspace_id: str, dataset_id: str) -> Path:
+    """
+    Get the path to the persisted fingerprint of a dataset.
+    
+    Format: dataset_name_fingerprint.json (in the workspace cache directory)
+    Example: netflix.csv -> netflix_fingerprint.json
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        
+    Returns:
+        Path to fingerprint JSON file
+    """
+    cache_dir = get_workspace_cache_dir(workspace_id)
+    dataset_name = Path(dataset_id).stem
+    return cache_dir / f"{dataset_name}_fingerprint.json"
+
+
+def get_columnar_cache_file_path(workspace_id: str, dataset_id: str) -> Path:
+    """
+    Get the path to the columnar (Arrow IPC) sidecar of a dataset.
+    
+    Format: dataset_name_columnar.arrow (in the workspace cache directory)
+    Example: netflix.csv -> netflix_columnar.arrow
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        
+    Returns:
+        Path to the Arrow IPC file
+    """
+    cache_dir = get_workspace_cache_dir(workspace_id)
+    dataset_name = Path(dataset_id).stem
+    return cache_dir / f"{dataset_name}_columnar.arrow"
+
+
+def get_vizion_cache_dir(workspace_id: str) -> Path:
+    """
+    Get the directory of cached Vizion outputs for a workspace.
+    
+    Entries are keyed by dataset fingerprint and chart parameters, so they
+    never go stale; the oldest entries are pruned.
+    """
+    vizion_dir = get_workspace_cache_dir(workspace_id) / "vizion"
+    vizion_dir.mkdir(exist_ok=True)
+    return vizion_dir
+
+
+def get_decision_eda_cache_dir(workspace_id: str) -> Path:
+    """
+    Get the directory of memoized decision EDA results for a workspace.
+    
+    Entries are keyed by dataset fingerprint, decision metric and options,
+    so they never go stale; the oldest entries are pruned.
+    """
+    eda_dir = get_workspace_cache_dir(workspace_id) / "decision_eda"
+    eda_dir.mkdir(exist_ok=True)
+    return eda_dir
+
+
+def get_column_intelligence_file_path(workspace_id: str, dataset_id: str) -> Path:
+    """
+    Get the path to the persisted column intelligence of a dataset.
+    
+    Format: dataset_name_column_intelligence.json (in the workspace cache directory)
+    Example: netflix.csv -> netflix_column_intelligence.json
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        
+    Returns:
+        Path to column intelligence JSON file
+    """
+    cache_dir = get_workspace_cache_dir(workspace_id)
+    dataset_name = Path(dataset_id).stem
+    return cache_dir / f"{dataset_name}_column_intelligence.json"
+
+
+def get_correlation_matrix_file_path(workspace_id: str, dataset_id: str, method: str = "pearson") -> Path:
+    """
+    Get the path to the cached correlation matrix of a dataset.
+    
+    Format: dataset_name_correlation_<method>.npz (in the workspace cache directory)
+    Example: netflix.csv -> netflix_correlation_pearson.npz
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        method: Correlation method ("pearson" or "spearman")
+        
+    Returns:
+        Path to the NumPy archive
+    """
+    cache_dir = get_workspace_cache_dir(workspace_id)
+    dataset_name = Path(dataset_id).stem
+    return cache_dir / f"{dataset_name}_correlation_{method}.npz"
+
+
+def get_ai_context_file_path(workspace_id: str, dataset_id: str) -> Path:
+    """
+    Get the path to the cached AI context bundle of a dataset.
+    
+    Format: dataset_name_ai_context.json (in the workspace cache directory)
+    Example: netflix.csv -> netflix_ai_context.json
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        
+    Returns:
+        Path to AI context JSON file
+    """
+    cache_dir = get_workspace_cache_dir(workspace_id)
+    dataset_name = Path(dataset_id).stem
+    return cache_dir / f"{dataset_name}_ai_context.json"
+
+
+def get_log_index_file_path(workspace_id: str, log_path: Path) -> Path:
+    """
+    Get the path to the offset index of an append-only JSONL log.
+    
+    Format: <log dir>_<log name>.idx (in the log_index subdirectory of the
+    workspace cache directory)
+    Example: files/movie_logs.jsonl -> log_index/files_movie_logs.jsonl.idx
+    
+    Args:
+        workspace_id: Workspace identifier
+        log_path: Path to the JSONL log
+        
+    Returns:
+        Path to the index file
+    """
+    index_dir = get_workspace_cache_dir(workspace_id) / "log_index"
+    index_dir.mkdir(exist_ok=True)
+    return index_dir / f"{log_path.parent.name}_{log_path.name}.idx"
+
+
+def get_eda_cube_file_path(workspace_id: str, dataset_id: str) -> Path:
+    """
+    Get the path to the decision EDA statistics cube of a dataset.
+    
+    Format: dataset_name_eda_cube.npz (in the workspace cache directory)
+    Example: netflix.csv -> netflix_eda_cube.npz
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        
+    Returns:
+        Path to the NumPy archive
+    """
+    cache_dir = get_workspace_cache_dir(workspace_id)
+    dataset_name = Path(dataset_id).stem
+    return cache_dir / f"{dataset_name}_eda_cube.npz"
+
+
+def get_replay_checkpoint_dir(workspace_id: str, dataset_id: str) -> Path:
+    """
+    Get the directory of replay checkpoints of a dataset.
+    
+    Format: replay/dataset_name (in the workspace cache directory), one
+    <operations>.npz file per checkpoint
+    Example: netflix.csv -> replay/netflix/00000010.npz
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename (e.g., "netflix.csv")
+        
+    Returns:
+        Path to the checkpoint directory
+    """
+    checkpoint_dir = get_workspace_cache_dir(workspace_id) / "replay" / Path(dataset_id).stem
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    return checkpoint_dir
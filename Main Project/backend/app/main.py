@@ -10,6 +10,8 @@ from app.api.schema import router as schema_router
 from app.api.ai_context import router as ai_context_router
 from app.api.python_execution import router as python_execution_router
 from app.api.decision_eda import router as decision_eda_router
+from app.api.jobs import router as jobs_router
+from app.api.uploads import router as uploads_router
 
 from app.config import ALLOWED_ORIGINS
 
@@ -31,6 +33,7 @@ app.add_middleware(
 # Include routers
 # IMPORTANT: Workspace router must be included for workspace-aware operations
 app.include_router(workspaces_router)
+app.include_router(uploads_router)  # Resumable dataset uploads
 app.include_router(cleaning_router)
 app.include_router(datasets_router)  # Legacy endpoint for backward compatibility
 app.include_router(overview_router, prefix="/api")
@@ -38,6 +41,7 @@ app.include_router(schema_router)  # Schema endpoint
 app.include_router(ai_context_router)  # AI context endpoint
 app.include_router(python_execution_router)  # Python execution for AI analysis
 app.include_router(decision_eda_router, prefix="/api")  # Decision-driven EDA endpoint
+app.include_router(jobs_router)  # Background job status
 
 
 
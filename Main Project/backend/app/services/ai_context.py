@@ -3,18 +3,216 @@ AI Context service for Data4Viz.
 
 Generates AI-friendly context files (schema, logs, dataset summary) without raw data.
 These files provide metadata and statistics only - no actual data values.
+
+Schema and dataset summary come from one profiling pass over the dataset's
+current state. The whole bundle is cached (in memory and in the workspace
+cache directory) per dataset fingerprint and number of logged operations,
+which together identify the current state, so repeated requests don't touch
+the data.
+
+Bundles of wide datasets can be fitted to a token budget (see
+fit_context_bundle): columns are ranked by informativeness and the least
+useful ones are compacted, then omitted, until the bundle fits.
 """
 
-from typing import Dict, Any, Optional
+import json
+from typing import Dict, Any, Optional, Tuple
 import logging
 
-from app.services.schema_service import compute_schema
-from app.services.operation_logs import get_operation_logs
-from app.services.dataset_loader import dataset_exists, load_dataset
+from app.config import AI_CONTEXT_CACHE_SIZE, AI_CONTEXT_CHARS_PER_TOKEN, get_ai_context_file_path
+from app.services.schema_service import get_canonical_type, get_current_df, get_numeric_stats, load_dataset_to_cache
+from app.services.operation_logs import get_operation_logs, query_operation_logs
+from app.services.dataset_loader import dataset_exists
+from app.services.dataset_fingerprint import get_dataset_fingerprint
+from app.services.column_sketches import get_column_sketches
+from app.utils.cache import LRUCache, atomic_write_json
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Full bundles (keyed by workspace, dataset, fingerprint and logged operations)
+_bundle_cache = LRUCache(maxsize=AI_CONTEXT_CACHE_SIZE)
+
+
+def _profile_dataset(workspace_id: str, dataset_id: str, operations: int) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Schema and dataset summary contexts from one pass over the current state.
+    
+    Each column is scanned once: one distinct count (with missing values)
+    gives both the unique and the duplicate count, and the quartiles of the
+    numeric statistics give the IQR outlier fences.
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        operations: Number of logged operations (the state equals the
+            dataset file when there are none)
+        
+    Returns:
+        Tuple of (schema context, dataset summary context), or None if the
+        dataset can't be loaded
+    """
+    df = get_current_df(workspace_id, dataset_id)
+    if df is None:
+        if not load_dataset_to_cache(workspace_id, dataset_id):
+            return None
+        df = get_current_df(workspace_id, dataset_id)
+        if df is None:
+            return None
+    
+    total_rows = len(df)
+    total_columns = len(df.columns)
+    
+    # Sketches describe the dataset file, so they only apply before any cleaning
+    sketches = get_column_sketches(workspace_id, dataset_id, df) if operations == 0 else {}
+    
+    schema_columns = []
+    column_summaries = []
+    total_health_score = 0.0
+    
+    for col in df.columns:
+        col_data = df[col]
+        canonical_type = get_canonical_type(col_data)
+        
+        # Calculate metrics (no raw values)
+        missing_count = int(col_data.isna().sum())
+        missing_pct = round((missing_count / total_rows * 100) if total_rows > 0 else 0.0, 2)
+        
+        distinct_with_missing = int(col_data.nunique(dropna=False))
+        unique_count = distinct_with_missing - (1 if missing_count > 0 else 0)
+        duplicate_count = total_rows - distinct_with_missing
+        duplicates_pct = round((duplicate_count / total_rows * 100) if total_rows > 0 else 0.0, 2)
+        
+        # Statistics and outliers for numeric columns only
+        numeric_stats = None
+        outliers = None
+        if canonical_type == "numeric":
+            values = col_data if pd.api.types.is_numeric_dtype(col_data) else pd.to_numeric(col_data, errors="coerce")
+            numeric_stats = get_numeric_stats(values, sketch=sketches.get(col))
+            if numeric_stats is not None:
+                Q1, Q3 = numeric_stats["q25"], numeric_stats["q75"]
+                IQR = Q3 - Q1 if Q1 is not None and Q3 is not None else 0.0
+                if IQR > 0:
+                    lower_bound, upper_bound = Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+                    outliers = int(((values < lower_bound) | (values > upper_bound)).sum())
+                else:
+                    outliers = 0
+        
+        # Calculate health score
+        health_score = 100.0
+        health_score -= min(missing_pct * 2, 40)
+        health_score -= min(duplicates_pct * 1, 20)
+        if outliers is not None:
+            outlier_pct = (outliers / total_rows * 100) if total_rows > 0 else 0
+            health_score -= min(outlier_pct * 0.5, 20)
+        health_score = max(health_score, 0)
+        
+        schema_columns.append({
+            "name": col,
+            "canonical_type": canonical_type,
+            "pandas_dtype": str(col_data.dtype),
+            "missing_count": missing_count,
+            "missing_percentage": missing_pct,
+            "unique_count": unique_count,
+            "numeric_stats": numeric_stats,  # Only stats, no raw values
+        })
+        column_summaries.append({
+            "name": col,
+            "canonical_type": canonical_type,
+            "missing_count": missing_count,
+            "missing_percentage": missing_pct,
+            "duplicate_count": duplicate_count,
+            "duplicate_percentage": duplicates_pct,
+            "outlier_count": outliers,
+            "health_score": round(health_score, 1),
+        })
+        
+        total_health_score += health_score
+    
+    # Calculate overall score
+    overall_score = round((total_health_score / len(column_summaries)) if column_summaries else 0, 1)
+    
+    # Count duplicates at row level
+    duplicate_row_count = int(df.duplicated().sum())
+    
+    schema_context = {
+        "workspace_id": workspace_id,
+        "dataset_id": dataset_id,
+        "total_rows": total_rows,
+        "total_columns": total_columns,
+        "columns": schema_columns,
+        "computed_at": pd.Timestamp.now().isoformat(),
+        "using_current": True,
+    }
+    summary_context = {
+        "workspace_id": workspace_id,
+        "dataset_id": dataset_id,
+        "total_rows": total_rows,
+        "total_columns": total_columns,
+        "duplicate_row_count": duplicate_row_count,
+        "overall_health_score": overall_score,
+        "columns": column_summaries,
+    }
+    return schema_context, summary_context
+
+
+def _read_cached_bundle(workspace_id: str, dataset_id: str, fingerprint: str, operations: int) -> Optional[Dict[str, Any]]:
+    path = get_ai_context_file_path(workspace_id, dataset_id)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except Exception as e:
+        logger.warning(f"[ai_context] Failed to read {path.name}: {e}")
+        return None
+    if record.get("fingerprint") != fingerprint or record.get("operations") != operations:
+        return None
+    return record.get("bundle")
+
+
+def _save_cached_bundle(workspace_id: str, dataset_id: str, fingerprint: str, operations: int, bundle: Dict[str, Any]) -> None:
+    record = {
+        "dataset_id": dataset_id,
+        "fingerprint": fingerprint,
+        "operations": operations,
+        "bundle": bundle,
+    }
+    try:
+        atomic_write_json(get_ai_context_file_path(workspace_id, dataset_id), record, default=str)
+    except Exception as e:
+        logger.warning(f"[ai_context] Failed to persist AI context for '{dataset_id}': {e}")
+
+
+def _get_full_bundle(workspace_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    """Complete bundle of the current state, cached per fingerprint and logged operations."""
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    if fingerprint is None:
+        return None
+    _, operations = query_operation_logs(workspace_id, dataset_id, limit=0)
+    
+    key = (workspace_id, dataset_id, fingerprint, operations)
+    bundle = _bundle_cache.get(key)
+    if bundle is None:
+        bundle = _read_cached_bundle(workspace_id, dataset_id, fingerprint, operations)
+    if bundle is None:
+        profile = _profile_dataset(workspace_id, dataset_id, operations)
+        if profile is None:
+            return None
+        schema_context, summary_context = profile
+        bundle = {
+            "workspace_id": workspace_id,
+            "dataset_id": dataset_id,
+            "generated_at": pd.Timestamp.now().isoformat(),
+            "schema": schema_context,
+            "logs": generate_logs_context(workspace_id, dataset_id),
+            "dataset_summary": summary_context,
+        }
+        _save_cached_bundle(workspace_id, dataset_id, fingerprint, operations, bundle)
+        logger.info(f"[ai_context] Built AI context for '{dataset_id}' ({len(schema_context['columns'])} columns)")
+    _bundle_cache.set(key, bundle)
+    return bundle
+
 
 def generate_schema_context(workspace_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
     """
@@ -28,31 +226,8 @@ def generate_schema_context(workspace_id: str, dataset_id: str) -> Optional[Dict
         Schema context dictionary or None if dataset not found
     """
     try:
-        schema = compute_schema(workspace_id, dataset_id, use_current=True)
-        if not schema:
-            return None
-        
-        # Return schema without raw data - only metadata
-        return {
-            "workspace_id": schema["workspace_id"],
-            "dataset_id": schema["dataset_id"],
-            "total_rows": schema["total_rows"],
-            "total_columns": schema["total_columns"],
-            "columns": [
-                {
-                    "name": col["name"],
-                    "canonical_type": col["canonical_type"],
-                    "pandas_dtype": col["pandas_dtype"],
-                    "missing_count": col["missing_count"],
-                    "missing_percentage": col["missing_percentage"],
-                    "unique_count": col["unique_count"],
-                    "numeric_stats": col.get("numeric_stats"),  # Only stats, no raw values
-                }
-                for col in schema["columns"]
-            ],
-            "computed_at": schema["computed_at"],
-            "using_current": schema["using_current"],
-        }
+        bundle = _get_full_bundle(workspace_id, dataset_id)
+        return bundle["schema"] if bundle else None
     except Exception as e:
         logger.error(f"Error generating schema context: {e}")
         return None
@@ -107,93 +282,177 @@ def generate_dataset_summary_context(workspace_id: str, dataset_id: str) -> Opti
     try:
         if not dataset_exists(dataset_id, workspace_id):
             return None
-        
-        # Load dataset for analysis
-        df = load_dataset(dataset_id, workspace_id)
-        
-        total_rows = len(df)
-        total_columns = len(df.columns)
-        
-        # Get schema for type information
-        schema = compute_schema(workspace_id, dataset_id, use_current=True)
-        
-        # Calculate column summaries (no raw data)
-        column_summaries = []
-        total_health_score = 0.0
-        
-        for col in df.columns:
-            col_data = df[col]
-            
-            # Get canonical type from schema if available
-            canonical_type = "unknown"
-            if schema:
-                schema_col = next((c for c in schema["columns"] if c["name"] == col), None)
-                if schema_col:
-                    canonical_type = schema_col["canonical_type"]
-            
-            # Calculate metrics (no raw values)
-            missing_count = int(col_data.isna().sum())
-            missing_pct = round((missing_count / total_rows * 100) if total_rows > 0 else 0.0, 2)
-            
-            duplicate_count = int(col_data.duplicated().sum())
-            duplicates_pct = round((duplicate_count / total_rows * 100) if total_rows > 0 else 0.0, 2)
-            
-            # Outliers for numeric columns only
-            outliers = None
-            if canonical_type == "numeric" and not col_data.isna().all():
-                Q1 = col_data.quantile(0.25)
-                Q3 = col_data.quantile(0.75)
-                IQR = Q3 - Q1
-                if IQR > 0:
-                    lower_bound = Q1 - 1.5 * IQR
-                    upper_bound = Q3 + 1.5 * IQR
-                    outliers = int(((col_data < lower_bound) | (col_data > upper_bound)).sum())
-                else:
-                    outliers = 0
-            
-            # Calculate health score
-            health_score = 100.0
-            health_score -= min(missing_pct * 2, 40)
-            health_score -= min(duplicates_pct * 1, 20)
-            if outliers is not None:
-                outlier_pct = (outliers / total_rows * 100) if total_rows > 0 else 0
-                health_score -= min(outlier_pct * 0.5, 20)
-            health_score = max(health_score, 0)
-            
-            column_summaries.append({
-                "name": col,
-                "canonical_type": canonical_type,
-                "missing_count": missing_count,
-                "missing_percentage": missing_pct,
-                "duplicate_count": duplicate_count,
-                "duplicate_percentage": duplicates_pct,
-                "outlier_count": outliers,
-                "health_score": round(health_score, 1),
-            })
-            
-            total_health_score += health_score
-        
-        # Calculate overall score
-        overall_score = round((total_health_score / len(column_summaries)) if column_summaries else 0, 1)
-        
-        # Count duplicates at row level
-        duplicate_row_count = int(df.duplicated().sum())
-        
-        return {
-            "workspace_id": workspace_id,
-            "dataset_id": dataset_id,
-            "total_rows": total_rows,
-            "total_columns": total_columns,
-            "duplicate_row_count": duplicate_row_count,
-            "overall_health_score": overall_score,
-            "columns": column_summaries,
-        }
+        bundle = _get_full_bundle(workspace_id, dataset_id)
+        return bundle["dataset_summary"] if bundle else None
     except Exception as e:
         logger.error(f"Error generating dataset summary context: {e}")
         return None
 
 
-def generate_ai_context_bundle(workspace_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+def estimate_tokens(data: Any) -> int:
+    """Estimated LLM tokens of data serialized as compact JSON."""
+    chars = len(json.dumps(data, separators=(",", ":"), default=str))
+    return -(-chars // AI_CONTEXT_CHARS_PER_TOKEN)
+
+
+def _informativeness(schema_column: Dict[str, Any], summary_column: Dict[str, Any], total_rows: int) -> float:
+    """
+    How much a column tells about the dataset (higher is more useful).
+    
+    Constant and entirely missing columns tell nothing; identifier-like
+    columns (a distinct value in nearly every row) little. Quality problems
+    (a low health score) count for more: they are what questions about a
+    dataset are usually about. Numeric columns carry statistics, so they
+    rank above other columns of the same quality.
+    """
+    unique_count = schema_column["unique_count"]
+    if unique_count <= 1:
+        return 0.0
+    score = 1.0 + (100.0 - summary_column["health_score"]) / 100.0
+    if schema_column["canonical_type"] == "numeric":
+        score += 0.5
+    elif unique_count >= 0.95 * (total_rows - schema_column["missing_count"]):
+        score *= 0.25
+    return score
+
+
+def _compact_column(column: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    return {field: column[field] for field in fields}
+
+
+def _json_chars(data: Any) -> int:
+    return len(json.dumps(data, separators=(",", ":"), default=str))
+
+
+def fit_context_bundle(
+    bundle: Dict[str, Any],
+    max_tokens: Optional[int] = None,
+    max_columns: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Fit an AI context bundle to a column and token budget.
+    
+    Columns are ranked by informativeness. The max_columns most informative
+    keep their full entries and the others are compacted (schema: name and
+    type; summary: name and health score). To meet max_tokens, the least
+    informative columns are compacted first, then the oldest operations are
+    left out of the logs, then the least informative compacted columns are
+    left out. Sizes are computed once per entry, so fitting is linear in
+    the number of columns.
+    
+    Args:
+        bundle: Full bundle (not modified)
+        max_tokens: Token budget of the serialized bundle (estimated, see
+            estimate_tokens)
+        max_columns: Columns kept with full entries
+        
+    Returns:
+        Bundle with the columns in dataset order and a "context_budget"
+        entry describing what was compacted or left out (the bundle itself
+        when there is no budget). Very small budgets may not be met.
+    """
+    if max_tokens is None and max_columns is None:
+        return bundle
+    
+    schema = bundle["schema"]
+    summary = bundle["dataset_summary"]
+    logs = bundle["logs"]
+    schema_columns = schema["columns"]
+    summary_by_name = {col["name"]: col for col in summary["columns"]}
+    names = [col["name"] for col in schema_columns]
+    
+    # Most informative first (dataset order among equals)
+    scores = [
+        _informativeness(col, summary_by_name[col["name"]], schema["total_rows"])
+        for col in schema_columns
+    ]
+    ranking = sorted(range(len(names)), key=lambda i: -scores[i])
+    
+    full = set(ranking if max_columns is None else ranking[:max_columns])
+    omitted = set()
+    first_operation = 0
+    operations = logs["operations"]
+    
+    if max_tokens is not None:
+        compact_schema = {i: _compact_column(col, ("name", "canonical_type")) for i, col in enumerate(schema_columns)}
+        compact_summary = {i: _compact_column(summary_by_name[name], ("name", "health_score")) for i, name in enumerate(names)}
+        # Entry sizes, with a separating comma
+        full_chars = [
+            _json_chars(col) + _json_chars(summary_by_name[col["name"]]) + 2
+            for col in schema_columns
+        ]
+        compact_chars = [_json_chars(compact_schema[i]) + _json_chars(compact_summary[i]) + 2 for i in range(len(names))]
+        operation_chars = [_json_chars(entry) + 1 for entry in operations]
+        # Everything but the entries, with room for the context_budget entry
+        base_chars = _json_chars({
+            **bundle,
+            "schema": {**schema, "columns": []},
+            "logs": {**logs, "operations": []},
+            "dataset_summary": {**summary, "columns": []},
+        }) + 200
+        
+        budget_chars = max_tokens * AI_CONTEXT_CHARS_PER_TOKEN
+        chars = base_chars + sum(operation_chars) + sum(
+            full_chars[i] if i in full else compact_chars[i] for i in range(len(names))
+        )
+        
+        # 1. Compact the least informative columns
+        for i in reversed(ranking):
+            if chars <= budget_chars:
+                break
+            if i in full:
+                full.discard(i)
+                chars -= full_chars[i] - compact_chars[i]
+        # 2. Leave out the oldest operations
+        while chars > budget_chars and first_operation < len(operations):
+            chars -= operation_chars[first_operation]
+            first_operation += 1
+        # 3. Leave out the least informative columns
+        for i in reversed(ranking):
+            if chars <= budget_chars:
+                break
+            omitted.add(i)
+            chars -= compact_chars[i]
+    
+    kept = [i for i in range(len(names)) if i not in omitted]
+    fitted = {
+        **bundle,
+        "schema": {
+            **schema,
+            "columns": [
+                schema_columns[i] if i in full else _compact_column(schema_columns[i], ("name", "canonical_type"))
+                for i in kept
+            ],
+        },
+        "logs": {**logs, "operations": operations[first_operation:]},
+        "dataset_summary": {
+            **summary,
+            "columns": [
+                summary_by_name[names[i]] if i in full else _compact_column(summary_by_name[names[i]], ("name", "health_score"))
+                for i in kept
+            ],
+        },
+    }
+    fitted["context_budget"] = {
+        "max_tokens": max_tokens,
+        "max_columns": max_columns,
+        "full_columns": len(full),
+        "compacted_columns": len(kept) - len(full),
+        "omitted_columns": len(omitted),
+        "omitted_operations": first_operation,
+    }
+    fitted["context_budget"]["estimated_tokens"] = estimate_tokens(fitted)
+    # Again, so the estimate counts its own entry
+    fitted["context_budget"]["estimated_tokens"] = estimate_tokens(fitted)
+    return fitted
+
+
+def generate_ai_context_bundle(
+    workspace_id: str,
+    dataset_id: str,
+    max_tokens: Optional[int] = None,
+    max_columns: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
     """
     Generate complete AI context bundle (schema, logs, dataset summary).
     
@@ -202,6 +461,8 @@ def generate_ai_context_bundle(workspace_id: str, dataset_id: str) -> Optional[D
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
+        max_tokens: Optional token budget (see fit_context_bundle)
+        max_columns: Optional number of columns kept with full entries
         
     Returns:
         Dictionary containing schema, logs, and dataset_summary, or None if dataset not found
@@ -210,21 +471,11 @@ def generate_ai_context_bundle(workspace_id: str, dataset_id: str) -> Optional[D
         if not dataset_exists(dataset_id, workspace_id):
             return None
         
-        schema_context = generate_schema_context(workspace_id, dataset_id)
-        logs_context = generate_logs_context(workspace_id, dataset_id)
-        summary_context = generate_dataset_summary_context(workspace_id, dataset_id)
-        
-        if not schema_context or not summary_context:
+        bundle = _get_full_bundle(workspace_id, dataset_id)
+        if not bundle:
             return None
         
-        return {
-            "workspace_id": workspace_id,
-            "dataset_id": dataset_id,
-            "generated_at": pd.Timestamp.now().isoformat(),
-            "schema": schema_context,
-            "logs": logs_context,
-            "dataset_summary": summary_context,
-        }
+        return fit_context_bundle(bundle, max_tokens, max_columns)
     except Exception as e:
         logger.error(f"Error generating AI context bundle: {e}")
         return None
@@ -0,0 +1,500 @@
+"""
+Server-side aggregation of chart data.
+
+Charts are sent to the browser as Vega-Lite specs with inline data. Instead
+of embedding every row and letting Vega aggregate, the grouping, binning and
+aggregation happen here and the spec only carries the aggregated values:
+- bar / pie:  one row per X category (top-N + "Other" for high cardinality)
+- line/area:  one row per X value, downsampled (LTTB / min-max) to the chart width;
+              an X that is neither numeric nor dates keeps its categories in
+              first-appearance order (top-N + "Other")
+- histogram:  pre-computed bins (bin_start, bin_end, count)
+- scatter:    raw points, deterministically sampled down to the cap; on
+              large datasets a 2-D density grid (counts per cell), optionally
+              with a sample of raw points on top
+
+The size of a chart response is O(groups), never O(rows): every result is
+capped at CHART_MAX_POINTS data points.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    CHART_DATE_MIN_SHARE,
+    CHART_DENSITY_BINS,
+    CHART_DENSITY_MIN_ROWS,
+    CHART_MAX_POINTS,
+    CHART_TOP_N,
+    CHART_WIDTH,
+)
+from app.services.downsampling import downsample_indices, target_points
+
+logger = logging.getLogger(__name__)
+
+# Label of the bucket holding the categories beyond the top N
+OTHER_LABEL = "Other"
+
+DEFAULT_HISTOGRAM_BINS = 30
+
+# Accepted aggregation names -> canonical name
+AGGREGATIONS = {
+    "count": "count",
+    "sum": "sum",
+    "avg": "avg",
+    "mean": "avg",
+    "average": "avg",
+    "min": "min",
+    "max": "max",
+}
+
+
+class ChartData:
+    """
+    Aggregated chart data.
+
+    Attributes:
+        values: Records for the spec's "data.values"
+        x_field: Field holding the X value (or bin start for histograms)
+        y_field: Field holding the aggregated value
+        x_type: Vega-Lite type of the X field
+        source_rows: Number of dataset rows the values were computed from
+        truncated: True if groups were merged ("Other"), downsampled or sampled to fit the cap
+        mode: "aggregate", or "density" for 2-D density grids
+        overlay: Raw points drawn on top of a density grid (may be empty)
+    """
+
+    def __init__(
+        self,
+        values: List[Dict[str, Any]],
+        x_field: str,
+        y_field: str,
+        x_type: str,
+        source_rows: int,
+        truncated: bool = False,
+        mode: str = "aggregate",
+        overlay: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.values = values
+        self.x_field = x_field
+        self.y_field = y_field
+        self.x_type = x_type
+        self.source_rows = source_rows
+        self.truncated = truncated
+        self.mode = mode
+        self.overlay = overlay or []
+
+    def metadata(self) -> Dict[str, Any]:
+        """Summary for the spec's usermeta."""
+        return {
+            "aggregated": True,
+            "mode": self.mode,
+            "source_rows": self.source_rows,
+            "points": len(self.values) + len(self.overlay),
+            "truncated": self.truncated,
+        }
+
+
+def normalize_aggregation(aggregation: Optional[str]) -> str:
+    """
+    Map an aggregation name to count/sum/avg/min/max.
+
+    Raises:
+        ValueError: If the aggregation is not supported
+    """
+    name = (aggregation or "count").lower()
+    if name not in AGGREGATIONS:
+        raise ValueError(f"Unsupported aggregation '{aggregation}'. Use one of: count, sum, avg, min, max")
+    return AGGREGATIONS[name]
+
+
+def _to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """JSON-safe records (NaN -> null, numpy scalars -> Python, timestamps -> ISO strings)."""
+    return json.loads(frame.to_json(orient="records", date_format="iso"))
+
+
+def _group_stats(keys: pd.Series, values: Optional[pd.Series]) -> pd.DataFrame:
+    """
+    Per-group sufficient statistics (rows, count, sum, min, max) in one pass.
+
+    Keeping counts and sums (instead of averages) lets groups be merged
+    exactly, e.g. into the "Other" bucket or wider bins.
+    """
+    frame = pd.DataFrame({"key": keys})
+    if values is None:
+        return frame.groupby("key", sort=False, dropna=True).size().to_frame("rows")
+    frame["value"] = values
+    grouped = frame.groupby("key", sort=False, dropna=True)["value"]
+    return pd.DataFrame({
+        "rows": grouped.size(),
+        "count": grouped.count(),
+        "sum": grouped.sum(min_count=1),
+        "min": grouped.min(),
+        "max": grouped.max(),
+    })
+
+
+def _finalize(stats: pd.DataFrame, aggregation: str) -> pd.Series:
+    """Aggregated value per group from its sufficient statistics."""
+    if aggregation == "count":
+        return stats["rows"]
+    if aggregation == "avg":
+        return stats["sum"] / stats["count"].where(stats["count"] > 0)
+    return stats[aggregation]
+
+
+def _merge_stats(stats: pd.DataFrame) -> Dict[str, Any]:
+    """Merge several groups' statistics into one group."""
+    merged = {"rows": stats["rows"].sum()}
+    if "sum" in stats:
+        merged.update({
+            "count": stats["count"].sum(),
+            "sum": stats["sum"].sum(min_count=1),
+            "min": stats["min"].min(),
+            "max": stats["max"].max(),
+        })
+    return merged
+
+
+def _numeric_values(df: pd.DataFrame, y_col: Optional[str], aggregation: str) -> Optional[pd.Series]:
+    """The Y column as numbers (None for count, which only needs row counts)."""
+    if aggregation == "count" or not y_col:
+        return None
+    return pd.to_numeric(df[y_col], errors="coerce")
+
+
+def aggregate_categorical(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: Optional[str],
+    aggregation: str,
+    top_n: int = CHART_TOP_N,
+) -> ChartData:
+    """
+    Aggregate Y by X category; keep the top N categories and merge the rest into "Other".
+
+    Categories are ranked by their aggregated value (descending).
+    """
+    aggregation = normalize_aggregation(aggregation)
+    top_n = max(1, min(top_n, CHART_MAX_POINTS - 1))
+    y_field = y_col if aggregation != "count" and y_col else "count"
+
+    stats = _group_stats(df[x_col], _numeric_values(df, y_col, aggregation))
+    stats[y_field] = _finalize(stats, aggregation)
+    stats = stats.sort_values(y_field, ascending=False, na_position="last")
+
+    truncated = len(stats) > top_n
+    if truncated:
+        top, rest = stats.iloc[:top_n], stats.iloc[top_n:]
+        other = pd.DataFrame([_merge_stats(rest)], index=pd.Index([OTHER_LABEL], name="key"))
+        other[y_field] = _finalize(other, aggregation)
+        stats = pd.concat([top, other])
+
+    result = pd.DataFrame({x_col: stats.index.astype(str), y_field: stats[y_field].to_numpy()})
+    return ChartData(_to_records(result), x_col, y_field, "nominal", len(df), truncated)
+
+
+def _nothing_to_plot(x_col: str, y_col: Optional[str], aggregation: str) -> str:
+    """Error message for a line/area chart without a single point."""
+    if aggregation != "count" and y_col:
+        return f"No rows have both a value in '{x_col}' and a numeric value in '{y_col}' to plot"
+    return f"Column '{x_col}' has no values to plot"
+
+
+def _parse_dates(x: pd.Series) -> Optional[pd.Series]:
+    """
+    Parse a non-numeric column as dates, or None if it is not mostly dates.
+
+    Values without any digit ("Jan", "North") are labels, not dates: the
+    mixed-format parser would turn month names into dates of year 1.
+    """
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x
+    present = x.dropna()
+    if present.empty:
+        return None
+    parsed = pd.to_datetime(x, errors="coerce", format="mixed")
+    parsed = parsed.where(x.astype(str).str.contains(r"\d", regex=True))
+    if parsed.notna().sum() < CHART_DATE_MIN_SHARE * len(present):
+        return None
+    return parsed
+
+
+def _aggregate_sequence(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: Optional[str],
+    y_field: str,
+    aggregation: str,
+    top_n: int,
+) -> ChartData:
+    """
+    Aggregate Y by a categorical X for line and area charts.
+
+    Categories keep their order of first appearance in the dataset. If
+    there are more than top_n, the top_n with the largest aggregated value
+    are kept (still in appearance order) and the rest is merged into a
+    trailing "Other" point.
+    """
+    stats = _group_stats(df[x_col], _numeric_values(df, y_col, aggregation))
+    stats[y_field] = _finalize(stats, aggregation)
+    stats = stats[stats[y_field].notna()]
+
+    truncated = len(stats) > top_n
+    if truncated:
+        # Largest first; ties go to the category that appears first
+        ranked = np.argsort(-stats[y_field].to_numpy(dtype=float), kind="stable")
+        keep = np.zeros(len(stats), dtype=bool)
+        keep[ranked[:top_n]] = True
+        other = pd.DataFrame([_merge_stats(stats[~keep])], index=pd.Index([OTHER_LABEL], name="key"))
+        other[y_field] = _finalize(other, aggregation)
+        stats = pd.concat([stats[keep], other])
+
+    result = pd.DataFrame({x_col: stats.index.astype(str), y_field: stats[y_field].to_numpy()})
+    return ChartData(_to_records(result), x_col, y_field, "ordinal", len(df), truncated)
+
+
+def aggregate_ordered(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: Optional[str],
+    aggregation: str,
+    max_points: int = CHART_MAX_POINTS,
+    method: str = "lttb",
+    top_n: int = CHART_TOP_N,
+) -> ChartData:
+    """
+    Aggregate Y by an ordered X (dates or numbers), for line and area charts.
+
+    One point per distinct X, sorted by X. If there are more than max_points,
+    the series is downsampled (LTTB or min/max, see downsampling) so peaks
+    and the overall shape survive. An X that is neither numeric nor mostly
+    dates (see CHART_DATE_MIN_SHARE) is treated as ordered categories: first
+    appearance order, at most top_n of them plus "Other".
+
+    Raises:
+        ValueError: If the aggregation is invalid or there is nothing to plot
+    """
+    aggregation = normalize_aggregation(aggregation)
+    y_field = y_col if aggregation != "count" and y_col else "count"
+
+    x = df[x_col]
+    x_type = "quantitative"
+    if not pd.api.types.is_numeric_dtype(x):
+        x = _parse_dates(x)
+        if x is None:
+            top_n = max(1, min(top_n, max_points - 1))
+            chart_data = _aggregate_sequence(df, x_col, y_col, y_field, aggregation, top_n)
+            if not chart_data.values:
+                raise ValueError(_nothing_to_plot(x_col, y_col, aggregation))
+            return chart_data
+        x_type = "temporal"
+
+    stats = _group_stats(x, _numeric_values(df, y_col, aggregation)).sort_index()
+    series = _finalize(stats, aggregation).dropna()
+    if series.empty:
+        raise ValueError(_nothing_to_plot(x_col, y_col, aggregation))
+
+    truncated = len(series) > max_points
+    if truncated:
+        x_values = series.index.asi8 if x_type == "temporal" else series.index.to_numpy(dtype=float)
+        keep = downsample_indices(x_values, series.to_numpy(dtype=float), max_points, method)
+        series = series.iloc[keep]
+
+    result = pd.DataFrame({x_col: series.index, y_field: series.to_numpy()})
+    return ChartData(_to_records(result), x_col, y_field, x_type, len(df), truncated)
+
+
+def aggregate_histogram(df: pd.DataFrame, x_col: str, bins: int = DEFAULT_HISTOGRAM_BINS) -> ChartData:
+    """
+    Bin a numeric column into equal-width bins (counts per bin).
+
+    Values are returned as bin_start / bin_end / count, for a Vega-Lite
+    bar with "bin": {"binned": true}.
+    """
+    bins = max(1, min(int(bins), CHART_MAX_POINTS))
+    values = pd.to_numeric(df[x_col], errors="coerce").to_numpy(dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return ChartData([], "bin_start", "count", "quantitative", len(df))
+
+    counts, edges = np.histogram(values, bins=bins)
+    result = pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+    return ChartData(_to_records(result), "bin_start", "count", "quantitative", len(df))
+
+
+def sample_points(df: pd.DataFrame, x_col: str, y_col: str, max_points: int = CHART_MAX_POINTS) -> ChartData:
+    """
+    Raw (x, y) points for scatter plots, sampled down to max_points.
+
+    The sample is deterministic (fixed seed), so the same dataset always
+    produces the same chart.
+    """
+    columns = [x_col] if x_col == y_col else [x_col, y_col]
+    points = df[columns].dropna()
+    truncated = len(points) > max_points
+    if truncated:
+        points = points.sample(n=max_points, random_state=0).sort_index()
+    return ChartData(_to_records(points), x_col, y_col, "quantitative", len(df), truncated)
+
+
+def density_bins(value: Any) -> Tuple[int, int]:
+    """
+    Validate a density grid size and cap it at CHART_MAX_POINTS cells.
+
+    Args:
+        value: Cells along both axes, or a pair (cells along X, cells along Y)
+
+    Returns:
+        Tuple of (cells along X, cells along Y), both axes scaled down by the
+        same factor when the grid would have more than CHART_MAX_POINTS cells
+
+    Raises:
+        ValueError: If the value is not a positive integer or a pair of them
+    """
+    pair = tuple(value) if isinstance(value, (list, tuple)) else (value, value)
+    if len(pair) != 2 or not all(isinstance(b, int) and not isinstance(b, bool) and b > 0 for b in pair):
+        raise ValueError("density_bins must be a positive integer or a pair of positive integers")
+    bins_x, bins_y = pair
+    if bins_x * bins_y > CHART_MAX_POINTS:
+        scale = (CHART_MAX_POINTS / (bins_x * bins_y)) ** 0.5
+        bins_x = max(1, int(bins_x * scale))
+        bins_y = max(1, min(int(bins_y * scale), CHART_MAX_POINTS // bins_x))
+        bins_x = max(1, min(bins_x, CHART_MAX_POINTS // bins_y))
+    return bins_x, bins_y
+
+
+def density_grid(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: str,
+    bins: Tuple[int, int] = CHART_DENSITY_BINS,
+    overlay_points: int = 0,
+) -> ChartData:
+    """
+    2-D histogram of two numeric columns: number of rows per grid cell.
+
+    Equivalent to np.histogram2d with uniform bins, but cell indices are
+    computed arithmetically and counted with np.bincount, which is several
+    times faster on large arrays (~0.4 s for 10M rows). Only non-empty
+    cells are returned (x_start, x_end, y_start, y_end, count).
+
+    Args:
+        df: Dataset
+        x_col: X column (coerced to numbers)
+        y_col: Y column (coerced to numbers)
+        bins: Cells along X and Y, or along both (see density_bins)
+        overlay_points: Number of raw points to sample for drawing on top of the grid
+
+    Returns:
+        ChartData in "density" mode (grid cells and overlay points together
+        at most CHART_MAX_POINTS)
+
+    Raises:
+        ValueError: If bins or overlay_points is invalid
+    """
+    bins_x, bins_y = density_bins(bins)
+    if not isinstance(overlay_points, int) or isinstance(overlay_points, bool) or overlay_points < 0:
+        raise ValueError("overlay_points must be a non-negative integer")
+    x = pd.to_numeric(df[x_col], errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(df[y_col], errors="coerce").to_numpy(dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    if len(x) == 0:
+        return ChartData([], "x_start", "y_start", "quantitative", len(df), mode="density")
+
+    x_min, x_max = float(x.min()), float(x.max())
+    y_min, y_max = float(y.min()), float(y.max())
+    # Degenerate ranges (a single value) get a unit-wide cell, like np.histogram
+    if x_max == x_min:
+        x_min, x_max = x_min - 0.5, x_max + 0.5
+    if y_max == y_min:
+        y_min, y_max = y_min - 0.5, y_max + 0.5
+
+    ix = np.minimum(((x - x_min) * (bins_x / (x_max - x_min))).astype(np.int64), bins_x - 1)
+    iy = np.minimum(((y - y_min) * (bins_y / (y_max - y_min))).astype(np.int64), bins_y - 1)
+    counts = np.bincount(ix * bins_y + iy, minlength=bins_x * bins_y)
+
+    cells = np.flatnonzero(counts)
+    cell_x, cell_y = np.divmod(cells, bins_y)
+    x_edges = np.linspace(x_min, x_max, bins_x + 1)
+    y_edges = np.linspace(y_min, y_max, bins_y + 1)
+    grid = pd.DataFrame({
+        "x_start": x_edges[cell_x],
+        "x_end": x_edges[cell_x + 1],
+        "y_start": y_edges[cell_y],
+        "y_end": y_edges[cell_y + 1],
+        "count": counts[cells],
+    })
+
+    overlay: List[Dict[str, Any]] = []
+    overlay_points = min(overlay_points, CHART_MAX_POINTS - len(grid))
+    if overlay_points:
+        rng = np.random.default_rng(0)
+        picked = np.sort(rng.choice(len(x), size=min(overlay_points, len(x)), replace=False))
+        overlay = _to_records(pd.DataFrame({x_col: x[picked], y_col: y[picked]}))
+
+    return ChartData(_to_records(grid), "x_start", "y_start", "quantitative", len(df), True, "density", overlay)
+
+
+def aggregate_chart_data(
+    df: pd.DataFrame,
+    chart_type: str,
+    x_col: str,
+    y_col: Optional[str],
+    aggregation: Optional[str],
+    params: Optional[Dict[str, Any]] = None,
+) -> ChartData:
+    """
+    Aggregate a dataset for a chart type.
+
+    Args:
+        df: Dataset
+        chart_type: bar, line, area, histogram, scatter or pie
+        x_col: X column (category / time / binned column)
+        y_col: Y column (aggregated, unused for counts and histograms)
+        aggregation: count, sum, avg, min or max
+        params: Optional chart parameters ("bins", "top_n", "max_points",
+            "width" and "downsample" = lttb / minmax for line charts, whose
+            "top_n" applies to a categorical X;
+            "density", "density_threshold", "density_bins" and
+            "overlay_points" for scatter charts)
+
+    Returns:
+        ChartData with at most CHART_MAX_POINTS values
+
+    Raises:
+        ValueError: If a column, the aggregation or a density parameter is invalid
+    """
+    params = params or {}
+    for col in (x_col, y_col):
+        if col and col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in dataset")
+    max_points = max(1, min(int(params.get("max_points", CHART_MAX_POINTS)), CHART_MAX_POINTS))
+
+    if chart_type == "histogram":
+        if pd.api.types.is_numeric_dtype(df[x_col]):
+            return aggregate_histogram(df, x_col, params.get("bins", DEFAULT_HISTOGRAM_BINS))
+        return aggregate_categorical(df, x_col, None, "count", params.get("top_n", CHART_TOP_N))
+    if chart_type in ("line", "area"):
+        # No more points than the chart has pixels for
+        max_points = target_points(params.get("width", CHART_WIDTH), max_points)
+        return aggregate_ordered(
+            df, x_col, y_col, aggregation, max_points,
+            params.get("downsample", "lttb"), params.get("top_n", CHART_TOP_N),
+        )
+    if chart_type == "scatter":
+        # Density grid on large datasets, unless explicitly disabled ("density": false)
+        density = params.get("density")
+        if density is None:
+            density = len(df) >= int(params.get("density_threshold", CHART_DENSITY_MIN_ROWS))
+        if density:
+            bins = params.get("density_bins", CHART_DENSITY_BINS)
+            return density_grid(df, x_col, y_col or x_col, bins, params.get("overlay_points", 0))
+        return sample_points(df, x_col, y_col or x_col, max_points)
+    return aggregate_categorical(df, x_col, y_col, aggregation, params.get("top_n", CHART_TOP_N))
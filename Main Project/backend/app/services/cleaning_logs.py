@@ -1,14 +1,14 @@
 """Cleaning logs storage and retrieval.
 
 IMPORTANT: Cleaning logs are stored per workspace.
-Each workspace maintains its own history of cleaning operations.
+Each workspace maintains its own append-only history of cleaning
+operations, as JSON lines with an offset index (see app.utils.jsonl_log).
 """
 
-import json
-from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
-from app.config import get_workspace_logs_dir
+from app.config import get_log_index_file_path, get_workspace_logs_dir
+from app.utils.jsonl_log import JSONLLog
 
 
 class CleaningLog:
@@ -21,7 +21,8 @@ class CleaningLog:
         action: str,
         rows_affected: int,
         parameters: Dict[str, Any] = None,
-        timestamp: str = None
+        timestamp: str = None,
+        column: Optional[str] = None
     ):
         self.dataset_name = dataset_name
         self.operation = operation
@@ -29,6 +30,7 @@ class CleaningLog:
         self.rows_affected = rows_affected
         self.parameters = parameters or {}
         self.timestamp = timestamp or datetime.now().isoformat()
+        self.column = column
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert log entry to dictionary."""
@@ -36,66 +38,71 @@ class CleaningLog:
             "dataset_name": self.dataset_name,
             "operation": self.operation,
             "action": self.action,
+            "column": self.column,
             "rows_affected": self.rows_affected,
             "parameters": self.parameters,
             "timestamp": self.timestamp,
         }
 
 
+def _cleaning_log(workspace_id: str) -> JSONLLog:
+    logs_file = get_workspace_logs_dir(workspace_id) / "cleaning_logs.jsonl"
+    return JSONLLog(
+        logs_file,
+        get_log_index_file_path(workspace_id, logs_file),
+        key_fields=("dataset_name", "operation", "column"),
+        # Logs used to be one JSON array, rewritten on every append
+        legacy_path=logs_file.with_suffix(".json"),
+    )
+
+
 def save_cleaning_log(workspace_id: str, log: CleaningLog) -> None:
     """
     Save a cleaning operation log to workspace storage.
     
-    Logs are stored as JSON files in the workspace logs directory.
-    Each log entry is appended to a logs.json file.
+    Each log entry is appended as one line to the cleaning_logs.jsonl file
+    in the workspace logs directory.
     
     Args:
         workspace_id: Workspace identifier
         log: CleaningLog instance to save
     """
-    logs_dir = get_workspace_logs_dir(workspace_id)
-    logs_file = logs_dir / "cleaning_logs.json"
-    
-    # Load existing logs
-    logs = []
-    if logs_file.exists():
-        try:
-            with open(logs_file, 'r') as f:
-                logs = json.load(f)
-        except Exception:
-            logs = []
-    
-    # Append new log
-    logs.append(log.to_dict())
-    
-    # Save back to file
-    with open(logs_file, 'w') as f:
-        json.dump(logs, f, indent=2)
+    _cleaning_log(workspace_id).append(log.to_dict())
 
 
-def get_cleaning_logs(workspace_id: str) -> List[Dict[str, Any]]:
+def get_cleaning_logs(
+    workspace_id: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    since: Optional[str] = None,
+    dataset_name: Optional[str] = None,
+    operation: Optional[str] = None,
+    column: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
-    Get all cleaning logs for a workspace.
+    Get cleaning logs for a workspace (all of them by default).
     
     Returns logs in reverse chronological order (most recent first).
     
     Args:
         workspace_id: Workspace identifier
+        limit: Maximum entries to return (None = all)
+        offset: Matching entries to skip
+        since: Only entries with a timestamp after this ISO timestamp
+        dataset_name: Only entries of this dataset
+        operation: Only entries of this operation
+        column: Only entries on this column
         
     Returns:
         List of log entries as dictionaries
     """
-    logs_dir = get_workspace_logs_dir(workspace_id)
-    logs_file = logs_dir / "cleaning_logs.json"
-    
-    if not logs_file.exists():
-        return []
-    
+    filters = {
+        name: value
+        for name, value in (("dataset_name", dataset_name), ("operation", operation), ("column", column))
+        if value is not None
+    }
     try:
-        with open(logs_file, 'r') as f:
-            logs = json.load(f)
-        # Sort by timestamp descending (most recent first)
-        logs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        logs, _ = _cleaning_log(workspace_id).read(filters, since, offset, limit, newest_first=True)
         return logs
     except Exception:
         return []
@@ -0,0 +1,272 @@
+"""
+Cleaning summary computation for Data4Viz.
+
+Computes the per-column quality metrics shown on the Data Cleaning page
+(missing %, duplicate contribution, IQR outliers, health score). Columns are
+independent, so they are profiled in parallel via the profiling executor.
+
+IMPORTANT: Summaries are cached in memory and in the workspace cache
+directory, keyed by the dataset fingerprint. When the dataset changes, only
+columns whose values changed are recomputed.
+"""
+
+import json
+import logging
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_cleaning_summary_cache_file_path
+from app.services.column_sketches import get_column_sketches
+from app.services.dataset_fingerprint import compute_column_hashes
+from app.services.profiling_executor import profile_columns
+from app.services.quantile_sketch import QuantileSketch, iqr_bounds
+from app.utils.cache import LRUCache, atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# (workspace_id, dataset_id, exact) -> {"fingerprint": ..., "summary": ...}
+_summary_cache = LRUCache(maxsize=64)
+
+
+def get_summary_column_type(col_data: pd.Series) -> str:
+    """Determine the cleaning summary type of a column."""
+    if pd.api.types.is_numeric_dtype(col_data):
+        return "numeric"
+    elif pd.api.types.is_datetime64_any_dtype(col_data):
+        return "datetime"
+    elif pd.api.types.is_bool_dtype(col_data):
+        return "boolean"
+    return "categorical"
+
+
+def summarize_column(
+    col_data: pd.Series,
+    sketch: Optional[QuantileSketch] = None,
+    exact: bool = False
+) -> Dict[str, Any]:
+    """
+    Compute cleaning summary metrics for a single column.
+
+    Args:
+        col_data: Column values
+        sketch: Optional quantile sketch of the column (used for large columns)
+        exact: If True, always compute exact quartiles for IQR outliers
+
+    Returns:
+        Dictionary with name, type, missing_pct, duplicates_pct, outliers, health_score
+    """
+    total_rows = len(col_data)
+    col = col_data.name
+    col_type = get_summary_column_type(col_data)
+
+    # Calculate missing percentage
+    missing_count = col_data.isna().sum()
+    missing_pct = (missing_count / total_rows * 100) if total_rows > 0 else 0
+    missing_pct = max(0.0, min(100.0, missing_pct))  # Clamp to 0-100
+
+    # Calculate duplicate contribution (percentage of rows that are duplicates)
+    duplicate_count = col_data.duplicated().sum()
+    duplicates_pct = (duplicate_count / total_rows * 100) if total_rows > 0 else 0
+    duplicates_pct = max(0.0, min(100.0, duplicates_pct))  # Clamp to 0-100
+
+    # Calculate outliers for numeric columns
+    outliers = None
+    if col_type == "numeric" and not col_data.isna().all():
+        try:
+            Q1, Q3, IQR, lower_bound, upper_bound = iqr_bounds(col_data, sketch=sketch, exact=exact)
+            if IQR > 0:
+                outliers = int(((col_data < lower_bound) | (col_data > upper_bound)).sum())
+            else:
+                outliers = 0
+        except Exception as e:
+            logger.warning(f"[summarize_column] Error calculating outliers for column '{col}': {e}")
+            outliers = None
+
+    # Calculate health score (0-100)
+    # Penalize: missing values, duplicates, outliers, type inconsistencies
+    health_score = 100.0
+    health_score -= min(missing_pct * 2, 40)  # Up to 40 points for missing
+    health_score -= min(duplicates_pct * 1, 20)  # Up to 20 points for duplicates
+    if outliers is not None and outliers > 0:
+        outlier_pct = (outliers / total_rows * 100) if total_rows > 0 else 0
+        health_score -= min(outlier_pct * 0.5, 20)  # Up to 20 points for outliers
+    health_score = max(0.0, min(100.0, health_score))  # Clamp to 0-100
+
+    return {
+        "name": col,
+        "type": col_type,
+        "missing_pct": round(float(missing_pct), 2),
+        "duplicates_pct": round(float(duplicates_pct), 2),
+        "outliers": outliers,
+        "health_score": round(float(health_score), 1),
+    }
+
+
+def compute_cleaning_summary(
+    df: pd.DataFrame,
+    sketches: Optional[Dict[str, QuantileSketch]] = None,
+    exact: bool = False,
+    workers: Optional[int] = None,
+    columns: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Compute cleaning summary metrics for the columns of a dataset.
+
+    Args:
+        df: Dataset to analyze
+        sketches: Optional quantile sketches by column (large datasets)
+        exact: If True, always compute exact quartiles for IQR outliers
+        workers: Number of profiling workers (default: PROFILE_WORKERS)
+        columns: Optional subset of columns to analyze (default: all)
+
+    Returns:
+        Tuple of (column summaries in column order, overall score)
+    """
+    sketches = sketches or {}
+    columns = list(df.columns) if columns is None else columns
+    column_args = {col: (sketches.get(col), exact) for col in columns}
+    results = profile_columns(
+        df, summarize_column, columns=columns, column_args=column_args, workers=workers
+    )
+    column_summaries = list(results.values())
+
+    overall_score = overall_health_score(column_summaries)
+    return column_summaries, overall_score
+
+
+def overall_health_score(column_summaries: List[Dict[str, Any]]) -> float:
+    """Average column health score, rounded to one decimal."""
+    if not column_summaries:
+        return 0.0
+    total_health_score = sum(summary["health_score"] for summary in column_summaries)
+    return round(total_health_score / len(column_summaries), 1)
+
+
+def _load_summary_cache_file(workspace_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    """Load the persisted summary cache for a dataset (None if missing/unreadable)."""
+    cache_path = get_cleaning_summary_cache_file_path(workspace_id, dataset_id)
+    if not cache_path.exists():
+        return None
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"[cleaning_summary] Failed to read summary cache for '{dataset_id}': {e}")
+        return None
+
+
+def get_cached_cleaning_summary(
+    workspace_id: str,
+    dataset_id: str,
+    fingerprint: Optional[str],
+    exact: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Get a cached cleaning summary if it was computed for this dataset fingerprint.
+
+    Checks memory first, then the workspace cache directory.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        fingerprint: Current dataset fingerprint
+        exact: Whether exact quartiles were requested
+
+    Returns:
+        Summary dict (rows, columns, overall_score) or None on a miss
+    """
+    if fingerprint is None:
+        return None
+
+    key = (workspace_id, dataset_id, exact)
+    entry = _summary_cache.get(key)
+    if entry is not None and entry["fingerprint"] == fingerprint:
+        return entry["summary"]
+
+    payload = _load_summary_cache_file(workspace_id, dataset_id)
+    if payload is None or payload.get("fingerprint") != fingerprint or payload.get("exact") != exact:
+        return None
+
+    summary = payload["summary"]
+    _summary_cache.set(key, {"fingerprint": fingerprint, "summary": summary})
+    logger.info(f"[cleaning_summary] Loaded cached summary for '{dataset_id}' from disk")
+    return summary
+
+
+def update_cleaning_summary(
+    workspace_id: str,
+    dataset_id: str,
+    df: pd.DataFrame,
+    fingerprint: Optional[str],
+    exact: bool = False
+) -> Dict[str, Any]:
+    """
+    Compute the cleaning summary for a changed dataset and cache it.
+
+    Columns whose values (and the row count) are unchanged since the last
+    persisted summary are reused; only changed columns are recomputed.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        df: Loaded dataset
+        fingerprint: Dataset fingerprint the summary is computed for
+        exact: If True, always compute exact quartiles for IQR outliers
+
+    Returns:
+        Summary dict (rows, columns, overall_score)
+    """
+    total_rows = len(df)
+    column_hashes = compute_column_hashes(df)
+
+    previous = _load_summary_cache_file(workspace_id, dataset_id)
+    previous_columns: Dict[str, Any] = {}
+    if previous and previous.get("exact") == exact and previous.get("summary", {}).get("rows") == total_rows:
+        previous_columns = previous.get("column_entries", {})
+
+    reused: Dict[str, Dict[str, Any]] = {}
+    for col in df.columns:
+        entry = previous_columns.get(str(col))
+        if entry and entry.get("hash") == column_hashes[str(col)]:
+            reused[str(col)] = entry["summary"]
+    changed = [col for col in df.columns if str(col) not in reused]
+
+    computed: Dict[str, Dict[str, Any]] = {}
+    if changed:
+        sketches = {} if exact else get_column_sketches(
+            workspace_id, dataset_id, df,
+            columns=None if len(changed) == len(df.columns) else changed
+        )
+        summaries, _ = compute_cleaning_summary(df, sketches=sketches, exact=exact, columns=changed)
+        computed = {str(summary["name"]): summary for summary in summaries}
+
+    logger.info(
+        f"[cleaning_summary] '{dataset_id}': recomputed {len(changed)} column(s), "
+        f"reused {len(reused)}"
+    )
+
+    column_summaries = [reused.get(str(col)) or computed[str(col)] for col in df.columns]
+    summary = {
+        "rows": total_rows,
+        "columns": column_summaries,
+        "overall_score": overall_health_score(column_summaries),
+    }
+
+    if fingerprint is not None:
+        _summary_cache.set((workspace_id, dataset_id, exact), {"fingerprint": fingerprint, "summary": summary})
+        payload = {
+            "dataset_id": dataset_id,
+            "fingerprint": fingerprint,
+            "exact": exact,
+            "summary": summary,
+            "column_entries": {
+                str(col): {"hash": column_hashes[str(col)], "summary": col_summary}
+                for col, col_summary in zip(df.columns, column_summaries)
+            },
+        }
+        try:
+            atomic_write_json(get_cleaning_summary_cache_file_path(workspace_id, dataset_id), payload, default=str)
+        except Exception as e:
+            logger.warning(f"[cleaning_summary] Failed to persist summary cache for '{dataset_id}': {e}")
+
+    return summary
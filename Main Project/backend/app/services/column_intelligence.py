@@ -0,0 +1,207 @@
+"""
+Column intelligence for Data4Viz.
+
+Explains what each column of a dataset means and why it's used. The
+explanations only depend on column names and types, so they are built from
+a schema probe (header + small sample, see dataset_loader) instead of the
+full dataset, and persisted per dataset in the workspace cache.
+
+A persisted result stays valid while the dataset's columns (names and
+inferred types) are unchanged: if the dataset content changed but its
+columns did not, the stored intelligence is re-tagged with the new
+fingerprint instead of being regenerated.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from app.config import get_column_intelligence_file_path, get_workspace_cache_dir
+from app.services.dataset_fingerprint import get_dataset_fingerprint
+from app.services.dataset_loader import dataset_exists, probe_dataset_schema
+from app.utils.cache import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+_FILE_SUFFIX = "_column_intelligence.json"
+
+
+def _data_type(dtype: str) -> str:
+    """Map a pandas dtype name to numeric / datetime / categorical."""
+    try:
+        resolved = pd.api.types.pandas_dtype(dtype)
+    except TypeError:
+        return "categorical"
+    if pd.api.types.is_numeric_dtype(resolved):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(resolved):
+        return "datetime"
+    return "categorical"
+
+
+def _explain_column(name: str, data_type: str) -> Dict[str, str]:
+    """Explain a column from its name and type."""
+    # Generate simple explanations (can be enhanced with AI later)
+    # For now, provide basic explanations based on column name and type
+    col_name_lower = name.lower()
+
+    # Generate meaning based on column name patterns
+    if any(word in col_name_lower for word in ['id', 'key', 'index']):
+        meaning = "Unique identifier for each record in the dataset"
+        why_used = "Used to uniquely identify and reference individual records"
+    elif any(word in col_name_lower for word in ['date', 'time', 'timestamp']):
+        meaning = "Date or time information"
+        why_used = "Used to track temporal information and enable time-based analysis"
+    elif any(word in col_name_lower for word in ['name', 'title', 'label']):
+        meaning = "Descriptive text or label"
+        why_used = "Used to provide human-readable descriptions or names"
+    elif any(word in col_name_lower for word in ['price', 'cost', 'amount', 'value', 'revenue']):
+        meaning = "Monetary or numeric value"
+        why_used = "Used to represent quantitative financial or numeric measurements"
+    elif any(word in col_name_lower for word in ['count', 'number', 'quantity', 'total']):
+        meaning = "Numeric count or quantity"
+        why_used = "Used to represent numeric counts, quantities, or totals"
+    elif data_type == "numeric":
+        meaning = "Numeric measurement or value"
+        why_used = "Used for quantitative analysis and mathematical operations"
+    elif data_type == "datetime":
+        meaning = "Date or time information"
+        why_used = "Used for temporal analysis and time-based filtering"
+    else:
+        meaning = "Categorical classification or text data"
+        why_used = "Used for grouping, filtering, and categorical analysis"
+
+    return {"name": name, "data_type": data_type, "meaning": meaning, "why_used": why_used}
+
+
+def _columns_signature(schema: Dict[str, str]) -> List[List[str]]:
+    """Column names with their intelligence data types (what the explanations depend on)."""
+    return [[name, _data_type(dtype)] for name, dtype in schema.items()]
+
+
+def build_column_intelligence(schema: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Build column intelligence from a schema probe.
+
+    Args:
+        schema: Ordered mapping of column name -> pandas dtype name
+
+    Returns:
+        Intelligence dictionary (columns, generated_at in milliseconds)
+    """
+    return {
+        "columns": [_explain_column(name, data_type) for name, data_type in _columns_signature(schema)],
+        "generated_at": int(datetime.now().timestamp() * 1000),  # milliseconds
+    }
+
+
+def _read_record(path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"[column_intelligence] Failed to read {path.name}: {e}")
+        return None
+
+
+def _save_record(workspace_id: str, dataset_id: str, fingerprint: Optional[str], signature, intelligence) -> Dict[str, Any]:
+    record = {
+        "dataset_id": dataset_id,
+        "fingerprint": fingerprint,
+        "columns_signature": signature,
+        "intelligence": intelligence,
+    }
+    try:
+        atomic_write_json(get_column_intelligence_file_path(workspace_id, dataset_id), record)
+    except Exception as e:
+        logger.warning(f"[column_intelligence] Failed to persist intelligence for '{dataset_id}': {e}")
+    return record
+
+
+def load_column_intelligence(workspace_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the persisted column intelligence of a dataset if it's still valid.
+
+    Valid means: same dataset fingerprint, or a different fingerprint but the
+    same columns (checked with the schema probe).
+
+    Returns:
+        Intelligence dictionary, or None if missing or the columns changed
+    """
+    path = get_column_intelligence_file_path(workspace_id, dataset_id)
+    if not path.exists() or not dataset_exists(dataset_id, workspace_id):
+        return None
+    record = _read_record(path)
+    if record is None or record.get("dataset_id") != dataset_id:
+        return None
+
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    if record.get("fingerprint") == fingerprint:
+        return record["intelligence"]
+
+    # Content changed: the explanations still hold if the columns didn't
+    signature = _columns_signature(probe_dataset_schema(dataset_id, workspace_id))
+    if record.get("columns_signature") != signature:
+        logger.info(f"[column_intelligence] Columns of '{dataset_id}' changed, stored intelligence is stale")
+        return None
+    _save_record(workspace_id, dataset_id, fingerprint, signature, record["intelligence"])
+    return record["intelligence"]
+
+
+def get_column_intelligence(workspace_id: str, dataset_id: str, regenerate: bool = False) -> Dict[str, Any]:
+    """
+    Get the column intelligence of a dataset, generating and persisting it if needed.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        regenerate: Ignore the persisted intelligence
+
+    Returns:
+        Intelligence dictionary (columns, generated_at)
+
+    Raises:
+        FileNotFoundError: If the dataset doesn't exist
+        ValueError: If the dataset header can't be read
+    """
+    if not regenerate:
+        cached = load_column_intelligence(workspace_id, dataset_id)
+        if cached is not None:
+            logger.info(f"[column_intelligence] Using stored intelligence for '{dataset_id}'")
+            return cached
+
+    schema = probe_dataset_schema(dataset_id, workspace_id)
+    intelligence = build_column_intelligence(schema)
+    _save_record(
+        workspace_id,
+        dataset_id,
+        get_dataset_fingerprint(workspace_id, dataset_id),
+        _columns_signature(schema),
+        intelligence,
+    )
+    logger.info(f"[column_intelligence] Generated intelligence for {len(schema)} columns of '{dataset_id}'")
+    return intelligence
+
+
+def load_latest_column_intelligence(workspace_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the most recently generated, still valid column intelligence in a workspace.
+
+    Returns:
+        Dictionary with dataset_id and intelligence, or None if there is none
+    """
+    records = []
+    for path in get_workspace_cache_dir(workspace_id).glob(f"*{_FILE_SUFFIX}"):
+        record = _read_record(path)
+        if record and record.get("dataset_id") and record.get("intelligence"):
+            records.append(record)
+
+    records.sort(key=lambda r: r["intelligence"].get("generated_at", 0), reverse=True)
+    for record in records:
+        intelligence = load_column_intelligence(workspace_id, record["dataset_id"])
+        if intelligence is not None:
+            return {"dataset_id": record["dataset_id"], "intelligence": intelligence}
+    return None
@@ -0,0 +1,214 @@
+"""
+Per-dataset column sketches for Data4Viz.
+
+Sketches are built in a single streaming pass over a dataset (a loaded
+DataFrame or CSV chunks) and persisted in the workspace cache directory,
+next to the dataset they describe. A persisted sketch file is only reused
+while the dataset file is unchanged.
+
+Two kinds of sketches are kept:
+- Quantile sketches (KLL) for numeric columns: IQR bounds and quartiles
+- HyperLogLog sketches for all columns: distinct counts
+"""
+
+import json
+import logging
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.config import (
+    get_column_sketches_file_path,
+    QUANTILE_SKETCH_MIN_ROWS,
+    DISTINCT_SKETCH_MIN_ROWS,
+)
+from app.services.dataset_loader import get_dataset_path, iter_dataset_chunks
+from app.services.hyperloglog import HASH_VERSION, HyperLogLog
+from app.services.quantile_sketch import QuantileSketch
+from app.utils.cache import LRUCache, atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Sketches for one dataset: (quantile sketches, distinct-count sketches)
+ColumnSketches = Tuple[Dict[str, QuantileSketch], Dict[str, HyperLogLog]]
+
+# (workspace_id, dataset_id) -> (file signature, sketches)
+_sketch_cache = LRUCache(maxsize=32)
+
+
+def _is_sketchable(series: pd.Series) -> bool:
+    """Only real numeric columns get quantile sketches (booleans excluded)."""
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _file_signature(workspace_id: str, dataset_id: str) -> Optional[list]:
+    """Get (size, mtime_ns) of the dataset file, or None if it doesn't exist."""
+    dataset_path = get_dataset_path(dataset_id, workspace_id)
+    try:
+        stat = dataset_path.stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build_column_sketches(
+    frames: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+) -> ColumnSketches:
+    """
+    Build quantile and distinct-count sketches for all columns in one pass.
+
+    Args:
+        frames: A DataFrame, or an iterable of DataFrame chunks of the same dataset
+
+    Returns:
+        Tuple of (quantile sketches by numeric column, HyperLogLog sketches by column)
+    """
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+
+    quantiles: Dict[str, QuantileSketch] = {}
+    distinct: Dict[str, HyperLogLog] = {}
+    for chunk in frames:
+        for col in chunk.columns:
+            series = chunk[col]
+            if col not in distinct:
+                distinct[col] = HyperLogLog()
+            distinct[col].update(series)
+            if not _is_sketchable(series):
+                continue
+            if col not in quantiles:
+                quantiles[col] = QuantileSketch()
+            quantiles[col].update(series)
+    return quantiles, distinct
+
+
+def save_column_sketches(workspace_id: str, dataset_id: str, sketches: ColumnSketches) -> None:
+    """
+    Persist column sketches for a dataset (non-critical, errors are logged).
+    """
+    quantiles, distinct = sketches
+    sketches_path = get_column_sketches_file_path(workspace_id, dataset_id)
+    signature = _file_signature(workspace_id, dataset_id)
+    payload = {
+        "dataset_id": dataset_id,
+        "file_signature": signature,
+        "columns": {col: sketch.to_dict() for col, sketch in quantiles.items()},
+        "distinct": {col: sketch.to_dict() for col, sketch in distinct.items()},
+        "distinct_hash_version": HASH_VERSION,
+    }
+    try:
+        atomic_write_json(sketches_path, payload)
+        _sketch_cache.set((workspace_id, dataset_id), (signature, sketches))
+        logger.info(f"[column_sketches] Saved sketches for {len(distinct)} columns of '{dataset_id}'")
+    except Exception as e:
+        logger.warning(f"[column_sketches] Failed to save sketches for '{dataset_id}': {e}")
+
+
+def load_column_sketches(workspace_id: str, dataset_id: str) -> Optional[ColumnSketches]:
+    """
+    Load persisted column sketches if they still match the dataset file.
+
+    Returns:
+        Tuple of (quantile sketches, distinct-count sketches), or None if
+        missing, unreadable or stale
+    """
+    signature = _file_signature(workspace_id, dataset_id)
+    cached = _sketch_cache.get((workspace_id, dataset_id))
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    sketches_path = get_column_sketches_file_path(workspace_id, dataset_id)
+    if not sketches_path.exists():
+        return None
+
+    try:
+        with open(sketches_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except Exception as e:
+        logger.warning(f"[column_sketches] Failed to read sketches for '{dataset_id}': {e}")
+        return None
+
+    if payload.get("file_signature") != signature:
+        logger.info(f"[column_sketches] Sketches for '{dataset_id}' are stale")
+        return None
+
+    # Files written before distinct counts were sketched, or with another
+    # value hashing (registers wouldn't merge), are rebuilt
+    if "distinct" not in payload or payload.get("distinct_hash_version") != HASH_VERSION:
+        return None
+
+    sketches = (
+        {col: QuantileSketch.from_dict(data) for col, data in payload.get("columns", {}).items()},
+        {col: HyperLogLog.from_dict(data) for col, data in payload["distinct"].items()},
+    )
+    _sketch_cache.set((workspace_id, dataset_id), (signature, sketches))
+    return sketches
+
+
+def _get_sketches(
+    workspace_id: str,
+    dataset_id: str,
+    df: Optional[pd.DataFrame],
+    columns: Optional[List[str]]
+) -> ColumnSketches:
+    """Load persisted sketches, or build (and persist) them from df or the file."""
+    sketches = load_column_sketches(workspace_id, dataset_id)
+    if sketches is not None:
+        return sketches
+
+    if columns is not None:
+        frames = df[columns] if df is not None else iter_dataset_chunks(dataset_id, workspace_id, usecols=columns)
+        return build_column_sketches(frames)
+
+    frames = df if df is not None else iter_dataset_chunks(dataset_id, workspace_id)
+    sketches = build_column_sketches(frames)
+    save_column_sketches(workspace_id, dataset_id, sketches)
+    return sketches
+
+
+def get_column_sketches(
+    workspace_id: str,
+    dataset_id: str,
+    df: Optional[pd.DataFrame] = None,
+    columns: Optional[List[str]] = None
+) -> Dict[str, QuantileSketch]:
+    """
+    Get quantile sketches for a dataset, building and persisting them if needed.
+
+    Datasets smaller than QUANTILE_SKETCH_MIN_ROWS are always answered
+    exactly, so no sketches are built for them.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        df: Optional already-loaded dataset (avoids re-reading the file);
+            when omitted the file is streamed in chunks
+        columns: Optional subset of columns that is needed; if the persisted
+            sketches are stale, only these are built (and not persisted)
+
+    Returns:
+        Dictionary mapping numeric column name to its sketch
+    """
+    if df is not None and len(df) < QUANTILE_SKETCH_MIN_ROWS:
+        return {}
+    return _get_sketches(workspace_id, dataset_id, df, columns)[0]
+
+
+def get_distinct_sketches(
+    workspace_id: str,
+    dataset_id: str,
+    df: Optional[pd.DataFrame] = None,
+    columns: Optional[List[str]] = None
+) -> Dict[str, HyperLogLog]:
+    """
+    Get HyperLogLog distinct-count sketches for a dataset.
+
+    Datasets smaller than DISTINCT_SKETCH_MIN_ROWS are always counted
+    exactly, so no sketches are built for them. Arguments are the same as
+    for get_column_sketches.
+
+    Returns:
+        Dictionary mapping column name to its sketch
+    """
+    if df is not None and len(df) < DISTINCT_SKETCH_MIN_ROWS:
+        return {}
+    return _get_sketches(workspace_id, dataset_id, df, columns)[1]
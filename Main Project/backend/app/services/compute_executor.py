@@ -0,0 +1,167 @@
+"""
+Compute executor for Data4Viz API handlers.
+
+API handlers are async, so any blocking pandas work inside them runs on the
+event loop and stalls every other request (including /health). Handlers
+hand that work to one of two shared pools instead:
+
+- run_io: thread pool, for loading/saving datasets and pandas work that
+  touches in-process state (caches, registry, logs).
+- run_cpu: process pool, for CPU-heavy functions that are self-contained:
+  they take IDs (not DataFrames), load what they need and return a
+  picklable result. Falls back to the thread pool when
+  COMPUTE_CPU_WORKERS is 0.
+- run_isolated: a separate process pool for work that must be bounded in
+  time (third-party rendering code). On timeout the workers are killed and
+  the pool is replaced.
+
+IMPORTANT: Functions passed to run_cpu must be module-level (picklable).
+In-memory caches filled inside a worker process stay in that process;
+persisted caches (workspace cache files) are shared.
+"""
+
+import asyncio
+import atexit
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.config import COMPUTE_IO_WORKERS, COMPUTE_CPU_WORKERS, COMPUTE_ISOLATED_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_io_pool: Optional[ThreadPoolExecutor] = None
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+_isolated_pool: Optional[ProcessPoolExecutor] = None
+_pools_lock = threading.Lock()
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Get (or lazily create) the shared I/O thread pool."""
+    global _io_pool
+    with _pools_lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(max_workers=COMPUTE_IO_WORKERS, thread_name_prefix="compute-io")
+        return _io_pool
+
+
+def get_cpu_pool() -> Executor:
+    """Get (or lazily create) the shared CPU process pool (I/O pool if disabled)."""
+    global _cpu_pool
+    if COMPUTE_CPU_WORKERS <= 0:
+        return get_io_pool()
+    with _pools_lock:
+        if _cpu_pool is None:
+            # spawn: forking a threaded server process is unsafe
+            _cpu_pool = ProcessPoolExecutor(
+                max_workers=COMPUTE_CPU_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _cpu_pool
+
+
+def get_isolated_pool() -> ProcessPoolExecutor:
+    """Get (or lazily create) the process pool for isolated, time-limited work."""
+    global _isolated_pool
+    with _pools_lock:
+        if _isolated_pool is None:
+            _isolated_pool = ProcessPoolExecutor(
+                max_workers=max(1, COMPUTE_ISOLATED_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _isolated_pool
+
+
+class ComputeTimeout(TimeoutError):
+    """Raised when isolated work exceeds its time limit."""
+
+
+def _discard_isolated_pool(pool: ProcessPoolExecutor, kill: bool = False) -> None:
+    """Replace the isolated pool; optionally kill its workers (stuck work can't be cancelled)."""
+    global _isolated_pool
+    with _pools_lock:
+        if _isolated_pool is pool:
+            _isolated_pool = None
+    if kill:
+        # ProcessPoolExecutor has no public API to stop a running task
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_compute_pools() -> None:
+    """Shut down the compute pools."""
+    global _io_pool, _cpu_pool, _isolated_pool
+    with _pools_lock:
+        for pool in (_io_pool, _cpu_pool, _isolated_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        _io_pool = None
+        _cpu_pool = None
+        _isolated_pool = None
+
+
+async def run_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking function in the I/O thread pool without blocking the event loop.
+
+    Exceptions (including HTTPException) propagate to the caller unchanged.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), functools.partial(func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a CPU-heavy, module-level function in the process pool.
+
+    Arguments and the result must be picklable. If the process pool is broken
+    (e.g. a worker was killed), it is replaced and the call is retried once
+    in the I/O thread pool.
+    """
+    global _cpu_pool
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    pool = get_cpu_pool()
+    try:
+        return await loop.run_in_executor(pool, call)
+    except BrokenProcessPool as e:
+        logger.warning(f"[compute_executor] Process pool unavailable ({e}), running in thread pool")
+        with _pools_lock:
+            if _cpu_pool is pool:
+                _cpu_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        return await loop.run_in_executor(get_io_pool(), call)
+
+
+async def run_isolated(func: Callable[..., Any], *args, timeout: float, **kwargs) -> Any:
+    """
+    Run a module-level function in the isolated process pool with a time limit.
+
+    IMPORTANT: On timeout the pool's worker processes are killed, so other
+    calls running in the same pool fail with BrokenProcessPool; those are
+    retried once on a fresh pool.
+
+    Raises:
+        ComputeTimeout: If the function doesn't finish within timeout seconds
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    for attempt in range(2):
+        pool = get_isolated_pool()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(pool, call), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"[compute_executor] {getattr(func, '__name__', func)} timed out after {timeout}s, killing workers")
+            _discard_isolated_pool(pool, kill=True)
+            raise ComputeTimeout(f"Timed out after {timeout:g} seconds")
+        except BrokenProcessPool as e:
+            _discard_isolated_pool(pool)
+            if attempt == 1:
+                raise
+            logger.warning(f"[compute_executor] Isolated pool broken ({e}), retrying on a new pool")
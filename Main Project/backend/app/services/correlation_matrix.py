@@ -0,0 +1,266 @@
+"""
+Correlation matrix kernel for Data4Viz.
+
+Computes the correlation of every pair of numeric columns at once, with
+pairwise-complete missing-value handling: each pair uses exactly the rows
+where both values are present (the same as pandas Series.corr on a pair).
+
+Every column is coerced to numbers once. The matrix is then built from
+per-pair sufficient statistics (pair counts, sums, sums of squares and cross
+products), which are matrix products of the value block and its presence
+mask, accumulated over row chunks to bound memory. Spearman is Pearson on
+the ranks of each column.
+
+Matrices are cached in memory and on disk per dataset fingerprint, so
+switching the decision metric in decision EDA is a lookup of one row.
+"""
+
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_correlation_matrix_file_path
+from app.services.dataset_fingerprint import get_dataset_fingerprint
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+CORRELATION_METHODS = ("pearson", "spearman")
+
+# Rows per chunk when accumulating pair statistics
+CORRELATION_CHUNK_ROWS = 100_000
+
+# Hot matrices (keyed by workspace, dataset, fingerprint and method)
+_matrix_cache = LRUCache(maxsize=32)
+
+
+class CorrelationMatrix:
+    """
+    Pairwise-complete correlation matrix.
+
+    Attributes:
+        columns: Column names (matrix order)
+        r: Correlation coefficients (NaN when undefined)
+        n: Number of complete pairs behind each coefficient
+        method: "pearson" or "spearman"
+    """
+
+    def __init__(self, columns: Sequence[str], r: np.ndarray, n: np.ndarray, method: str = "pearson"):
+        self.columns = list(columns)
+        self.r = r
+        self.n = n
+        self.method = method
+        self._positions = {col: i for i, col in enumerate(self.columns)}
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._positions
+
+    def row(self, column: str) -> Dict[str, Tuple[float, int]]:
+        """
+        Correlations of one column with all others.
+
+        Returns:
+            Dictionary mapping other column -> (coefficient, complete pairs)
+        """
+        i = self._positions[column]
+        return {
+            col: (float(self.r[i, j]), int(self.n[i, j]))
+            for j, col in enumerate(self.columns)
+            if j != i
+        }
+
+
+def coerce_numeric_columns(df: pd.DataFrame, columns: Sequence[str]) -> List[np.ndarray]:
+    """
+    Coerce columns to float arrays (non-numeric values become NaN), once each.
+
+    Float columns are returned without copying.
+    """
+    return [pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan) for col in columns]
+
+
+def rank_columns(arrays: List[np.ndarray]) -> List[np.ndarray]:
+    """Average ranks of each column's non-missing values (NaN stays NaN)."""
+    return [pd.Series(values).rank(method="average").to_numpy(dtype=float) for values in arrays]
+
+
+def pair_statistics(
+    arrays: List[np.ndarray],
+    chunk_rows: int = CORRELATION_CHUNK_ROWS,
+    shift: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Sufficient statistics of all column pairs, pairwise-complete.
+
+    For every pair (i, j) only rows where both are present count. The
+    per-pair counts, sums, sums of squares and cross products are matrix
+    products of the (zero-filled) value block and its presence mask. Values
+    are shifted by a per-column offset first to keep the sums well
+    conditioned. The statistics are additive over rows, so they can be
+    updated by adding or subtracting the statistics of a set of rows
+    computed with the same shift.
+
+    Args:
+        arrays: Equal-length float columns (NaN = missing)
+        chunk_rows: Rows per accumulation chunk
+        shift: Per-column offset (default: column means of the first chunk)
+
+    Returns:
+        Dictionary of k x k arrays counts, sums (sums[i, j]: sum of column
+        i over pairs (i, j)), squares, products, and the shift used
+    """
+    k = len(arrays)
+    n_rows = len(arrays[0]) if k else 0
+    stats = {name: np.zeros((k, k)) for name in ("counts", "sums", "squares", "products")}
+
+    for start in range(0, n_rows, chunk_rows):
+        block = np.column_stack([values[start:start + chunk_rows] for values in arrays])
+        present = ~np.isnan(block)
+        if shift is None:
+            with np.errstate(invalid="ignore"):
+                shift = np.nan_to_num(np.nanmean(np.where(present, block, np.nan), axis=0))
+        values = np.where(present, block - shift, 0.0)
+        mask = present.astype(float)
+        stats["counts"] += mask.T @ mask
+        stats["sums"] += values.T @ mask
+        stats["squares"] += (values * values).T @ mask
+        stats["products"] += values.T @ values
+
+    stats["shift"] = shift if shift is not None else np.zeros(k)
+    return stats
+
+
+def correlation_from_statistics(stats: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson coefficients from pair statistics (see pair_statistics).
+
+    Returns:
+        Tuple of (coefficients, complete pair counts), both k x k
+    """
+    counts, sums = stats["counts"], stats["sums"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = stats["products"] - sums * sums.T / counts
+        variance = stats["squares"] - sums * sums / counts
+        r = covariance / np.sqrt(variance * variance.T)
+    r[(counts < 2) | ~np.isfinite(r)] = np.nan
+    r = np.clip(r, -1.0, 1.0)
+    # A column correlates perfectly with itself, unless it is constant (as pandas)
+    np.fill_diagonal(r, np.where((np.diag(counts) >= 2) & (np.diag(variance) > 0), 1.0, np.nan))
+    return r, np.rint(counts).astype(np.int64)
+
+
+def pairwise_correlation(arrays: List[np.ndarray], chunk_rows: int = CORRELATION_CHUNK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete Pearson correlation of all pairs of columns.
+
+    For every pair (i, j) only rows where both are present are used (the
+    same as pandas Series.corr on the pair).
+
+    Args:
+        arrays: Equal-length float columns (NaN = missing)
+        chunk_rows: Rows per accumulation chunk
+
+    Returns:
+        Tuple of (coefficients, complete pair counts), both k x k
+    """
+    return correlation_from_statistics(pair_statistics(arrays, chunk_rows))
+
+
+def build_correlation_matrix(df: pd.DataFrame, columns: Sequence[str], method: str = "pearson") -> CorrelationMatrix:
+    """
+    Build the correlation matrix of the given columns.
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method '{method}'. Use one of: {', '.join(CORRELATION_METHODS)}")
+    arrays = coerce_numeric_columns(df, columns)
+    if method == "spearman":
+        # Ranks over each column's own values (with missing values that can
+        # differ from the pair's rows, as an approximation)
+        arrays = rank_columns(arrays)
+    if not arrays:
+        return CorrelationMatrix([], np.empty((0, 0)), np.empty((0, 0), dtype=np.int64), method)
+    r, n = pairwise_correlation(arrays)
+    return CorrelationMatrix(columns, r, n, method)
+
+
+def _load_matrix(workspace_id: str, dataset_id: str, method: str, fingerprint: str) -> Optional[CorrelationMatrix]:
+    path = get_correlation_matrix_file_path(workspace_id, dataset_id, method)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["fingerprint"]) != fingerprint:
+                return None
+            return CorrelationMatrix(data["columns"].tolist(), data["r"], data["n"], method)
+    except Exception as e:
+        logger.warning(f"[correlation_matrix] Failed to read cached matrix for '{dataset_id}': {e}")
+        return None
+
+
+def _save_matrix(workspace_id: str, dataset_id: str, matrix: CorrelationMatrix, fingerprint: str) -> None:
+    path = get_correlation_matrix_file_path(workspace_id, dataset_id, matrix.method)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, fingerprint=np.array(fingerprint), columns=np.array(matrix.columns, dtype=str), r=matrix.r, n=matrix.n)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        logger.warning(f"[correlation_matrix] Failed to cache matrix for '{dataset_id}': {e}")
+
+
+def get_correlation_matrix(
+    workspace_id: str,
+    dataset_id: str,
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    method: str = "pearson"
+) -> CorrelationMatrix:
+    """
+    Get the correlation matrix of a dataset's numeric columns, cached per fingerprint.
+
+    A cached matrix is reused when it covers all requested columns; it is
+    rebuilt (and replaces the cached one) otherwise.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        df: Loaded dataset
+        columns: Columns to correlate
+        method: "pearson" or "spearman"
+
+    Returns:
+        CorrelationMatrix (may hold more columns than requested)
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method '{method}'. Use one of: {', '.join(CORRELATION_METHODS)}")
+
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    key = (workspace_id, dataset_id, fingerprint, method)
+    if fingerprint is not None:
+        matrix = _matrix_cache.get(key)
+        if matrix is None:
+            matrix = _load_matrix(workspace_id, dataset_id, method, fingerprint)
+        if matrix is not None and all(col in matrix for col in columns):
+            _matrix_cache.set(key, matrix)
+            return matrix
+
+    matrix = build_correlation_matrix(df, columns, method)
+    logger.info(f"[correlation_matrix] Built {method} matrix of {len(matrix.columns)} columns for '{dataset_id}'")
+    if fingerprint is not None:
+        _matrix_cache.set(key, matrix)
+        _save_matrix(workspace_id, dataset_id, matrix, fingerprint)
+    return matrix
@@ -0,0 +1,383 @@
+"""
+Dataset export in columnar and streaming formats.
+
+Formats:
+- parquet: Apache Parquet (requires pyarrow)
+- feather: Feather v2 / Arrow IPC file, LZ4-compressed (requires pyarrow)
+- arrow:   Arrow IPC stream (requires pyarrow)
+- ndjson:  Newline-delimited JSON, one object per row (always available)
+
+Exports select a subset of columns and a row range and are produced in
+record batches, so the dataset is never materialized in memory.
+
+When pyarrow is installed, datasets get a columnar sidecar (an Arrow IPC
+file in the workspace cache, tagged with the dataset fingerprint). Exports
+read it memory-mapped, so column projection and row ranges are zero-copy
+slices instead of a CSV re-parse. The sidecar is built on first export (or
+by the upload post-processing job) and rebuilt when the dataset changes.
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from app.config import EXPORT_BATCH_ROWS, get_columnar_cache_file_path
+from app.services.dataset_fingerprint import get_dataset_fingerprint
+from app.services.dataset_loader import get_dataset_path, iter_dataset_chunks, probe_dataset_schema
+
+# pyarrow is optional: required for parquet / feather / arrow exports
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    # format -> (media type, file extension, requires pyarrow)
+    "parquet": ("application/vnd.apache.parquet", ".parquet", True),
+    "feather": ("application/vnd.apache.arrow.file", ".feather", True),
+    "arrow": ("application/vnd.apache.arrow.stream", ".arrows", True),
+    "ndjson": ("application/x-ndjson", ".ndjson", False),
+}
+
+# Format of an export request that doesn't name one: parquet needs pyarrow
+DEFAULT_EXPORT_FORMAT = "parquet" if HAS_PYARROW else "ndjson"
+
+# Schema metadata key holding the fingerprint of the dataset a sidecar was built from
+_SIDECAR_FINGERPRINT_KEY = b"data4viz.fingerprint"
+
+
+class ExportError(ValueError):
+    """Raised when an export request is invalid (unknown format/columns, bad row range)."""
+
+
+def parse_row_range(rows: Optional[str]) -> Tuple[int, Optional[int]]:
+    """
+    Parse a "start:end" row range (end exclusive, either side optional).
+
+    Examples: "100:200", ":1000", "5000:"
+
+    Raises:
+        ExportError: If the range is malformed
+    """
+    if not rows:
+        return 0, None
+    start_text, sep, end_text = rows.partition(":")
+    try:
+        if not sep:
+            raise ValueError()
+        start = int(start_text) if start_text.strip() else 0
+        end = int(end_text) if end_text.strip() else None
+    except ValueError:
+        raise ExportError(f"Invalid row range '{rows}', expected 'start:end'")
+    if start < 0 or (end is not None and end < start):
+        raise ExportError(f"Invalid row range '{rows}'")
+    return start, end
+
+
+def get_dataset_columns(workspace_id: str, dataset_id: str) -> List[str]:
+    """Read the column names of a dataset from its header."""
+    return list(probe_dataset_schema(dataset_id, workspace_id, sample_rows=0))
+
+
+def _iter_csv_chunks(
+    workspace_id: str,
+    dataset_id: str,
+    columns: Optional[List[str]],
+    start: int,
+    end: Optional[int],
+) -> Iterator[pd.DataFrame]:
+    """Stream the selected columns and row range from the CSV, chunk by chunk."""
+    position = 0
+    for chunk in iter_dataset_chunks(dataset_id, workspace_id, chunksize=EXPORT_BATCH_ROWS, usecols=columns):
+        chunk_start, chunk_end = position, position + len(chunk)
+        position = chunk_end
+        if chunk_end <= start:
+            continue
+        if end is not None and chunk_start >= end:
+            break
+        lo = max(start - chunk_start, 0)
+        hi = len(chunk) if end is None else min(end - chunk_start, len(chunk))
+        chunk = chunk.iloc[lo:hi]
+        if columns is not None:
+            chunk = chunk[columns]  # usecols doesn't keep the requested order
+        yield chunk
+
+
+# =============================================================================
+# Columnar sidecar (pyarrow)
+# =============================================================================
+
+def _arrow_type_for(series: pd.Series) -> "pa.DataType":
+    """Arrow type for a CSV column, inferred from its first chunk."""
+    arrow_type = pa.Array.from_pandas(series).type
+    if pa.types.is_null(arrow_type):
+        return pa.string()  # all-null in the first chunk: keep as text
+    return arrow_type
+
+
+def _iter_csv_batches(workspace_id: str, dataset_id: str) -> Iterator["pa.RecordBatch"]:
+    """
+    Convert the CSV to Arrow record batches with one schema for all chunks.
+
+    The schema is inferred from the first chunk; later chunks are converted
+    to it (e.g. an integer column with missing values becomes nullable int).
+
+    Raises:
+        ExportError: If a column changes type in later chunks
+    """
+    schema = None
+    for chunk in iter_dataset_chunks(dataset_id, workspace_id, chunksize=EXPORT_BATCH_ROWS):
+        chunk.columns = [str(col) for col in chunk.columns]
+        if schema is None:
+            schema = pa.schema([(col, _arrow_type_for(chunk[col])) for col in chunk.columns])
+        try:
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ExportError(f"Dataset '{dataset_id}' has columns with inconsistent types ({e}); export it as ndjson")
+        yield from table.to_batches(max_chunksize=EXPORT_BATCH_ROWS)
+
+
+def _sidecar_matches(path: Path, fingerprint: str) -> bool:
+    """True if the sidecar exists and was built from the current dataset content."""
+    if not path.exists():
+        return False
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    return metadata.get(_SIDECAR_FINGERPRINT_KEY) == fingerprint.encode()
+
+
+def ensure_columnar_sidecar(workspace_id: str, dataset_id: str) -> Optional[Path]:
+    """
+    Build the Arrow IPC sidecar of a dataset if it's missing or stale.
+
+    The CSV is converted batch by batch and the file is moved into place
+    atomically, so concurrent readers see either the old or the new sidecar.
+
+    Returns:
+        Path to an up-to-date sidecar, or None if pyarrow isn't installed
+
+    Raises:
+        FileNotFoundError: If the dataset doesn't exist
+        ExportError: If the dataset can't be represented with a single schema
+    """
+    if not HAS_PYARROW:
+        return None
+
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    sidecar_path = get_columnar_cache_file_path(workspace_id, dataset_id)
+    if fingerprint and _sidecar_matches(sidecar_path, fingerprint):
+        return sidecar_path
+
+    batches = _iter_csv_batches(workspace_id, dataset_id)
+    first = next(batches, None)
+    if first is None:
+        # Header-only file: keep the columns, no rows
+        columns = get_dataset_columns(workspace_id, dataset_id)
+        schema = pa.schema([(col, pa.string()) for col in columns])
+    else:
+        schema = first.schema
+    schema = schema.with_metadata({_SIDECAR_FINGERPRINT_KEY: (fingerprint or "").encode()})
+
+    fd, tmp_path = tempfile.mkstemp(dir=sidecar_path.parent, prefix=f".{sidecar_path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        rows = 0
+        with pa.ipc.new_file(tmp_path, schema) as writer:
+            if first is not None:
+                writer.write_batch(first.replace_schema_metadata(schema.metadata))
+                rows += first.num_rows
+            for batch in batches:
+                writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+                rows += batch.num_rows
+        os.replace(tmp_path, sidecar_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    logger.info(f"[dataset_export] Built columnar sidecar for '{dataset_id}': {rows} rows, {len(schema)} columns")
+    return sidecar_path
+
+
+def _iter_sidecar_batches(
+    sidecar_path: Path,
+    columns: Optional[List[str]],
+    start: int,
+    end: Optional[int],
+) -> Iterator["pa.RecordBatch"]:
+    """Read the selected columns and row range from the memory-mapped sidecar (zero-copy slices)."""
+    with pa.memory_map(str(sidecar_path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        position = 0
+        for i in range(reader.num_record_batches):
+            if end is not None and position >= end:
+                break
+            batch = reader.get_batch(i)
+            batch_start, position = position, position + batch.num_rows
+            if position <= start:
+                continue
+            lo = max(start - batch_start, 0)
+            hi = batch.num_rows if end is None else min(end - batch_start, batch.num_rows)
+            if columns is not None:
+                batch = batch.select(columns)
+            yield batch.slice(lo, hi - lo).replace_schema_metadata(None)
+
+
+def _sidecar_schema(sidecar_path: Path, columns: Optional[List[str]]) -> "pa.Schema":
+    with pa.memory_map(str(sidecar_path), "r") as source:
+        schema = pa.ipc.open_file(source).schema.remove_metadata()
+    if columns is not None:
+        schema = pa.schema([schema.field(col) for col in columns])
+    return schema
+
+
+# =============================================================================
+# Writers
+# =============================================================================
+
+class _ChunkSink:
+    """Write-only file object that collects written bytes until they're drained."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _iter_arrow_export(
+    export_format: str,
+    schema: "pa.Schema",
+    batches: Iterator["pa.RecordBatch"],
+) -> Iterator[bytes]:
+    """Encode record batches as parquet / feather / arrow, yielding bytes as they're produced."""
+    sink = _ChunkSink()
+    stream = pa.PythonFile(sink, mode="w")
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(stream, schema, compression="snappy")
+    elif export_format == "feather":
+        writer = pa.ipc.new_file(stream, schema, options=pa.ipc.IpcWriteOptions(compression="lz4"))
+    else:
+        writer = pa.ipc.new_stream(stream, schema)
+
+    try:
+        for batch in batches:
+            if export_format == "parquet":
+                writer.write_table(pa.Table.from_batches([batch], schema=schema))
+            else:
+                writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _iter_ndjson(frames: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode DataFrame chunks as newline-delimited JSON."""
+    for frame in frames:
+        if len(frame) == 0:
+            continue
+        # to_json maps NaN/NaT to null and timestamps to ISO strings
+        text = frame.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+        yield text.encode("utf-8") if text.endswith("\n") else (text + "\n").encode("utf-8")
+
+
+def iter_dataset_export(
+    workspace_id: str,
+    dataset_id: str,
+    export_format: str,
+    columns: Optional[List[str]] = None,
+    rows: Optional[str] = None,
+) -> Iterator[bytes]:
+    """
+    Export a dataset (column subset, row range) as a stream of bytes.
+
+    Validation happens eagerly, before the first chunk is produced, so errors
+    can still be reported as a normal HTTP error.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        export_format: One of EXPORT_FORMATS
+        columns: Columns to export, in order (None = all)
+        rows: Row range "start:end" (end exclusive, None = all rows)
+
+    Returns:
+        Iterator over the encoded export
+
+    Raises:
+        FileNotFoundError: If the dataset doesn't exist
+        ExportError: If the format, columns or row range are invalid
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if EXPORT_FORMATS[export_format][2] and not HAS_PYARROW:
+        raise ExportError(f"Export format '{export_format}' requires pyarrow, which is not installed; use ndjson")
+
+    dataset_path = get_dataset_path(dataset_id, workspace_id)
+    if not dataset_path.exists():
+        raise FileNotFoundError(f"Dataset '{dataset_id}' not found in workspace '{workspace_id}'")
+
+    start, end = parse_row_range(rows)
+    if columns is not None:
+        available = set(get_dataset_columns(workspace_id, dataset_id))
+        missing = [col for col in columns if col not in available]
+        if missing:
+            raise ExportError(f"Columns not found in dataset: {', '.join(missing)}")
+        if len(set(columns)) != len(columns):
+            raise ExportError("Duplicate columns in export request")
+
+    sidecar_path = None
+    if HAS_PYARROW:
+        try:
+            sidecar_path = ensure_columnar_sidecar(workspace_id, dataset_id)
+        except ExportError:
+            # Mixed-type columns: ndjson can still be produced from the CSV
+            if export_format != "ndjson":
+                raise
+    logger.info(
+        f"[dataset_export] Exporting '{dataset_id}' as {export_format} "
+        f"(columns={len(columns) if columns else 'all'}, rows={start}:{end if end is not None else ''}, "
+        f"source={'sidecar' if sidecar_path else 'csv'})"
+    )
+
+    if sidecar_path is None:
+        return _iter_ndjson(_iter_csv_chunks(workspace_id, dataset_id, columns, start, end))
+
+    batches = _iter_sidecar_batches(sidecar_path, columns, start, end)
+    if export_format == "ndjson":
+        return _iter_ndjson(batch.to_pandas() for batch in batches)
+    return _iter_arrow_export(export_format, _sidecar_schema(sidecar_path, columns), batches)
@@ -0,0 +1,339 @@
+"""
+Dataset content fingerprints for Data4Viz.
+
+A fingerprint is a hash of the dataset file's bytes. It is used to validate
+cached, derived results (cleaning summary, overview, outlier analysis,
+insights): a cached result is reused only while the fingerprint it was
+computed for still matches.
+
+The file is hashed in fixed-size chunks. The per-chunk hashes (a flat
+Merkle leaf list) are kept with the fingerprint, so two versions of a
+dataset can be compared chunk by chunk to find the byte ranges that changed.
+The fingerprint digest is the hash of the leaf list.
+
+IMPORTANT: Hashing a large file on every request would defeat the caches,
+so fingerprints are memoized by the file's stat signature (inode, size,
+mtime_ns), in memory and in the workspace cache directory. Checking a
+fingerprint costs a stat call while the file is unchanged; any write to the
+dataset changes the signature and forces a re-hash.
+"""
+
+import hashlib
+import json
+import logging
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import FINGERPRINT_CHUNK_SIZE, get_fingerprint_file_path
+from app.services.dataset_loader import get_dataset_path
+from app.utils.cache import LRUCache, atomic_write_json
+
+# xxhash is optional: faster chunk hashing when installed
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+logger = logging.getLogger(__name__)
+
+CHUNK_HASH_ALGORITHM = "xxh3_128" if HAS_XXHASH else "blake2b_128"
+
+# (path, inode, size, mtime_ns) -> DatasetFingerprint
+_fingerprint_cache = LRUCache(maxsize=256)
+
+
+def _hash_chunk(data: memoryview) -> str:
+    """Hash one chunk of file content."""
+    if HAS_XXHASH:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class DatasetFingerprint:
+    """
+    Content fingerprint of a dataset file with per-chunk hashes.
+
+    Attributes:
+        digest: Hash of the whole file content (root of the chunk hashes)
+        size: File size in bytes
+        chunk_size: Chunk size used for hashing
+        chunk_hashes: Hash of each chunk, in file order
+        algorithm: Chunk hash algorithm
+        changed_ranges: Byte ranges [start, end) that changed compared to the
+                        previously fingerprinted version (None if unknown)
+    """
+
+    def __init__(
+        self,
+        digest: str,
+        size: int,
+        chunk_size: int,
+        chunk_hashes: List[str],
+        algorithm: str = CHUNK_HASH_ALGORITHM,
+        changed_ranges: Optional[List[Tuple[int, int]]] = None
+    ):
+        self.digest = digest
+        self.size = size
+        self.chunk_size = chunk_size
+        self.chunk_hashes = chunk_hashes
+        self.algorithm = algorithm
+        self.changed_ranges = changed_ranges
+
+    @classmethod
+    def from_chunk_hashes(cls, size: int, chunk_size: int, chunk_hashes: List[str]) -> "DatasetFingerprint":
+        """Build a fingerprint from its chunk hashes (computes the root digest)."""
+        root = hashlib.blake2b(digest_size=16)
+        root.update(f"{CHUNK_HASH_ALGORITHM}:{size}:{chunk_size}".encode("utf-8"))
+        for chunk_hash in chunk_hashes:
+            root.update(bytes.fromhex(chunk_hash))
+        return cls(root.hexdigest(), size, chunk_size, chunk_hashes)
+
+    def diff(self, previous: "DatasetFingerprint") -> List[Tuple[int, int]]:
+        """
+        Get the byte ranges of this version that differ from a previous one.
+
+        Args:
+            previous: Fingerprint of the previous version of the same file
+
+        Returns:
+            Merged list of (start, end) byte ranges; empty if identical
+        """
+        if previous.chunk_size != self.chunk_size or previous.algorithm != self.algorithm:
+            return [(0, self.size)] if self.size else []
+
+        ranges: List[Tuple[int, int]] = []
+        for i, chunk_hash in enumerate(self.chunk_hashes):
+            if i < len(previous.chunk_hashes) and previous.chunk_hashes[i] == chunk_hash:
+                continue
+            start = i * self.chunk_size
+            end = min(start + self.chunk_size, self.size)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON storage."""
+        return {
+            "digest": self.digest,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "chunk_hashes": self.chunk_hashes,
+            "algorithm": self.algorithm,
+            "changed_ranges": self.changed_ranges,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DatasetFingerprint":
+        """Create from dictionary."""
+        changed_ranges = data.get("changed_ranges")
+        return cls(
+            digest=data["digest"],
+            size=data["size"],
+            chunk_size=data["chunk_size"],
+            chunk_hashes=data["chunk_hashes"],
+            algorithm=data.get("algorithm", CHUNK_HASH_ALGORITHM),
+            changed_ranges=[tuple(r) for r in changed_ranges] if changed_ranges is not None else None,
+        )
+
+
+def get_file_signature(workspace_id: str, dataset_id: str) -> Optional[Tuple[str, int, int, int]]:
+    """
+    Get the stat signature of a dataset file.
+
+    Returns:
+        Tuple of (path, inode, size, mtime_ns), or None if the file doesn't exist
+    """
+    dataset_path = get_dataset_path(dataset_id, workspace_id)
+    try:
+        stat = dataset_path.stat()
+    except OSError:
+        return None
+    return (str(dataset_path), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class ChunkHasher:
+    """
+    Incremental fingerprint of a byte stream (e.g. an upload being written).
+
+    Produces the same fingerprint as hash_file_chunks on the written file,
+    regardless of how the stream is split into update() calls.
+    """
+
+    def __init__(self, chunk_size: int = FINGERPRINT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.chunk_hashes: List[str] = []
+        self.size = 0
+        self._buffer = bytearray()
+
+    def update(self, data: bytes) -> None:
+        """Add the next bytes of the stream."""
+        self.size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            view = memoryview(self._buffer)
+            self.chunk_hashes.append(_hash_chunk(view[:self.chunk_size]))
+            view.release()
+            del self._buffer[:self.chunk_size]
+
+    def finish(self) -> DatasetFingerprint:
+        """Hash the final partial chunk and return the fingerprint."""
+        if self._buffer:
+            self.chunk_hashes.append(_hash_chunk(memoryview(self._buffer)))
+            self._buffer = bytearray()
+        return DatasetFingerprint.from_chunk_hashes(self.size, self.chunk_size, self.chunk_hashes)
+
+
+def hash_file_chunks(path: str, chunk_size: int = FINGERPRINT_CHUNK_SIZE) -> DatasetFingerprint:
+    """
+    Stream a file through the chunk hash.
+
+    Args:
+        path: File path
+        chunk_size: Bytes per chunk
+
+    Returns:
+        DatasetFingerprint of the file content
+    """
+    chunk_hashes: List[str] = []
+    size = 0
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            chunk_hashes.append(_hash_chunk(view[:n]))
+            size += n
+    return DatasetFingerprint.from_chunk_hashes(size, chunk_size, chunk_hashes)
+
+
+def _load_persisted(workspace_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    """Load the persisted fingerprint record for a dataset (None if missing/unreadable)."""
+    fingerprint_path = get_fingerprint_file_path(workspace_id, dataset_id)
+    if not fingerprint_path.exists():
+        return None
+    try:
+        with open(fingerprint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"[dataset_fingerprint] Failed to read fingerprint for '{dataset_id}': {e}")
+        return None
+
+
+def get_fingerprint_info(workspace_id: str, dataset_id: str) -> Optional[DatasetFingerprint]:
+    """
+    Get the full fingerprint (digest, chunk hashes, changed ranges) of a dataset.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+
+    Returns:
+        DatasetFingerprint, or None if the dataset doesn't exist
+    """
+    signature = get_file_signature(workspace_id, dataset_id)
+    if signature is None:
+        return None
+
+    fingerprint = _fingerprint_cache.get(signature)
+    if fingerprint is not None:
+        return fingerprint
+
+    persisted = _load_persisted(workspace_id, dataset_id)
+    if persisted is not None and persisted.get("signature") == list(signature[1:]):
+        fingerprint = DatasetFingerprint.from_dict(persisted["fingerprint"])
+        if fingerprint.algorithm == CHUNK_HASH_ALGORITHM:
+            _fingerprint_cache.set(signature, fingerprint)
+            return fingerprint
+
+    fingerprint = hash_file_chunks(signature[0])
+    logger.info(
+        f"[get_fingerprint_info] Hashed '{dataset_id}' ({fingerprint.size} bytes, "
+        f"{len(fingerprint.chunk_hashes)} chunks): {fingerprint.digest}"
+    )
+    _store_fingerprint(workspace_id, dataset_id, signature, fingerprint, persisted)
+    return fingerprint
+
+
+def _store_fingerprint(
+    workspace_id: str,
+    dataset_id: str,
+    signature: Tuple[str, int, int, int],
+    fingerprint: DatasetFingerprint,
+    persisted: Optional[Dict[str, Any]]
+) -> None:
+    """Diff against the previous version, then memoize and persist a fingerprint."""
+    if persisted is not None:
+        previous = DatasetFingerprint.from_dict(persisted["fingerprint"])
+        fingerprint.changed_ranges = fingerprint.diff(previous)
+
+    _fingerprint_cache.set(signature, fingerprint)
+    try:
+        atomic_write_json(
+            get_fingerprint_file_path(workspace_id, dataset_id),
+            {"dataset_id": dataset_id, "signature": list(signature[1:]), "fingerprint": fingerprint.to_dict()},
+        )
+    except Exception as e:
+        logger.warning(f"[dataset_fingerprint] Failed to persist fingerprint for '{dataset_id}': {e}")
+
+
+def record_dataset_fingerprint(workspace_id: str, dataset_id: str, fingerprint: DatasetFingerprint) -> None:
+    """
+    Record a fingerprint computed while the dataset file was written.
+
+    Saves re-reading the file on the next fingerprint check. Must be called
+    right after the file is in place (the current stat signature is used).
+    """
+    signature = get_file_signature(workspace_id, dataset_id)
+    if signature is None or signature[2] != fingerprint.size:
+        return
+    _store_fingerprint(workspace_id, dataset_id, signature, fingerprint, _load_persisted(workspace_id, dataset_id))
+
+
+def get_dataset_fingerprint(workspace_id: str, dataset_id: str) -> Optional[str]:
+    """
+    Get the content fingerprint of a dataset file.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+
+    Returns:
+        Hex digest of the file content, or None if the dataset doesn't exist
+    """
+    fingerprint = get_fingerprint_info(workspace_id, dataset_id)
+    return fingerprint.digest if fingerprint is not None else None
+
+
+def get_changed_byte_ranges(workspace_id: str, dataset_id: str) -> Optional[List[Tuple[int, int]]]:
+    """
+    Get the byte ranges that changed since the previously fingerprinted version.
+
+    Returns:
+        List of (start, end) ranges, or None if there is no previous version
+    """
+    fingerprint = get_fingerprint_info(workspace_id, dataset_id)
+    return fingerprint.changed_ranges if fingerprint is not None else None
+
+
+def compute_column_hashes(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    Hash the values of each column (index excluded).
+
+    Used to find which columns changed between two versions of a dataset.
+
+    Returns:
+        Dictionary mapping column name to a hex digest of its values
+    """
+    hashes = {}
+    for col in df.columns:
+        series = df[col]
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(str(series.dtype).encode("utf-8"))
+        hasher.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+        hashes[str(col)] = hasher.hexdigest()
+    return hashes
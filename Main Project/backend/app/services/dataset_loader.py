@@ -5,17 +5,39 @@ All datasets belong to a workspace and are stored in workspace-specific director
 Data Cleaning is an operational view on top of workspace datasets - not a data source.
 """
 
+import csv
 import pandas as pd
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, Optional
 from datetime import datetime
 import logging
-from app.config import DATA_DIR, get_workspace_datasets_dir, get_workspace_files_dir, get_workspace_logs_dir
+from app.config import DATA_DIR, SCHEMA_PROBE_ROWS, get_workspace_datasets_dir, get_workspace_files_dir, get_workspace_logs_dir
 from app.services.file_registry import register_file, unregister_file, get_file_metadata, verify_file_ownership, is_file_protected
 
 logger = logging.getLogger(__name__)
 
 
+def get_dataset_path(dataset_id: str, workspace_id: Optional[str] = None) -> Path:
+    """
+    Get the on-disk path of a dataset.
+    
+    Workspace-aware: If workspace_id is provided, resolves inside the workspace datasets directory.
+    Legacy support: If workspace_id is None, resolves inside the global data directory.
+
+    Args:
+        dataset_id: Filename of the dataset (e.g., "sample.csv")
+        workspace_id: Workspace identifier (required for workspace-aware operations)
+
+    Returns:
+        Path to the dataset file (may not exist)
+    """
+    if workspace_id:
+        # Workspace-aware: workspace storage
+        return get_workspace_datasets_dir(workspace_id) / dataset_id
+    # Legacy: global data directory
+    return DATA_DIR / dataset_id
+
+
 def load_dataset(dataset_id: str, workspace_id: Optional[str] = None) -> pd.DataFrame:
     """
     Load a dataset from workspace storage.
@@ -34,12 +56,7 @@ def load_dataset(dataset_id: str, workspace_id: Optional[str] = None) -> pd.Data
         FileNotFoundError: If dataset file doesn't exist
         ValueError: If file cannot be parsed as CSV
     """
-    if workspace_id:
-        # Workspace-aware: load from workspace storage
-        dataset_path = get_workspace_datasets_dir(workspace_id) / dataset_id
-    else:
-        # Legacy: load from global data directory
-        dataset_path = DATA_DIR / dataset_id
+    dataset_path = get_dataset_path(dataset_id, workspace_id)
 
     if not dataset_path.exists():
         location = f"workspace '{workspace_id}'" if workspace_id else "data directory"
@@ -173,11 +190,132 @@ def dataset_exists(dataset_id: str, workspace_id: Optional[str] = None) -> bool:
     Returns:
         True if dataset exists, False otherwise
     """
-    if workspace_id:
-        dataset_path = get_workspace_datasets_dir(workspace_id) / dataset_id
-    else:
-        dataset_path = DATA_DIR / dataset_id
-    return dataset_path.exists()
+    return get_dataset_path(dataset_id, workspace_id).exists()
+
+
+def detect_delimiter(dataset_path: Path, sample_bytes: int = 64 * 1024) -> str:
+    """
+    Detect the delimiter of a CSV file from a prefix sample.
+    
+    Mirrors load_dataset: sniff the delimiter first, and prefer semicolon
+    when sniffing yields a single column.
+
+    Args:
+        dataset_path: Path to the CSV file
+        sample_bytes: Number of bytes to sample from the start of the file
+
+    Returns:
+        Delimiter character (defaults to comma)
+    """
+    with open(dataset_path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        sample = f.read(sample_bytes)
+
+    # Only sniff complete lines so a truncated last row doesn't confuse the sniffer
+    if len(sample) == sample_bytes and "\n" in sample:
+        sample = sample[: sample.rfind("\n")]
+    return detect_delimiter_from_sample(sample)
+
+
+def detect_delimiter_from_sample(sample: str) -> str:
+    """
+    Detect the delimiter of CSV text (complete lines from the start of a file).
+
+    Args:
+        sample: Leading lines of the CSV file
+
+    Returns:
+        Delimiter character (defaults to comma)
+    """
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+
+    header = sample.split("\n", 1)[0]
+    if delimiter != ";" and header.count(delimiter) == 0 and header.count(";") > 0:
+        delimiter = ";"
+    return delimiter
+
+
+def iter_dataset_chunks(
+    dataset_id: str,
+    workspace_id: Optional[str] = None,
+    chunksize: int = 100_000,
+    usecols: Optional[list] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a dataset from workspace storage in row chunks.
+    
+    Used for single-pass work (sketches, exports) that should not
+    materialize the whole dataset in memory.
+
+    Args:
+        dataset_id: Filename of the dataset
+        workspace_id: Workspace identifier (required for workspace-aware operations)
+        chunksize: Number of rows per chunk
+        usecols: Optional subset of columns to read
+
+    Yields:
+        DataFrame chunks in file order
+
+    Raises:
+        FileNotFoundError: If dataset file doesn't exist
+    """
+    dataset_path = get_dataset_path(dataset_id, workspace_id)
+    if not dataset_path.exists():
+        raise FileNotFoundError(f"Dataset '{dataset_id}' not found")
+
+    delimiter = detect_delimiter(dataset_path)
+    reader = pd.read_csv(
+        dataset_path,
+        sep=delimiter,
+        usecols=usecols,
+        chunksize=chunksize,
+        on_bad_lines="skip",
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def probe_dataset_schema(
+    dataset_id: str,
+    workspace_id: Optional[str] = None,
+    sample_rows: int = SCHEMA_PROBE_ROWS,
+) -> Dict[str, str]:
+    """
+    Read a dataset's columns and infer their dtypes from the header plus a small sample.
+    
+    Much cheaper than load_dataset for work that only needs column names and
+    types: only the first sample_rows rows are parsed. A numeric column whose
+    first non-numeric value comes after the sample is reported as numeric.
+
+    Args:
+        dataset_id: Filename of the dataset
+        workspace_id: Workspace identifier (required for workspace-aware operations)
+        sample_rows: Number of data rows used to infer dtypes (0 = header only)
+
+    Returns:
+        Ordered mapping of column name -> pandas dtype name (e.g. "int64", "object")
+
+    Raises:
+        FileNotFoundError: If dataset file doesn't exist
+        ValueError: If the file cannot be parsed as CSV
+    """
+    dataset_path = get_dataset_path(dataset_id, workspace_id)
+    if not dataset_path.exists():
+        raise FileNotFoundError(f"Dataset '{dataset_id}' not found")
+
+    try:
+        sample = pd.read_csv(
+            dataset_path,
+            sep=detect_delimiter(dataset_path),
+            nrows=sample_rows,
+            on_bad_lines="skip",
+        )
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise ValueError(f"Failed to read the header of dataset '{dataset_id}': {str(e)}") from e
+    return {str(col): str(dtype) for col, dtype in sample.dtypes.items()}
 
 
 def get_dataset_info(dataset_id: str, workspace_id: Optional[str] = None) -> dict:
@@ -307,6 +445,10 @@ def list_workspace_files(workspace_id: str) -> list[dict]:
                     if not file_path.exists():
                         continue
                     
+                    # Skip in-progress atomic writes (hidden temp files)
+                    if file_path.name.startswith("."):
+                        continue
+                    
                     stat = file_path.stat()
                     suffix = file_path.suffix.lower()
                     
@@ -0,0 +1,655 @@
+"""
+Streaming dataset uploads for Data4Viz.
+
+Uploads are written to a temp file in the workspace uploads directory as
+they arrive (never held in memory as a whole), hashed on the fly into the
+dataset fingerprint, and validated from a prefix sample (header and
+delimiter). When complete, the temp file is renamed into datasets/.
+
+Very large files can be sent with the resumable protocol: create a session,
+upload numbered parts (in any order, retrying failed ones), then complete
+the session, which stitches the parts together through the same path.
+
+Post-processing (delimiter normalization, sketches, overview, outlier
+precomputation) runs afterwards as a background job. When the job queue
+is full, only the delimiter is normalized, synchronously.
+
+Single-request uploads are multipart/form-data bodies parsed as they stream
+in (MultipartUpload): the file field goes straight into the temp file,
+without being spooled to disk first by the web framework.
+
+IMPORTANT: The uploaded file is stored as sent. Files with a non-comma
+delimiter are rewritten to comma-separated by the post-processing job;
+until then, load_dataset reads them with delimiter detection.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from app.config import (
+    UPLOAD_PART_SIZE,
+    UPLOAD_SAMPLE_BYTES,
+    UPLOAD_SESSION_TTL_HOURS,
+    get_workspace_datasets_dir,
+    get_workspace_uploads_dir,
+)
+from app.services.dataset_fingerprint import ChunkHasher, record_dataset_fingerprint
+from app.services.dataset_loader import detect_delimiter_from_sample, get_dataset_path, iter_dataset_chunks, load_dataset
+from app.utils.cache import atomic_write_json
+
+# python-multipart is imported as python_multipart since 0.0.13 (multipart before)
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+SESSION_FILE = "session.json"
+
+
+class UploadValidationError(ValueError):
+    """Raised when an upload is not a valid CSV dataset (maps to HTTP 400)."""
+
+
+def validate_upload_filename(filename: Optional[str]) -> str:
+    """
+    Check that an upload filename is a plain CSV filename.
+
+    Raises:
+        UploadValidationError: If the name is missing, not .csv, or contains a path
+    """
+    if not filename or not filename.endswith(".csv"):
+        raise UploadValidationError("Only CSV files are supported")
+    if Path(filename).name != filename or filename.startswith("."):
+        raise UploadValidationError(f"Invalid filename '{filename}'")
+    return filename
+
+
+def sniff_csv_sample(sample: bytes, complete: bool) -> Dict[str, Any]:
+    """
+    Validate the start of a CSV file and detect its delimiter and columns.
+
+    Args:
+        sample: Leading bytes of the file
+        complete: True if the sample is the whole file
+
+    Returns:
+        Dictionary with delimiter and column names
+
+    Raises:
+        UploadValidationError: If the sample can't be parsed as a CSV with columns
+    """
+    text = sample.decode("utf-8", errors="replace")
+    if not complete and "\n" in text:
+        # Only parse complete lines
+        text = text[: text.rfind("\n") + 1]
+    if not text.strip():
+        raise UploadValidationError("Uploaded file is empty")
+
+    delimiter = detect_delimiter_from_sample(text)
+    try:
+        df = pd.read_csv(io.StringIO(text), sep=delimiter, on_bad_lines="skip")
+    except Exception as e:
+        raise UploadValidationError(f"Failed to parse CSV file: {str(e)}")
+    if len(df.columns) == 0:
+        raise UploadValidationError("CSV file has no columns")
+    return {"delimiter": delimiter, "columns": [str(col) for col in df.columns]}
+
+
+class StreamingUpload:
+    """
+    Writes an upload to a temp file chunk by chunk, then moves it into place.
+
+    Usage:
+        upload = StreamingUpload(workspace_id, filename)
+        try:
+            for chunk in chunks:
+                upload.write(chunk)
+            info = upload.finalize()
+        except Exception:
+            upload.abort()
+            raise
+    """
+
+    def __init__(self, workspace_id: str, filename: str):
+        self.workspace_id = workspace_id
+        self.filename = validate_upload_filename(filename)
+        fd, temp_path = tempfile.mkstemp(
+            dir=get_workspace_uploads_dir(workspace_id), prefix=".upload-", suffix=".tmp"
+        )
+        self.temp_path = Path(temp_path)
+        self._file = os.fdopen(fd, "wb")
+        self._hasher = ChunkHasher()
+        self._sample = bytearray()
+        self._sniffed: Optional[Dict[str, Any]] = None
+        self._newlines = 0
+        self._last_byte = b""
+
+    @property
+    def size(self) -> int:
+        return self._hasher.size
+
+    def write(self, data: bytes) -> None:
+        """
+        Append a chunk of the upload.
+
+        Raises:
+            UploadValidationError: As soon as the prefix sample is complete
+                                   and not a valid CSV
+        """
+        if not data:
+            return
+        self._file.write(data)
+        self._hasher.update(data)
+        self._newlines += data.count(b"\n")
+        self._last_byte = data[-1:]
+
+        if self._sniffed is None:
+            self._sample += data[: UPLOAD_SAMPLE_BYTES - len(self._sample)]
+            if len(self._sample) >= UPLOAD_SAMPLE_BYTES:
+                # Fail fast: don't accept gigabytes of something that isn't a CSV
+                self._sniffed = sniff_csv_sample(bytes(self._sample), complete=False)
+
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Validate, move the file into datasets/ and record its fingerprint.
+
+        Replaces an existing dataset with the same name atomically.
+
+        Returns:
+            Dictionary with size, delimiter, columns, estimated rows and fingerprint
+
+        Raises:
+            UploadValidationError: If the upload is empty or not a valid CSV
+        """
+        self._file.close()
+        if self.size == 0:
+            raise UploadValidationError("Uploaded file is empty")
+        if self._sniffed is None:
+            self._sniffed = sniff_csv_sample(bytes(self._sample), complete=True)
+
+        dataset_path = get_workspace_datasets_dir(self.workspace_id) / self.filename
+        os.replace(self.temp_path, dataset_path)
+
+        fingerprint = self._hasher.finish()
+        record_dataset_fingerprint(self.workspace_id, self.filename, fingerprint)
+
+        # Line count (quoted newlines inside values make this an estimate)
+        lines = self._newlines + (1 if self._last_byte != b"\n" else 0)
+        info = {
+            "id": self.filename,
+            "size": self.size,
+            "delimiter": self._sniffed["delimiter"],
+            "columns": self._sniffed["columns"],
+            "rows": max(lines - 1, 0),
+            "fingerprint": fingerprint.digest,
+        }
+        logger.info(
+            f"[StreamingUpload] Stored '{self.filename}' in workspace '{self.workspace_id}' "
+            f"({self.size} bytes, delimiter={info['delimiter']!r}, ~{info['rows']} rows)"
+        )
+        return info
+
+    def abort(self) -> None:
+        """Discard the partial upload."""
+        try:
+            self._file.close()
+        except Exception:
+            pass
+        self.temp_path.unlink(missing_ok=True)
+
+
+class MultipartUpload:
+    """
+    Streams the file field of a multipart/form-data body into a StreamingUpload.
+
+    The body is parsed incrementally as it is fed in; the file part's bytes
+    are written to the upload's temp file as they are parsed, other fields
+    are ignored.
+
+    Usage:
+        upload = MultipartUpload(workspace_id, content_type)
+        try:
+            for chunk in body:
+                upload.write(chunk)
+            info = upload.finalize()
+        except Exception:
+            upload.abort()
+            raise
+    """
+
+    def __init__(self, workspace_id: str, content_type: str, field: str = "file"):
+        """
+        Raises:
+            UploadValidationError: If the body is not multipart/form-data
+        """
+        mime_type, options = parse_options_header(content_type or "")
+        boundary = options.get(b"boundary")
+        if mime_type != b"multipart/form-data" or not boundary:
+            raise UploadValidationError("Expected a multipart/form-data body with a 'file' field")
+        self.workspace_id = workspace_id
+        self.field = field.encode("latin-1")
+        self.upload: Optional[StreamingUpload] = None
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._in_file = False
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._in_file = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if options.get(b"name") != self.field or self.upload is not None:
+            return
+        filename = options.get(b"filename")
+        self.upload = StreamingUpload(self.workspace_id, filename.decode("utf-8") if filename else None)
+        self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.upload.write(data[start:end])
+
+    def write(self, data: bytes) -> None:
+        """
+        Parse the next chunk of the request body.
+
+        Raises:
+            UploadValidationError: If the file is not a valid CSV upload
+        """
+        self._parser.write(data)
+
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Finish parsing and move the uploaded file into place (see StreamingUpload.finalize).
+
+        Raises:
+            UploadValidationError: If the body has no file field or the file is not a valid CSV
+        """
+        self._parser.finalize()
+        if self.upload is None:
+            raise UploadValidationError(f"Missing '{self.field.decode('latin-1')}' field in the upload")
+        return self.upload.finalize()
+
+    def abort(self) -> None:
+        """Discard the partial upload."""
+        if self.upload is not None:
+            self.upload.abort()
+
+
+# ----------------------------
+# Resumable (chunked) uploads
+# ----------------------------
+
+def _session_dir(workspace_id: str, upload_id: str) -> Path:
+    if not upload_id or Path(upload_id).name != upload_id or upload_id.startswith("."):
+        raise UploadValidationError(f"Invalid upload ID '{upload_id}'")
+    return get_workspace_uploads_dir(workspace_id) / upload_id
+
+
+def _part_path(session_dir: Path, part_number: int) -> Path:
+    return session_dir / f"part-{part_number:06d}"
+
+
+def cleanup_expired_upload_sessions(workspace_id: str) -> int:
+    """Delete resumable upload sessions older than UPLOAD_SESSION_TTL_HOURS."""
+    cutoff = datetime.now() - timedelta(hours=UPLOAD_SESSION_TTL_HOURS)
+    removed = 0
+    for session_dir in get_workspace_uploads_dir(workspace_id).iterdir():
+        if not session_dir.is_dir():
+            continue
+        try:
+            if datetime.fromtimestamp(session_dir.stat().st_mtime) < cutoff:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info(f"[upload_sessions] Removed {removed} expired upload sessions in workspace '{workspace_id}'")
+    return removed
+
+
+def create_upload_session(
+    workspace_id: str,
+    filename: str,
+    total_size: Optional[int] = None,
+    part_size: int = UPLOAD_PART_SIZE
+) -> Dict[str, Any]:
+    """
+    Start a resumable upload.
+
+    Args:
+        workspace_id: Workspace identifier
+        filename: Target dataset filename (.csv)
+        total_size: Optional expected total size in bytes (checked on completion)
+        part_size: Suggested part size for the client
+
+    Returns:
+        Session dictionary (upload_id, filename, part_size, ...)
+    """
+    validate_upload_filename(filename)
+    cleanup_expired_upload_sessions(workspace_id)
+
+    upload_id = uuid.uuid4().hex
+    session = {
+        "upload_id": upload_id,
+        "workspace_id": workspace_id,
+        "filename": filename,
+        "total_size": total_size,
+        "part_size": part_size,
+        "created_at": datetime.now().isoformat(),
+    }
+    session_dir = _session_dir(workspace_id, upload_id)
+    session_dir.mkdir()
+    atomic_write_json(session_dir / SESSION_FILE, session, indent=2)
+    logger.info(f"[upload_sessions] Created upload session {upload_id} for '{filename}' in workspace '{workspace_id}'")
+    return session
+
+
+def get_upload_session(workspace_id: str, upload_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a resumable upload session with its received parts.
+
+    Returns:
+        Session dictionary with "parts" (list of {part_number, size}) and
+        "received_bytes", or None if unknown
+    """
+    session_file = _session_dir(workspace_id, upload_id) / SESSION_FILE
+    if not session_file.exists():
+        return None
+    with open(session_file, "r", encoding="utf-8") as f:
+        session = json.load(f)
+
+    parts = []
+    for part_path in sorted(session_file.parent.glob("part-*")):
+        parts.append({"part_number": int(part_path.name[len("part-"):]), "size": part_path.stat().st_size})
+    session["parts"] = parts
+    session["received_bytes"] = sum(part["size"] for part in parts)
+    return session
+
+
+class PartWriter:
+    """
+    Writes one part of a resumable upload (temp file, renamed when complete).
+
+    Re-uploading a part replaces it, so failed parts can simply be retried.
+    """
+
+    def __init__(self, workspace_id: str, upload_id: str, part_number: int):
+        if part_number < 1:
+            raise UploadValidationError("Part numbers start at 1")
+        self.session_dir = _session_dir(workspace_id, upload_id)
+        if not (self.session_dir / SESSION_FILE).exists():
+            raise FileNotFoundError(f"Upload session '{upload_id}' not found")
+        self.part_number = part_number
+        fd, temp_path = tempfile.mkstemp(dir=self.session_dir, prefix=".part-", suffix=".tmp")
+        self.temp_path = Path(temp_path)
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.blake2b(digest_size=16)
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    def finalize(self) -> Dict[str, Any]:
+        """Move the part into place; returns part number, size and digest."""
+        self._file.close()
+        os.replace(self.temp_path, _part_path(self.session_dir, self.part_number))
+        # Touch the session so active uploads don't expire
+        os.utime(self.session_dir)
+        return {"part_number": self.part_number, "size": self.size, "digest": self._hash.hexdigest()}
+
+    def abort(self) -> None:
+        try:
+            self._file.close()
+        except Exception:
+            pass
+        self.temp_path.unlink(missing_ok=True)
+
+
+def complete_upload_session(
+    workspace_id: str,
+    upload_id: str,
+    total_parts: Optional[int] = None,
+    read_size: int = 1024 * 1024
+) -> Dict[str, Any]:
+    """
+    Assemble the parts of a resumable upload into the dataset file.
+
+    Parts 1..N are streamed in order through StreamingUpload (hashing and
+    validation), then the session is deleted.
+
+    Args:
+        workspace_id: Workspace identifier
+        upload_id: Upload session ID
+        total_parts: Optional number of parts the client sent (checked)
+
+    Returns:
+        Upload info (see StreamingUpload.finalize)
+
+    Raises:
+        FileNotFoundError: If the session doesn't exist
+        UploadValidationError: If parts are missing, the size doesn't match,
+                               or the result is not a valid CSV
+    """
+    session = get_upload_session(workspace_id, upload_id)
+    if session is None:
+        raise FileNotFoundError(f"Upload session '{upload_id}' not found")
+
+    numbers = [part["part_number"] for part in session["parts"]]
+    expected = total_parts if total_parts is not None else (max(numbers) if numbers else 0)
+    missing = sorted(set(range(1, expected + 1)) - set(numbers))
+    if not numbers or missing:
+        raise UploadValidationError(f"Upload is missing parts: {missing or 'all'}")
+    if session.get("total_size") is not None and session["received_bytes"] != session["total_size"]:
+        raise UploadValidationError(
+            f"Upload size mismatch: received {session['received_bytes']} bytes, expected {session['total_size']}"
+        )
+
+    session_dir = _session_dir(workspace_id, upload_id)
+    upload = StreamingUpload(workspace_id, session["filename"])
+    try:
+        for part_number in range(1, expected + 1):
+            with open(_part_path(session_dir, part_number), "rb") as f:
+                while True:
+                    data = f.read(read_size)
+                    if not data:
+                        break
+                    upload.write(data)
+        info = upload.finalize()
+    except Exception:
+        upload.abort()
+        raise
+
+    shutil.rmtree(session_dir, ignore_errors=True)
+    logger.info(f"[upload_sessions] Completed upload session {upload_id} ({expected} parts)")
+    return info
+
+
+def abort_upload_session(workspace_id: str, upload_id: str) -> bool:
+    """Delete a resumable upload session and its parts; returns False if unknown."""
+    session_dir = _session_dir(workspace_id, upload_id)
+    if not session_dir.exists():
+        return False
+    shutil.rmtree(session_dir, ignore_errors=True)
+    logger.info(f"[upload_sessions] Aborted upload session {upload_id}")
+    return True
+
+
+# ----------------------------
+# Post-processing
+# ----------------------------
+
+def normalize_dataset_file(workspace_id: str, dataset_id: str, delimiter: str, chunksize: int = 100_000) -> bool:
+    """
+    Rewrite a dataset with a non-comma delimiter as comma-separated CSV.
+
+    Streams the file in row chunks into a temp file next to it, then
+    replaces it atomically. Malformed lines are skipped (as on load).
+
+    Returns:
+        True if the file was rewritten
+    """
+    if delimiter == ",":
+        return False
+
+    dataset_path = get_dataset_path(dataset_id, workspace_id)
+    fd, temp_path = tempfile.mkstemp(dir=dataset_path.parent, prefix=f".{dataset_id}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            header = True
+            for chunk in iter_dataset_chunks(dataset_id, workspace_id, chunksize=chunksize):
+                chunk.to_csv(f, index=False, header=header)
+                header = False
+        os.replace(temp_path, dataset_path)
+    except Exception:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    logger.info(f"[normalize_dataset_file] Rewrote '{dataset_id}' as comma-separated (was {delimiter!r})")
+    return True
+
+
+def postprocess_uploaded_dataset(job, dataset_id: str, delimiter: str = ",") -> Dict[str, Any]:
+    """
+    Background job run after an upload: normalize the delimiter, build column
+    sketches, compute and save the overview, precompute outliers and build
+    the columnar export sidecar.
+
+    Each step after normalization is non-critical; failures are logged and
+    reported in the result.
+
+    Args:
+        job: The running Job (progress reporting / cancellation)
+        dataset_id: Uploaded dataset filename
+        delimiter: Delimiter detected on upload
+
+    Returns:
+        Result dictionary (rows, columns, which steps succeeded)
+    """
+    from app.api.overview import compute_overview, save_overview_to_file
+    from app.services.column_sketches import get_distinct_sketches
+    from app.services.dataset_export import HAS_PYARROW, ensure_columnar_sidecar
+    from app.services.dataset_fingerprint import get_dataset_fingerprint
+    from app.services.outlier_analysis import run_outlier_analysis
+
+    workspace_id = job.workspace_id
+    result: Dict[str, Any] = {"dataset_id": dataset_id, "normalized": False, "overview": False, "outliers": False}
+
+    job.report(0.05, "Normalizing file")
+    result["normalized"] = normalize_dataset_file(workspace_id, dataset_id, delimiter)
+
+    job.report(0.2, "Loading dataset")
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    df = load_dataset(dataset_id, workspace_id)
+    result["rows"] = len(df)
+    result["columns"] = len(df.columns)
+
+    job.report(0.3, "Building column sketches")
+    # Builds and persists the column sketches in the same pass
+    distinct_sketches = get_distinct_sketches(workspace_id, dataset_id, df)
+
+    job.report(0.4, "Computing overview")
+    try:
+        overview = compute_overview(df, distinct_sketches=distinct_sketches)
+        save_overview_to_file(workspace_id, dataset_id, overview, fingerprint)
+        result["overview"] = True
+        logger.info(f"[postprocess] Overview generated and saved for dataset: {dataset_id}")
+    except Exception as e:
+        logger.error(f"[postprocess] Failed to generate overview for '{dataset_id}' (non-critical): {e}")
+
+    job.report(0.7, "Detecting outliers")
+    try:
+        analysis = run_outlier_analysis(workspace_id, dataset_id)
+        result["outliers"] = True
+        result["total_outliers"] = analysis["total_outliers"]
+    except Exception as e:
+        logger.error(f"[postprocess] Failed to precompute outliers for '{dataset_id}' (non-critical): {e}")
+
+    if HAS_PYARROW:
+        job.report(0.9, "Building columnar sidecar")
+        try:
+            result["columnar"] = ensure_columnar_sidecar(workspace_id, dataset_id) is not None
+        except Exception as e:
+            logger.error(f"[postprocess] Failed to build columnar sidecar for '{dataset_id}' (non-critical): {e}")
+
+    return result
+
+
+def register_uploaded_dataset(workspace_id: str, info: Dict[str, Any]) -> Optional[str]:
+    """
+    Register a stored upload and queue its post-processing job.
+
+    If the job queue is full, the delimiter is normalized right away
+    instead (the other post-processing steps are computed on demand).
+
+    Returns:
+        Post-processing job ID, or None if the job queue is full
+    """
+    from app.services.file_registry import register_file
+    from app.services.jobs import JobQueueFull, submit_job
+
+    dataset_id = info["id"]
+    try:
+        register_file(
+            file_path=str(get_dataset_path(dataset_id, workspace_id)),
+            workspace_id=workspace_id,
+            file_type="csv",
+            is_protected=True,
+        )
+    except Exception as e:
+        # Registration is best-effort
+        logger.warning(f"Failed to register file in registry (non-critical): {e}")
+
+    try:
+        job = submit_job(
+            "dataset_postprocess",
+            workspace_id,
+            postprocess_uploaded_dataset,
+            dataset_id,
+            info["delimiter"],
+            params={"dataset_id": dataset_id},
+        )
+        return job.id
+    except JobQueueFull as e:
+        # The overview endpoint computes on demand if it isn't ready
+        logger.warning(f"Post-processing for '{dataset_id}' not queued (non-critical): {e}")
+    try:
+        normalize_dataset_file(workspace_id, dataset_id, info["delimiter"])
+    except Exception as e:
+        # load_dataset still detects the delimiter
+        logger.error(f"[postprocess] Failed to normalize '{dataset_id}' (non-critical): {e}")
+    return None
@@ -8,13 +8,69 @@ BACKEND RESPONSIBILITIES:
 - NO explanations, NO recommendations, NO ML models
 """
 
+import copy
+import hashlib
+import json
+import logging
+import os
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from app.config import (
+    DECISION_EDA_CACHE_SIZE,
+    DECISION_EDA_DISK_CACHE_ENTRIES,
+    EDA_CUBE_MAX_CELLS,
+    SIGNIFICANCE_MAX_TIME_BUDGET,
+    SIGNIFICANCE_TIME_BUDGET,
+    get_decision_eda_cache_dir,
+)
+from app.services.dataset_fingerprint import get_dataset_fingerprint
 from app.services.dataset_loader import load_dataset
+from app.services.segment_engine import compute_segment_impacts, factorize_column, segment_impact_from_stats
+from app.services.correlation_matrix import (
+    CORRELATION_METHODS,
+    coerce_numeric_columns,
+    get_correlation_matrix,
+    pair_statistics,
+)
+from app.services.eda_cube import EDACube, build_segment_table, load_eda_cube, save_eda_cube
+from app.services.significance import SignificanceData, compute_significance
+from app.services.column_sketches import get_column_sketches, get_distinct_sketches
+from app.services.hyperloglog import distinct_count
+from app.services.quantile_sketch import iqr_bounds
+from app.utils.cache import LRUCache, atomic_write_json
 
+logger = logging.getLogger(__name__)
 
-def infer_column_type(df: pd.DataFrame, col: str) -> str:
-    """Infer column type: numeric, datetime, or categorical."""
+# Memoized stats per (workspace, fingerprint + metric + options key)
+_stats_cache = LRUCache(maxsize=DECISION_EDA_CACHE_SIZE)
+
+NON_NUMERIC_METRIC_MESSAGE = (
+    "The selected metric contains non-numeric values and cannot be analyzed. "
+    "Please clean or convert this column to numeric values."
+)
+
+# Distinct values parsed up front when checking whether a text column holds dates
+DATETIME_PROBE_VALUES = 100
+
+
+def infer_column_type(
+    df: pd.DataFrame,
+    col: str,
+    factorized: Optional[Tuple[np.ndarray, pd.Index]] = None
+) -> str:
+    """
+    Infer column type: numeric, datetime, or categorical.
+    
+    Text columns are checked on their distinct values, weighted by how often
+    each occurs (same result as checking every row, at a fraction of the
+    cost for repetitive columns).
+    
+    Args:
+        df: DataFrame
+        col: Column name
+        factorized: Optional (codes, uniques) of the column (see segment_engine.factorize_column)
+    """
     s = df[col]
     
     # 1) numeric first
@@ -25,26 +81,242 @@ def infer_column_type(df: pd.DataFrame, col: str) -> str:
     if pd.api.types.is_datetime64_any_dtype(s):
         return "datetime"
     
+    codes, uniques = factorized if factorized is not None else factorize_column(s)
+    # Rows per distinct value; missing values count as failed conversions
+    weights = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    total = len(s)
+    if total == 0:
+        return "categorical"
+    values = pd.Series(uniques, dtype=object)
+    
     # 3) numeric-like strings
     if s.dtype == "object":
-        num = pd.to_numeric(s, errors="coerce")
-        if num.notna().mean() > 0.8:
+        num = pd.to_numeric(values, errors="coerce")
+        if weights[num.notna().to_numpy()].sum() / total > 0.8:
             return "numeric"
     
     # 4) datetime with sane years
-    parsed = pd.to_datetime(s, errors="coerce")
-    if parsed.notna().mean() > 0.7:
-        years = parsed.dropna().dt.year
+    # Many distinct values: parse the most frequent ones first (after the
+    # first value, which decides the inferred format). The column is not a
+    # datetime if they already leave 30% of rows unparsed, or if none of them
+    # is a date at all
+    missing = total - weights.sum()
+    if len(values) > DATETIME_PROBE_VALUES:
+        frequent = np.argsort(-weights, kind="stable")[:DATETIME_PROBE_VALUES]
+        probe = pd.to_datetime(values.iloc[np.concatenate(([0], frequent))], errors="coerce")
+        probe_failed = probe.isna().to_numpy()[1:]
+        if probe_failed.all() or (missing + weights[frequent][probe_failed].sum()) / total >= 0.3:
+            return "categorical"
+    parsed = pd.to_datetime(values, errors="coerce")
+    parsed_mask = parsed.notna().to_numpy()
+    if weights[parsed_mask].sum() / total > 0.7:
+        years = parsed[parsed_mask].dt.year
         if not years.empty and years.between(1900, 2100).all():
             return "datetime"
     
     return "categorical"
 
 
+class DecisionEDAContext:
+    """
+    Metric-independent state of decision EDA on one loaded dataset.
+    
+    Column types, factorized columns (integer codes per text column) and the
+    exclusion checks don't depend on the decision metric: they are computed
+    once, lazily, and shared by every metric analyzed with the context (see
+    compute_decision_eda_batch).
+    """
+    
+    def __init__(
+        self,
+        workspace_id: str,
+        dataset_id: str,
+        df: pd.DataFrame,
+        exact: bool = False,
+        column_types: Optional[Dict[str, str]] = None,
+        sketch_columns: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            workspace_id: Workspace identifier
+            dataset_id: Dataset filename
+            df: Loaded dataset
+            exact: See compute_decision_eda_stats
+            column_types: Already known column types (the others are inferred)
+            sketch_columns: Only sketch these columns (see column_sketches;
+                None = all columns, persisted)
+        """
+        self.workspace_id = workspace_id
+        self.dataset_id = dataset_id
+        self.df = df
+        self.exact = exact
+        self.sketch_columns = sketch_columns
+        self.factorized: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+        self.column_types: Dict[str, str] = dict(column_types or {})
+        self._exclusions: Optional[Dict[str, str]] = None
+        self._distinct_sketches = None
+    
+    def factorized_column(self, col: str) -> Tuple[np.ndarray, pd.Index]:
+        """Integer codes and distinct values of a column (computed once)."""
+        if col not in self.factorized:
+            self.factorized[col] = factorize_column(self.df[col])
+        return self.factorized[col]
+    
+    def column_type(self, col: str) -> str:
+        """Inferred type of a column (computed once)."""
+        if col not in self.column_types:
+            s = self.df[col]
+            if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_datetime64_any_dtype(s):
+                self.column_types[col] = infer_column_type(self.df, col)
+            else:
+                self.column_types[col] = infer_column_type(self.df, col, self.factorized_column(col))
+        return self.column_types[col]
+    
+    def quantile_sketch(self, col: str):
+        """Quantile sketch of a numeric column, or None when answering exactly."""
+        if self.exact or not pd.api.types.is_numeric_dtype(self.df[col]):
+            # Sketches describe the file column as stored, so only use them when no coercion happens
+            return None
+        return get_column_sketches(self.workspace_id, self.dataset_id, self.df, self.sketch_columns).get(col)
+    
+    def exclusions(self) -> Dict[str, str]:
+        """
+        Columns excluded from analysis (high uniqueness, text/URL patterns, IDs).
+        
+        Returns:
+            Dictionary mapping excluded column -> reason, in column order
+        """
+        if self._exclusions is None:
+            reasons = {col: self.exclusion_reason(col) for col in self.df.columns}
+            self._exclusions = {col: reason for col, reason in reasons.items() if reason is not None}
+        return self._exclusions
+    
+    def exclusion_reason(self, col: str) -> Optional[str]:
+        """
+        Why a column is excluded from analysis.
+        
+        Returns:
+            The reason, or None if the column is analyzed
+        """
+        df = self.df
+        total_rows = len(df)
+        excluded_patterns = ["id", "url", "description", "title", "summary", "name", "email", "address"]
+        
+        if self.column_type(col) == "categorical":
+            # Already factorized: the distinct count is exact and free
+            unique_count = len(self.factorized_column(col)[1])
+        else:
+            # Distinct-count sketches for large datasets (empty for small ones)
+            if self._distinct_sketches is None:
+                self._distinct_sketches = {} if self.exact else get_distinct_sketches(
+                    self.workspace_id, self.dataset_id, df, self.sketch_columns
+                )
+            unique_count, _ = distinct_count(df[col], sketch=self._distinct_sketches.get(col), exact=self.exact)
+        unique_pct = (unique_count / total_rows * 100) if total_rows > 0 else 0
+        
+        # Check exclusion criteria
+        col_lower = col.lower()
+        
+        # High uniqueness (>80%)
+        if unique_pct > 80:
+            return "High uniqueness"
+        # Free-text or URL pattern in column name
+        if any(pattern in col_lower for pattern in excluded_patterns):
+            if "url" in col_lower or "link" in col_lower:
+                return "URL column"
+            if "description" in col_lower or "text" in col_lower or "comment" in col_lower:
+                return "Free-text column"
+            if "id" in col_lower and unique_pct > 50:
+                return "Identifier column"
+            return "Text/identifier pattern"
+        # Very long text values (likely free text)
+        if self.column_type(col) == "categorical":
+            codes = self.factorized_column(col)[0]
+            sample_values = df[col].iloc[np.flatnonzero(codes >= 0)[:100]]
+            if len(sample_values) > 0:
+                avg_length = sample_values.astype(str).str.len().mean()
+                if avg_length > 50:  # Average length > 50 chars suggests free text
+                    return "Free-text column"
+        return None
+
+
+def _validate_correlation_method(correlation_method: str) -> None:
+    if correlation_method not in CORRELATION_METHODS:
+        raise ValueError(
+            f"Unknown correlation method '{correlation_method}'. Use one of: {', '.join(CORRELATION_METHODS)}"
+        )
+
+
+def _stats_cache_key(
+    dataset_id: str,
+    fingerprint: str,
+    decision_metric: str,
+    exact: bool,
+    correlation_method: str,
+    significance_budget: Optional[float] = None
+) -> str:
+    """
+    Memoization key of one metric's stats: dataset fingerprint + metric + options.
+    
+    Stats with significance estimates (significance_budget set) have their own key.
+    """
+    options = [dataset_id, decision_metric, exact, correlation_method]
+    if significance_budget is not None:
+        options.append(significance_budget)
+    canonical = json.dumps(options, separators=(",", ":"))
+    return hashlib.blake2b(f"{fingerprint}:{canonical}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_memoized_stats(workspace_id: str, key: str) -> Optional[Dict[str, Any]]:
+    """
+    Get memoized decision EDA stats (memory first, then disk).
+    
+    Returns:
+        The stats ({"error": message} for a metric that can't be analyzed),
+        or None on a miss
+    """
+    cached = _stats_cache.get((workspace_id, key))
+    if cached is not None:
+        return cached
+    
+    path = get_decision_eda_cache_dir(workspace_id) / f"{key}.json"
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except Exception as e:
+        logger.warning(f"[decision_eda_cache] Failed to read memoized stats {key}: {e}")
+        return None
+    _stats_cache.set((workspace_id, key), cached)
+    return cached
+
+
+def save_memoized_stats(workspace_id: str, key: str, stats: Dict[str, Any]) -> None:
+    """
+    Memoize decision EDA stats in memory and on disk (non-critical, errors are logged).
+    
+    The on-disk tier keeps the DECISION_EDA_DISK_CACHE_ENTRIES most recent entries.
+    """
+    _stats_cache.set((workspace_id, key), stats)
+    cache_dir = get_decision_eda_cache_dir(workspace_id)
+    try:
+        atomic_write_json(cache_dir / f"{key}.json", stats)
+        entries = sorted(cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[DECISION_EDA_DISK_CACHE_ENTRIES:]:
+            os.unlink(stale)
+    except Exception as e:
+        logger.warning(f"[decision_eda_cache] Failed to save stats {key}: {e}")
+
+
 def compute_decision_eda_stats(
     workspace_id: str,
     dataset_id: str,
-    decision_metric: str
+    decision_metric: str,
+    exact: bool = False,
+    correlation_method: str = "pearson",
+    significance: bool = False,
+    significance_budget: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Compute decision-driven EDA statistics.
@@ -55,17 +327,230 @@ def compute_decision_eda_stats(
     - Missing value percentage of decision_metric
     - Basic outlier influence estimate
     
+    Results are memoized by (dataset fingerprint, metric, options), so a
+    repeated request for an unchanged dataset doesn't load it again.
+    
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
         decision_metric: Name of the numeric column to analyze
+        exact: If True, always compute exact quartiles for outlier bounds and
+               exact unique counts for the exclusion checks
+        correlation_method: "pearson" or "spearman" (numeric factors)
+        significance: Add bootstrap confidence intervals and permutation
+            p-values to the reported factors (see significance module)
+        significance_budget: Seconds of resampling per metric (default
+            SIGNIFICANCE_TIME_BUDGET)
         
     Returns:
         Dictionary with computed statistics and ranked factors
     """
-    # Load dataset
-    df = load_dataset(dataset_id, workspace_id)
+    results, errors = _compute_decision_eda(
+        workspace_id, dataset_id, [decision_metric], exact, correlation_method, significance, significance_budget
+    )
+    if decision_metric in errors:
+        raise ValueError(errors[decision_metric])
+    return results[decision_metric]
+
+
+def compute_decision_eda_batch(
+    workspace_id: str,
+    dataset_id: str,
+    decision_metrics: List[str],
+    exact: bool = False,
+    correlation_method: str = "pearson",
+    significance: bool = False,
+    significance_budget: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Compute decision-driven EDA statistics for several candidate metrics.
+    
+    The dataset is loaded once, and column types, factorized columns,
+    exclusions and the correlation matrix are shared by all metrics. Each
+    metric's result is memoized like compute_decision_eda_stats.
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        decision_metrics: Names of the numeric columns to analyze
+        exact: See compute_decision_eda_stats
+        correlation_method: "pearson" or "spearman" (numeric factors)
+        significance: See compute_decision_eda_stats
+        significance_budget: Seconds of resampling per metric
+        
+    Returns:
+        Dictionary with "results" (metric -> stats) and "errors" (metric ->
+        message, for metrics that can't be analyzed)
+    """
+    results, errors = _compute_decision_eda(
+        workspace_id, dataset_id, decision_metrics, exact, correlation_method, significance, significance_budget
+    )
+    return {"results": results, "errors": errors}
+
+
+def _compute_decision_eda(
+    workspace_id: str,
+    dataset_id: str,
+    decision_metrics: List[str],
+    exact: bool,
+    correlation_method: str,
+    significance: bool = False,
+    significance_budget: Optional[float] = None
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """
+    Memoized stats of each metric; on a miss they come from the dataset's
+    statistics cube (Pearson, sketched) or from the rows. Significance
+    estimates are added from the rows, and memoized separately.
+    """
+    _validate_correlation_method(correlation_method)
+    if significance:
+        significance_budget = _validate_significance_budget(significance_budget)
+    
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    if fingerprint is None:
+        raise FileNotFoundError(f"Dataset '{dataset_id}' not found in workspace '{workspace_id}'")
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    keys: Dict[str, str] = {}
+    for metric in dict.fromkeys(decision_metrics):
+        keys[metric] = _stats_cache_key(dataset_id, fingerprint, metric, exact, correlation_method)
+        cached = load_memoized_stats(workspace_id, keys[metric])
+        if cached is None:
+            continue
+        if "error" in cached:
+            errors[metric] = cached["error"]
+        else:
+            results[metric] = cached
+    
+    missing = [metric for metric in keys if metric not in results and metric not in errors]
+    context: Optional[DecisionEDAContext] = None
+    if missing:
+        cube: Optional[EDACube] = None
+        # The cube holds Pearson statistics and sketched quantiles; Spearman
+        # and exact requests read the rows
+        if correlation_method == "pearson" and not exact:
+            cube = load_eda_cube(workspace_id, dataset_id, fingerprint)
+            if cube is None:
+                context = DecisionEDAContext(workspace_id, dataset_id, load_dataset(dataset_id, workspace_id))
+                cube = build_eda_cube(context, fingerprint)
+                if cube is not None:
+                    save_eda_cube(workspace_id, dataset_id, cube)
+        
+        for metric in missing:
+            try:
+                if cube is not None:
+                    stats = _metric_stats_from_cube(cube, metric)
+                else:
+                    if context is None:
+                        context = DecisionEDAContext(workspace_id, dataset_id, load_dataset(dataset_id, workspace_id), exact)
+                    stats = _compute_metric_stats(context, metric, correlation_method)
+            except ValueError as e:
+                # Deterministic for this dataset version (missing or non-numeric column)
+                errors[metric] = str(e)
+                save_memoized_stats(workspace_id, keys[metric], {"error": errors[metric]})
+                continue
+            save_memoized_stats(workspace_id, keys[metric], stats)
+            results[metric] = stats
+        logger.info(
+            f"[decision_eda] Computed {len(missing)} of {len(keys)} metrics for '{dataset_id}' "
+            f"({len(keys) - len(missing)} memoized, {'cube' if cube is not None else 'rows'})"
+        )
     
+    if significance and results:
+        pending = []
+        for metric in results:
+            keys[metric] = _stats_cache_key(
+                dataset_id, fingerprint, metric, exact, correlation_method, significance_budget
+            )
+            cached = load_memoized_stats(workspace_id, keys[metric])
+            if cached is None:
+                pending.append(metric)
+            else:
+                results[metric] = cached
+        if pending and context is None:
+            context = DecisionEDAContext(workspace_id, dataset_id, load_dataset(dataset_id, workspace_id), exact)
+        for metric in pending:
+            results[metric] = add_significance(context, results[metric], significance_budget)
+            save_memoized_stats(workspace_id, keys[metric], results[metric])
+    
+    # Keep the requested order
+    return {metric: results[metric] for metric in keys if metric in results}, errors
+
+
+def _validate_significance_budget(significance_budget: Optional[float]) -> float:
+    if significance_budget is None:
+        return SIGNIFICANCE_TIME_BUDGET
+    if not 0 < significance_budget <= SIGNIFICANCE_MAX_TIME_BUDGET:
+        raise ValueError(
+            f"significance_budget must be greater than 0 and at most {SIGNIFICANCE_MAX_TIME_BUDGET:g} seconds"
+        )
+    return float(significance_budget)
+
+
+def add_significance(context: DecisionEDAContext, stats: Dict[str, Any], time_budget: float) -> Dict[str, Any]:
+    """
+    Add significance estimates to the factors reported in decision EDA stats.
+    
+    Every numeric factor entry (top_factors, all_correlations) gets a
+    bootstrap confidence interval of its correlation and a permutation
+    p-value; every categorical one (top_factors, all_segment_impacts) gets
+    them for its segment mean difference. The summary gets a "significance"
+    section with the resample counts.
+    
+    Args:
+        context: Context of the loaded dataset
+        stats: Stats of one metric (not modified)
+        time_budget: Seconds of resampling
+        
+    Returns:
+        Copy of the stats with the estimates
+    """
+    df = context.df
+    stats = copy.deepcopy(stats)
+    decision_series = _coerce_metric(df, stats["decision_metric"])
+    valid_mask = decision_series.notna().to_numpy()
+    
+    entries = stats["top_factors"] + stats["all_correlations"] + stats["all_segment_impacts"]
+    numeric_cols = list(dict.fromkeys(entry["factor"] for entry in entries if entry["type"] == "numeric"))
+    categorical_cols = list(dict.fromkeys(entry["factor"] for entry in entries if entry["type"] == "categorical"))
+    data = SignificanceData(
+        decision_series.to_numpy(dtype=float)[valid_mask],
+        [values[valid_mask] for values in coerce_numeric_columns(df, numeric_cols)],
+        [context.factorized_column(col)[0][valid_mask] for col in categorical_cols],
+    )
+    result = compute_significance(data, time_budget=time_budget)
+    
+    estimates = {("numeric", col): estimate for col, estimate in zip(numeric_cols, result["numeric"])}
+    estimates.update({("categorical", col): estimate for col, estimate in zip(categorical_cols, result["categorical"])})
+    for entry in entries:
+        entry.update(estimates[(entry["type"], entry["factor"])])
+    stats["significance"] = {
+        key: result[key] for key in ("bootstrap_resamples", "permutations", "confidence", "elapsed_seconds")
+    }
+    return stats
+
+
+def _check_metric_values(valid_count: int, total_count: int) -> None:
+    """
+    Reject a metric whose values are mostly non-numeric.
+    
+    Raises:
+        ValueError: If no value, or fewer than 90% of the values, are numeric
+    """
+    # Null/empty rows count as invalid (they're NaN after coercion)
+    valid_ratio = valid_count / total_count if total_count > 0 else 0.0
+    if valid_count == 0 or valid_ratio < 0.9:
+        raise ValueError(NON_NUMERIC_METRIC_MESSAGE)
+
+
+def _coerce_metric(df: pd.DataFrame, decision_metric: str) -> pd.Series:
+    """
+    The decision metric column as numbers (NaN where missing).
+    
+    Raises:
+        ValueError: If the column doesn't exist or isn't numeric
+    """
     # Validate decision_metric exists
     if decision_metric not in df.columns:
         raise ValueError(f"Column '{decision_metric}' not found in dataset")
@@ -81,207 +566,187 @@ def compute_decision_eda_stats(
     coerced = pd.to_numeric(series, errors="coerce")
     
     # STEP 3: Validate - Check if all values are NaN OR if valid numeric values < 90%
-    # Ignore null/empty rows in validation (they're already NaN after coercion)
-    valid_count = coerced.notna().sum()
-    total_count = len(coerced)
-    valid_ratio = valid_count / total_count if total_count > 0 else 0.0
+    _check_metric_values(int(coerced.notna().sum()), len(coerced))
     
-    if valid_count == 0 or valid_ratio < 0.9:
-        raise ValueError(
-            "The selected metric contains non-numeric values and cannot be analyzed. "
-            "Please clean or convert this column to numeric values."
+    # Ensure we're working with numeric data (should always pass after coercion, but double-check)
+    if not pd.api.types.is_numeric_dtype(coerced):
+        raise ValueError(NON_NUMERIC_METRIC_MESSAGE)
+    return coerced
+
+
+def _metric_column_stats(context: DecisionEDAContext, col: str, coerced: pd.Series) -> Dict[str, float]:
+    """
+    Summary of a numeric column: valid_count, mean, median, std, min, max
+    and the IQR outlier_count.
+    
+    Args:
+        context: Context of the dataset
+        col: Column name
+        coerced: The column as numbers (NaN where missing)
+    """
+    decision_valid = coerced.dropna()
+    
+    # Compute basic outlier influence estimate
+    # Using IQR method
+    try:
+        Q1, Q3, IQR, lower_bound, upper_bound = iqr_bounds(
+            decision_valid, sketch=context.quantile_sketch(col), exact=context.exact
         )
+        outliers_mask = (decision_valid < lower_bound) | (decision_valid > upper_bound)
+        return {
+            "valid_count": len(decision_valid),
+            "mean": float(decision_valid.mean()),
+            "median": float(decision_valid.median()),
+            "std": float(decision_valid.std()),
+            "min": float(decision_valid.min()),
+            "max": float(decision_valid.max()),
+            "outlier_count": int(outliers_mask.sum()),
+        }
+    except (ValueError, TypeError, AttributeError) as e:
+        # Catch Pandas/NumPy errors and convert to clean error message
+        error_msg = str(e).lower()
+        if any(word in error_msg for word in ("agg function failed", "quantile", "mean", "dtype")):
+            raise ValueError(NON_NUMERIC_METRIC_MESSAGE)
+        # Re-raise other errors as-is
+        raise
+
+
+def _compute_metric_stats(
+    context: DecisionEDAContext,
+    decision_metric: str,
+    correlation_method: str
+) -> Dict[str, Any]:
+    """Decision EDA statistics of one metric, from the rows (see compute_decision_eda_stats)."""
+    df = context.df
+    workspace_id, dataset_id = context.workspace_id, context.dataset_id
+    column_type = context.column_type
     
     # Replace original column with coerced numeric series
-    decision_series = coerced
+    decision_series = _coerce_metric(df, decision_metric)
     
     # Remove rows where decision_metric is missing for analysis
     valid_mask = decision_series.notna()
-    df_valid = df[valid_mask].copy()
     decision_valid = decision_series[valid_mask]
     
-    # Ensure we're working with numeric data (should always pass after coercion, but double-check)
-    if len(decision_valid) > 0 and not pd.api.types.is_numeric_dtype(decision_valid):
-        raise ValueError(
-            "The selected metric contains non-numeric values and cannot be analyzed. "
-            "Please clean or convert this column to numeric values."
-        )
-    
-    total_rows = len(df)
-    valid_rows = len(df_valid)
-    missing_pct = round((total_rows - valid_rows) / total_rows * 100, 2) if total_rows > 0 else 0.0
-    
     # Identify excluded columns (high uniqueness, text/URL patterns, IDs)
-    excluded_columns: List[Dict[str, str]] = []
-    excluded_patterns = ["id", "url", "description", "title", "summary", "name", "email", "address"]
-    
-    for col in df.columns:
-        if col == decision_metric:
-            continue
-        
-        col_type = infer_column_type(df, col)
-        unique_count = df[col].nunique(dropna=True)
-        unique_pct = (unique_count / total_rows * 100) if total_rows > 0 else 0
-        
-        # Check exclusion criteria
-        col_lower = col.lower()
-        is_excluded = False
-        exclusion_reason = ""
-        
-        # High uniqueness (>80%)
-        if unique_pct > 80:
-            is_excluded = True
-            exclusion_reason = "High uniqueness"
-        # Free-text or URL pattern in column name
-        elif any(pattern in col_lower for pattern in excluded_patterns):
-            is_excluded = True
-            if "url" in col_lower or "link" in col_lower:
-                exclusion_reason = "URL column"
-            elif "description" in col_lower or "text" in col_lower or "comment" in col_lower:
-                exclusion_reason = "Free-text column"
-            elif "id" in col_lower and unique_pct > 50:
-                exclusion_reason = "Identifier column"
-            else:
-                exclusion_reason = "Text/identifier pattern"
-        # Very long text values (likely free text)
-        elif col_type == "categorical":
-            sample_values = df[col].dropna().head(100)
-            if len(sample_values) > 0:
-                avg_length = sample_values.astype(str).str.len().mean()
-                if avg_length > 50:  # Average length > 50 chars suggests free text
-                    is_excluded = True
-                    exclusion_reason = "Free-text column"
-        
-        if is_excluded:
-            excluded_columns.append({
-                "column": col,
-                "reason": exclusion_reason
-            })
+    excluded_columns: List[Dict[str, str]] = [
+        {"column": col, "reason": reason}
+        for col, reason in context.exclusions().items()
+        if col != decision_metric
+    ]
+    excluded_names = {exc["column"] for exc in excluded_columns}
+    
+    # Compute correlations with numeric columns: one row of the dataset's
+    # correlation matrix (pairwise-complete, cached per dataset fingerprint,
+    # so switching the decision metric doesn't recompute it)
+    numeric_cols = [
+        col for col in df.columns
+        if col != decision_metric and col not in excluded_names and column_type(col) == "numeric"
+    ]
+    matrix_cols = [col for col in df.columns if col == decision_metric or column_type(col) == "numeric"]
+    matrix = get_correlation_matrix(workspace_id, dataset_id, df, matrix_cols, method=correlation_method)
+    metric_correlations = matrix.row(decision_metric)
+    correlations = _correlation_factors(metric_correlations[col] + (col,) for col in numeric_cols)
+    
+    # Compute segment-level mean differences for categorical columns:
+    # one bincount pass per column over its factorized codes
+    categorical_cols = [
+        col for col in df.columns
+        if col != decision_metric and col not in excluded_names and column_type(col) == "categorical"
+    ]
+    segment_impacts: List[Dict[str, Any]] = compute_segment_impacts(
+        {col: context.factorized_column(col) for col in categorical_cols},
+        decision_valid.to_numpy(dtype=float),
+        row_mask=valid_mask.to_numpy(),
+    )
+    
+    return _build_summary(
+        decision_metric,
+        len(df),
+        _metric_column_stats(context, decision_metric, decision_series),
+        correlations,
+        segment_impacts,
+        excluded_columns,
+        correlation_method,
+    )
+
+
+def _metric_stats_from_cube(cube: EDACube, decision_metric: str) -> Dict[str, Any]:
+    """
+    Decision EDA statistics of one metric, from the statistics cube (Pearson).
     
-    # Compute correlations with numeric columns
-    correlations: List[Dict[str, Any]] = []
-    numeric_cols = []
+    Same result as _compute_metric_stats without reading a row.
+    """
+    if decision_metric not in cube.columns:
+        raise ValueError(f"Column '{decision_metric}' not found in dataset")
+    if decision_metric not in cube.numeric:
+        # Not numeric means at most 80% of the values are numbers (see infer_column_type)
+        raise ValueError(NON_NUMERIC_METRIC_MESSAGE)
+    column_stats = cube.column_stats[decision_metric]
+    _check_metric_values(column_stats["valid_count"], cube.rows)
+    
+    excluded_columns: List[Dict[str, str]] = [
+        {"column": col, "reason": reason}
+        for col, reason in cube.exclusions.items()
+        if col != decision_metric
+    ]
+    
+    j = cube.numeric.index(decision_metric)
+    r, n = cube.correlations()
+    correlations = _correlation_factors(
+        (float(r[j, i]), int(n[j, i]), col)
+        for i, col in enumerate(cube.numeric)
+        if col != decision_metric and col not in cube.exclusions
+    )
     
-    for col in df.columns:
-        if col == decision_metric:
-            continue
-        
-        # Skip excluded columns
-        if any(exc["column"] == col for exc in excluded_columns):
-            continue
-        
-        col_type = infer_column_type(df, col)
-        if col_type == "numeric":
-            numeric_cols.append(col)
-            col_series = pd.to_numeric(df_valid[col], errors='coerce')
-            valid_col_mask = col_series.notna()
-            
-            if valid_col_mask.sum() < 10:  # Need at least 10 valid pairs
-                continue
-            
-            corr_value = decision_valid[valid_col_mask].corr(col_series[valid_col_mask])
-            
-            if pd.notna(corr_value):
-                correlations.append({
-                    "factor": col,
-                    "correlation": round(float(corr_value), 4),
-                    "abs_correlation": round(abs(float(corr_value)), 4),
-                    "type": "numeric"
-                })
-    
-    # Compute segment-level mean differences for categorical columns
     segment_impacts: List[Dict[str, Any]] = []
-    
-    for col in df.columns:
-        if col == decision_metric:
-            continue
-        
-        # Skip excluded columns
-        if any(exc["column"] == col for exc in excluded_columns):
+    for col, table in cube.segments.items():
+        impact = segment_impact_from_stats(table.counts[:, j], table.sums[:, j], table.labels, column_stats["mean"])
+        if impact is not None:
+            segment_impacts.append({"factor": col, **impact, "type": "categorical"})
+    
+    return _build_summary(
+        decision_metric,
+        cube.rows,
+        column_stats,
+        correlations,
+        segment_impacts,
+        excluded_columns,
+        "pearson",
+    )
+
+
+def _correlation_factors(pairs) -> List[Dict[str, Any]]:
+    """Correlation entries from (coefficient, complete pairs, column) tuples."""
+    correlations: List[Dict[str, Any]] = []
+    for corr_value, pair_count, col in pairs:
+        if pair_count < 10:  # Need at least 10 valid pairs
             continue
         
-        col_type = infer_column_type(df, col)
-        if col_type == "categorical":
-            try:
-                # Ensure aggregation runs ONLY on numeric columns
-                # Use the already-converted numeric decision_valid series
-                grouped = df_valid.groupby(col)
-                segment_means_dict = {}
-                for group_name, group_indices in grouped.groups.items():
-                    # Get corresponding values from the numeric decision_valid series
-                    group_mask = df_valid.index.isin(group_indices)
-                    group_values = decision_valid[group_mask]
-                    
-                    # Validate numeric before aggregation
-                    if len(group_values) > 0 and pd.api.types.is_numeric_dtype(group_values):
-                        segment_mean = group_values.mean()
-                        if pd.notna(segment_mean):
-                            segment_means_dict[group_name] = segment_mean
-                
-                if len(segment_means_dict) < 2:
-                    continue
-                
-                segment_means = pd.Series(segment_means_dict)
-                
-                # Compute difference between highest and lowest segment
-                max_mean = segment_means.max()
-                min_mean = segment_means.min()
-                mean_diff = max_mean - min_mean
-                
-                # Compute overall mean for reference
-                overall_mean = decision_valid.mean()
-                
-                # Impact score: relative difference
-                if overall_mean != 0:
-                    relative_impact = abs(mean_diff / overall_mean) * 100
-                else:
-                    relative_impact = abs(mean_diff)
-                
-                # Get top segments
-                top_segments = segment_means.nlargest(3).to_dict()
-                bottom_segments = segment_means.nsmallest(3).to_dict()
-                
-                segment_impacts.append({
-                    "factor": col,
-                    "mean_difference": round(float(mean_diff), 4),
-                    "relative_impact_pct": round(float(relative_impact), 2),
-                    "top_segments": {str(k): round(float(v), 4) for k, v in top_segments.items()},
-                    "bottom_segments": {str(k): round(float(v), 4) for k, v in bottom_segments.items()},
-                    "type": "categorical"
-                })
-            except (ValueError, TypeError, AttributeError) as e:
-                # Catch Pandas/NumPy errors and convert to clean error message
-                error_msg = str(e).lower()
-                if "agg function failed" in error_msg or "mean" in error_msg or "dtype" in error_msg:
-                    raise ValueError(
-                        "The selected metric contains non-numeric values and cannot be analyzed. "
-                        "Please clean or convert this column to numeric values."
-                    )
-                # Re-raise other errors as-is
-                raise
-    
-    # Compute basic outlier influence estimate
-    # Using IQR method
-    try:
-        Q1 = decision_valid.quantile(0.25)
-        Q3 = decision_valid.quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        
-        outliers_mask = (decision_valid < lower_bound) | (decision_valid > upper_bound)
-        outlier_count = outliers_mask.sum()
-        outlier_pct = round(outlier_count / valid_rows * 100, 2) if valid_rows > 0 else 0.0
-    except (ValueError, TypeError, AttributeError) as e:
-        # Catch Pandas/NumPy errors and convert to clean error message
-        error_msg = str(e).lower()
-        if "agg function failed" in error_msg or "quantile" in error_msg or "dtype" in error_msg:
-            raise ValueError(
-                "The selected metric contains non-numeric values and cannot be analyzed. "
-                "Please clean or convert this column to numeric values."
-            )
-        # Re-raise other errors as-is
-        raise
+        if pd.notna(corr_value):
+            correlations.append({
+                "factor": col,
+                "correlation": round(float(corr_value), 4),
+                "abs_correlation": round(abs(float(corr_value)), 4),
+                "type": "numeric"
+            })
+    return correlations
+
+
+def _build_summary(
+    decision_metric: str,
+    total_rows: int,
+    column_stats: Dict[str, float],
+    correlations: List[Dict[str, Any]],
+    segment_impacts: List[Dict[str, Any]],
+    excluded_columns: List[Dict[str, str]],
+    correlation_method: str
+) -> Dict[str, Any]:
+    """Rank the factors and assemble the decision EDA summary."""
+    valid_rows = column_stats["valid_count"]
+    missing_pct = round((total_rows - valid_rows) / total_rows * 100, 2) if total_rows > 0 else 0.0
+    outlier_count = column_stats["outlier_count"]
+    outlier_pct = round(outlier_count / valid_rows * 100, 2) if valid_rows > 0 else 0.0
     
     # Compute impact scores and rank factors
     factors: List[Dict[str, Any]] = []
@@ -340,7 +805,7 @@ def compute_decision_eda_stats(
     top_factors = deduplicated_factors[:5]
     
     # Build summary
-    summary = {
+    return {
         "decision_metric": decision_metric,
         "total_rows": total_rows,
         "valid_rows": valid_rows,
@@ -351,27 +816,200 @@ def compute_decision_eda_stats(
         "all_correlations": sorted(correlations[:10], key=lambda x: (-abs(x.get("correlation", 0)), x.get("factor", ""))),  # Top 10 correlations, deterministically sorted
         "all_segment_impacts": sorted(segment_impacts[:10], key=lambda x: (-x.get("relative_impact_pct", 0), x.get("factor", ""))),  # Top 10 segment impacts, deterministically sorted
         "excluded_columns": excluded_columns,  # Columns excluded from analysis
-        "decision_metric_stats": {}
+        "correlation_method": correlation_method,
+        "decision_metric_stats": {
+            stat: round(column_stats[stat], 4) for stat in ("mean", "median", "std", "min", "max")
+        }
     }
+
+
+def build_eda_cube(context: DecisionEDAContext, fingerprint: Optional[str]) -> Optional[EDACube]:
+    """
+    Build the statistics cube of a dataset (see eda_cube).
     
-    # Compute decision metric stats with error handling
+    Args:
+        context: Context of the loaded dataset (not exact)
+        fingerprint: Fingerprint of the dataset
+        
+    Returns:
+        EDACube, or None if it would exceed EDA_CUBE_MAX_CELLS
+    """
+    df = context.df
+    exclusions = context.exclusions()
+    column_types = {col: context.column_type(col) for col in df.columns}
+    numeric = [col for col in df.columns if column_types[col] == "numeric"]
+    factors = [col for col in df.columns if column_types[col] == "categorical" and col not in exclusions]
+    
+    cells = sum(len(context.factorized_column(col)[1]) for col in factors) * len(numeric)
+    if cells > EDA_CUBE_MAX_CELLS:
+        logger.info(f"[decision_eda] No statistics cube for '{context.dataset_id}' ({cells} cells)")
+        return None
+    
+    arrays = coerce_numeric_columns(df, numeric)
+    column_stats = {col: _cube_column_stats(context, col, values) for col, values in zip(numeric, arrays)}
+    segments = {col: build_segment_table(*context.factorized_column(col), arrays) for col in factors}
+    return EDACube(
+        context.dataset_id,
+        fingerprint,
+        len(df),
+        list(df.columns),
+        column_types,
+        exclusions,
+        numeric,
+        pair_statistics(arrays),
+        column_stats,
+        segments,
+    )
+
+
+def _cube_column_stats(context: DecisionEDAContext, col: str, values: np.ndarray) -> Dict[str, float]:
+    """Column summary stored in the cube (only the valid count for a column that can't be a metric)."""
+    coerced = pd.Series(values, copy=False)
+    valid_count = int(coerced.notna().sum())
     try:
-        summary["decision_metric_stats"] = {
-            "mean": round(float(decision_valid.mean()), 4),
-            "median": round(float(decision_valid.median()), 4),
-            "std": round(float(decision_valid.std()), 4),
-            "min": round(float(decision_valid.min()), 4),
-            "max": round(float(decision_valid.max()), 4)
-        }
-    except (ValueError, TypeError, AttributeError) as e:
-        # Catch Pandas/NumPy errors and convert to clean error message
-        error_msg = str(e).lower()
-        if "agg function failed" in error_msg or "mean" in error_msg or "dtype" in error_msg:
-            raise ValueError(
-                "The selected metric contains non-numeric values and cannot be analyzed. "
-                "Please clean or convert this column to numeric values."
-            )
-        # Re-raise other errors as-is
-        raise
+        _check_metric_values(valid_count, len(coerced))
+        return _metric_column_stats(context, col, coerced)
+    except ValueError:
+        return {"valid_count": valid_count}
+
+
+def update_eda_cube(
+    workspace_id: str,
+    source_dataset_id: str,
+    dataset_id: str,
+    df_before: pd.DataFrame,
+    df_after: pd.DataFrame,
+    changed_columns: List[str],
+    removed_rows: Optional[List[int]] = None
+) -> bool:
+    """
+    Derive the statistics cube of a cleaned dataset from its source's cube.
+    
+    Only the changed rows are read: removed rows and the old version of
+    modified rows are subtracted from the aggregates, the new version of
+    modified rows is added. Column summaries are recomputed for the changed
+    columns (for every numeric column when rows were removed). If the
+    update can't be done (no source cube, a column changed type), nothing
+    is saved and the cube is rebuilt on the next decision EDA request.
+    Non-critical: errors are logged.
     
-    return summary
+    Args:
+        workspace_id: Workspace identifier
+        source_dataset_id: Dataset that was cleaned
+        dataset_id: The cleaned dataset (already saved)
+        df_before: Source dataset as loaded
+        df_after: Cleaned dataset (rows in source order, index reset)
+        changed_columns: Columns whose values may have changed
+        removed_rows: Positions in df_before of the rows that were removed
+        
+    Returns:
+        True if the cleaned dataset's cube was saved
+    """
+    try:
+        return _update_eda_cube(
+            workspace_id, source_dataset_id, dataset_id, df_before, df_after, changed_columns, removed_rows
+        )
+    except Exception as e:
+        logger.warning(f"[decision_eda] Failed to update statistics cube for '{dataset_id}': {e}")
+        return False
+
+
+def _update_eda_cube(
+    workspace_id: str,
+    source_dataset_id: str,
+    dataset_id: str,
+    df_before: pd.DataFrame,
+    df_after: pd.DataFrame,
+    changed_columns: List[str],
+    removed_rows: Optional[List[int]]
+) -> bool:
+    source_fingerprint = get_dataset_fingerprint(workspace_id, source_dataset_id)
+    cube = load_eda_cube(workspace_id, source_dataset_id, source_fingerprint, use_cache=False)
+    if cube is None:
+        return False
+    if cube.columns != list(df_before.columns) or cube.columns != list(df_after.columns) or cube.rows != len(df_before):
+        return False
+    changed = [col for col in dict.fromkeys(changed_columns) if col in cube.columns]
+    
+    # Source positions of the rows that remain, in df_after order
+    positions = np.arange(len(df_before))
+    if removed_rows:
+        removed = np.unique(np.asarray(removed_rows, dtype=np.int64))
+        if (
+            len(removed) != len(removed_rows)
+            or removed[0] < 0 or removed[-1] >= len(df_before)
+            or len(df_before) - len(removed) != len(df_after)
+        ):
+            return False
+        positions = np.delete(positions, removed)
+    elif len(df_before) != len(df_after):
+        return False
+    
+    # Column types: all re-inferred when rows were removed (the shares that
+    # decide them moved), only the changed columns otherwise
+    context = DecisionEDAContext(
+        workspace_id,
+        dataset_id,
+        df_after,
+        column_types=None if removed_rows else {col: t for col, t in cube.column_types.items() if col not in changed},
+        sketch_columns=None if removed_rows else changed,
+    )
+    if any(context.column_type(col) != cube.column_types[col] for col in (cube.columns if removed_rows else changed)):
+        logger.info(f"[decision_eda] Column types of '{dataset_id}' changed, statistics cube will be rebuilt")
+        return False
+    
+    # Rows: subtract the removed ones and the old version of the modified
+    # ones, add the new version of the modified ones
+    if removed_rows:
+        cube.accumulate(df_before.iloc[removed], sign=-1)
+    modified = np.zeros(len(df_after), dtype=bool)
+    for col in changed:
+        old = df_before[col].iloc[positions].reset_index(drop=True)
+        new = df_after[col]
+        modified |= ~((old == new).to_numpy() | (old.isna() & new.isna()).to_numpy())
+    modified = np.flatnonzero(modified)
+    cube.accumulate(df_before.iloc[positions[modified]], sign=-1)
+    cube.accumulate(df_after.iloc[modified], sign=1)
+    if cube.rows != len(df_after):
+        return False
+    
+    # Exclusions, factors and column summaries of the affected columns
+    affected = cube.columns if removed_rows else changed
+    for col in affected:
+        reason = context.exclusion_reason(col)
+        if reason is None:
+            cube.exclusions.pop(col, None)
+        else:
+            cube.exclusions[col] = reason
+    cube.exclusions = {col: cube.exclusions[col] for col in cube.columns if col in cube.exclusions}
+    
+    arrays = None
+    segments = {}
+    for col in cube.columns:
+        if cube.column_types[col] != "categorical" or col in cube.exclusions:
+            continue
+        if col not in cube.segments:
+            # Newly analyzed factor: aggregated from scratch
+            if arrays is None:
+                arrays = coerce_numeric_columns(df_after, cube.numeric)
+            cube.segments[col] = build_segment_table(*context.factorized_column(col), arrays)
+        segments[col] = cube.segments[col]
+        segments[col].drop_empty()
+    cube.segments = segments
+    if cube.cells > EDA_CUBE_MAX_CELLS:
+        return False
+    
+    for col in cube.numeric:
+        if col in affected:
+            values = coerce_numeric_columns(df_after, [col])[0]
+            cube.column_stats[col] = _cube_column_stats(context, col, values)
+    
+    cube.dataset_id = dataset_id
+    cube.fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    if cube.fingerprint is None:
+        return False
+    logger.info(
+        f"[decision_eda] Updated statistics cube for '{dataset_id}' from '{source_dataset_id}' "
+        f"({len(df_before) - len(df_after)} rows removed, {len(modified)} rows modified)"
+    )
+    return save_eda_cube(workspace_id, dataset_id, cube)
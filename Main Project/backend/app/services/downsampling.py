@@ -0,0 +1,155 @@
+"""
+Downsampling of line series for trend charts.
+
+A chart can't show more points than it has pixels, so long series (sensor
+or log data with millions of timestamps) are reduced to a target number of
+points that depends on the chart width, while keeping the shape:
+- LTTB (Largest-Triangle-Three-Buckets): picks, per bucket, the point that
+  forms the largest triangle with the previously picked point and the next
+  bucket's average. Keeps peaks and the visual trend.
+- min/max: keeps the lowest and highest point of each pixel bucket. Keeps
+  every extreme (spikes, outages) at twice the points.
+
+Both work on X-sorted data and return indices of the points to keep, so
+any number of columns can be carried along.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from app.config import CHART_MAX_POINTS, CHART_POINTS_PER_PIXEL
+
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+
+def target_points(width: Optional[int] = None, max_points: int = CHART_MAX_POINTS) -> int:
+    """
+    Number of points worth drawing on a chart of the given pixel width.
+
+    Args:
+        width: Chart width in pixels
+        max_points: Hard cap
+
+    Returns:
+        Target point count (at least 3)
+    """
+    if not width or width <= 0:
+        return max(3, max_points)
+    return max(3, min(int(width * CHART_POINTS_PER_PIXEL), max_points))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; the points in between are
+    split into threshold - 2 buckets of equal size and one point is kept per
+    bucket. Bucket averages come from cumulative sums and triangle areas are
+    computed with numpy per bucket; only the dependency on the previously
+    picked point is sequential.
+
+    Args:
+        x: X values, sorted ascending (numbers or datetime64)
+        y: Y values (no NaN)
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices of the points to keep
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Relative float X (datetime64 / large epochs lose nothing that matters for areas)
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.view("int64")
+    x = x.astype(float) - float(x[0])
+    y = np.asarray(y, dtype=float)
+
+    # threshold - 2 buckets over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average of each bucket; the third triangle vertex of bucket i is the
+    # average of bucket i + 1 (the last point for the last bucket)
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = ends - starts
+    avg_x = (cum_x[ends] - cum_x[starts]) / sizes
+    avg_y = (cum_y[ends] - cum_y[starts]) / sizes
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(len(starts)):
+        s, e = starts[i], ends[i]
+        # Twice the triangle area (constant factor doesn't change the argmax)
+        area = np.abs((x[a] - next_x[i]) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (next_y[i] - y[a]))
+        a = s + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Min/max bucketing: keep the minimum and maximum point of each X bucket.
+
+    X is split into (threshold - 2) // 2 equal-width buckets (one per pixel
+    column at the target density). Since X is sorted, buckets are contiguous
+    runs, so per-bucket extremes come from ufunc.reduceat in O(n).
+
+    Args:
+        x: X values, sorted ascending (numbers or datetime64)
+        y: Y values (no NaN)
+        threshold: Maximum number of points to keep
+
+    Returns:
+        Sorted indices of the points to keep (first and last point included)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.view("int64")
+    x = x.astype(float)
+    y = np.asarray(y, dtype=float)
+
+    n_buckets = (threshold - 2) // 2
+    span = x[-1] - x[0]
+    if span <= 0:
+        starts = np.array([0])
+    else:
+        # First index of each non-empty bucket
+        bounds = x[0] + span * np.arange(n_buckets) / n_buckets
+        starts = np.unique(np.searchsorted(x, bounds, side="left"))
+        starts = starts[starts < n]
+    sizes = np.diff(np.append(starts, n))
+
+    positions = np.arange(n)
+    keep = [np.array([0, n - 1])]
+    for reduce_extreme in (np.minimum, np.maximum):
+        extremes = np.repeat(reduce_extreme.reduceat(y, starts), sizes)
+        # First position in each bucket holding the bucket's extreme
+        candidates = np.where(y == extremes, positions, n)
+        keep.append(np.minimum.reduceat(candidates, starts))
+    return np.unique(np.concatenate(keep))
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, threshold: int, method: str = "lttb") -> np.ndarray:
+    """
+    Indices of the points to keep when drawing (x, y) with about threshold points.
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method == "lttb":
+        return lttb_indices(x, y, threshold)
+    if method == "minmax":
+        return minmax_indices(x, y, threshold)
+    raise ValueError(f"Unknown downsampling method '{method}'. Use one of: {', '.join(DOWNSAMPLING_METHODS)}")
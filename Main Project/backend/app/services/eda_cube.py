@@ -0,0 +1,347 @@
+"""
+Sufficient-statistics cube for decision EDA.
+
+Everything decision EDA reports for a metric derives from a few aggregates
+that are sums over rows:
+- per (categorical factor, numeric column): per-segment count, sum and sum
+  of squares of the numeric column -> segment means, mean differences,
+  relative impacts (and segment variances)
+- per pair of numeric columns: pairwise-complete counts, sums, sums of
+  squares and cross products -> Pearson correlations
+plus a summary of each numeric column (mean, median, std, min, max, IQR
+outlier count) and the metric-independent column types and exclusions.
+
+The cube is persisted per dataset and tagged with the dataset fingerprint.
+Once it exists, EDA for any numeric metric is answered without loading
+rows. Because the aggregates are additive, a cleaning operation updates the
+cube by subtracting the old version of the changed rows and adding the new
+one (see decision_eda_service.update_eda_cube).
+"""
+
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_eda_cube_file_path
+from app.services.correlation_matrix import coerce_numeric_columns, correlation_from_statistics, pair_statistics
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the stored layout changes; older files are rebuilt
+EDA_CUBE_VERSION = 1
+
+_PAIR_KEYS = ("counts", "sums", "squares", "products", "shift")
+
+# Hot cubes (keyed by workspace, dataset and fingerprint)
+_cube_cache = LRUCache(maxsize=8)
+
+
+class SegmentTable:
+    """
+    Per-segment aggregates of every numeric column for one categorical factor.
+
+    Attributes:
+        labels: Segment values as strings (order of first appearance)
+        rows: Rows per segment (k-independent)
+        counts: Rows with a value of numeric column j, per segment (S x k)
+        sums: Sum of numeric column j, per segment (S x k)
+        squares: Sum of squares of numeric column j, per segment (S x k)
+    """
+
+    def __init__(
+        self,
+        labels: List[str],
+        rows: np.ndarray,
+        counts: np.ndarray,
+        sums: np.ndarray,
+        squares: np.ndarray,
+    ):
+        self.labels = labels
+        self.rows = rows
+        self.counts = counts
+        self.sums = sums
+        self.squares = squares
+
+    @classmethod
+    def empty(cls, labels: List[str], k: int) -> "SegmentTable":
+        s = len(labels)
+        return cls(labels, np.zeros(s, dtype=np.int64), np.zeros((s, k), dtype=np.int64), np.zeros((s, k)), np.zeros((s, k)))
+
+    def codes_for(self, values: pd.Series, add_new: bool = False) -> np.ndarray:
+        """
+        Segment positions of the given column values (-1 for missing values).
+
+        Args:
+            values: Column values
+            add_new: Append unseen values as new (empty) segments; otherwise
+                they map to -1
+
+        Returns:
+            Integer positions
+        """
+        present = values.notna().to_numpy()
+        labels = values[present].astype(str)
+        codes = np.full(len(values), -1, dtype=np.int64)
+        positions = pd.Index(self.labels, dtype=object).get_indexer(labels)
+        if add_new and (positions < 0).any():
+            self._extend(list(pd.unique(labels[positions < 0])))
+            positions = pd.Index(self.labels, dtype=object).get_indexer(labels)
+        codes[present] = positions
+        return codes
+
+    def _extend(self, labels: List[str]) -> None:
+        """Append empty segments."""
+        self.labels.extend(labels)
+        s, k = len(labels), self.counts.shape[1]
+        self.rows = np.concatenate([self.rows, np.zeros(s, dtype=np.int64)])
+        self.counts = np.vstack([self.counts, np.zeros((s, k), dtype=np.int64)])
+        self.sums = np.vstack([self.sums, np.zeros((s, k))])
+        self.squares = np.vstack([self.squares, np.zeros((s, k))])
+
+    def accumulate(self, codes: np.ndarray, arrays: Sequence[np.ndarray], sign: int = 1) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) rows.
+
+        Args:
+            codes: Segment position of each row (-1 = no segment)
+            arrays: Numeric columns of the same rows (float, NaN = missing), cube order
+            sign: 1 to add the rows, -1 to remove them
+        """
+        in_segment = codes >= 0
+        codes = codes[in_segment]
+        n_segments = len(self.labels)
+        rows = np.bincount(codes, minlength=n_segments)
+        self.rows += sign * rows
+        for j, values in enumerate(arrays):
+            values = values[in_segment]
+            present = ~np.isnan(values)
+            if present.all():
+                counts = rows
+            else:
+                counts = np.bincount(codes[present], minlength=n_segments)
+                values = np.where(present, values, 0.0)
+            self.counts[:, j] += sign * counts
+            self.sums[:, j] += sign * np.bincount(codes, weights=values, minlength=n_segments)
+            self.squares[:, j] += sign * np.bincount(codes, weights=values * values, minlength=n_segments)
+
+    def drop_empty(self) -> None:
+        """Remove segments that no longer have rows."""
+        keep = np.flatnonzero(self.rows > 0)
+        if len(keep) == len(self.labels):
+            return
+        self.labels = [self.labels[i] for i in keep]
+        self.rows, self.counts = self.rows[keep], self.counts[keep]
+        self.sums, self.squares = self.sums[keep], self.squares[keep]
+
+
+class EDACube:
+    """
+    Sufficient statistics of a dataset for decision EDA.
+
+    Attributes:
+        dataset_id: Dataset filename
+        fingerprint: Fingerprint of the dataset the cube describes
+        rows: Number of dataset rows
+        columns: All dataset columns, in order
+        column_types: Column -> numeric / datetime / categorical
+        exclusions: Excluded column -> reason (see DecisionEDAContext.exclusions)
+        numeric: Numeric columns (order of the k axis of all aggregates)
+        pairs: Pair statistics of the numeric columns (see pair_statistics)
+        column_stats: Numeric column -> summary (valid_count, mean, median,
+            std, min, max, outlier_count)
+        segments: Categorical factor (not excluded) -> SegmentTable
+    """
+
+    def __init__(
+        self,
+        dataset_id: str,
+        fingerprint: Optional[str],
+        rows: int,
+        columns: List[str],
+        column_types: Dict[str, str],
+        exclusions: Dict[str, str],
+        numeric: List[str],
+        pairs: Dict[str, np.ndarray],
+        column_stats: Dict[str, Dict[str, float]],
+        segments: Dict[str, SegmentTable],
+    ):
+        self.dataset_id = dataset_id
+        self.fingerprint = fingerprint
+        self.rows = rows
+        self.columns = columns
+        self.column_types = column_types
+        self.exclusions = exclusions
+        self.numeric = numeric
+        self.pairs = pairs
+        self.column_stats = column_stats
+        self.segments = segments
+        self._correlations: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def cells(self) -> int:
+        """Number of (segment, numeric column) cells."""
+        return sum(len(table.labels) for table in self.segments.values()) * len(self.numeric)
+
+    def correlations(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Pearson coefficients and complete pair counts of the numeric columns."""
+        if self._correlations is None:
+            self._correlations = correlation_from_statistics(self.pairs)
+        return self._correlations
+
+    def accumulate(self, df: pd.DataFrame, sign: int = 1) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) a set of rows.
+
+        Args:
+            df: The rows (all cube columns)
+            sign: 1 to add the rows, -1 to remove them
+        """
+        if df.empty:
+            return
+        arrays = coerce_numeric_columns(df, self.numeric)
+        if arrays:
+            delta = pair_statistics(arrays, shift=self.pairs["shift"])
+            for key in ("counts", "sums", "squares", "products"):
+                self.pairs[key] += sign * delta[key]
+        for col, table in self.segments.items():
+            table.accumulate(table.codes_for(df[col], add_new=sign > 0), arrays, sign)
+        self.rows += sign * len(df)
+        self._correlations = None
+
+    def to_file(self, path) -> None:
+        """Write the cube atomically as a NumPy archive."""
+        factors = list(self.segments)
+        meta = {
+            "version": EDA_CUBE_VERSION,
+            "dataset_id": self.dataset_id,
+            "fingerprint": self.fingerprint,
+            "rows": self.rows,
+            "columns": self.columns,
+            "column_types": self.column_types,
+            "exclusions": self.exclusions,
+            "numeric": self.numeric,
+            "column_stats": self.column_stats,
+            "factors": factors,
+            "labels": [self.segments[col].labels for col in factors],
+        }
+        arrays = {f"pairs_{key}": self.pairs[key] for key in _PAIR_KEYS}
+        for i, col in enumerate(factors):
+            table = self.segments[col]
+            arrays.update({
+                f"seg{i}_rows": table.rows,
+                f"seg{i}_counts": table.counts,
+                f"seg{i}_sums": table.sums,
+                f"seg{i}_squares": table.squares,
+            })
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, meta=np.array(json.dumps(meta, default=float)), **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def from_file(cls, path) -> Optional["EDACube"]:
+        """Read a cube written by to_file (None if it has an older layout)."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != EDA_CUBE_VERSION:
+                return None
+            pairs = {key: data[f"pairs_{key}"] for key in _PAIR_KEYS}
+            segments = {
+                col: SegmentTable(
+                    list(labels),
+                    data[f"seg{i}_rows"],
+                    data[f"seg{i}_counts"],
+                    data[f"seg{i}_sums"],
+                    data[f"seg{i}_squares"],
+                )
+                for i, (col, labels) in enumerate(zip(meta["factors"], meta["labels"]))
+            }
+        return cls(
+            meta["dataset_id"],
+            meta["fingerprint"],
+            meta["rows"],
+            meta["columns"],
+            meta["column_types"],
+            meta["exclusions"],
+            meta["numeric"],
+            pairs,
+            meta["column_stats"],
+            segments,
+        )
+
+
+def build_segment_table(codes: np.ndarray, uniques: pd.Index, arrays: Sequence[np.ndarray]) -> SegmentTable:
+    """Aggregate the numeric columns per segment of a factorized column."""
+    table = SegmentTable.empty([str(value) for value in uniques], len(arrays))
+    table.accumulate(codes, arrays)
+    return table
+
+
+def load_eda_cube(workspace_id: str, dataset_id: str, fingerprint: Optional[str], use_cache: bool = True) -> Optional[EDACube]:
+    """
+    Load the persisted cube of a dataset if it matches the fingerprint.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        fingerprint: Current dataset fingerprint
+        use_cache: Allow the in-memory copy (pass False before mutating the cube)
+
+    Returns:
+        EDACube, or None if missing, unreadable or stale
+    """
+    if fingerprint is None:
+        return None
+    key = (workspace_id, dataset_id, fingerprint)
+    if use_cache:
+        cube = _cube_cache.get(key)
+        if cube is not None:
+            return cube
+
+    path = get_eda_cube_file_path(workspace_id, dataset_id)
+    if not path.exists():
+        return None
+    try:
+        cube = EDACube.from_file(path)
+    except Exception as e:
+        logger.warning(f"[eda_cube] Failed to read cube for '{dataset_id}': {e}")
+        return None
+    if cube is None or cube.fingerprint != fingerprint:
+        return None
+    if use_cache:
+        _cube_cache.set(key, cube)
+    return cube
+
+
+def save_eda_cube(workspace_id: str, dataset_id: str, cube: EDACube) -> bool:
+    """
+    Persist a cube (non-critical, errors are logged).
+
+    Returns:
+        True if the cube was written
+    """
+    try:
+        cube.to_file(get_eda_cube_file_path(workspace_id, dataset_id))
+    except Exception as e:
+        logger.warning(f"[eda_cube] Failed to save cube for '{dataset_id}': {e}")
+        return False
+    _cube_cache.set((workspace_id, dataset_id, cube.fingerprint), cube)
+    logger.info(
+        f"[eda_cube] Saved cube for '{dataset_id}': {len(cube.numeric)} numeric columns, "
+        f"{len(cube.segments)} factors, {cube.cells} cells"
+    )
+    return True
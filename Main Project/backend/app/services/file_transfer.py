@@ -0,0 +1,258 @@
+"""
+File downloads for Data4Viz.
+
+Serves workspace files straight from disk in constant memory:
+- Single byte ranges (HTTP Range / 206) for partial and resumable downloads
+- Conditional GET (If-None-Match / If-Modified-Since -> 304, If-Range)
+- Optional on-the-fly gzip for text files
+- Zero-copy sendfile when the ASGI server supports the
+  "http.response.zerocopysend" extension; otherwise chunked reads
+
+ETags of datasets are strong and derived from the dataset fingerprint
+(content hash, memoized by file stat). Other files get a weak ETag from
+their size and modification time.
+"""
+
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Iterator, List, Mapping, Optional, Tuple
+
+import anyio
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+# Bytes read per chunk when the server can't sendfile
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Media types worth compressing on the fly
+COMPRESSIBLE_MEDIA_TYPES = {"text/csv", "application/json", "text/plain", "application/x-ipynb+json"}
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header can't be satisfied (maps to HTTP 416)."""
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "Range: bytes=..." header.
+
+    Multiple ranges are not supported; they are ignored (the full file is
+    served), which RFC 9110 allows.
+
+    Args:
+        header: Range header value (or None)
+        size: File size in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions, or None for the full file
+
+    Raises:
+        RangeNotSatisfiable: If the range lies outside the file
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            # Suffix range: last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+
+    if end is not None and start > end:
+        # Invalid range: ignored
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def _etag_list(header: str) -> List[str]:
+    """Split an If-None-Match / If-Range header into opaque tags (weak prefix removed)."""
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, mtime: float) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since (weak comparison).
+
+    If-None-Match takes precedence; If-Modified-Since is only used without it.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etag_list(if_none_match)
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+def if_range_matches(headers: Mapping[str, str], etag: str, mtime: float) -> bool:
+    """True if there is no If-Range header, or it still matches the file (strong comparison)."""
+    if_range = headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return not etag.startswith("W/") and if_range == etag
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_range).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class FileRangeResponse(Response):
+    """
+    Serve a file, or one byte range of it, without loading it into memory.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        start: int,
+        end: int,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+    ):
+        self.path = path
+        self.start = start
+        self.count = max(end - start + 1, 0)
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.body = b""
+        headers = dict(headers or {})
+        headers["content-length"] = str(self.count)
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f,
+                    "offset": self.start,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            return
+
+        remaining = self.count
+        async with await anyio.open_file(self.path, "rb") as f:
+            await f.seek(self.start)
+            while remaining > 0:
+                chunk = await f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # File shrank while sending; end the response
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def iter_gzip_file(path: Path, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a file and yield it gzip-compressed, chunk by chunk."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            compressed = compressor.compress(data)
+            if compressed:
+                yield compressed
+    yield compressor.flush()
+
+
+def build_file_response(
+    request_headers: Mapping[str, str],
+    path: Path,
+    media_type: str,
+    filename: str,
+    etag: str,
+    compress: bool = False,
+) -> Response:
+    """
+    Build the response for a file download request.
+
+    Handles conditional requests (304), Range (206/416) and optional gzip
+    (only for full, compressible responses when the client accepts gzip).
+
+    Args:
+        request_headers: Request headers
+        path: File to serve
+        media_type: Content type
+        filename: Download filename (Content-Disposition)
+        etag: ETag of the file's current content
+        compress: Allow on-the-fly gzip
+
+    Returns:
+        Starlette response
+    """
+    stat = path.stat()
+    size = stat.st_size
+    gzip_ok = (
+        compress
+        and media_type in COMPRESSIBLE_MEDIA_TYPES
+        and "gzip" in request_headers.get("accept-encoding", "").lower()
+        and not request_headers.get("range")
+    )
+    if gzip_ok:
+        # A different representation needs a different ETag
+        etag = etag[:-1] + '-gzip"'
+
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(stat.st_mtime, usegmt=True),
+        "cache-control": "no-cache",
+        "accept-ranges": "bytes",
+        "content-disposition": f'attachment; filename="{filename}"',
+    }
+    if compress:
+        headers["vary"] = "Accept-Encoding"
+
+    if is_not_modified(request_headers, etag, stat.st_mtime):
+        headers.pop("content-disposition")
+        return Response(status_code=304, headers=headers)
+
+    if gzip_ok:
+        headers["content-encoding"] = "gzip"
+        return StreamingResponse(iter_gzip_file(path), media_type=media_type, headers=headers)
+
+    byte_range = None
+    if if_range_matches(request_headers, etag, stat.st_mtime):
+        try:
+            byte_range = parse_range_header(request_headers.get("range"), size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"content-range": f"bytes */{size}", "accept-ranges": "bytes"})
+
+    if byte_range is None:
+        return FileRangeResponse(path, 0, size - 1, headers=headers, media_type=media_type)
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return FileRangeResponse(path, start, end, status_code=206, headers=headers, media_type=media_type)
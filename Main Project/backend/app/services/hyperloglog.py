@@ -0,0 +1,199 @@
+"""
+HyperLogLog distinct-count sketch for Data4Viz.
+
+A sketch is built in one pass over a column (or over CSV chunks), can be
+merged with other sketches, and estimates the number of distinct values in
+fixed memory (2**precision one-byte registers) instead of hashing every
+distinct value into a table like nunique().
+
+IMPORTANT: Small columns are always counted exactly (pandas nunique), so
+results for typical datasets are unchanged. Callers can force exact counts
+with exact=True.
+"""
+
+import base64
+import math
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import HLL_PRECISION, DISTINCT_SKETCH_MIN_ROWS
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Vectorized bit length of uint64 values (0 for 0)."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp is exact on 32-bit integers: x = m * 2**e with 0.5 <= m < 1
+    high_bits = np.frexp(high)[1]
+    low_bits = np.frexp(low)[1]
+    return np.where(high > 0, high_bits + 32, low_bits)
+
+
+# Version of the value hashing (persisted sketches built with another one are rebuilt)
+HASH_VERSION = 2
+
+# infer_dtype kinds of object columns that hold only numbers (or booleans)
+_NUMBER_KINDS = ("integer", "floating", "mixed-integer-float", "decimal", "boolean")
+
+
+def _hash(values: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def _hash_numbers(values: pd.Series) -> np.ndarray:
+    # + 0.0 turns -0.0 into 0.0 (equal values, different bits)
+    return _hash(values.astype(np.float64) + 0.0)
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """
+    Hash non-null column values to uint64 (deterministic across runs).
+
+    Hashes depend on the value, not on the dtype it was read as: numbers and
+    booleans are hashed as float64 (True as 1.0, like nunique), other values
+    as they are. A CSV column read as int64 in one chunk and as float64 in
+    another (a chunk with missing values) therefore hashes equal values
+    alike, and sketches of the chunks merge correctly. Integers beyond 2**53
+    can collide with their float64 neighbours.
+    """
+    values = values.dropna()
+    if values.empty:
+        return np.empty(0, dtype=np.uint64)
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return _hash_numbers(values)
+    if values.dtype != object:
+        return _hash(values)
+
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind in _NUMBER_KINDS:
+        return _hash_numbers(values)
+    if kind.startswith("mixed"):
+        # Numbers and other values in one column: hash each part canonically
+        is_number = values.map(lambda v: isinstance(v, (int, float, np.number, np.bool_))).to_numpy(dtype=bool)
+        if is_number.any():
+            hashes = np.empty(len(values), dtype=np.uint64)
+            hashes[is_number] = _hash_numbers(values[is_number])
+            hashes[~is_number] = _hash(values[~is_number])
+            return hashes
+    return _hash(values)
+
+
+class HyperLogLog:
+    """
+    Mergeable HyperLogLog sketch.
+
+    The top `precision` bits of each 64-bit hash pick a register; the
+    register keeps the maximum position of the first set bit in the rest.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def from_values(cls, values: pd.Series, precision: int = HLL_PRECISION) -> "HyperLogLog":
+        """Build a sketch from a single column of values."""
+        return cls(precision).update(values)
+
+    @property
+    def error(self) -> float:
+        """Relative standard error of the estimate."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, values: pd.Series) -> "HyperLogLog":
+        """
+        Add a batch of values (nulls are ignored).
+
+        Args:
+            values: Column or chunk of values
+
+        Returns:
+            The sketch itself (for chaining)
+        """
+        return self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> "HyperLogLog":
+        """Add a batch of precomputed uint64 hashes."""
+        if hashes.size == 0:
+            return self
+
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes << np.uint64(p)
+        # Position of the first set bit in the remaining 64 - p bits
+        rank = np.minimum(65 - _bit_length(rest), 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        Merge another sketch into this one (e.g. sketches of two chunks).
+
+        Returns:
+            The sketch itself (for chaining)
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        """Estimate the number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON storage."""
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(self.registers.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HyperLogLog":
+        """Create from dictionary."""
+        sketch = cls(int(data.get("precision", HLL_PRECISION)))
+        registers = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8)
+        if registers.size == sketch.registers.size:
+            sketch.registers = registers.copy()
+        return sketch
+
+
+def distinct_count(
+    series: pd.Series,
+    sketch: Optional[HyperLogLog] = None,
+    exact: bool = False,
+) -> Tuple[int, float]:
+    """
+    Get the number of distinct non-null values in a column.
+
+    Large columns (DISTINCT_SKETCH_MIN_ROWS) are estimated with HyperLogLog,
+    using the given prebuilt sketch or building one from the column;
+    otherwise (or with exact=True) pandas nunique is used.
+
+    Args:
+        series: Column values
+        sketch: Optional prebuilt sketch for this column
+        exact: If True, always count exactly
+
+    Returns:
+        Tuple of (distinct count, relative standard error; 0.0 when exact)
+    """
+    if exact or len(series) < DISTINCT_SKETCH_MIN_ROWS:
+        return int(series.nunique(dropna=True)), 0.0
+
+    if sketch is None:
+        sketch = HyperLogLog.from_values(series)
+    # An estimate can't exceed the number of non-null values
+    non_null = int(series.notna().sum())
+    return min(sketch.estimate(), non_null), sketch.error
@@ -2,40 +2,62 @@
 Insight Storage Service for Decision-Driven EDA.
 
 Handles persistence, versioning, and deterministic insight management.
+
+Snapshots live in a per-workspace store (see get_workspace_insights_dir):
+- index.sqlite3: one row per snapshot version (dataset, metric, version,
+  dataset hash, creation time, content hash) and one head per
+  dataset/metric holding the version counter and the latest version
+- blobs/: snapshot contents (backend stats + insights) as gzip-compressed
+  JSON named by the SHA-256 of the content, so identical snapshots are
+  stored once
+
+Saving allocates the version and moves the latest pointer in one
+transaction; loading the latest snapshot is an index lookup plus one blob
+read. Snapshot files of the previous layout (one JSON file per version plus
+a "latest" copy) are imported when a workspace's index is created.
 """
 
+import gzip
+import hashlib
 import json
+import logging
 import os
-import hashlib
-from pathlib import Path
-from typing import Dict, Any, Optional, List
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.config import get_insight_index_path, get_workspace_insights_dir
 
 logger = logging.getLogger(__name__)
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    dataset_id TEXT NOT NULL,
+    decision_metric TEXT NOT NULL,
+    version TEXT NOT NULL,
+    dataset_hash TEXT,
+    created_at TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (dataset_id, decision_metric, version)
+);
+CREATE INDEX IF NOT EXISTS snapshots_content ON snapshots (content_hash);
+CREATE TABLE IF NOT EXISTS heads (
+    dataset_id TEXT NOT NULL,
+    decision_metric TEXT NOT NULL,
+    next_version INTEGER NOT NULL,
+    latest TEXT,
+    PRIMARY KEY (dataset_id, decision_metric)
+);
+"""
 
-def get_insight_storage_path(workspace_id: str, dataset_id: str, decision_metric: str) -> Path:
-    """
-    Get the storage path for insight JSON files.
-    
-    Args:
-        workspace_id: Workspace identifier
-        dataset_id: Dataset filename
-        decision_metric: Decision metric column name
-        
-    Returns:
-        Path object for the insight storage directory
-    """
-    # Sanitize filenames
-    safe_dataset_id = dataset_id.replace("/", "_").replace("\\", "_")
-    safe_metric = decision_metric.replace("/", "_").replace("\\", "_")
-    
-    # Store in workspace-specific directory
-    base_path = Path("workspaces") / workspace_id / "insights"
-    base_path.mkdir(parents=True, exist_ok=True)
-    
-    return base_path
+_SNAPSHOT_COLUMNS = "s.dataset_id, s.decision_metric, s.version, s.dataset_hash, s.created_at, s.content_hash"
+
+# Serializes index creation (and the import of legacy snapshot files)
+_index_lock = threading.Lock()
 
 
 def compute_dataset_hash(workspace_id: str, dataset_id: str) -> str:
@@ -43,81 +65,224 @@ def compute_dataset_hash(workspace_id: str, dataset_id: str) -> str:
     Compute a deterministic hash of the dataset content.
     Used to detect dataset changes.
     
+    Uses the chunked content fingerprint of the dataset file, which is
+    memoized by file stat, so repeat checks don't read the file.
+    
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
-        
+    
     Returns:
-        SHA256 hash of dataset content
+        Fingerprint of dataset content
     """
     try:
-        from app.services.dataset_loader import load_dataset
-        import pandas as pd
-        
-        df = load_dataset(dataset_id, workspace_id)
+        from app.services.dataset_fingerprint import get_dataset_fingerprint
         
-        # Create deterministic hash from:
-        # 1. Dataset shape (rows, columns)
-        # 2. Column names (sorted)
-        # 3. Column dtypes (sorted)
-        # 4. First and last row hash (for content change detection)
-        
-        shape_str = f"{len(df)}_{len(df.columns)}"
-        columns_str = "_".join(sorted(df.columns))
-        dtypes_str = "_".join([f"{col}:{str(df[col].dtype)}" for col in sorted(df.columns)])
-        
-        # Hash first and last rows for content change detection
-        first_row_hash = ""
-        last_row_hash = ""
-        if len(df) > 0:
-            first_row = df.iloc[0].to_dict()
-            first_row_hash = hashlib.sha256(
-                json.dumps(first_row, sort_keys=True, default=str).encode()
-            ).hexdigest()[:16]
-            
-            if len(df) > 1:
-                last_row = df.iloc[-1].to_dict()
-                last_row_hash = hashlib.sha256(
-                    json.dumps(last_row, sort_keys=True, default=str).encode()
-                ).hexdigest()[:16]
-        
-        content_str = f"{shape_str}|{columns_str}|{dtypes_str}|{first_row_hash}|{last_row_hash}"
-        
-        return hashlib.sha256(content_str.encode()).hexdigest()
+        fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+        if fingerprint is None:
+            raise FileNotFoundError(f"Dataset '{dataset_id}' not found")
+        return fingerprint
     except Exception as e:
         logger.error(f"Error computing dataset hash: {e}")
         # Return a fallback hash based on dataset_id
         return hashlib.sha256(f"{workspace_id}_{dataset_id}".encode()).hexdigest()
 
 
-def get_insight_file_path(
-    workspace_id: str,
-    dataset_id: str,
-    decision_metric: str,
-    version: Optional[str] = None
-) -> Path:
+def _serialize_content(backend_stats: Dict[str, Any], insights: Dict[str, Any]) -> bytes:
+    """Snapshot content as compact JSON (key order kept, it is meaningful to the UI)."""
+    content = {"backend_stats": backend_stats, "insights": insights}
+    return json.dumps(content, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _blob_path(workspace_id: str, content_hash: str) -> Path:
+    return get_workspace_insights_dir(workspace_id) / "blobs" / content_hash[:2] / f"{content_hash}.json.gz"
+
+
+def _write_blob(workspace_id: str, data: bytes) -> str:
     """
-    Get the file path for storing/loading insights.
+    Store serialized content unless an identical blob exists.
     
-    Args:
-        workspace_id: Workspace identifier
-        dataset_id: Dataset filename
-        decision_metric: Decision metric column name
-        version: Optional version identifier (defaults to "latest")
-        
     Returns:
-        Path to insight JSON file
+        Content hash (blob name)
+    """
+    content_hash = hashlib.sha256(data).hexdigest()
+    path = _blob_path(workspace_id, content_hash)
+    if path.exists():
+        return content_hash
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(gzip.compress(data, mtime=0))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return content_hash
+
+
+def _read_blob(workspace_id: str, content_hash: str) -> Dict[str, Any]:
+    with open(_blob_path(workspace_id, content_hash), "rb") as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def _release_blobs(conn: sqlite3.Connection, workspace_id: str, content_hashes: Iterable[str]) -> None:
+    """Delete blobs no snapshot references any more (inside the deleting transaction)."""
+    for content_hash in set(content_hashes):
+        referenced = conn.execute(
+            "SELECT 1 FROM snapshots WHERE content_hash = ? LIMIT 1", (content_hash,)
+        ).fetchone()
+        if referenced is None:
+            try:
+                _blob_path(workspace_id, content_hash).unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _legacy_snapshot_dirs(workspace_id: str) -> List[Path]:
+    """Directories that may hold snapshot files of the previous layout."""
+    dirs = [get_workspace_insights_dir(workspace_id)]
+    # Earlier versions resolved the directory against the working directory
+    cwd_dir = Path("workspaces").resolve() / workspace_id / "insights"
+    if cwd_dir.is_dir() and cwd_dir.resolve() != dirs[0].resolve():
+        dirs.append(cwd_dir)
+    return dirs
+
+
+def _import_legacy_snapshots(workspace_id: str, conn: sqlite3.Connection) -> List[Path]:
     """
-    storage_path = get_insight_storage_path(workspace_id, dataset_id, decision_metric)
-    safe_dataset_id = dataset_id.replace("/", "_").replace("\\", "_")
-    safe_metric = decision_metric.replace("/", "_").replace("\\", "_")
+    Import snapshot files of the previous layout into a new index.
     
-    if version:
-        filename = f"{safe_dataset_id}_{safe_metric}_v{version}.json"
-    else:
-        filename = f"{safe_dataset_id}_{safe_metric}_latest.json"
+    Versioned files become snapshot rows; the "latest" copy sets the latest
+    version (and is imported too if its versioned file was deleted).
     
-    return storage_path / filename
+    Returns:
+        Imported files (removed by the caller once the index is in place)
+    """
+    imported: List[Path] = []
+    heads: Dict[tuple, Dict[str, Any]] = {}
+    for directory in _legacy_snapshot_dirs(workspace_id):
+        for file in sorted(directory.glob("*.json")):
+            try:
+                with open(file, "r") as f:
+                    snapshot = json.load(f)
+                key = (snapshot["dataset_id"], snapshot["decision_metric"])
+                version = str(snapshot["version"])
+            except Exception as e:
+                logger.warning(f"Skipping unreadable insight snapshot {file}: {e}")
+                continue
+            
+            content_hash = _write_blob(
+                workspace_id, _serialize_content(snapshot.get("backend_stats"), snapshot.get("insights"))
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, version, snapshot.get("dataset_hash"), snapshot.get("created_at") or "", content_hash),
+            )
+            head = heads.setdefault(key, {"next_version": 1, "latest": None})
+            if version.isdigit():
+                head["next_version"] = max(head["next_version"], int(version) + 1)
+            if file.stem.endswith("_latest"):
+                head["latest"] = version
+            imported.append(file)
+    
+    for (dataset_id, decision_metric), head in heads.items():
+        conn.execute(
+            "INSERT INTO heads VALUES (?, ?, ?, ?)",
+            (dataset_id, decision_metric, head["next_version"], head["latest"]),
+        )
+    return imported
+
+
+def _create_index(workspace_id: str, path: Path) -> None:
+    """Create a workspace's index (importing legacy snapshot files) and register it."""
+    from app.services.file_registry import register_file, unregister_file
+    
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp_path, isolation_level=None)
+        try:
+            conn.executescript(_SCHEMA)
+            conn.execute("BEGIN")
+            imported = _import_legacy_snapshots(workspace_id, conn)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    
+    register_file(
+        file_path=str(path),
+        workspace_id=workspace_id,
+        file_type="insight",
+        is_protected=False,  # Insight files can be deleted
+    )
+    for file in imported:
+        try:
+            file.unlink()
+            unregister_file(str(file))
+        except Exception as e:
+            logger.warning(f"Failed to remove imported insight snapshot {file}: {e}")
+    if imported:
+        logger.info(f"Imported {len(imported)} insight snapshot file(s) into the index of workspace {workspace_id}")
+
+
+@contextmanager
+def _open_index(workspace_id: str) -> Iterator[sqlite3.Connection]:
+    """Connection to a workspace's index, created on first use."""
+    path = get_insight_index_path(workspace_id)
+    if not path.exists():
+        with _index_lock:
+            if not path.exists():
+                _create_index(workspace_id, path)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _write_transaction(workspace_id: str) -> Iterator[sqlite3.Connection]:
+    """
+    Exclusive write transaction on a workspace's index.
+    
+    Blobs are written and released inside it, so a blob can't be deleted
+    while another save starts referencing it.
+    """
+    with _open_index(workspace_id) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def _snapshot_from_row(workspace_id: str, row: tuple, content: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    dataset_id, decision_metric, version, dataset_hash, created_at, _ = row
+    snapshot = {
+        "version": version,
+        "workspace_id": workspace_id,
+        "dataset_id": dataset_id,
+        "decision_metric": decision_metric,
+        "dataset_hash": dataset_hash,
+        "created_at": created_at,
+    }
+    if content is not None:
+        snapshot.update(content)
+    return snapshot
 
 
 def save_insight_snapshot(
@@ -129,7 +294,10 @@ def save_insight_snapshot(
     version: Optional[str] = None
 ) -> str:
     """
-    Save a complete insight snapshot to disk.
+    Save a complete insight snapshot and make it the latest.
+    
+    The content is stored once per distinct (backend_stats, insights);
+    saving an identical snapshot again only adds an index row.
     
     Args:
         workspace_id: Workspace identifier
@@ -137,76 +305,49 @@ def save_insight_snapshot(
         decision_metric: Decision metric column name
         backend_stats: Backend-computed statistics
         insights: Generated insights
-        version: Optional version identifier (auto-generated if None)
-        
+        version: Optional version identifier (next from the version counter
+            if None; an existing version is replaced)
+    
     Returns:
         Version identifier of saved snapshot
     """
     try:
         # Compute dataset hash for change detection
         dataset_hash = compute_dataset_hash(workspace_id, dataset_id)
-        
-        # Generate version if not provided
-        if not version:
-            # Check for existing versions
-            storage_path = get_insight_storage_path(workspace_id, dataset_id, decision_metric)
-            existing_versions = []
-            if storage_path.exists():
-                for file in storage_path.glob(f"*_{decision_metric.replace('/', '_')}_v*.json"):
-                    try:
-                        version_match = file.stem.split("_v")[-1]
-                        if version_match.isdigit():
-                            existing_versions.append(int(version_match))
-                    except:
-                        pass
+        data = _serialize_content(backend_stats, insights)
+        
+        with _write_transaction(workspace_id) as conn:
+            head = conn.execute(
+                "SELECT next_version FROM heads WHERE dataset_id = ? AND decision_metric = ?",
+                (dataset_id, decision_metric),
+            ).fetchone()
+            next_version = head[0] if head else 1
+            if not version:
+                version = str(next_version)
+            if version.isdigit():
+                next_version = max(next_version, int(version) + 1)
             
-            if existing_versions:
-                version = f"{max(existing_versions) + 1}"
-            else:
-                version = "1"
-        
-        # Create snapshot
-        snapshot = {
-            "version": version,
-            "workspace_id": workspace_id,
-            "dataset_id": dataset_id,
-            "decision_metric": decision_metric,
-            "dataset_hash": dataset_hash,
-            "created_at": datetime.utcnow().isoformat(),
-            "backend_stats": backend_stats,
-            "insights": insights,
-        }
-        
-        # Save to file
-        file_path = get_insight_file_path(workspace_id, dataset_id, decision_metric, version)
-        with open(file_path, "w") as f:
-            json.dump(snapshot, f, indent=2, default=str)
-        
-        # Also save as "latest"
-        latest_path = get_insight_file_path(workspace_id, dataset_id, decision_metric)
-        with open(latest_path, "w") as f:
-            json.dump(snapshot, f, indent=2, default=str)
+            replaced = conn.execute(
+                "SELECT content_hash FROM snapshots WHERE dataset_id = ? AND decision_metric = ? AND version = ?",
+                (dataset_id, decision_metric, version),
+            ).fetchone()
+            content_hash = _write_blob(workspace_id, data)
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                (dataset_id, decision_metric, version, dataset_hash, datetime.utcnow().isoformat(), content_hash),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO heads VALUES (?, ?, ?, ?)",
+                (dataset_id, decision_metric, next_version, version),
+            )
+            if replaced is not None and replaced[0] != content_hash:
+                _release_blobs(conn, workspace_id, [replaced[0]])
         
         logger.info(
             f"Saved insight snapshot v{version} for {dataset_id}/{decision_metric} "
             f"in workspace {workspace_id}"
         )
         
-        # Register insight files in registry
-        from app.services.file_registry import register_file
-        register_file(
-            file_path=str(file_path),
-            workspace_id=workspace_id,
-            file_type="insight",
-            is_protected=False,  # Insight files can be deleted
-        )
-        register_file(
-            file_path=str(latest_path),
-            workspace_id=workspace_id,
-            file_type="insight",
-            is_protected=False,
-        )
-        
         return version
     except Exception as e:
         logger.error(f"Error saving insight snapshot: {e}")
@@ -220,28 +361,40 @@ def load_insight_snapshot(
     version: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
     """
-    Load an insight snapshot from disk.
+    Load an insight snapshot.
     
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
         decision_metric: Decision metric column name
         version: Optional version identifier (defaults to "latest")
-        
+    
     Returns:
         Insight snapshot dictionary or None if not found
     """
     try:
-        file_path = get_insight_file_path(workspace_id, dataset_id, decision_metric, version)
-        
-        if not file_path.exists():
+        with _open_index(workspace_id) as conn:
+            if version:
+                row = conn.execute(
+                    f"SELECT {_SNAPSHOT_COLUMNS} FROM snapshots s "
+                    "WHERE s.dataset_id = ? AND s.decision_metric = ? AND s.version = ?",
+                    (dataset_id, decision_metric, version),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    f"SELECT {_SNAPSHOT_COLUMNS} FROM heads h JOIN snapshots s "
+                    "ON s.dataset_id = h.dataset_id AND s.decision_metric = h.decision_metric AND s.version = h.latest "
+                    "WHERE h.dataset_id = ? AND h.decision_metric = ?",
+                    (dataset_id, decision_metric),
+                ).fetchone()
+        
+        if row is None:
             return None
         
-        with open(file_path, "r") as f:
-            snapshot = json.load(f)
+        snapshot = _snapshot_from_row(workspace_id, row, _read_blob(workspace_id, row[5]))
         
         logger.info(
-            f"Loaded insight snapshot v{snapshot.get('version', 'unknown')} "
+            f"Loaded insight snapshot v{snapshot['version']} "
             f"for {dataset_id}/{decision_metric}"
         )
         
@@ -251,6 +404,61 @@ def load_insight_snapshot(
         return None
 
 
+def list_insight_snapshots(
+    workspace_id: str,
+    dataset_id: Optional[str] = None,
+    latest_only: bool = True,
+    include_content: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    List insight snapshots across decision metrics (and datasets).
+    
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Only snapshots of this dataset (all datasets if None)
+        latest_only: Only the latest snapshot of each dataset/metric
+        include_content: Include backend_stats and insights (each distinct
+            content is read once)
+    
+    Returns:
+        Snapshot dictionaries (with "is_latest"), ordered by dataset, metric
+        and version
+    """
+    query = (
+        f"SELECT {_SNAPSHOT_COLUMNS}, s.version = h.latest FROM snapshots s JOIN heads h "
+        "ON s.dataset_id = h.dataset_id AND s.decision_metric = h.decision_metric"
+    )
+    conditions, params = [], []
+    if dataset_id is not None:
+        conditions.append("s.dataset_id = ?")
+        params.append(dataset_id)
+    if latest_only:
+        conditions.append("s.version = h.latest")
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY s.dataset_id, s.decision_metric, CAST(s.version AS INTEGER), s.version"
+    
+    try:
+        with _open_index(workspace_id) as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        contents: Dict[str, Dict[str, Any]] = {}
+        snapshots = []
+        for row in rows:
+            content = None
+            if include_content:
+                if row[5] not in contents:
+                    contents[row[5]] = _read_blob(workspace_id, row[5])
+                content = contents[row[5]]
+            snapshot = _snapshot_from_row(workspace_id, row[:6], content)
+            snapshot["is_latest"] = bool(row[6])
+            snapshots.append(snapshot)
+        return snapshots
+    except Exception as e:
+        logger.error(f"Error listing insight snapshots: {e}")
+        return []
+
+
 def is_dataset_changed(
     workspace_id: str,
     dataset_id: str,
@@ -263,7 +471,7 @@ def is_dataset_changed(
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
         stored_hash: Hash stored in snapshot
-        
+    
     Returns:
         True if dataset has changed, False otherwise
     """
@@ -288,27 +496,17 @@ def get_all_versions(
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
         decision_metric: Decision metric column name
-        
+    
     Returns:
-        List of version identifiers (sorted)
+        List of numeric version identifiers (sorted)
     """
     try:
-        storage_path = get_insight_storage_path(workspace_id, dataset_id, decision_metric)
-        safe_dataset_id = dataset_id.replace("/", "_").replace("\\", "_")
-        safe_metric = decision_metric.replace("/", "_").replace("\\", "_")
-        
-        versions = []
-        if storage_path.exists():
-            pattern = f"{safe_dataset_id}_{safe_metric}_v*.json"
-            for file in storage_path.glob(pattern):
-                try:
-                    version_match = file.stem.split("_v")[-1]
-                    if version_match.isdigit():
-                        versions.append(version_match)
-                except:
-                    pass
-        
-        return sorted(versions, key=int)
+        with _open_index(workspace_id) as conn:
+            rows = conn.execute(
+                "SELECT version FROM snapshots WHERE dataset_id = ? AND decision_metric = ?",
+                (dataset_id, decision_metric),
+            ).fetchall()
+        return sorted((version for (version,) in rows if version.isdigit()), key=int)
     except Exception as e:
         logger.error(f"Error getting versions: {e}")
         return []
@@ -324,34 +522,60 @@ def delete_insight_snapshot(
     Delete an insight snapshot.
     If version is None, deletes the latest snapshot.
     
+    When the latest snapshot is deleted, the highest remaining version
+    becomes the latest.
+    
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
         decision_metric: Decision metric column name
         version: Optional version identifier (defaults to "latest")
-        
+    
     Returns:
         True if deleted successfully, False otherwise
     """
     try:
-        if version:
-            file_path = get_insight_file_path(workspace_id, dataset_id, decision_metric, version)
-        else:
-            file_path = get_insight_file_path(workspace_id, dataset_id, decision_metric)
-        
-        if file_path.exists():
-            file_path.unlink()
-            logger.info(
-                f"Deleted insight snapshot v{version or 'latest'} "
-                f"for {dataset_id}/{decision_metric} in workspace {workspace_id}"
-            )
-            return True
-        else:
-            logger.warning(
-                f"Insight snapshot v{version or 'latest'} not found "
-                f"for {dataset_id}/{decision_metric}"
+        with _write_transaction(workspace_id) as conn:
+            head = conn.execute(
+                "SELECT latest FROM heads WHERE dataset_id = ? AND decision_metric = ?",
+                (dataset_id, decision_metric),
+            ).fetchone()
+            latest = head[0] if head else None
+            target = version or latest
+            row = None
+            if target is not None:
+                row = conn.execute(
+                    "SELECT content_hash FROM snapshots WHERE dataset_id = ? AND decision_metric = ? AND version = ?",
+                    (dataset_id, decision_metric, target),
+                ).fetchone()
+            if row is None:
+                logger.warning(
+                    f"Insight snapshot v{version or 'latest'} not found "
+                    f"for {dataset_id}/{decision_metric}"
+                )
+                return False
+            
+            conn.execute(
+                "DELETE FROM snapshots WHERE dataset_id = ? AND decision_metric = ? AND version = ?",
+                (dataset_id, decision_metric, target),
             )
-            return False
+            if target == latest:
+                remaining = conn.execute(
+                    "SELECT version FROM snapshots WHERE dataset_id = ? AND decision_metric = ? "
+                    "ORDER BY CAST(version AS INTEGER) DESC, version DESC LIMIT 1",
+                    (dataset_id, decision_metric),
+                ).fetchone()
+                conn.execute(
+                    "UPDATE heads SET latest = ? WHERE dataset_id = ? AND decision_metric = ?",
+                    (remaining[0] if remaining else None, dataset_id, decision_metric),
+                )
+            _release_blobs(conn, workspace_id, [row[0]])
+        
+        logger.info(
+            f"Deleted insight snapshot v{target} "
+            f"for {dataset_id}/{decision_metric} in workspace {workspace_id}"
+        )
+        return True
     except Exception as e:
         logger.error(f"Error deleting insight snapshot: {e}")
         return False
@@ -365,39 +589,35 @@ def delete_all_insight_versions(
     """
     Delete all versions of an insight snapshot.
     
+    The version counter restarts, so the next snapshot is version 1.
+    
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
         decision_metric: Decision metric column name
-        
+    
     Returns:
-        Number of files deleted
+        Number of versions deleted
     """
     try:
-        storage_path = get_insight_storage_path(workspace_id, dataset_id, decision_metric)
-        safe_dataset_id = dataset_id.replace("/", "_").replace("\\", "_")
-        safe_metric = decision_metric.replace("/", "_").replace("\\", "_")
-        
-        deleted_count = 0
-        if storage_path.exists():
-            # Delete all versioned files
-            pattern = f"{safe_dataset_id}_{safe_metric}_v*.json"
-            for file in storage_path.glob(pattern):
-                try:
-                    file.unlink()
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Error deleting file {file}: {e}")
-            
-            # Delete latest file
-            latest_path = get_insight_file_path(workspace_id, dataset_id, decision_metric)
-            if latest_path.exists():
-                try:
-                    latest_path.unlink()
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Error deleting latest file: {e}")
+        with _write_transaction(workspace_id) as conn:
+            content_hashes = [
+                content_hash for (content_hash,) in conn.execute(
+                    "SELECT content_hash FROM snapshots WHERE dataset_id = ? AND decision_metric = ?",
+                    (dataset_id, decision_metric),
+                ).fetchall()
+            ]
+            conn.execute(
+                "DELETE FROM snapshots WHERE dataset_id = ? AND decision_metric = ?",
+                (dataset_id, decision_metric),
+            )
+            conn.execute(
+                "DELETE FROM heads WHERE dataset_id = ? AND decision_metric = ?",
+                (dataset_id, decision_metric),
+            )
+            _release_blobs(conn, workspace_id, content_hashes)
         
+        deleted_count = len(content_hashes)
         logger.info(
             f"Deleted {deleted_count} insight snapshot(s) "
             f"for {dataset_id}/{decision_metric} in workspace {workspace_id}"
@@ -0,0 +1,305 @@
+"""
+Background job subsystem for Data4Viz.
+
+Heavy dataset work (upload post-processing, overview/outlier precomputation,
+decision EDA) runs as jobs on a bounded in-process worker pool instead of
+inside the request. Each job is persisted as JSON under the workspace
+(workspaces/{workspace_id}/jobs/{job_id}.json) so its status, progress and
+result can be polled via GET /jobs/{job_id}.
+
+IMPORTANT:
+- Jobs run in this process; jobs that were queued or running when the
+  server stopped are reported as failed ("interrupted") on the next read.
+- Cancellation is cooperative: a queued job is dropped immediately, a
+  running job stops at its next progress report.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import JOB_WORKERS, JOB_QUEUE_LIMIT, WORKSPACES_DIR, get_workspace_jobs_dir
+from app.utils.cache import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATUSES = {JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when the job was cancelled."""
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are waiting to run."""
+
+
+class Job:
+    """A unit of background work and its persisted state."""
+
+    def __init__(
+        self,
+        job_type: str,
+        workspace_id: str,
+        params: Optional[Dict[str, Any]] = None,
+        job_id: Optional[str] = None,
+        status: str = JOB_QUEUED,
+        progress: float = 0.0,
+        message: str = "",
+        result: Any = None,
+        error: Optional[str] = None,
+        created_at: Optional[str] = None,
+        started_at: Optional[str] = None,
+        finished_at: Optional[str] = None,
+    ):
+        self.id = job_id or uuid.uuid4().hex
+        self.type = job_type
+        self.workspace_id = workspace_id
+        self.params = params or {}
+        self.status = status
+        self.progress = progress
+        self.message = message
+        self.result = result
+        self.error = error
+        self.created_at = created_at or datetime.now().isoformat()
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.cancel_requested = False
+        self._future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def report(self, progress: float, message: str = "") -> None:
+        """
+        Report progress (0.0-1.0) from inside the job function.
+
+        Raises:
+            JobCancelled: If cancellation was requested
+        """
+        if self.cancel_requested:
+            raise JobCancelled()
+        self.progress = max(0.0, min(1.0, float(progress)))
+        if message:
+            self.message = message
+        save_job(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON storage."""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "workspace_id": self.workspace_id,
+            "params": self.params,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        """Create from dictionary."""
+        return cls(
+            job_type=data["type"],
+            workspace_id=data["workspace_id"],
+            params=data.get("params"),
+            job_id=data["id"],
+            status=data.get("status", JOB_QUEUED),
+            progress=data.get("progress", 0.0),
+            message=data.get("message", ""),
+            result=data.get("result"),
+            error=data.get("error"),
+            created_at=data.get("created_at"),
+            started_at=data.get("started_at"),
+            finished_at=data.get("finished_at"),
+        )
+
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_jobs: Dict[str, Job] = {}
+_jobs_lock = threading.Lock()
+
+# Finished jobs kept in memory (older ones are still readable from disk)
+_MAX_FINISHED_IN_MEMORY = 500
+
+
+def save_job(job: Job) -> None:
+    """Persist a job record (non-critical, errors are logged)."""
+    try:
+        job_path = get_workspace_jobs_dir(job.workspace_id) / f"{job.id}.json"
+        atomic_write_json(job_path, job.to_dict(), default=str)
+    except Exception as e:
+        logger.warning(f"[jobs] Failed to persist job {job.id}: {e}")
+
+
+def _pending_count() -> int:
+    with _jobs_lock:
+        return sum(1 for job in _jobs.values() if job.status == JOB_QUEUED)
+
+
+def _finish(job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+    job.status = status
+    job.result = result
+    job.error = error
+    job.finished_at = datetime.now().isoformat()
+    if status == JOB_SUCCEEDED:
+        job.progress = 1.0
+    save_job(job)
+
+
+def _run_job(job: Job, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> None:
+    """Worker entry point: run a job function and record its outcome."""
+    if job.cancel_requested:
+        _finish(job, JOB_CANCELLED)
+        return
+
+    job.status = JOB_RUNNING
+    job.started_at = datetime.now().isoformat()
+    save_job(job)
+    logger.info(f"[jobs] Started {job.type} job {job.id} (workspace {job.workspace_id})")
+
+    try:
+        result = func(job, *args, **kwargs)
+        _finish(job, JOB_SUCCEEDED, result=result)
+        logger.info(f"[jobs] Finished {job.type} job {job.id}")
+    except JobCancelled:
+        _finish(job, JOB_CANCELLED)
+        logger.info(f"[jobs] Cancelled {job.type} job {job.id}")
+    except Exception as e:
+        _finish(job, JOB_FAILED, error=str(e))
+        logger.error(f"[jobs] {job.type} job {job.id} failed: {e}", exc_info=True)
+
+
+def submit_job(
+    job_type: str,
+    workspace_id: str,
+    func: Callable[..., Any],
+    *args,
+    params: Optional[Dict[str, Any]] = None,
+    **kwargs
+) -> Job:
+    """
+    Queue a function to run as a background job.
+
+    The function is called as func(job, *args, **kwargs); it can call
+    job.report(progress, message) and its return value (JSON-serializable)
+    becomes the job result.
+
+    Args:
+        job_type: Job type name (e.g. "dataset_postprocess")
+        workspace_id: Workspace the job belongs to
+        func: Job function
+        params: Parameters recorded with the job (for display only)
+
+    Returns:
+        The queued Job
+
+    Raises:
+        JobQueueFull: If JOB_QUEUE_LIMIT jobs are already waiting
+    """
+    if _pending_count() >= JOB_QUEUE_LIMIT:
+        raise JobQueueFull(f"Too many queued jobs (limit {JOB_QUEUE_LIMIT})")
+
+    job = Job(job_type, workspace_id, params=params)
+    with _jobs_lock:
+        finished = [job_id for job_id, j in _jobs.items() if j.finished]
+        for job_id in finished[:max(0, len(finished) - _MAX_FINISHED_IN_MEMORY)]:
+            del _jobs[job_id]
+        _jobs[job.id] = job
+    save_job(job)
+    job._future = _executor.submit(_run_job, job, func, args, kwargs)
+    logger.info(f"[jobs] Queued {job_type} job {job.id} (workspace {workspace_id})")
+    return job
+
+
+def _load_job_file(job_id: str, workspace_id: Optional[str] = None) -> Optional[Job]:
+    """Load a persisted job record (e.g. from before a restart)."""
+    if workspace_id:
+        candidates = [get_workspace_jobs_dir(workspace_id) / f"{job_id}.json"]
+    else:
+        candidates = list(WORKSPACES_DIR.glob(f"*/jobs/{job_id}.json"))
+
+    for job_path in candidates:
+        if not job_path.exists():
+            continue
+        try:
+            with open(job_path, "r", encoding="utf-8") as f:
+                job = Job.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"[jobs] Failed to read job file {job_path}: {e}")
+            continue
+        if not job.finished:
+            # Not in memory, so the process that ran it is gone
+            job.status = JOB_FAILED
+            job.error = "Job was interrupted by a server restart"
+        return job
+    return None
+
+
+def get_job(job_id: str, workspace_id: Optional[str] = None) -> Optional[Job]:
+    """
+    Get a job by ID.
+
+    Args:
+        job_id: Job identifier
+        workspace_id: Optional workspace (speeds up lookup of persisted jobs)
+
+    Returns:
+        Job, or None if unknown
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is not None:
+        return job
+    return _load_job_file(job_id, workspace_id)
+
+
+def list_jobs(workspace_id: str) -> List[Job]:
+    """List jobs of a workspace (persisted and in memory), newest first."""
+    jobs: Dict[str, Job] = {}
+    for job_path in get_workspace_jobs_dir(workspace_id).glob("*.json"):
+        try:
+            with open(job_path, "r", encoding="utf-8") as f:
+                job = Job.from_dict(json.load(f))
+            jobs[job.id] = get_job(job.id, workspace_id) or job
+        except Exception as e:
+            logger.warning(f"[jobs] Failed to read job file {job_path}: {e}")
+    return sorted(jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+
+def cancel_job(job_id: str) -> Optional[Job]:
+    """
+    Request cancellation of a job.
+
+    Returns:
+        The job, or None if unknown (finished jobs are returned unchanged)
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return _load_job_file(job_id)
+    if job.finished:
+        return job
+
+    job.cancel_requested = True
+    if job._future is not None and job._future.cancel():
+        # Never started: the worker won't run it, so record it here
+        _finish(job, JOB_CANCELLED)
+    logger.info(f"[jobs] Cancellation requested for job {job_id}")
+    return job
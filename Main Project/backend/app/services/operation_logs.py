@@ -2,41 +2,54 @@
 Operation logs storage and retrieval.
 
 IMPORTANT: Operation logs are stored per dataset (not per workspace).
-Each dataset maintains its own append-only log of cleaning operations.
+Each dataset maintains its own append-only log of cleaning operations,
+as JSON lines with an offset index (see app.utils.jsonl_log), so appends
+don't rewrite the history and reads can be paged and filtered.
 """
 
-import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
-from app.config import get_workspace_files_dir
+from app.config import get_log_index_file_path, get_workspace_files_dir
+from app.utils.jsonl_log import JSONLLog
 
 logger = logging.getLogger(__name__)
 
 
 def get_dataset_logs_path(workspace_id: str, dataset_id: str) -> Path:
     """
-    Get the path to the logs.json file for a dataset.
+    Get the path to the logs.jsonl file for a dataset.
     
-    Format: dataset_name_logs.json
-    Example: movie.csv -> movie_logs.json
+    Format: dataset_name_logs.jsonl
+    Example: movie.csv -> movie_logs.jsonl
     
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename (e.g., "movie.csv")
         
     Returns:
-        Path to logs JSON file
+        Path to logs JSONL file
     """
     files_dir = get_workspace_files_dir(workspace_id)
-    # Remove .csv extension and add _logs.json
+    # Remove .csv extension and add _logs.jsonl
     dataset_name = Path(dataset_id).stem
-    logs_filename = f"{dataset_name}_logs.json"
+    logs_filename = f"{dataset_name}_logs.jsonl"
     return files_dir / logs_filename
 
 
+def _operation_log(workspace_id: str, dataset_id: str) -> JSONLLog:
+    logs_path = get_dataset_logs_path(workspace_id, dataset_id)
+    return JSONLLog(
+        logs_path,
+        get_log_index_file_path(workspace_id, logs_path),
+        key_fields=("operation_type", "column"),
+        # Logs used to be one JSON array, rewritten on every append
+        legacy_path=logs_path.with_suffix(".json"),
+    )
+
+
 def append_operation_log(
     workspace_id: str,
     dataset_id: str,
@@ -44,12 +57,15 @@ def append_operation_log(
     column: Optional[str],
     column_type: Optional[str],
     strategy: Optional[str],
-    affected_rows: int
+    affected_rows: int,
+    parameters: Optional[Dict[str, Any]] = None
 ) -> None:
     """
-    Append an operation log entry to the dataset's logs.json file.
+    Append an operation log entry to the dataset's logs.jsonl file.
     
     This is an append-only operation. Logs are never deleted or modified.
+    Entries carry everything needed to apply the operation again, so the
+    log can be replayed (see app.services.replay_engine).
     
     Args:
         workspace_id: Workspace identifier
@@ -59,10 +75,8 @@ def append_operation_log(
         column_type: Column canonical type (if applicable)
         strategy: Strategy used (if applicable)
         affected_rows: Number of rows affected
+        parameters: Strategy parameters (e.g. constant_value)
     """
-    logs_path = get_dataset_logs_path(workspace_id, dataset_id)
-    logs_path.parent.mkdir(parents=True, exist_ok=True)
-    
     # Create log entry
     log_entry = {
         "operation_type": operation_type,
@@ -70,62 +84,78 @@ def append_operation_log(
         "column_type": column_type,
         "strategy": strategy,
         "affected_rows": affected_rows,
+        "parameters": parameters or {},
         "timestamp": datetime.now().isoformat()
     }
     
-    # Load existing logs
-    logs = []
-    if logs_path.exists():
-        try:
-            with open(logs_path, 'r', encoding='utf-8') as f:
-                logs = json.load(f)
-            if not isinstance(logs, list):
-                logs = []
-        except Exception as e:
-            logger.warning(f"Failed to load existing logs from {logs_path}: {e}. Starting fresh.")
-            logs = []
-    
-    # Append new log entry
-    logs.append(log_entry)
-    
-    # Write back to file (append-only means we always write the full list)
     try:
-        with open(logs_path, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, indent=2, ensure_ascii=False)
+        _operation_log(workspace_id, dataset_id).append(log_entry)
         logger.info(f"Appended operation log for dataset '{dataset_id}' in workspace '{workspace_id}'")
     except Exception as e:
-        logger.error(f"Failed to write operation log to {logs_path}: {e}")
+        logger.error(f"Failed to write operation log for dataset '{dataset_id}': {e}")
         raise
 
 
-def get_operation_logs(workspace_id: str, dataset_id: str) -> List[Dict[str, Any]]:
+def get_operation_logs(
+    workspace_id: str,
+    dataset_id: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    since: Optional[str] = None,
+    operation_type: Optional[str] = None,
+    column: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
-    Get all operation logs for a dataset.
+    Get operation logs for a dataset (all of them by default).
     
     Returns logs in chronological order (oldest first).
     
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
+        limit, offset, since, operation_type, column: See query_operation_logs
         
     Returns:
         List of log entries as dictionaries
     """
-    logs_path = get_dataset_logs_path(workspace_id, dataset_id)
+    return query_operation_logs(workspace_id, dataset_id, limit, offset, since, operation_type, column)[0]
+
+
+def query_operation_logs(
+    workspace_id: str,
+    dataset_id: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    since: Optional[str] = None,
+    operation_type: Optional[str] = None,
+    column: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Get a page of a dataset's operation logs, in chronological order.
     
-    if not logs_path.exists():
-        return []
+    Filtering and paging use the log index; only the returned entries are
+    read from the log.
     
-    try:
-        with open(logs_path, 'r', encoding='utf-8') as f:
-            logs = json.load(f)
-        
-        if not isinstance(logs, list):
-            logger.warning(f"Logs file {logs_path} does not contain a list. Returning empty list.")
-            return []
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        limit: Maximum entries to return (None = all)
+        offset: Matching entries to skip
+        since: Only entries with a timestamp after this ISO timestamp
+        operation_type: Only entries of this operation type
+        column: Only entries on this column
         
-        # Return in chronological order (oldest first)
-        return logs
+    Returns:
+        Tuple of (log entries, number of matching entries)
+    """
+    filters = {}
+    if operation_type is not None:
+        filters["operation_type"] = operation_type
+    if column is not None:
+        filters["column"] = column
+    
+    try:
+        return _operation_log(workspace_id, dataset_id).read(filters, since, offset, limit)
     except Exception as e:
-        logger.error(f"Failed to read operation logs from {logs_path}: {e}")
-        return []
+        logger.error(f"Failed to read operation logs for dataset '{dataset_id}': {e}")
+        return [], 0
@@ -0,0 +1,131 @@
+"""
+Cached outlier analysis for Data4Viz.
+
+Runs outlier detection over a whole dataset and persists the result as the
+workspace's outlier analysis file, so it can be served from cache (by the
+outliers endpoint) while the dataset is unchanged. Used both inline by the
+outliers endpoint and by background jobs.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.config import get_outlier_analysis_file_path
+from app.services.column_sketches import get_column_sketches
+from app.services.dataset_loader import load_dataset
+from app.services.insight_storage import compute_dataset_hash
+from app.services.outliers import detect_outliers_for_dataset
+
+logger = logging.getLogger(__name__)
+
+
+def load_cached_outlier_analysis(
+    workspace_id: str,
+    dataset_id: str,
+    method: str,
+    exact: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Load the persisted outlier analysis if it is still valid.
+
+    The analysis is valid if the dataset hash matches, the method matches,
+    and (when exact is requested) it was computed with exact quartiles.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        method: Detection method ("zscore" or "iqr")
+        exact: Whether exact results are required
+
+    Returns:
+        Outlier analysis dictionary, or None if missing or stale
+    """
+    outlier_file_path = get_outlier_analysis_file_path(workspace_id, dataset_id)
+    if not outlier_file_path.exists():
+        return None
+
+    try:
+        with open(outlier_file_path, "r") as f:
+            cached_analysis = json.load(f)
+    except Exception as e:
+        logger.warning(f"[outlier_analysis] Failed to load cached analysis: {e}, recomputing")
+        return None
+
+    # Verify dataset hash matches (dataset hasn't changed)
+    current_hash = compute_dataset_hash(workspace_id, dataset_id)
+    if (
+        cached_analysis.get("dataset_hash") == current_hash
+        and cached_analysis.get("method") == method.lower()
+        and (not exact or cached_analysis.get("exact", True))
+    ):
+        logger.info(f"[outlier_analysis] Using cached outlier analysis from {outlier_file_path}")
+        return cached_analysis
+
+    logger.info("[outlier_analysis] Dataset changed or method mismatch, recomputing outliers")
+    return None
+
+
+def run_outlier_analysis(
+    workspace_id: str,
+    dataset_id: str,
+    method: str = "zscore",
+    threshold: float = 3.0,
+    exact: bool = False
+) -> Dict[str, Any]:
+    """
+    Detect outliers in a dataset and persist the analysis.
+
+    The analysis file is registered in the file registry (as a deletable
+    overview-type file) so it appears on the Files page.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        method: Detection method ("zscore" or "iqr")
+        threshold: Z-score threshold (zscore method only)
+        exact: Force exact quartiles for the iqr method
+
+    Returns:
+        Outlier analysis dictionary (as persisted)
+    """
+    method = method.lower()
+    df = load_dataset(dataset_id, workspace_id)
+
+    sketches = None
+    if method == "iqr" and not exact and not df.empty:
+        sketches = get_column_sketches(workspace_id, dataset_id, df)
+    outliers = detect_outliers_for_dataset(df, method, threshold, sketches=sketches, exact=exact) if not df.empty else []
+
+    logger.info(f"[run_outlier_analysis] Detected {len(outliers)} outliers in dataset '{dataset_id}'")
+
+    # Save outlier analysis to file for caching (even if no outliers found)
+    outlier_analysis = {
+        "workspace_id": workspace_id,
+        "dataset_id": dataset_id,
+        "dataset_hash": compute_dataset_hash(workspace_id, dataset_id),
+        "method": method,
+        "threshold": threshold,
+        "exact": exact or not sketches,
+        "timestamp": datetime.now().isoformat(),
+        "outliers": outliers,
+        "total_outliers": len(outliers),
+    }
+
+    outlier_file_path = get_outlier_analysis_file_path(workspace_id, dataset_id)
+    outlier_file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(outlier_file_path, "w") as f:
+        json.dump(outlier_analysis, f, indent=2, default=str)
+
+    logger.info(f"[run_outlier_analysis] Saved outlier analysis to {outlier_file_path}")
+
+    from app.services.file_registry import register_file
+    register_file(
+        file_path=str(outlier_file_path),
+        workspace_id=workspace_id,
+        file_type="overview",  # Use "overview" type so it appears in Files page as "Generated by: Outlier Analysis"
+        is_protected=False,  # Outlier analysis files can be deleted
+    )
+
+    return outlier_analysis
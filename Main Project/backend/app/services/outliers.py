@@ -2,26 +2,27 @@
 
 import pandas as pd
 import numpy as np
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional
 from app.utils.validators import validate_column_exists, validate_numeric_column
+from app.services.quantile_sketch import QuantileSketch, iqr_bounds
 
 
-def detect_outliers_iqr(df: pd.DataFrame, column: str) -> pd.Series:
+def detect_outliers_iqr(
+    df: pd.DataFrame, column: str, sketch: Optional[QuantileSketch] = None, exact: bool = False
+) -> pd.Series:
     """
     Detect outliers using IQR method.
 
     Args:
         df: DataFrame to analyze
         column: Column name to check
+        sketch: Optional quantile sketch of the column (used for large columns)
+        exact: If True, always compute exact quartiles
 
     Returns:
         Boolean Series indicating outliers
     """
-    Q1 = df[column].quantile(0.25)
-    Q3 = df[column].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
+    _, _, _, lower_bound, upper_bound = iqr_bounds(df[column], sketch=sketch, exact=exact)
 
     outlier_mask = (df[column] < lower_bound) | (df[column] > upper_bound)
     return outlier_mask
@@ -52,7 +53,12 @@ def detect_outliers_zscore(df: pd.DataFrame, column: str, threshold: float = 3.0
 
 
 def handle_outliers(
-    df: pd.DataFrame, column: str, method: str, action: str
+    df: pd.DataFrame,
+    column: str,
+    method: str,
+    action: str,
+    sketch: Optional[QuantileSketch] = None,
+    exact: bool = False,
 ) -> Tuple[pd.DataFrame, int, float, List[int]]:
     """
     Handle outliers in a numeric column.
@@ -62,6 +68,8 @@ def handle_outliers(
         column: Column name with outliers
         method: Detection method (IQR, Z-Score)
         action: Action to perform (cap, remove, ignore)
+        sketch: Optional quantile sketch of the column (used for large columns)
+        exact: If True, always compute exact quartiles
 
     Returns:
         Tuple of (cleaned_df, affected_rows, affected_percentage, affected_indices)
@@ -73,7 +81,7 @@ def handle_outliers(
 
     # Detect outliers
     if method == "IQR":
-        outlier_mask = detect_outliers_iqr(df_cleaned, column)
+        outlier_mask = detect_outliers_iqr(df_cleaned, column, sketch=sketch, exact=exact)
     elif method == "Z-Score":
         outlier_mask = detect_outliers_zscore(df_cleaned, column)
     else:
@@ -90,11 +98,7 @@ def handle_outliers(
 
     elif action == "cap":
         # Cap outliers to min/max bounds
-        Q1 = df_cleaned[column].quantile(0.25)
-        Q3 = df_cleaned[column].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
+        _, _, _, lower_bound, upper_bound = iqr_bounds(df_cleaned[column], sketch=sketch, exact=exact)
 
         # Cap values
         df_cleaned.loc[df_cleaned[column] < lower_bound, column] = lower_bound
@@ -118,7 +122,11 @@ def handle_outliers(
 
 
 def detect_outliers_for_dataset(
-    df: pd.DataFrame, method: str = "zscore", threshold: float = 3.0
+    df: pd.DataFrame,
+    method: str = "zscore",
+    threshold: float = 3.0,
+    sketches: Optional[Dict[str, QuantileSketch]] = None,
+    exact: bool = False,
 ) -> List[Dict[str, Any]]:
     """
     Detect outliers across all numeric columns in a dataset.
@@ -130,6 +138,8 @@ def detect_outliers_for_dataset(
         df: DataFrame to analyze
         method: Detection method ("zscore" or "iqr")
         threshold: Z-score threshold (only used for zscore method, default 3.0)
+        sketches: Optional quantile sketches by column (iqr method, large columns)
+        exact: If True, always compute exact quartiles
     
     Returns:
         List of outlier records with:
@@ -166,13 +176,10 @@ def detect_outliers_for_dataset(
             lower_outlier_mask = df[column] < lower_bound
             upper_outlier_mask = df[column] > upper_bound
         elif method.lower() == "iqr":
-            Q1 = df[column].quantile(0.25)
-            Q3 = df[column].quantile(0.75)
-            IQR = Q3 - Q1
+            sketch = sketches.get(column) if sketches else None
+            Q1, Q3, IQR, lower_bound, upper_bound = iqr_bounds(df[column], sketch=sketch, exact=exact)
             if IQR == 0:
                 continue
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
             
             # Detect lower and upper outliers separately
             lower_outlier_mask = df[column] < lower_bound
@@ -0,0 +1,229 @@
+"""
+Column-parallel profiling executor for Data4Viz.
+
+Profiling (overview, cleaning summary) is a set of independent per-column
+computations. This module fans them out across workers and merges the
+results back in column order, so output is identical to a serial run.
+
+Two kinds of workers are used:
+- Threads: for columns backed by plain numpy arrays, where pandas/numpy
+  kernels (isna, nunique, quantile, ...) release the GIL.
+- Processes: for large datasets with object columns, where parsing and
+  hashing Python objects holds the GIL. Numeric columns are handed to the
+  worker processes through shared memory instead of being pickled.
+
+Both pools are started once, with PROFILE_WORKERS workers, and shared by
+concurrent calls; a call's worker count only limits how many of its tasks
+run at once.
+
+IMPORTANT: Column functions must be module-level (picklable) and take a
+Series as their first argument. Series passed to process workers carry a
+default RangeIndex (not the original index).
+"""
+
+import atexit
+import logging
+import multiprocessing
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.config import PROFILE_WORKERS, PROFILE_PROCESS_MIN_ROWS
+
+logger = logging.getLogger(__name__)
+
+# Pools are expensive to start (processes especially), so each kind is
+# started once with PROFILE_WORKERS workers and shared by every call; a call
+# asking for fewer workers keeps fewer of its tasks in flight instead
+_pools: Dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(kind: str) -> Executor:
+    """Get (or lazily create) the shared thread or process pool."""
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            workers = max(1, PROFILE_WORKERS)
+            if kind == "process":
+                # spawn: forking a threaded server process is unsafe
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="profile")
+            _pools[kind] = pool
+    return pool
+
+
+def _map_bounded(pool: Executor, calls: Iterable[tuple], limit: int) -> List[Any]:
+    """
+    Run pool.submit(*call) for each call, with at most `limit` in flight.
+
+    Calls are consumed lazily, so per-task setup (e.g. shared memory) only
+    happens when the task is submitted. Returns when every submitted task
+    has finished, even if one of them failed.
+
+    Returns:
+        Results in call order
+
+    Raises:
+        The first exception raised by a task
+    """
+    futures: List[Future] = []
+    running: Set[Future] = set()
+    try:
+        for call in calls:
+            if len(running) >= limit:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            future = pool.submit(*call)
+            futures.append(future)
+            running.add(future)
+        return [future.result() for future in futures]
+    finally:
+        wait(futures)
+
+
+@atexit.register
+def shutdown_pools() -> None:
+    """Shut down all profiling pools."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def _is_shareable(series: pd.Series) -> bool:
+    """True if the column is a plain numpy array that can live in shared memory."""
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM"
+
+
+def _releases_gil(df: pd.DataFrame, columns: Sequence[Hashable]) -> bool:
+    """True if all columns are numpy-backed (kernels release the GIL)."""
+    return all(_is_shareable(df[col]) for col in columns)
+
+
+def _share_series(series: pd.Series) -> Tuple[tuple, shared_memory.SharedMemory]:
+    """Copy a numeric column into a new shared memory block."""
+    arr = series.to_numpy()
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+    return ("shm", shm.name, arr.dtype.str, arr.shape, series.name), shm
+
+
+def _attach_shared(name: str) -> shared_memory.SharedMemory:
+    """Attach to a shared memory block owned by the parent process."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+
+def _run_column_task(func: Callable[..., Any], spec: tuple, args: tuple) -> Any:
+    """Process worker entry point: rebuild the column and run func on it."""
+    if spec[0] != "shm":
+        return func(spec[1], *args)
+
+    _, name, dtype, shape, col_name = spec
+    shm = _attach_shared(name)
+    try:
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        # Copy out so no object outlives the shared buffer
+        series = pd.Series(arr.copy(), name=col_name)
+        del arr
+        return func(series, *args)
+    finally:
+        shm.close()
+
+
+def profile_columns(
+    df: pd.DataFrame,
+    func: Callable[..., Any],
+    columns: Optional[Sequence[Hashable]] = None,
+    column_args: Optional[Dict[Hashable, tuple]] = None,
+    workers: Optional[int] = None,
+    mode: str = "auto",
+) -> Dict[Hashable, Any]:
+    """
+    Run a per-column profiling function over a DataFrame in parallel.
+
+    Args:
+        df: Dataset to profile
+        func: Module-level function called as func(series, *column_args[col])
+        columns: Columns to profile (default: all, in DataFrame order)
+        column_args: Optional extra positional arguments per column
+        workers: Columns profiled at once (default: PROFILE_WORKERS, the
+            size of the shared pools); 1 runs serially
+        mode: "thread", "process" or "auto" (processes only for large
+              datasets with object columns)
+
+    Returns:
+        Dictionary mapping column name to func result, in column order
+
+    Raises:
+        Any exception raised by func for a column
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    column_args = column_args or {}
+    workers = max(1, min(workers or PROFILE_WORKERS, len(columns) or 1))
+
+    if workers == 1 or len(columns) <= 1:
+        return {col: func(df[col], *column_args.get(col, ())) for col in columns}
+
+    if mode == "auto":
+        use_processes = len(df) >= PROFILE_PROCESS_MIN_ROWS and not _releases_gil(df, columns)
+        mode = "process" if use_processes else "thread"
+
+    if mode == "thread":
+        calls = ((func, df[col], *column_args.get(col, ())) for col in columns)
+        return dict(zip(columns, _map_bounded(_get_pool("thread"), calls, workers)))
+
+    shared: List[shared_memory.SharedMemory] = []
+
+    def process_calls():
+        for col in columns:
+            series = df[col]
+            if _is_shareable(series):
+                spec, shm = _share_series(series)
+                shared.append(shm)
+            else:
+                spec = ("pickle", series.reset_index(drop=True))
+            yield _run_column_task, func, spec, column_args.get(col, ())
+
+    try:
+        return dict(zip(columns, _map_bounded(_get_pool("process"), process_calls(), workers)))
+    finally:
+        # Every submitted task has finished: no worker still reads the blocks
+        for shm in shared:
+            shm.close()
+            shm.unlink()
+
+
+def map_in_processes(
+    func: Callable[..., Any],
+    arg_tuples: Sequence[tuple],
+    workers: Optional[int] = None,
+) -> List[Any]:
+    """
+    Run a module-level function once per argument tuple in the shared process pool.
+
+    Args:
+        func: Module-level function called as func(*args)
+        arg_tuples: Positional arguments of each call (picklable)
+        workers: Calls run at once (default: PROFILE_WORKERS, the pool size)
+
+    Returns:
+        Results in argument order
+
+    Raises:
+        Any exception raised by func
+    """
+    calls = ((func, *args) for args in arg_tuples)
+    return _map_bounded(_get_pool("process"), calls, max(1, workers or PROFILE_WORKERS))
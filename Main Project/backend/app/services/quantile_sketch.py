@@ -0,0 +1,264 @@
+"""
+Streaming quantile sketch (KLL) for Data4Viz.
+
+A sketch is built in one pass over a column (or over CSV chunks), can be
+merged with other sketches, and answers quantiles without sorting the full
+column. It is used to serve IQR bounds and q25/median/q75 on large data.
+
+IMPORTANT: Small columns are always answered exactly (pandas quantile), so
+results for typical datasets are unchanged. Callers can force exact results
+with exact=True.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.config import QUANTILE_SKETCH_ERROR, QUANTILE_SKETCH_MIN_ROWS
+
+# Capacity decay between adjacent levels (standard KLL constant)
+_LEVEL_DECAY = 2.0 / 3.0
+
+
+def k_for_error(error: float) -> int:
+    """
+    Get the KLL accuracy parameter for a target normalized rank error.
+
+    KLL sketches have a rank error of roughly 3.3 / k (k=200 -> ~1.65%).
+    """
+    if error <= 0:
+        raise ValueError("Quantile sketch error must be positive")
+    return max(8, int(math.ceil(3.3 / error)))
+
+
+def _as_float_array(values: Union[pd.Series, np.ndarray, Sequence[float]]) -> np.ndarray:
+    """Convert values to a flat float array without NaNs."""
+    if isinstance(values, pd.Series):
+        arr = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    else:
+        arr = np.asarray(values, dtype=float).ravel()
+    return arr[~np.isnan(arr)]
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL quantile sketch.
+
+    Items are kept in levels; an item at level h stands for 2**h original
+    values. When a level grows past its capacity it is sorted and every other
+    item is promoted to the next level.
+    """
+
+    def __init__(self, k: Optional[int] = None, seed: int = 0):
+        self.k = k or k_for_error(QUANTILE_SKETCH_ERROR)
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=float)]
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        # Fixed seed keeps compaction (and therefore results) deterministic
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_values(cls, values: Union[pd.Series, np.ndarray], k: Optional[int] = None) -> "QuantileSketch":
+        """Build a sketch from a single column of values."""
+        return cls(k=k).update(values)
+
+    @property
+    def is_exact(self) -> bool:
+        """True while no compaction has happened (all values are retained)."""
+        return len(self.levels) == 1
+
+    @property
+    def error(self) -> float:
+        """Approximate normalized rank error of answers (0.0 when exact)."""
+        return 0.0 if self.is_exact else 3.3 / self.k
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * _LEVEL_DECAY ** depth)))
+
+    def update(self, values: Union[pd.Series, np.ndarray, Sequence[float]]) -> "QuantileSketch":
+        """
+        Add a batch of values (NaNs are ignored).
+
+        Args:
+            values: Column or chunk of values
+
+        Returns:
+            The sketch itself (for chaining)
+        """
+        arr = _as_float_array(values)
+        if arr.size == 0:
+            return self
+
+        self.count += int(arr.size)
+        batch_min = float(arr.min())
+        batch_max = float(arr.max())
+        self.min = batch_min if self.min is None else min(self.min, batch_min)
+        self.max = batch_max if self.max is None else max(self.max, batch_max)
+
+        self.levels[0] = np.concatenate([self.levels[0], arr])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Merge another sketch into this one (e.g. sketches of two chunks).
+
+        Returns:
+            The sketch itself (for chaining)
+        """
+        if other.count == 0:
+            return self
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=float))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        """Compact levels until every level fits its capacity."""
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if items.size <= self._capacity(level):
+                    continue
+
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=float))
+
+                items = np.sort(items)
+                # With an odd number of items, one stays behind at this level
+                keep = items[-1:] if items.size % 2 else items[:0]
+                pairs = items[:-1] if items.size % 2 else items
+                offset = int(self._rng.integers(2))
+
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+                self.levels[level] = keep
+                compacted = True
+                # Adding a level shrinks lower capacities, so restart the sweep
+                break
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """
+        Get quantiles (0.0-1.0) from the sketch.
+
+        Exact sketches use linear interpolation (same as pandas); compacted
+        sketches return the item whose cumulative weight reaches the rank.
+        """
+        if self.count == 0:
+            return [None for _ in qs]
+
+        if self.is_exact:
+            return [float(v) for v in np.quantile(self.levels[0], list(qs))]
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(level_items.size, 2 ** level, dtype=float)
+            for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="mergesort")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        results: List[Optional[float]] = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min)
+            elif q >= 1:
+                results.append(self.max)
+            else:
+                idx = int(np.searchsorted(cumulative, q * cumulative[-1], side="left"))
+                results.append(float(items[min(idx, items.size - 1)]))
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Get a single quantile (0.0-1.0) from the sketch."""
+        return self.quantiles([q])[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON storage."""
+        return {
+            "k": self.k,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "levels": [level.tolist() for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        """Create from dictionary."""
+        sketch = cls(k=data.get("k"))
+        sketch.count = int(data.get("count", 0))
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        sketch.levels = [np.asarray(level, dtype=float) for level in data.get("levels", [[]])] or [
+            np.empty(0, dtype=float)
+        ]
+        return sketch
+
+
+def get_quartiles(
+    series: pd.Series,
+    sketch: Optional[QuantileSketch] = None,
+    exact: bool = False,
+) -> Tuple[float, float, float]:
+    """
+    Get (q25, median, q75) for a numeric column.
+
+    Uses the sketch when one is given, exact is False and the column is large
+    (QUANTILE_SKETCH_MIN_ROWS); otherwise falls back to pandas quantile.
+
+    Args:
+        series: Numeric column
+        sketch: Optional prebuilt sketch for this column
+        exact: If True, always compute exact quantiles
+
+    Returns:
+        Tuple of (q25, median, q75)
+    """
+    if not exact and sketch is not None and sketch.count >= QUANTILE_SKETCH_MIN_ROWS:
+        q25, median, q75 = sketch.quantiles([0.25, 0.5, 0.75])
+        return q25, median, q75
+
+    values = series.quantile([0.25, 0.5, 0.75])
+    return values.iloc[0], values.iloc[1], values.iloc[2]
+
+
+def iqr_bounds(
+    series: pd.Series,
+    sketch: Optional[QuantileSketch] = None,
+    exact: bool = False,
+    multiplier: float = 1.5,
+) -> Tuple[float, float, float, float, float]:
+    """
+    Get IQR outlier bounds for a numeric column.
+
+    Args:
+        series: Numeric column
+        sketch: Optional prebuilt sketch for this column
+        exact: If True, always compute exact quantiles
+        multiplier: IQR multiplier for the fences (default 1.5)
+
+    Returns:
+        Tuple of (Q1, Q3, IQR, lower_bound, upper_bound)
+    """
+    if not exact and sketch is not None and sketch.count >= QUANTILE_SKETCH_MIN_ROWS:
+        Q1, Q3 = sketch.quantiles([0.25, 0.75])
+    else:
+        Q1 = series.quantile(0.25)
+        Q3 = series.quantile(0.75)
+    IQR = Q3 - Q1
+    lower_bound = Q1 - multiplier * IQR
+    upper_bound = Q3 + multiplier * IQR
+    return Q1, Q3, IQR, lower_bound, upper_bound
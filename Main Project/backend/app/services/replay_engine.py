@@ -0,0 +1,378 @@
+"""
+Deterministic replay of a dataset's cleaning operations.
+
+A dataset's current state (current_df) is the raw dataset with the
+operations of its log (app.services.operation_logs) applied in order. Each
+logged operation is applied again by a pure function of the state and the
+log entry (see apply_operation), so the state after any number of
+operations can be rebuilt: after a restart, when the in-memory cache was
+cleared, or to reproduce a historical state.
+
+Replaying a long history from the raw file costs O(operations x rows), so
+the state is checkpointed every REPLAY_CHECKPOINT_INTERVAL operations in the
+workspace cache directory. A rebuild loads the nearest checkpoint at or
+before the target and replays only the tail of the log, read by offset.
+
+A checkpoint is an .npz file of one array per column (plus missing-value
+masks, category codes, the labels, the index) and a JSON manifest of their
+dtypes, read back with allow_pickle=False: loading one never executes code,
+and dtypes are restored exactly without parsing. Object columns are stored
+as JSON; a state with values JSON can't represent (or an unsupported dtype)
+is not checkpointed.
+
+A checkpoint is used only while it still matches: it records the raw
+dataset's fingerprint and the timestamp of the last operation it includes,
+both checked on load. Checkpoints are derived data; unreadable or stale
+ones are ignored and replaced by the next replay.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import REPLAY_CHECKPOINT_INTERVAL, REPLAY_MAX_CHECKPOINTS, get_replay_checkpoint_dir
+from app.services.dataset_fingerprint import get_dataset_fingerprint
+from app.services.dataset_loader import load_dataset
+from app.services.operation_logs import get_operation_logs, query_operation_logs
+from app.services.schema_service import apply_missing_value_strategy
+
+logger = logging.getLogger(__name__)
+
+
+def _replay_missing_values(df: pd.DataFrame, entry: Dict[str, Any]) -> pd.DataFrame:
+    strategy = entry.get("strategy")
+    parameters = entry.get("parameters") or {}
+    if strategy == "fill_constant" and "constant_value" not in parameters:
+        # Entries logged before parameters were recorded
+        raise ValueError("the fill constant was not logged")
+    df_after, _ = apply_missing_value_strategy(df, entry.get("column"), strategy, parameters.get("constant_value"))
+    return df_after
+
+
+# Replay function of each logged operation type: (state, log entry) -> new state
+_REPLAYERS: Dict[str, Callable[[pd.DataFrame, Dict[str, Any]], pd.DataFrame]] = {
+    "missing_values": _replay_missing_values,
+}
+
+
+def apply_operation(df: pd.DataFrame, entry: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Apply one logged operation to a state.
+
+    Args:
+        df: State before the operation (not modified)
+        entry: Operation log entry
+
+    Returns:
+        State after the operation
+
+    Raises:
+        ValueError: If the operation cannot be replayed
+    """
+    replayer = _REPLAYERS.get(entry.get("operation_type"))
+    if replayer is None:
+        raise ValueError(f"operation type '{entry.get('operation_type')}' cannot be replayed")
+    return replayer(df, entry)
+
+
+# Layout of the checkpoint files (older layouts are ignored)
+CHECKPOINT_VERSION = 1
+
+
+def _json_value(value: Any) -> Any:
+    """An object column value as JSON (Timestamps tagged, NaN kept)."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, np.generic) and not isinstance(value, (np.datetime64, np.timedelta64)):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return {"timestamp": value.isoformat()}
+    if value is pd.NA:
+        return {"na": True}
+    if value is pd.NaT:
+        return {"nat": True}
+    raise TypeError(f"{type(value).__name__} values cannot be checkpointed")
+
+
+def _from_json_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "timestamp" in value:
+            return pd.Timestamp(value["timestamp"])
+        return pd.NA if value.get("na") else pd.NaT
+    return value
+
+
+def _encode_values(key: str, values: Any, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Store a column's (or the index's) values in `arrays` under `key`.
+
+    Returns:
+        The manifest entry that _decode_values restores the values from
+
+    Raises:
+        TypeError: If the dtype or a value cannot be stored without pickle
+    """
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categorical = pd.Categorical(values)
+        arrays[key] = categorical.codes
+        return {
+            "kind": "category",
+            "ordered": bool(dtype.ordered),
+            "categories": _encode_values(f"{key}_categories", categorical.categories, arrays),
+        }
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        arrays[key] = pd.DatetimeIndex(values).tz_convert("UTC").tz_localize(None).to_numpy()
+        return {"kind": "datetimetz", "tz": str(dtype.tz)}
+    if isinstance(dtype, np.dtype) and dtype != object:
+        if dtype.kind not in "biufcmM":
+            raise TypeError(f"{dtype} columns cannot be checkpointed")
+        arrays[key] = np.asarray(values)
+        return {"kind": "numpy"}
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and hasattr(dtype, "numpy_dtype") and dtype.kind in "biuf":
+        # Nullable Int64 / Float64 / boolean: values and missing mask
+        mask = np.asarray(pd.isna(values))
+        arrays[key] = np.asarray(values.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        arrays[f"{key}_mask"] = mask
+        return {"kind": "masked", "dtype": str(dtype)}
+    if dtype == object or isinstance(dtype, pd.StringDtype):
+        payload = json.dumps([_json_value(value) for value in values], allow_nan=True)
+        arrays[key] = np.frombuffer(payload.encode("utf-8"), dtype=np.uint8)
+        return {"kind": "json", "dtype": str(dtype)}
+    raise TypeError(f"{dtype} columns cannot be checkpointed")
+
+
+def _decode_values(key: str, spec: Dict[str, Any], arrays) -> Any:
+    """Values stored by _encode_values (array or array-like)."""
+    kind = spec["kind"]
+    if kind == "category":
+        categories = _decode_values(f"{key}_categories", spec["categories"], arrays)
+        return pd.Categorical.from_codes(arrays[key], categories=categories, ordered=spec["ordered"])
+    if kind == "datetimetz":
+        return pd.DatetimeIndex(arrays[key]).tz_localize("UTC").tz_convert(spec["tz"])
+    if kind == "numpy":
+        return arrays[key]
+    if kind == "masked":
+        values = pd.array(arrays[key], dtype=spec["dtype"])
+        values[arrays[f"{key}_mask"]] = pd.NA
+        return values
+    values = [_from_json_value(value) for value in json.loads(bytes(arrays[key]).decode("utf-8"))]
+    if spec["dtype"] == "object":
+        # An explicit object Index: pandas would infer datetimes from an object array
+        result = np.empty(len(values), dtype=object)
+        result[:] = values
+        return pd.Index(result, dtype=object)
+    return pd.array(values, dtype=spec["dtype"])
+
+
+def _checkpoint_path(workspace_id: str, dataset_id: str, operations: int) -> Path:
+    return get_replay_checkpoint_dir(workspace_id, dataset_id) / f"{operations:08d}.npz"
+
+
+def _checkpoint_counts(workspace_id: str, dataset_id: str) -> List[int]:
+    """Operation counts of the existing checkpoints, ascending."""
+    counts = []
+    for path in get_replay_checkpoint_dir(workspace_id, dataset_id).glob("*.npz"):
+        if path.stem.isdigit():
+            counts.append(int(path.stem))
+    return sorted(counts)
+
+
+def _entry_timestamp(workspace_id: str, dataset_id: str, operations: int) -> Optional[str]:
+    """Timestamp of the last of the first `operations` log entries."""
+    if operations <= 0:
+        return None
+    entries = get_operation_logs(workspace_id, dataset_id, limit=1, offset=operations - 1)
+    return entries[0].get("timestamp") if entries else None
+
+
+def _save_checkpoint(
+    workspace_id: str,
+    dataset_id: str,
+    df: pd.DataFrame,
+    operations: int,
+    fingerprint: str,
+    last_timestamp: Optional[str]
+) -> None:
+    path = _checkpoint_path(workspace_id, dataset_id, operations)
+    arrays: Dict[str, np.ndarray] = {}
+    try:
+        if isinstance(df.columns, pd.MultiIndex):
+            raise TypeError("MultiIndex columns cannot be checkpointed")
+        labels = _encode_values("labels", df.columns, arrays)
+        if isinstance(df.index, pd.RangeIndex):
+            index = {"kind": "range", "start": df.index.start, "stop": df.index.stop, "step": df.index.step}
+        elif isinstance(df.index, pd.MultiIndex):
+            raise TypeError("a MultiIndex cannot be checkpointed")
+        else:
+            index = _encode_values("index", df.index, arrays)
+        index["name"] = _json_value(df.index.name)
+        manifest = {
+            "version": CHECKPOINT_VERSION,
+            "fingerprint": fingerprint,
+            "operations": operations,
+            "last_timestamp": last_timestamp,
+            "labels": labels,
+            "index": index,
+            "columns": [_encode_values(f"c{i}", df.iloc[:, i], arrays) for i in range(df.shape[1])],
+        }
+    except TypeError as e:
+        logger.info(f"[replay_engine] Not checkpointing '{dataset_id}' after {operations} operations: {e}")
+        return
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, manifest=np.array(json.dumps(manifest)), **arrays)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        logger.warning(f"[replay_engine] Failed to write checkpoint {operations} of '{dataset_id}': {e}")
+        return
+    logger.info(f"[replay_engine] Checkpointed '{dataset_id}' after {operations} operations")
+
+    # Keep the most recent checkpoints only (and drop pickled ones of older versions)
+    counts = _checkpoint_counts(workspace_id, dataset_id)
+    stale = [_checkpoint_path(workspace_id, dataset_id, count) for count in counts[:max(0, len(counts) - REPLAY_MAX_CHECKPOINTS)]]
+    for stale_path in stale + list(path.parent.glob("*.pkl")):
+        try:
+            stale_path.unlink()
+        except OSError:
+            pass
+
+
+def _load_checkpoint(workspace_id: str, dataset_id: str, operations: int, fingerprint: str) -> Optional[pd.DataFrame]:
+    """State after `operations` operations, or None if the checkpoint is missing or stale."""
+    path = _checkpoint_path(workspace_id, dataset_id, operations)
+    try:
+        with np.load(path, allow_pickle=False) as arrays:
+            manifest = json.loads(str(arrays["manifest"]))
+            if manifest.get("version") != CHECKPOINT_VERSION or manifest.get("fingerprint") != fingerprint:
+                return None
+            if manifest.get("last_timestamp") != _entry_timestamp(workspace_id, dataset_id, operations):
+                # The log was replaced since the checkpoint was written
+                return None
+            index_spec = manifest["index"]
+            if index_spec["kind"] == "range":
+                index = pd.RangeIndex(index_spec["start"], index_spec["stop"], index_spec["step"])
+            else:
+                index = pd.Index(_decode_values("index", index_spec, arrays))
+            index.name = _from_json_value(index_spec["name"])
+            df = pd.DataFrame(
+                {i: _decode_values(f"c{i}", spec, arrays) for i, spec in enumerate(manifest["columns"])},
+                index=index,
+            )
+            df.columns = pd.Index(_decode_values("labels", manifest["labels"], arrays))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"[replay_engine] Ignoring unreadable checkpoint {operations} of '{dataset_id}': {e}")
+        return None
+    return df
+
+
+def checkpoint_if_due(workspace_id: str, dataset_id: str, df: pd.DataFrame) -> bool:
+    """
+    Checkpoint a dataset's state after an operation was logged, if one is due.
+
+    Called with the new current state right after its operation was
+    appended to the log, so live sessions write the checkpoints and
+    rebuilds rarely need to.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        df: State after all logged operations
+
+    Returns:
+        True if a checkpoint was written
+    """
+    if REPLAY_CHECKPOINT_INTERVAL <= 0:
+        return False
+    _, operations = query_operation_logs(workspace_id, dataset_id, limit=0)
+    if operations == 0 or operations % REPLAY_CHECKPOINT_INTERVAL:
+        return False
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    if fingerprint is None:
+        return False
+    _save_checkpoint(
+        workspace_id, dataset_id, df, operations, fingerprint,
+        _entry_timestamp(workspace_id, dataset_id, operations)
+    )
+    return True
+
+
+def rebuild_dataset_state(
+    workspace_id: str,
+    dataset_id: str,
+    operations: Optional[int] = None,
+    raw_df: Optional[pd.DataFrame] = None
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Rebuild a dataset's state from its raw file and operation log.
+
+    Loads the nearest valid checkpoint at or before the target and replays
+    the remaining operations, checkpointing on the way.
+
+    Args:
+        workspace_id: Workspace identifier
+        dataset_id: Dataset filename
+        operations: Number of logged operations to apply (default: all,
+            i.e. the current state)
+        raw_df: The raw dataset, if already loaded (not modified)
+
+    Returns:
+        Tuple of (state, number of operations applied). The state may be
+        raw_df itself when no operation applies.
+
+    Raises:
+        FileNotFoundError: If the dataset doesn't exist
+        ValueError: If operations is out of range, or an operation cannot
+            be replayed
+    """
+    _, total = query_operation_logs(workspace_id, dataset_id, limit=0)
+    if operations is None:
+        operations = total
+    elif not 0 <= operations <= total:
+        raise ValueError(f"Dataset '{dataset_id}' has {total} logged operations, cannot rebuild the state after {operations}")
+
+    fingerprint = get_dataset_fingerprint(workspace_id, dataset_id)
+    df = None
+    start = 0
+    if fingerprint is not None and operations > 0:
+        for count in reversed(_checkpoint_counts(workspace_id, dataset_id)):
+            if 0 < count <= operations:
+                df = _load_checkpoint(workspace_id, dataset_id, count, fingerprint)
+                if df is not None:
+                    start = count
+                    break
+    if df is None:
+        df = raw_df if raw_df is not None else load_dataset(dataset_id, workspace_id)
+
+    if start < operations:
+        tail = get_operation_logs(workspace_id, dataset_id, limit=operations - start, offset=start)
+        if len(tail) != operations - start:
+            raise ValueError(f"Failed to read operations {start + 1} to {operations} of the log of '{dataset_id}'")
+        for position, entry in enumerate(tail, start + 1):
+            try:
+                df = apply_operation(df, entry)
+            except ValueError as e:
+                raise ValueError(f"Cannot replay operation {position} of '{dataset_id}': {e}") from e
+            # Checkpoints in (start, operations] are missing or stale: (re)write them
+            if fingerprint is not None and REPLAY_CHECKPOINT_INTERVAL > 0 and position % REPLAY_CHECKPOINT_INTERVAL == 0:
+                _save_checkpoint(workspace_id, dataset_id, df, position, fingerprint, entry.get("timestamp"))
+
+    logger.info(
+        f"[replay_engine] Rebuilt '{dataset_id}' after {operations} operations "
+        f"(from checkpoint {start}, replayed {operations - start})"
+    )
+    return df, operations
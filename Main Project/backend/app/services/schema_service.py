@@ -12,12 +12,15 @@ import numpy as np
 from typing import Dict, Optional, Any, Tuple
 from datetime import datetime
 import logging
-import json
 from pathlib import Path
 
 from app.services.dataset_loader import load_dataset, dataset_exists, save_dataset
+from app.services.column_sketches import get_column_sketches, get_distinct_sketches
+from app.services.hyperloglog import distinct_count
+from app.services.quantile_sketch import QuantileSketch, get_quartiles
 from app.services.operation_logs import append_operation_log
-from app.config import get_workspace_files_dir
+from app.config import get_log_index_file_path, get_workspace_files_dir
+from app.utils.jsonl_log import JSONLLog
 
 logger = logging.getLogger(__name__)
 
@@ -74,12 +77,18 @@ def get_canonical_type(series: pd.Series) -> str:
     return "categorical"
 
 
-def get_numeric_stats(series: pd.Series) -> Optional[Dict[str, Any]]:
+def get_numeric_stats(
+    series: pd.Series,
+    sketch: Optional[QuantileSketch] = None,
+    exact: bool = False
+) -> Optional[Dict[str, Any]]:
     """
     Compute basic statistics for numeric columns.
     
     Args:
         series: pandas Series (should be numeric)
+        sketch: Optional quantile sketch of the column (used for large columns)
+        exact: If True, always compute exact quartiles
         
     Returns:
         Dictionary with stats or None if not numeric
@@ -96,14 +105,16 @@ def get_numeric_stats(series: pd.Series) -> Optional[Dict[str, Any]]:
     if len(valid_series) == 0:
         return None
     
+    q25, median, q75 = get_quartiles(valid_series, sketch=sketch, exact=exact)
+    
     stats = {
         "min": float(valid_series.min()) if not pd.isna(valid_series.min()) else None,
         "max": float(valid_series.max()) if not pd.isna(valid_series.max()) else None,
         "mean": float(valid_series.mean()) if not pd.isna(valid_series.mean()) else None,
-        "median": float(valid_series.median()) if not pd.isna(valid_series.median()) else None,
+        "median": float(median) if median is not None and not pd.isna(median) else None,
         "std": float(valid_series.std()) if not pd.isna(valid_series.std()) else None,
-        "q25": float(valid_series.quantile(0.25)) if not pd.isna(valid_series.quantile(0.25)) else None,
-        "q75": float(valid_series.quantile(0.75)) if not pd.isna(valid_series.quantile(0.75)) else None,
+        "q25": float(q25) if q25 is not None and not pd.isna(q25) else None,
+        "q75": float(q75) if q75 is not None and not pd.isna(q75) else None,
     }
     
     return stats
@@ -113,6 +124,11 @@ def load_dataset_to_cache(workspace_id: str, dataset_id: str) -> bool:
     """
     Load dataset into in-memory cache (both raw_df and current_df).
     
+    current_df is rebuilt from the raw dataset and the dataset's operation
+    log (see app.services.replay_engine), so a cleared cache or a restarted
+    server comes back to the cleaned state. It falls back to the raw dataset
+    when the log cannot be replayed.
+    
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
@@ -128,14 +144,22 @@ def load_dataset_to_cache(workspace_id: str, dataset_id: str) -> bool:
         # Load dataset
         df = load_dataset(dataset_id, workspace_id)
         
+        # Rebuild current state: nearest checkpoint + replay of the logged operations
+        try:
+            from app.services.replay_engine import rebuild_dataset_state
+            current_df, _ = rebuild_dataset_state(workspace_id, dataset_id, raw_df=df)
+        except Exception as e:
+            logger.warning(f"Could not replay operation log of dataset '{dataset_id}', using raw dataset: {e}")
+            current_df = df
+        
         # Initialize workspace cache if needed
         if workspace_id not in _dataset_cache:
             _dataset_cache[workspace_id] = {}
         
-        # Store both raw and current (initially they're the same)
+        # Store both raw and current
         _dataset_cache[workspace_id][dataset_id] = {
             "raw_df": df.copy(),
-            "current_df": df.copy()
+            "current_df": current_df.copy()
         }
         
         logger.info(f"Loaded dataset '{dataset_id}' into cache for workspace '{workspace_id}'")
@@ -208,16 +232,25 @@ def update_current_df(workspace_id: str, dataset_id: str, df: pd.DataFrame) -> b
         return False
 
 
-def compute_schema(workspace_id: str, dataset_id: str, use_current: bool = True) -> Optional[Dict[str, Any]]:
+def compute_schema(
+    workspace_id: str,
+    dataset_id: str,
+    use_current: bool = True,
+    exact: bool = False
+) -> Optional[Dict[str, Any]]:
     """
     Compute schema for a dataset.
     
     Schema is the single source of truth for column metadata.
     
+    Unique counts of large columns are HyperLogLog estimates
+    (unique_count_error holds the relative standard error, 0.0 when exact).
+    
     Args:
         workspace_id: Workspace identifier
         dataset_id: Dataset filename
         use_current: If True, use current_df; if False, use raw_df
+        exact: If True, compute exact unique counts and quartiles
         
     Returns:
         Schema dictionary with columns and metadata, or None if dataset not in cache
@@ -260,6 +293,11 @@ def compute_schema(workspace_id: str, dataset_id: str, use_current: bool = True)
     total_rows = len(df)
     columns_schema = []
     
+    # Sketches describe the dataset file, so they only apply to the raw data
+    use_sketches = not use_current and not exact
+    sketches = get_column_sketches(workspace_id, dataset_id, df) if use_sketches else {}
+    distinct_sketches = get_distinct_sketches(workspace_id, dataset_id, df) if use_sketches else {}
+    
     try:
         for col in df.columns:
             series = df[col]
@@ -269,7 +307,9 @@ def compute_schema(workspace_id: str, dataset_id: str, use_current: bool = True)
             missing_count = int(series.isna().sum())
             missing_percentage = round((missing_count / total_rows * 100) if total_rows > 0 else 0.0, 2)
             
-            unique_count = int(series.nunique(dropna=True))
+            unique_count, unique_count_error = distinct_count(
+                series, sketch=distinct_sketches.get(col), exact=exact
+            )
             
             column_info = {
                 "name": col,
@@ -279,11 +319,12 @@ def compute_schema(workspace_id: str, dataset_id: str, use_current: bool = True)
                 "missing_count": missing_count,
                 "missing_percentage": missing_percentage,
                 "unique_count": unique_count,
+                "unique_count_error": unique_count_error,
             }
             
             # Add numeric stats if applicable
             if canonical_type == "numeric":
-                numeric_stats = get_numeric_stats(series)
+                numeric_stats = get_numeric_stats(series, sketch=sketches.get(col), exact=exact)
                 if numeric_stats:
                     column_info["numeric_stats"] = numeric_stats
             
@@ -348,10 +389,10 @@ def get_cleaned_dataset_filename(dataset_id: str) -> str:
 
 def get_cleaning_summary_filename(dataset_id: str) -> str:
     """
-    Get the filename for the cleaning summary metadata JSON.
+    Get the filename for the cleaning summary metadata (JSON lines, one per operation).
     
-    Format: dataset_name_data_cleaning_summary.json
-    Example: movie.csv -> movie_data_cleaning_summary.json
+    Format: dataset_name_data_cleaning_summary.jsonl
+    Example: movie.csv -> movie_data_cleaning_summary.jsonl
     
     Args:
         dataset_id: Original dataset filename
@@ -360,7 +401,7 @@ def get_cleaning_summary_filename(dataset_id: str) -> str:
         Cleaning summary filename
     """
     dataset_name = Path(dataset_id).stem
-    return f"{dataset_name}_data_cleaning_summary.json"
+    return f"{dataset_name}_data_cleaning_summary.jsonl"
 
 
 def save_cleaned_dataset(
@@ -423,10 +464,12 @@ def append_cleaning_metadata(
     affected_rows: int
 ) -> None:
     """
-    Append a cleaning operation to the cumulative metadata JSON file.
+    Append a cleaning operation to the cumulative metadata log.
     
-    This maintains ONE metadata JSON file per dataset that accumulates
-    all cleaning operations in chronological order.
+    This maintains ONE append-only metadata file per dataset (JSON lines,
+    see app.utils.jsonl_log) that accumulates all cleaning operations in
+    chronological order. A metadata JSON file of the previous layout
+    ({"operations": [...]}) is imported on first access.
     
     Args:
         workspace_id: Workspace identifier
@@ -437,24 +480,14 @@ def append_cleaning_metadata(
         affected_rows: Number of rows affected
     """
     files_dir = get_workspace_files_dir(workspace_id)
-    summary_filename = get_cleaning_summary_filename(dataset_id)
-    summary_path = files_dir / summary_filename
-    summary_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Load existing metadata
-    metadata = {
-        "workspace_id": workspace_id,
-        "dataset_id": dataset_id,
-        "operations": []
-    }
-    if summary_path.exists():
-        try:
-            with open(summary_path, 'r', encoding='utf-8') as f:
-                existing = json.load(f)
-                if isinstance(existing, dict) and "operations" in existing:
-                    metadata = existing
-        except Exception as e:
-            logger.warning(f"Failed to load existing cleaning metadata from {summary_path}: {e}. Starting fresh.")
+    summary_path = files_dir / get_cleaning_summary_filename(dataset_id)
+    metadata_log = JSONLLog(
+        summary_path,
+        get_log_index_file_path(workspace_id, summary_path),
+        key_fields=("operation_type", "column"),
+        legacy_path=summary_path.with_suffix(".json"),
+        legacy_entries=lambda metadata: metadata.get("operations") if isinstance(metadata, dict) else None,
+    )
     
     # Append new operation
     operation_entry = {
@@ -464,19 +497,87 @@ def append_cleaning_metadata(
         "affected_rows": affected_rows,
         "timestamp": datetime.now().isoformat()
     }
-    metadata["operations"].append(operation_entry)
-    metadata["last_updated"] = datetime.now().isoformat()
     
-    # Save back to file
     try:
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        metadata_log.append(operation_entry)
         logger.info(f"Appended cleaning metadata for dataset '{dataset_id}' in workspace '{workspace_id}'")
     except Exception as e:
         logger.error(f"Failed to write cleaning metadata to {summary_path}: {e}")
         raise
 
 
+def apply_missing_value_strategy(
+    df: pd.DataFrame,
+    column: str,
+    strategy: str,
+    constant_value: Optional[Any] = None
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Apply a missing value strategy to a column (no cache, file or log side effects).
+    
+    The result depends only on the DataFrame and the arguments, so applying
+    a logged operation again to the same state reproduces it (see
+    app.services.replay_engine).
+    
+    Args:
+        df: DataFrame to clean (not modified)
+        column: Column name to clean
+        strategy: Cleaning strategy (drop, fill_mean, fill_median, fill_mode, fill_constant)
+        constant_value: Value to use for fill_constant strategy
+        
+    Returns:
+        Tuple of (cleaned_df, affected_rows)
+        
+    Raises:
+        ValueError: If the column is missing, the strategy is unknown, or no
+            fill value can be computed
+    """
+    if column not in df.columns:
+        raise ValueError(f"Column '{column}' not found in dataset")
+    
+    df_cleaned = df.copy()
+    missing_count = int(df_cleaned[column].isna().sum())
+    
+    if strategy == "drop":
+        # Drop rows where the column has missing values
+        df_cleaned = df_cleaned.dropna(subset=[column]).reset_index(drop=True)
+        
+    elif strategy == "fill_mean":
+        mean_value = df_cleaned[column].mean()
+        if pd.isna(mean_value):
+            raise ValueError(f"Cannot compute mean for column '{column}' (all values are missing)")
+        df_cleaned[column] = df_cleaned[column].fillna(mean_value)
+        
+    elif strategy == "fill_median":
+        median_value = df_cleaned[column].median()
+        if pd.isna(median_value):
+            raise ValueError(f"Cannot compute median for column '{column}' (all values are missing)")
+        df_cleaned[column] = df_cleaned[column].fillna(median_value)
+        
+    elif strategy == "fill_mode":
+        mode_values = df_cleaned[column].mode()
+        if len(mode_values) > 0:
+            fill_value = mode_values[0]
+        else:
+            # If no mode exists, use the first non-null value
+            non_null_values = df_cleaned[column].dropna()
+            if len(non_null_values) > 0:
+                fill_value = non_null_values.iloc[0]
+            else:
+                raise ValueError(f"Cannot compute mode for column '{column}' (all values are missing)")
+        df_cleaned[column] = df_cleaned[column].fillna(fill_value)
+        
+    elif strategy == "fill_constant":
+        if constant_value is None:
+            raise ValueError("constant_value is required for 'fill_constant' strategy")
+        df_cleaned[column] = df_cleaned[column].fillna(constant_value)
+        
+    else:
+        raise ValueError(f"Unknown strategy: '{strategy}'. Valid strategies: drop, fill_mean, fill_median, fill_mode, fill_constant")
+    
+    return df_cleaned, missing_count
+
+
 def clean_missing_values(
     workspace_id: str,
     dataset_id: str,
@@ -536,7 +637,6 @@ def clean_missing_values(
             return None, 0, f"Column '{column}' not found in schema"
         
         canonical_type = column_info["canonical_type"]
-        original_missing_count = int(df[column].isna().sum())
         
         # Validate strategy based on canonical_type
         if strategy == "drop":
@@ -555,46 +655,10 @@ def clean_missing_values(
             return None, 0, f"Unknown strategy: '{strategy}'. Valid strategies: drop, fill_mean, fill_median, fill_mode, fill_constant"
         
         # Apply cleaning operation
-        df_cleaned = df.copy()
-        affected_rows = 0
-        
-        if strategy == "drop":
-            # Drop rows where the column has missing values
-            missing_mask = df_cleaned[column].isna()
-            affected_rows = int(missing_mask.sum())
-            df_cleaned = df_cleaned.dropna(subset=[column]).reset_index(drop=True)
-            
-        elif strategy == "fill_mean":
-            mean_value = df_cleaned[column].mean()
-            if pd.isna(mean_value):
-                return None, 0, f"Cannot compute mean for column '{column}' (all values are missing)"
-            df_cleaned[column] = df_cleaned[column].fillna(mean_value)
-            affected_rows = original_missing_count
-            
-        elif strategy == "fill_median":
-            median_value = df_cleaned[column].median()
-            if pd.isna(median_value):
-                return None, 0, f"Cannot compute median for column '{column}' (all values are missing)"
-            df_cleaned[column] = df_cleaned[column].fillna(median_value)
-            affected_rows = original_missing_count
-            
-        elif strategy == "fill_mode":
-            mode_values = df_cleaned[column].mode()
-            if len(mode_values) > 0:
-                fill_value = mode_values[0]
-            else:
-                # If no mode exists, use the first non-null value
-                non_null_values = df_cleaned[column].dropna()
-                if len(non_null_values) > 0:
-                    fill_value = non_null_values.iloc[0]
-                else:
-                    return None, 0, f"Cannot compute mode for column '{column}' (all values are missing)"
-            df_cleaned[column] = df_cleaned[column].fillna(fill_value)
-            affected_rows = original_missing_count
-            
-        elif strategy == "fill_constant":
-            df_cleaned[column] = df_cleaned[column].fillna(constant_value)
-            affected_rows = original_missing_count
+        try:
+            df_cleaned, affected_rows = apply_missing_value_strategy(df, column, strategy, constant_value)
+        except ValueError as e:
+            return None, 0, str(e)
         
         # Only update current_df, save files, and log if not in preview mode
         if not preview:
@@ -632,11 +696,19 @@ def clean_missing_values(
                     column=column,
                     column_type=canonical_type,
                     strategy=strategy,
-                    affected_rows=affected_rows
+                    affected_rows=affected_rows,
+                    parameters={"constant_value": constant_value} if strategy == "fill_constant" else None
                 )
             except Exception as e:
                 logger.warning(f"Failed to log operation for dataset '{dataset_id}': {e}")
                 # Don't fail the operation if logging fails
+            else:
+                # Checkpoint the new state when due, so a rebuild replays a short tail
+                try:
+                    from app.services.replay_engine import checkpoint_if_due
+                    checkpoint_if_due(workspace_id, dataset_id, df_cleaned)
+                except Exception as e:
+                    logger.warning(f"Failed to checkpoint dataset '{dataset_id}' (non-critical): {e}")
             
             logger.info(
                 f"Applied missing value cleaning: strategy='{strategy}', column='{column}', "
@@ -0,0 +1,178 @@
+"""
+Segment engine for decision EDA.
+
+Measures how a numeric metric differs between the segments (categories) of
+categorical columns. Each column is factorized once into integer codes;
+per-segment count, sum and mean of the metric then come from np.bincount in
+a single O(rows) pass, and the highest / lowest segments are picked with
+np.argpartition. Cost is independent of the number of categories, so a
+column with thousands of segments is as cheap as one with three.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import SEGMENT_MIN_SUPPORT, SEGMENT_TOP_K
+
+
+def factorize_column(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Encode a column as integer segment codes.
+
+    Returns:
+        Tuple of (codes with -1 for missing values, unique values in order of appearance)
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes, pd.Index(uniques)
+
+
+def segment_stats(codes: np.ndarray, values: np.ndarray, n_segments: int) -> Dict[str, np.ndarray]:
+    """
+    Per-segment count, sum and mean of a metric.
+
+    Args:
+        codes: Segment code of each row (-1 = no segment)
+        values: Metric value of each row (no NaN)
+        n_segments: Number of segments
+
+    Returns:
+        Dictionary of arrays indexed by segment code: count, sum, mean
+        (NaN for empty segments)
+    """
+    in_segment = codes >= 0
+    codes = codes[in_segment]
+    values = values[in_segment]
+    counts = np.bincount(codes, minlength=n_segments)
+    sums = np.bincount(codes, weights=values, minlength=n_segments)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return {"count": counts, "sum": sums, "mean": means}
+
+
+def top_k_segments(means: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """
+    Positions of the k highest (or lowest) means, best first.
+
+    argpartition selects them in O(segments); only the k picked are sorted.
+    Ties keep the lower position first, so results are deterministic.
+    """
+    n = len(means)
+    if n == 0 or k <= 0:
+        return np.array([], dtype=np.int64)
+    keys = -means if largest else means
+    if k < n:
+        picked = np.argpartition(keys, k - 1)[:k]
+        # Keep every position tied with the k-th key so the tie-breaker can choose
+        picked = np.flatnonzero(keys <= keys[picked].max())
+    else:
+        picked = np.arange(n)
+    order = np.lexsort((picked, keys[picked]))
+    return picked[order][:k]
+
+
+def segment_impact_from_stats(
+    counts: np.ndarray,
+    sums: np.ndarray,
+    labels: Sequence[Any],
+    overall_mean: float,
+    min_support: int = SEGMENT_MIN_SUPPORT,
+    k: int = SEGMENT_TOP_K,
+) -> Optional[Dict[str, Any]]:
+    """
+    Compare metric means across segments, given per-segment counts and sums.
+
+    Args:
+        counts: Rows with a metric value, per segment
+        sums: Sum of the metric, per segment
+        labels: Segment values (same order)
+        overall_mean: Mean of the metric over all analyzed rows
+        min_support: Minimum rows for a segment to be considered
+        k: Number of top / bottom segments to report
+
+    Returns:
+        Dictionary with mean_difference, relative_impact_pct, top_segments,
+        bottom_segments and segment_count, or None if fewer than two segments
+        have enough support
+    """
+    supported = np.flatnonzero(counts >= max(min_support, 1))
+    if len(supported) < 2:
+        return None
+
+    means = sums[supported] / counts[supported]
+    mean_diff = float(means.max() - means.min())
+    if overall_mean != 0:
+        relative_impact = abs(mean_diff / overall_mean) * 100
+    else:
+        relative_impact = abs(mean_diff)
+
+    def _labelled(positions: np.ndarray) -> Dict[str, float]:
+        return {str(labels[supported[p]]): round(float(means[p]), 4) for p in positions}
+
+    return {
+        "mean_difference": round(mean_diff, 4),
+        "relative_impact_pct": round(float(relative_impact), 2),
+        "top_segments": _labelled(top_k_segments(means, k, largest=True)),
+        "bottom_segments": _labelled(top_k_segments(means, k, largest=False)),
+        "segment_count": int(len(supported)),
+    }
+
+
+def compute_segment_impact(
+    codes: np.ndarray,
+    uniques: pd.Index,
+    values: np.ndarray,
+    overall_mean: float,
+    min_support: int = SEGMENT_MIN_SUPPORT,
+    k: int = SEGMENT_TOP_K,
+) -> Optional[Dict[str, Any]]:
+    """
+    Compare metric means across the segments of one categorical column.
+
+    Args:
+        codes: Segment codes of the rows being analyzed (see factorize_column)
+        uniques: Segment values for the codes
+        values: Metric values of the same rows (no NaN)
+        overall_mean: Mean of the metric over all analyzed rows
+        min_support: Minimum rows for a segment to be considered
+        k: Number of top / bottom segments to report
+
+    Returns:
+        See segment_impact_from_stats
+    """
+    stats = segment_stats(codes, values, len(uniques))
+    return segment_impact_from_stats(stats["count"], stats["sum"], uniques, overall_mean, min_support, k)
+
+
+def compute_segment_impacts(
+    columns: Dict[str, Tuple[np.ndarray, pd.Index]],
+    values: np.ndarray,
+    row_mask: Optional[np.ndarray] = None,
+    min_support: int = SEGMENT_MIN_SUPPORT,
+    k: int = SEGMENT_TOP_K,
+) -> List[Dict[str, Any]]:
+    """
+    Segment impacts of several factorized columns against one metric.
+
+    Args:
+        columns: Column name -> (codes, uniques) over all dataset rows
+        values: Metric values of the analyzed rows (no NaN)
+        row_mask: Boolean mask of the analyzed rows (None = all rows)
+        min_support: Minimum rows for a segment to be considered
+        k: Number of top / bottom segments to report
+
+    Returns:
+        One impact dictionary (with "factor" and "type") per column that has
+        at least two supported segments, in column order
+    """
+    values = np.asarray(values, dtype=float)
+    overall_mean = float(values.mean()) if len(values) else 0.0
+    impacts: List[Dict[str, Any]] = []
+    for col, (codes, uniques) in columns.items():
+        if row_mask is not None:
+            codes = codes[row_mask]
+        impact = compute_segment_impact(codes, uniques, values, overall_mean, min_support, k)
+        if impact is not None:
+            impacts.append({"factor": col, **impact, "type": "categorical"})
+    return impacts
@@ -0,0 +1,518 @@
+"""
+Resampling significance for decision EDA factors.
+
+Decision EDA ranks factors by impact score alone. This module estimates
+how much of a factor's signal could be noise:
+- bootstrap confidence intervals of the correlation of each numeric factor
+  with the metric, and of the mean difference between the segments of each
+  categorical factor
+- permutation p-values: how often shuffling the metric against the factors
+  gives a correlation (two-sided) or mean difference at least as strong
+
+Resampling is batched: each resample of a block is one row of a matrix,
+and the statistics of every factor for every resample of the block come
+out of one matrix product with a per-row design matrix (counts, sums,
+squares and cross products for numeric factors, one-hot segment columns
+for categorical ones; factors with many segments are summed per segment
+with np.add.reduceat instead). Bootstrap resamples weight rows with Poisson(1)
+counts (the large-sample form of resampling rows with replacement);
+permutations shuffle the metric values.
+
+The mean difference of a categorical factor is the range statistic: the
+highest supported segment mean minus the lowest. Resampling noise can only
+widen a range, so its bootstrap distribution sits above the observed value
+(more so the more segments there are). Its interval is therefore the basic
+(pivotal) one, 2 * observed - bootstrap quantiles, and factors with more
+than SIGNIFICANCE_MAX_CI_SEGMENTS segments get none; correlations use
+percentile intervals.
+
+Blocks run until the requested number of resamples is reached or the time
+budget runs out, so the reported resample counts can be lower than
+requested. Large datasets split the resamples across worker processes.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import (
+    PROFILE_WORKERS,
+    SEGMENT_MIN_SUPPORT,
+    SIGNIFICANCE_CHUNK_CELLS,
+    SIGNIFICANCE_CONFIDENCE,
+    SIGNIFICANCE_DESIGN_CELLS,
+    SIGNIFICANCE_MAX_CI_SEGMENTS,
+    SIGNIFICANCE_PROCESS_MIN_ROWS,
+    SIGNIFICANCE_RESAMPLES,
+    SIGNIFICANCE_TIME_BUDGET,
+)
+from app.services.profiling_executor import map_in_processes
+
+logger = logging.getLogger(__name__)
+
+# Poisson(1) counts by inverse CDF of a uint16 draw (much faster than rng.poisson)
+_POISSON_TABLE = np.searchsorted(
+    np.cumsum([math.exp(-1) / math.factorial(k) for k in range(16)]),
+    (np.arange(65536) + 0.5) / 65536,
+).astype(np.float32)
+
+# Resamples per block: bounds (resamples x rows) per matrix operation
+_MIN_BLOCK = 16
+_MAX_BLOCK = 1_000
+
+# Factors with more supported segments than this are summed per segment
+# with np.add.reduceat instead of one-hot design columns
+_DENSE_SEGMENTS = 64
+
+
+class SignificanceData:
+    """
+    Rows of one metric and its factors, prepared for resampling.
+
+    Only rows where the metric is present are kept. Values are standardized
+    (correlations don't change, mean differences are scaled back) and
+    stored as float32 for the matrix products.
+
+    The supported segments of all categorical factors are numbered
+    consecutively (segment columns). Factors with few segments get one-hot
+    columns in the design matrix; factors with many segments keep their
+    rows sorted by segment and are summed with np.add.reduceat, so the
+    design stays narrow whatever the cardinality.
+
+    Attributes:
+        x: Standardized metric (n)
+        x_scale: Standard deviation of the metric
+        y: Standardized numeric factors, 0 where missing (n x kn)
+        m: Presence masks of the numeric factors (n x kn)
+        segment_codes: One-hot design column of each row per low-cardinality
+            factor (-1 = missing or unsupported segment)
+        dense_columns: Segment column of each one-hot design column
+        sparse_segments: Per high-cardinality factor (rows sorted by
+            segment, start of each segment in them, first segment column)
+        segment_bounds: First segment column of each factor, plus the total (kf + 1)
+        min_support: Minimum rows (weight) for a segment mean to count
+    """
+
+    def __init__(
+        self,
+        metric: np.ndarray,
+        numeric: Sequence[np.ndarray],
+        segments: Sequence[np.ndarray],
+        min_support: int = SEGMENT_MIN_SUPPORT,
+    ):
+        """
+        Args:
+            metric: Metric values (no NaN)
+            numeric: Numeric factor values of the same rows (NaN = missing)
+            segments: Segment codes of the same rows per categorical factor (-1 = missing)
+            min_support: Minimum rows for a segment to be considered
+        """
+        metric = np.asarray(metric, dtype=float)
+        n = len(metric)
+        self.x_scale = float(metric.std()) or 1.0
+        self.x = ((metric - metric.mean()) / self.x_scale).astype(np.float32)
+
+        self.y = np.zeros((n, len(numeric)), dtype=np.float32)
+        self.m = np.zeros((n, len(numeric)), dtype=np.float32)
+        for j, values in enumerate(numeric):
+            present = ~np.isnan(values)
+            if present.any():
+                scale = float(values[present].std()) or 1.0
+                self.y[present, j] = (values[present] - values[present].mean()) / scale
+            self.m[:, j] = present
+
+        self.min_support = max(min_support, 1)
+        dense_codes: List[np.ndarray] = []
+        dense_columns: List[int] = []
+        self.sparse_segments: List[Tuple[np.ndarray, np.ndarray, int]] = []
+        bounds = [0]
+        for codes in segments:
+            in_segment = codes >= 0
+            counts = np.bincount(codes[in_segment], minlength=1)
+            supported = np.flatnonzero(counts >= self.min_support)
+            positions = np.full(len(counts), -1, dtype=np.int64)
+            positions[supported] = np.arange(len(supported))
+            local = np.full(n, -1, dtype=np.int64)
+            local[in_segment] = positions[codes[in_segment]]
+            if len(supported) <= _DENSE_SEGMENTS:
+                dense_codes.append(np.where(local >= 0, local + len(dense_columns), -1))
+                dense_columns.extend(range(bounds[-1], bounds[-1] + len(supported)))
+            else:
+                rows = np.flatnonzero(local >= 0)
+                rows = rows[np.argsort(local[rows], kind="stable")]
+                starts = np.searchsorted(local[rows], np.arange(len(supported)))
+                self.sparse_segments.append((rows, starts, bounds[-1]))
+            bounds.append(bounds[-1] + len(supported))
+        self.segment_codes = np.column_stack(dense_codes) if dense_codes else np.empty((n, 0), dtype=np.int64)
+        self.dense_columns = np.array(dense_columns, dtype=np.int64)
+        self.segment_bounds = np.array(bounds, dtype=np.int64)
+        self._design: Optional[np.ndarray] = None
+        self._totals: Optional[np.ndarray] = None
+
+    def __getstate__(self):
+        # Worker processes rebuild the design matrix instead of receiving it
+        state = self.__dict__.copy()
+        state["_design"] = None
+        return state
+
+    @property
+    def rows(self) -> int:
+        return len(self.x)
+
+    @property
+    def n_numeric(self) -> int:
+        return self.y.shape[1]
+
+    @property
+    def n_segments(self) -> int:
+        return int(self.segment_bounds[-1])
+
+    @property
+    def n_statistics(self) -> int:
+        """Sums behind the factor statistics: six per numeric factor, two per segment."""
+        return 6 * self.n_numeric + 2 * self.n_segments
+
+    @property
+    def n_columns(self) -> int:
+        """Columns of the design matrix."""
+        return 6 * self.n_numeric + 2 * len(self.dense_columns)
+
+    def one_hot(self, start: int, stop: int) -> np.ndarray:
+        """One-hot segment columns of a row range (rows x dense segments)."""
+        block = np.zeros((stop - start, len(self.dense_columns)), dtype=np.float32)
+        for f in range(self.segment_codes.shape[1]):
+            codes = self.segment_codes[start:stop, f]
+            rows = np.flatnonzero(codes >= 0)
+            block[rows, codes[rows]] = 1.0
+        return block
+
+    def design(self, start: int, stop: int) -> np.ndarray:
+        """
+        Bootstrap design matrix of a row range.
+
+        Columns: per numeric factor m, m*x, m*x^2, y, y^2, x*y (six blocks of
+        kn), then per one-hot segment the indicator and indicator*x. A
+        weighted sum of the rows gives every sum the factor statistics need
+        (except the high-cardinality segments, see add_sparse_sums).
+        """
+        x = self.x[start:stop, None]
+        m, y = self.m[start:stop], self.y[start:stop]
+        one_hot = self.one_hot(start, stop)
+        return np.hstack([m, m * x, m * x * x, y, y * y, y * x, one_hot, one_hot * x])
+
+    def design_chunks(self, width: int):
+        """
+        Design matrix in row ranges: yields (start, stop, block).
+
+        The matrix is built once and kept when it has at most
+        SIGNIFICANCE_DESIGN_CELLS cells; otherwise each range is rebuilt.
+        Ranges keep a (width x rows) block within SIGNIFICANCE_CHUNK_CELLS.
+        """
+        if self._design is None and self.rows * self.n_columns <= SIGNIFICANCE_DESIGN_CELLS:
+            self._design = np.empty((self.rows, self.n_columns), dtype=np.float32)
+            for start, stop in _row_chunks(self.rows, self.n_columns):
+                self._design[start:stop] = self.design(start, stop)
+        for start, stop in _row_chunks(self.rows, max(width, self.n_columns)):
+            block = self._design[start:stop] if self._design is not None else self.design(start, stop)
+            yield start, stop, block
+
+    def statistics_from_design(self, design_sums: np.ndarray) -> np.ndarray:
+        """Place design column sums (rows x n_columns) into the statistics layout (rows x n_statistics)."""
+        kn6, dense = 6 * self.n_numeric, len(self.dense_columns)
+        sums = np.zeros((len(design_sums), self.n_statistics))
+        sums[:, :kn6] = design_sums[:, :kn6]
+        sums[:, kn6 + self.dense_columns] = design_sums[:, kn6:kn6 + dense]
+        sums[:, kn6 + self.n_segments + self.dense_columns] = design_sums[:, kn6 + dense:]
+        return sums
+
+    def add_sparse_sums(self, sums: np.ndarray, values: np.ndarray, offset: int) -> None:
+        """
+        Write per-segment sums of `values` for the high-cardinality factors.
+
+        Args:
+            sums: Statistics (rows x n_statistics), updated in place
+            values: Row values (n, or rows x n)
+            offset: Statistics column of segment column 0 (counts or sums block)
+        """
+        # Rows first, so gathering a row copies contiguous values
+        values = np.ascontiguousarray(values.T)
+        for rows, starts, first in self.sparse_segments:
+            segment_sums = np.add.reduceat(values[rows], starts, axis=0)
+            sums[:, offset + first:offset + first + len(starts)] = segment_sums.T
+
+
+def _row_chunks(n_rows: int, width: int):
+    """Row ranges sized so a (width x rows) block stays within SIGNIFICANCE_CHUNK_CELLS."""
+    step = max(1_024, SIGNIFICANCE_CHUNK_CELLS // max(width, 1))
+    for start in range(0, n_rows, step):
+        yield start, min(start + step, n_rows)
+
+
+def _observed_sums(data: SignificanceData) -> np.ndarray:
+    """Statistics with every row counted once (the observed statistics), 1 x n_statistics."""
+    if data._totals is None:
+        design_sums = np.zeros(data.n_columns)
+        for _, _, design in data.design_chunks(1):
+            design_sums += design.sum(axis=0, dtype=np.float64)
+        totals = data.statistics_from_design(design_sums[None, :])
+        if data.sparse_segments:
+            kn6 = 6 * data.n_numeric
+            data.add_sparse_sums(totals, np.ones(data.rows), kn6)
+            data.add_sparse_sums(totals, data.x.astype(float), kn6 + data.n_segments)
+        data._totals = totals[0]
+    return data._totals[None, :]
+
+
+def _bootstrap_sums(data: SignificanceData, block: int, rng: np.random.Generator) -> np.ndarray:
+    """Statistics of `block` Poisson bootstrap resamples (block x n_statistics)."""
+    weights = _POISSON_TABLE[rng.integers(0, 65536, (block, data.rows), dtype=np.uint16)]
+    design_sums = np.zeros((block, data.n_columns))
+    for start, stop, design in data.design_chunks(block):
+        design_sums += weights[:, start:stop] @ design
+    sums = data.statistics_from_design(design_sums)
+    if data.sparse_segments:
+        kn6 = 6 * data.n_numeric
+        data.add_sparse_sums(sums, weights, kn6)
+        data.add_sparse_sums(sums, weights * data.x, kn6 + data.n_segments)
+    return sums
+
+
+def _permutation_sums(data: SignificanceData, block: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Statistics of `block` permutations of the metric (block x n_statistics).
+
+    Sums that don't involve the metric are the same for every permutation;
+    the others are products of the permuted metric block with the design
+    columns m, y and the segment indicators (and m for the squares);
+    high-cardinality segments are summed from the shuffled block directly.
+    """
+    kn, n_segments = data.n_numeric, data.n_segments
+    shuffled = data.x[rng.random((block, data.rows), dtype=np.float32).argsort(axis=1)]
+    products = np.zeros((block, data.n_columns))
+    squares = np.zeros((block, kn))
+    for start, stop, design in data.design_chunks(block):
+        part = shuffled[:, start:stop]
+        products += part @ design
+        squares += (part * part) @ design[:, :kn]
+
+    sums = np.tile(_observed_sums(data)[0], (block, 1))
+    sums[:, kn:2 * kn] = products[:, :kn]
+    sums[:, 2 * kn:3 * kn] = squares
+    sums[:, 5 * kn:6 * kn] = products[:, 3 * kn:4 * kn]
+    sums[:, 6 * kn + n_segments + data.dense_columns] = products[:, 6 * kn:6 * kn + len(data.dense_columns)]
+    if data.sparse_segments:
+        data.add_sparse_sums(sums, shuffled, 6 * kn + n_segments)
+    return sums
+
+
+def _factor_statistics(data: SignificanceData, sums: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Factor statistics from the statistics sums (one row per resample).
+
+    Returns:
+        Tuple of (correlations (rows x kn), segment mean differences in
+        metric units (rows x kf)); NaN where undefined
+    """
+    kn, n_segments = data.n_numeric, data.n_segments
+    count, s_x, s_xx, s_y, s_yy, s_xy = (sums[:, i * kn:(i + 1) * kn] for i in range(6))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = s_xy - s_x * s_y / count
+        r = covariance / np.sqrt((s_xx - s_x * s_x / count) * (s_yy - s_y * s_y / count))
+    r[(count < 2) | ~np.isfinite(r)] = np.nan
+    r = np.clip(r, -1.0, 1.0)
+
+    segment_counts = sums[:, 6 * kn:6 * kn + n_segments]
+    segment_sums = sums[:, 6 * kn + n_segments:]
+    supported = segment_counts >= data.min_support
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = segment_sums / segment_counts
+    bounds = data.segment_bounds
+    differences = np.full((len(sums), len(bounds) - 1), np.nan)
+    for f in range(len(bounds) - 1):
+        block = slice(bounds[f], bounds[f + 1])
+        enough = supported[:, block].sum(axis=1) >= 2
+        if not enough.any():
+            continue
+        highest = np.where(supported[:, block], means[:, block], -np.inf).max(axis=1)
+        lowest = np.where(supported[:, block], means[:, block], np.inf).min(axis=1)
+        differences[enough, f] = (highest - lowest)[enough] * data.x_scale
+    return r, differences
+
+
+def _resample(
+    data: SignificanceData,
+    resamples: int,
+    seed: np.random.SeedSequence,
+    deadline: float
+) -> Dict[str, np.ndarray]:
+    """
+    Run bootstrap and permutation blocks until `resamples` of each or the deadline.
+
+    At least one block of each kind runs, whatever the deadline. Module-level
+    so it can run in a worker process.
+
+    Returns:
+        Dictionary of bootstrap_r, bootstrap_diff, permutation_r,
+        permutation_diff (one row per resample)
+    """
+    rng = np.random.default_rng(seed)
+    block = int(np.clip(SIGNIFICANCE_CHUNK_CELLS // max(data.rows, 1), _MIN_BLOCK, _MAX_BLOCK))
+    bootstrap: List[Tuple[np.ndarray, np.ndarray]] = []
+    permutation: List[Tuple[np.ndarray, np.ndarray]] = []
+    done_bootstrap = done_permutation = 0
+    while done_bootstrap < resamples or done_permutation < resamples:
+        if bootstrap and permutation and time.time() >= deadline:
+            break
+        # Alternate so both kinds get a fair share of the budget
+        if done_permutation >= resamples or (done_bootstrap <= done_permutation and done_bootstrap < resamples):
+            size = min(block, resamples - done_bootstrap)
+            bootstrap.append(_factor_statistics(data, _bootstrap_sums(data, size, rng)))
+            done_bootstrap += size
+        else:
+            size = min(block, resamples - done_permutation)
+            permutation.append(_factor_statistics(data, _permutation_sums(data, size, rng)))
+            done_permutation += size
+
+    def _stack(parts, i, width):
+        return np.vstack([part[i] for part in parts]) if parts else np.empty((0, width))
+
+    kn, kf = data.n_numeric, len(data.segment_bounds) - 1
+    return {
+        "bootstrap_r": _stack(bootstrap, 0, kn),
+        "bootstrap_diff": _stack(bootstrap, 1, kf),
+        "permutation_r": _stack(permutation, 0, kn),
+        "permutation_diff": _stack(permutation, 1, kf),
+    }
+
+
+def _interval(values: np.ndarray, confidence: float) -> List[Optional[float]]:
+    """Percentile interval of each column (None where no resample is defined)."""
+    intervals = []
+    alpha = (1 - confidence) / 2
+    for column in values.T:
+        column = column[~np.isnan(column)]
+        if len(column) == 0:
+            intervals.append(None)
+        else:
+            low, high = np.quantile(column, [alpha, 1 - alpha])
+            intervals.append([round(float(low), 4), round(float(high), 4)])
+    return intervals
+
+
+def _range_interval(
+    values: np.ndarray,
+    observed: np.ndarray,
+    segment_counts: np.ndarray,
+    confidence: float
+) -> List[Optional[float]]:
+    """
+    Basic interval of each factor's segment mean difference (a range, >= 0).
+
+    [2 * observed - upper quantile, 2 * observed - lower quantile], clipped
+    at 0: reflecting the quantiles around the observed value corrects the
+    upward bias of the resampled range. None for factors with more than
+    SIGNIFICANCE_MAX_CI_SEGMENTS segments, whose bias is too large for that.
+    """
+    intervals = []
+    for interval, value, segments in zip(_interval(values, confidence), observed, segment_counts):
+        if interval is None or np.isnan(value) or segments > SIGNIFICANCE_MAX_CI_SEGMENTS:
+            intervals.append(None)
+        else:
+            low, high = interval
+            intervals.append([round(max(2 * float(value) - high, 0.0), 4), round(max(2 * float(value) - low, 0.0), 4)])
+    return intervals
+
+
+def _p_values(observed: np.ndarray, permuted: np.ndarray) -> List[Optional[float]]:
+    """
+    Permutation p-values: (1 + permutations at least as extreme) / (1 + permutations).
+
+    A small tolerance keeps float32 noise from splitting ties.
+    """
+    p_values = []
+    for j, value in enumerate(observed):
+        if np.isnan(value) or len(permuted) == 0:
+            p_values.append(None)
+            continue
+        extreme = int((permuted[:, j] >= value - 1e-6 * max(abs(value), 1.0)).sum())
+        p_values.append(round((1 + extreme) / (1 + len(permuted)), 4))
+    return p_values
+
+
+def compute_significance(
+    data: SignificanceData,
+    resamples: int = SIGNIFICANCE_RESAMPLES,
+    time_budget: float = SIGNIFICANCE_TIME_BUDGET,
+    confidence: float = SIGNIFICANCE_CONFIDENCE,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Bootstrap confidence intervals and permutation p-values of all factors.
+
+    Args:
+        data: Prepared metric and factor rows
+        resamples: Bootstrap resamples and permutations to run (each)
+        time_budget: Seconds to spend resampling (at least one block of
+            each kind runs)
+        confidence: Confidence level of the intervals
+        seed: Random seed (results are reproducible for the same resample counts)
+        workers: Worker processes (default: PROFILE_WORKERS for datasets of
+            at least SIGNIFICANCE_PROCESS_MIN_ROWS rows, else 1)
+
+    Returns:
+        Dictionary with:
+        - numeric: per numeric factor (input order) {"confidence_interval", "p_value"}
+          for the correlation
+        - categorical: per categorical factor {"confidence_interval", "p_value"}
+          for the segment mean difference (highest minus lowest segment
+          mean); the interval is None above SIGNIFICANCE_MAX_CI_SEGMENTS
+          segments
+        - bootstrap_resamples, permutations, confidence, elapsed_seconds
+    """
+    started = time.time()
+    deadline = started + time_budget
+    if workers is None:
+        workers = PROFILE_WORKERS if data.rows >= SIGNIFICANCE_PROCESS_MIN_ROWS else 1
+    workers = max(1, min(workers, resamples))
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    if workers > 1:
+        shares = [resamples // workers + (i < resamples % workers) for i in range(workers)]
+        parts = map_in_processes(
+            _resample, [(data, share, seeds[i], deadline) for i, share in enumerate(shares)], workers
+        )
+    else:
+        parts = [_resample(data, resamples, seeds[0], deadline)]
+    resampled = {key: np.vstack([part[key] for part in parts]) for key in parts[0]}
+
+    observed_r, observed_diff = (values[0] for values in _factor_statistics(data, _observed_sums(data)))
+    r_intervals = _interval(resampled["bootstrap_r"], confidence)
+    r_p_values = _p_values(np.abs(observed_r), np.abs(resampled["permutation_r"]))
+    diff_intervals = _range_interval(
+        resampled["bootstrap_diff"], observed_diff, np.diff(data.segment_bounds), confidence
+    )
+    diff_p_values = _p_values(observed_diff, resampled["permutation_diff"])
+
+    elapsed = time.time() - started
+    logger.info(
+        f"[significance] {len(resampled['bootstrap_r'])} bootstrap resamples and "
+        f"{len(resampled['permutation_r'])} permutations of {data.rows} rows in {elapsed:.2f}s ({workers} workers)"
+    )
+    return {
+        "numeric": [
+            {"confidence_interval": interval, "p_value": p}
+            for interval, p in zip(r_intervals, r_p_values)
+        ],
+        "categorical": [
+            {"confidence_interval": interval, "p_value": p}
+            for interval, p in zip(diff_intervals, diff_p_values)
+        ],
+        "bootstrap_resamples": len(resampled["bootstrap_r"]),
+        "permutations": len(resampled["permutation_r"]),
+        "confidence": confidence,
+        "elapsed_seconds": round(elapsed, 3),
+    }
@@ -1,9 +1,18 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
+import hashlib
+import json
+import os
 import pandas as pd
 import logging
 
+from app.config import VIZION_CACHE_SIZE, VIZION_DISK_CACHE_ENTRIES, get_vizion_cache_dir
+from app.utils.cache import LRUCache, atomic_write_json
+
 logger = logging.getLogger(__name__)
 
+# (workspace_id, cache key) -> Vizion output
+_vizion_cache = LRUCache(maxsize=VIZION_CACHE_SIZE)
+
 
 def _normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """Normalize DataFrame for deterministic behavior: reset index and ensure consistent column order."""
@@ -11,14 +20,55 @@ def _normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
         df = pd.DataFrame(df)
     # Ensure deterministic column order
     cols = list(df.columns)
-    cols_sorted = sorted(cols)
+    cols_sorted = sorted(cols, key=str)
     if cols_sorted != cols:
         df = df[cols_sorted]
-    # Reset index to avoid non-deterministic indices
-    df = df.reset_index(drop=True)
+    # Reset index to avoid non-deterministic indices (skip the copy if it's already 0..n-1)
+    if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1):
+        df = df.reset_index(drop=True)
     return df
 
 
+def _param_strings(value: Any) -> Iterable[str]:
+    """All strings in a (nested) parameter value."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _param_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _param_strings(item)
+
+
+def referenced_columns(params: Dict[str, Any], columns: Iterable[Any]) -> List[Any]:
+    """
+    Columns of the dataset that are referenced anywhere in the chart parameters.
+
+    Any parameter value (including nested lists/dicts such as color or
+    facet fields) equal to a column name counts as a reference.
+    """
+    by_name = {str(col): col for col in columns}
+    referenced = []
+    for text in _param_strings(params):
+        col = by_name.get(text)
+        if col is not None and col not in referenced:
+            referenced.append(col)
+    return referenced
+
+
+def project_dataframe(df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Keep only the columns a chart references, before normalizing / sending it to Vizion.
+
+    Falls back to all columns if the parameters reference none.
+    """
+    columns = referenced_columns(params, df.columns)
+    if not columns or len(columns) == len(df.columns):
+        return df
+    return df[columns]
+
+
 def run_vizion(params: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
     """
     Run Vizion with provided parameters and dataframe.
@@ -35,7 +85,8 @@ def run_vizion(params: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
         logger.exception("Vizion import failed")
         raise RuntimeError("Vizion library not available") from e
 
-    df_norm = _normalize_dataframe(df)
+    # Only the referenced columns are normalized (sorting/copying) and passed on
+    df_norm = _normalize_dataframe(project_dataframe(df, params))
 
     # Try common Vizion invocation patterns defensively.
     # Do not implement visualization logic here; pass through params and dataframe.
@@ -83,3 +134,69 @@ def extract_vega_spec(vizion_output: Dict[str, Any]) -> Optional[Dict[str, Any]]
         if key in vizion_output and isinstance(vizion_output[key], dict):
             return vizion_output[key]
     return None
+
+
+def run_vizion_worker(params: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Entry point for running Vizion in a worker process.
+
+    Returns only the picklable, JSON-safe parts of the output (the Vega-Lite
+    spec and the insight text), which is also what gets cached.
+    """
+    output = run_vizion(params, df)
+    return {
+        "vega_lite_spec": extract_vega_spec(output),
+        "insight_text": output.get("insight_text", "") if isinstance(output, dict) else "",
+    }
+
+
+def vizion_cache_key(fingerprint: str, params: Dict[str, Any]) -> str:
+    """
+    Cache key of a chart: dataset fingerprint + canonicalized parameters.
+
+    Parameters are serialized with sorted keys, so the same chart requested
+    with differently ordered parameters hits the same entry.
+    """
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(f"{fingerprint}:{canonical}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_cached_vizion_output(workspace_id: str, key: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a cached Vizion output (memory first, then disk).
+
+    Returns:
+        The cached output, or None on a miss
+    """
+    cached = _vizion_cache.get((workspace_id, key))
+    if cached is not None:
+        return cached
+
+    path = get_vizion_cache_dir(workspace_id) / f"{key}.json"
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except Exception as e:
+        logger.warning(f"[vizion_cache] Failed to read cached output {key}: {e}")
+        return None
+    _vizion_cache.set((workspace_id, key), cached)
+    return cached
+
+
+def save_vizion_output(workspace_id: str, key: str, output: Dict[str, Any]) -> None:
+    """
+    Cache a Vizion output in memory and on disk (non-critical, errors are logged).
+
+    The on-disk tier keeps the VIZION_DISK_CACHE_ENTRIES most recent entries.
+    """
+    _vizion_cache.set((workspace_id, key), output)
+    cache_dir = get_vizion_cache_dir(workspace_id)
+    try:
+        atomic_write_json(cache_dir / f"{key}.json", output, default=str)
+        entries = sorted(cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[VIZION_DISK_CACHE_ENTRIES:]:
+            os.unlink(stale)
+    except Exception as e:
+        logger.warning(f"[vizion_cache] Failed to save output {key}: {e}")
@@ -0,0 +1,83 @@
+"""Caching and file persistence utilities."""
+
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache.
+
+    Used for small, hot results (fingerprints, summaries) that are also
+    persisted on disk; evicted entries are simply recomputed or reloaded.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as recently used."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a value."""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove all values."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = None, **kwargs) -> None:
+    """
+    Write JSON to a file atomically.
+
+    Data is written to a temporary file in the same directory and moved into
+    place with os.replace, so readers never see a partially written file.
+
+    Args:
+        path: Target file path
+        data: JSON-serializable data
+        indent: Optional JSON indentation
+        **kwargs: Extra arguments for json.dump (e.g. default=str)
+
+    Raises:
+        OSError/TypeError: If the file cannot be written or data isn't serializable
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, **kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
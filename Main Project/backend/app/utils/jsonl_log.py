@@ -0,0 +1,302 @@
+"""
+Append-only JSONL logs with a sidecar offset index.
+
+Each entry is one JSON line added with a single write, so an append costs
+O(entry) whatever the length of the history, and a crash can at most tear
+the last line (ignored by readers, cut off before the next append).
+
+The sidecar index holds one small record per entry: byte offset and length
+of the line, its timestamp and a few key fields. Reads filter and page on
+the index and then read only the selected lines (seek + read), so a page of
+a long history costs a scan of the small index plus O(page). Parsed indexes
+are kept in memory and extended incrementally. The index is derived data:
+lines missing from it (a crash between the two writes) are indexed on the
+next access, and a lost index is rebuilt from the log.
+
+Appends are flushed at once and fsynced in batches: at most one fsync per
+file per LOG_FSYNC_INTERVAL seconds, from a timer thread (and at exit).
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.config import LOG_FSYNC_INTERVAL
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Index record: (offset, length, timestamp, key field values)
+IndexRecord = Tuple[int, int, str, Tuple[Any, ...]]
+
+# Parsed indexes (keyed by index path): [bytes parsed, records]
+_index_cache = LRUCache(maxsize=128)
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+_pending_fsync: Set[Path] = set()
+_pending_lock = threading.Lock()
+_fsync_timer: Optional[threading.Timer] = None
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(str(path), threading.Lock())
+
+
+def _field(entry: Dict[str, Any], name: str) -> Any:
+    """Value of a (dotted) field of an entry, None if absent."""
+    value: Any = entry
+    for part in name.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def flush_pending_logs() -> None:
+    """Fsync every log appended to since the last batch."""
+    global _fsync_timer
+    with _pending_lock:
+        paths = list(_pending_fsync)
+        _pending_fsync.clear()
+        _fsync_timer = None
+    for path in paths:
+        try:
+            with open(path, "ab") as f:
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.warning(f"[jsonl_log] Failed to fsync {path}: {e}")
+
+
+def _fsync_later(*paths: Path) -> None:
+    global _fsync_timer
+    with _pending_lock:
+        _pending_fsync.update(paths)
+        if LOG_FSYNC_INTERVAL > 0:
+            if _fsync_timer is None:
+                _fsync_timer = threading.Timer(LOG_FSYNC_INTERVAL, flush_pending_logs)
+                _fsync_timer.daemon = True
+                _fsync_timer.start()
+            return
+    flush_pending_logs()
+
+
+atexit.register(flush_pending_logs)
+
+
+class JSONLLog:
+    """
+    One append-only JSONL log and its index.
+
+    Attributes:
+        path: The JSONL log
+        index_path: Its sidecar index
+        key_fields: Entry fields kept in the index for filtering (dotted
+            names reach into nested objects, e.g. "parameters.column")
+        legacy_path: JSON file of the previous layout, imported on first access
+        legacy_entries: Extracts the entries from the legacy JSON (default:
+            the JSON is the list of entries)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        index_path: Path,
+        key_fields: Sequence[str] = (),
+        legacy_path: Optional[Path] = None,
+        legacy_entries: Optional[Callable[[Any], List[Dict[str, Any]]]] = None,
+    ):
+        self.path = path
+        self.index_path = index_path
+        self.key_fields = tuple(key_fields)
+        self.legacy_path = legacy_path
+        self.legacy_entries = legacy_entries
+
+    def _record(self, offset: int, length: int, entry: Dict[str, Any]) -> IndexRecord:
+        keys = tuple(_field(entry, name) for name in self.key_fields)
+        return offset, length, str(entry.get("timestamp") or ""), keys
+
+    def _migrate(self) -> None:
+        """Import the legacy JSON file (once, before the log exists)."""
+        if self.path.exists() or self.legacy_path is None or not self.legacy_path.exists():
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entries = self.legacy_entries(data) if self.legacy_entries else data
+            if not isinstance(entries, list):
+                raise ValueError("no list of entries")
+        except Exception as e:
+            logger.warning(f"[jsonl_log] Not importing unreadable log {self.legacy_path}: {e}")
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.legacy_path.unlink()
+        logger.info(f"[jsonl_log] Imported {len(entries)} entries from {self.legacy_path.name} into {self.path.name}")
+
+    def _index(self) -> List[IndexRecord]:
+        """Index records, parsing only what was added since the last call."""
+        key = str(self.index_path)
+        cached = _index_cache.get(key)
+        size = self.index_path.stat().st_size if self.index_path.exists() else 0
+        if cached is None or cached[0] > size:
+            cached = [0, []]
+        if cached[0] < size:
+            with open(self.index_path, "rb") as f:
+                f.seek(cached[0])
+                tail = f.read(size - cached[0])
+            parsed = cached[0]
+            records = cached[1]
+            for raw in tail.splitlines(keepends=True):
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    offset, length, timestamp, keys = json.loads(raw)
+                except ValueError:
+                    # A torn index line: rebuild the index from the log
+                    self._reset_index()
+                    return self._index()
+                records.append((offset, length, timestamp, tuple(keys)))
+                parsed += len(raw)
+            cached = [parsed, records]
+        _index_cache.set(key, cached)
+        return cached[1]
+
+    def _reset_index(self) -> None:
+        _index_cache.pop(str(self.index_path))
+        try:
+            self.index_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _write_index(self, records: List[IndexRecord]) -> None:
+        lines = b"".join(
+            json.dumps([offset, length, timestamp, list(keys)], ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+            for offset, length, timestamp, keys in records
+        )
+        with open(self.index_path, "ab") as f:
+            f.write(lines)
+
+    def _sync(self, truncate_torn: bool = False) -> List[IndexRecord]:
+        """
+        Bring the index up to date with the log (caller holds the lock).
+
+        Args:
+            truncate_torn: Cut off a torn last line (writers, before appending)
+
+        Returns:
+            Index records
+        """
+        self._migrate()
+        size = self.path.stat().st_size if self.path.exists() else 0
+        records = self._index()
+        end = records[-1][0] + records[-1][1] if records else 0
+        if end > size:
+            # The log was replaced or truncated: rebuild
+            self._reset_index()
+            records, end = self._index(), 0
+        if end < size:
+            with open(self.path, "rb") as f:
+                f.seek(end)
+                tail = f.read(size - end)
+            new_records = []
+            position = end
+            for raw in tail.splitlines(keepends=True):
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    new_records.append(self._record(position, len(raw), json.loads(raw)))
+                except ValueError:
+                    logger.warning(f"[jsonl_log] Skipping unreadable entry at byte {position} of {self.path.name}")
+                position += len(raw)
+            if new_records:
+                self._write_index(new_records)
+                records = self._index()
+            if truncate_torn and position < size:
+                logger.warning(f"[jsonl_log] Removing torn last entry of {self.path.name}")
+                with open(self.path, "r+b") as f:
+                    f.truncate(position)
+        return records
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Append one entry."""
+        line = json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+        with _lock_for(self.path):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._sync(truncate_torn=True)
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            self._write_index([self._record(offset, len(line), entry)])
+        _fsync_later(self.path, self.index_path)
+
+    def read(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        since: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        newest_first: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read a page of entries.
+
+        Args:
+            filters: Key field -> required value (fields must be key_fields)
+            since: Only entries with a timestamp after this ISO timestamp
+                (compared as a string: pass datetime.isoformat() output)
+            offset: Matching entries to skip
+            limit: Maximum entries to return (None = all)
+            newest_first: Page from the most recent entry backwards
+
+        Returns:
+            Tuple of (entries, number of matching entries)
+
+        Raises:
+            ValueError: If a filter field is not a key field
+        """
+        conditions = []
+        for name, value in (filters or {}).items():
+            if name not in self.key_fields:
+                raise ValueError(f"Cannot filter on '{name}'. Use one of: {', '.join(self.key_fields)}")
+            conditions.append((self.key_fields.index(name), value))
+
+        with _lock_for(self.path):
+            records = self._sync()
+
+        selected = [
+            record for record in records
+            if (since is None or record[2] > since) and all(record[3][i] == value for i, value in conditions)
+        ]
+        total = len(selected)
+        if newest_first:
+            selected.reverse()
+        page = selected[offset:] if limit is None else selected[offset:offset + limit]
+
+        entries = []
+        if page:
+            with open(self.path, "rb") as f:
+                for record_offset, length, _, _ in page:
+                    f.seek(record_offset)
+                    entries.append(json.loads(f.read(length)))
+        return entries, total
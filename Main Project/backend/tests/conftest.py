@@ -0,0 +1,34 @@
+"""Shared pytest setup for the backend tests (run from Main Project/backend)."""
+
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Make the app package importable wherever pytest is started from
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def workspace_id(tmp_path, monkeypatch):
+    """
+    A fresh workspace in a temporary workspaces directory.
+
+    Every module that imported WORKSPACES_DIR (and the file registry) is
+    pointed at tmp_path, so tests never touch backend/workspaces. The
+    workspace id is unique, so in-memory caches keyed by it start empty.
+    """
+    import app.config
+    import app.services.file_registry as file_registry
+
+    workspaces_dir = tmp_path / "workspaces"
+    workspaces_dir.mkdir()
+    for name, module in list(sys.modules.items()):
+        if (name == "app" or name.startswith("app.")) and hasattr(module, "WORKSPACES_DIR"):
+            monkeypatch.setattr(module, "WORKSPACES_DIR", workspaces_dir)
+    monkeypatch.setattr(file_registry, "FILE_REGISTRY_PATH", workspaces_dir / ".file_registry.json")
+    # Paths resolved against the working directory stay inside tmp_path too
+    monkeypatch.chdir(tmp_path)
+    assert app.config.WORKSPACES_DIR == workspaces_dir
+    return f"test-{uuid.uuid4().hex[:12]}"
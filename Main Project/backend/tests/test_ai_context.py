@@ -0,0 +1,138 @@
+"""AI context bundles: caching per dataset state and fitting to a token budget."""
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.ai_context as ai_context
+from app.config import get_workspace_datasets_dir
+from app.main import app
+from app.services.ai_context import estimate_tokens, fit_context_bundle, generate_ai_context_bundle
+from app.services.operation_logs import append_operation_log
+
+ROWS = 200
+
+
+@pytest.fixture
+def dataset_id(workspace_id):
+    """A wide dataset: informative numeric columns, constants and an identifier."""
+    rng = np.random.default_rng(0)
+    columns = {"order_code": [f"o{i}" for i in range(ROWS)], "constant": ["same"] * ROWS}
+    for i in range(30):
+        values = rng.normal(50, 10, ROWS).round(1)
+        values[rng.choice(ROWS, i * 3, replace=False)] = np.nan
+        columns[f"n{i:02d}"] = values
+    for i in range(10):
+        columns[f"c{i}"] = rng.choice(["a", "b", "c"], ROWS)
+    pd.DataFrame(columns).to_csv(get_workspace_datasets_dir(workspace_id) / "wide.csv", index=False)
+    # Replayed into the current state: n00 has no missing values, so the rows stay
+    for i in range(12):
+        append_operation_log(workspace_id, "wide.csv", "missing_values", "n00", "numeric", "drop", 0)
+    return "wide.csv"
+
+
+def _names(bundle, section="schema"):
+    return [col["name"] for col in bundle[section]["columns"]]
+
+
+def _full(bundle):
+    return [col["name"] for col in bundle["schema"]["columns"] if "unique_count" in col]
+
+
+def test_without_budget_the_full_bundle_is_returned(workspace_id, dataset_id):
+    bundle = generate_ai_context_bundle(workspace_id, dataset_id)
+
+    assert "context_budget" not in bundle
+    assert len(bundle["schema"]["columns"]) == len(bundle["dataset_summary"]["columns"]) == 42
+    assert bundle["logs"]["total_operations"] == 12
+    assert fit_context_bundle(bundle) is bundle
+
+
+def test_max_columns_keeps_the_most_informative_columns(workspace_id, dataset_id):
+    bundle = generate_ai_context_bundle(workspace_id, dataset_id)
+    original = copy.deepcopy(bundle)
+
+    fitted = fit_context_bundle(bundle, max_columns=5)
+
+    assert bundle == original
+    # Columns stay in dataset order; numeric columns with the lowest health score rank first
+    assert _names(fitted) == _names(bundle) and _names(fitted, "dataset_summary") == _names(bundle)
+    numeric = [col for col in bundle["dataset_summary"]["columns"] if col["canonical_type"] == "numeric"]
+    expected = sorted(numeric, key=lambda col: col["health_score"])[:5]
+    assert _full(fitted) == [name for name in _names(bundle) if name in {col["name"] for col in expected}]
+    assert max(col["health_score"] for col in expected) < 80
+    compacted = next(col for col in fitted["schema"]["columns"] if col["name"] == "constant")
+    assert set(compacted) == {"name", "canonical_type"}
+    assert fitted["context_budget"]["full_columns"] == 5
+    assert fitted["context_budget"]["compacted_columns"] == 37
+
+
+def test_uninformative_columns_are_cut_first(workspace_id, dataset_id):
+    bundle = generate_ai_context_bundle(workspace_id, dataset_id)
+
+    fitted = fit_context_bundle(bundle, max_columns=40)
+
+    assert set(_names(bundle)) - set(_full(fitted)) == {"order_code", "constant"}
+
+
+def test_token_budget_compacts_then_drops_operations_then_columns(workspace_id, dataset_id):
+    bundle = generate_ai_context_bundle(workspace_id, dataset_id)
+    full_tokens = estimate_tokens(bundle)
+
+    previous = None
+    for max_tokens in range(full_tokens, 200, -250):
+        fitted = fit_context_bundle(bundle, max_tokens=max_tokens)
+        budget = fitted["context_budget"]
+        assert budget["estimated_tokens"] == estimate_tokens(fitted)
+        assert budget["estimated_tokens"] <= max_tokens
+        assert len(fitted["logs"]["operations"]) == 12 - budget["omitted_operations"]
+        # Operations go only once every column is compacted, columns only once every operation is gone
+        if budget["omitted_operations"]:
+            assert budget["full_columns"] == 0
+        if budget["omitted_columns"]:
+            assert budget["omitted_operations"] == 12
+        if previous is not None:
+            assert budget["full_columns"] <= previous["full_columns"]
+            assert budget["omitted_columns"] >= previous["omitted_columns"]
+        previous = budget
+    assert previous["omitted_columns"] > 0
+    # The oldest operations are the ones left out
+    partial = next(
+        fit_context_bundle(bundle, max_tokens=t) for t in range(full_tokens, 0, -10)
+        if 0 < fit_context_bundle(bundle, max_tokens=t)["context_budget"]["omitted_operations"] < 12
+    )
+    assert partial["logs"]["operations"] == bundle["logs"]["operations"][-len(partial["logs"]["operations"]):]
+
+
+def test_bundle_is_cached_per_dataset_state(workspace_id, dataset_id, monkeypatch):
+    first = generate_ai_context_bundle(workspace_id, dataset_id)
+    profile = ai_context._profile_dataset
+
+    def fail(*args, **kwargs):
+        raise AssertionError("dataset was profiled")
+    monkeypatch.setattr(ai_context, "_profile_dataset", fail)
+    assert generate_ai_context_bundle(workspace_id, dataset_id) == first
+    # As after a restart: read from the workspace cache directory
+    ai_context._bundle_cache.clear()
+    assert generate_ai_context_bundle(workspace_id, dataset_id) == first
+
+    # A new logged operation is a new state
+    monkeypatch.setattr(ai_context, "_profile_dataset", profile)
+    append_operation_log(workspace_id, dataset_id, "missing_values", "n00", "numeric", "drop", 0)
+    assert generate_ai_context_bundle(workspace_id, dataset_id)["logs"]["total_operations"] == 13
+
+
+def test_ai_context_endpoint_budget(workspace_id, dataset_id):
+    client = TestClient(app)
+    url = f"/dataset/{dataset_id}/ai-context"
+
+    response = client.get(url, params={"workspace_id": workspace_id, "max_tokens": 1500})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["context_budget"]["estimated_tokens"] <= 1500
+    assert client.get(url, params={"workspace_id": workspace_id}).json()["context_budget"] is None
+    assert client.get(url, params={"workspace_id": workspace_id, "max_tokens": 0}).status_code == 422
+    assert client.get("/dataset/missing.csv/ai-context", params={"workspace_id": workspace_id}).status_code == 404
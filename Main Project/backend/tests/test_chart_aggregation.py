@@ -0,0 +1,118 @@
+"""Server-side chart aggregation: ordered X axes, downsampling and density grids."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import CHART_MAX_POINTS
+from app.services.chart_aggregation import OTHER_LABEL, aggregate_chart_data, aggregate_ordered, density_bins
+
+
+def test_line_over_dates_is_temporal_and_sorted():
+    df = pd.DataFrame({
+        "day": ["2024-01-03", "2024-01-01", "2024/01/02", "2024-01-01", "n/a"],
+        "sales": [3.0, 1.0, 2.0, 5.0, 9.0],
+    })
+    chart = aggregate_ordered(df, "day", "sales", "sum")
+    assert chart.x_type == "temporal"
+    assert [point["sales"] for point in chart.values] == [6.0, 2.0, 3.0]
+
+
+def test_line_over_categories_keeps_first_appearance_order():
+    df = pd.DataFrame({
+        "region": ["North", "South", "North", "East", "West", "South"],
+        "sales": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+    chart = aggregate_chart_data(df, "line", "region", "sales", "sum")
+    assert chart.x_type == "ordinal"
+    assert chart.values == [
+        {"region": "North", "sales": 4.0},
+        {"region": "South", "sales": 8.0},
+        {"region": "East", "sales": 4.0},
+        {"region": "West", "sales": 5.0},
+    ]
+
+
+def test_month_names_are_categories_not_dates():
+    months = ["Jan", "Feb", "Mar", "Apr"]
+    df = pd.DataFrame({"month": months * 2, "visits": range(8)})
+    chart = aggregate_ordered(df, "month", "visits", "avg")
+    assert chart.x_type == "ordinal"
+    assert [point["month"] for point in chart.values] == months
+
+
+def test_many_categories_keep_the_top_n_plus_other():
+    labels = [f"item{i}" for i in range(10)]
+    df = pd.DataFrame({"item": labels, "value": [float(i % 5) for i in range(10)]})
+    chart = aggregate_ordered(df, "item", "value", "sum", top_n=3)
+    assert chart.truncated
+    # The largest three in appearance order (item3 and item8 tie: the first one wins)
+    assert [point["item"] for point in chart.values] == ["item3", "item4", "item9", OTHER_LABEL]
+    assert chart.values[-1]["value"] == pytest.approx(20.0 - 3 - 4 - 4)
+
+
+def test_nothing_to_plot_is_an_error():
+    df = pd.DataFrame({"region": ["North", "South"], "note": ["a", "b"]})
+    with pytest.raises(ValueError, match="numeric value in 'note'"):
+        aggregate_ordered(df, "region", "note", "sum")
+    with pytest.raises(ValueError, match="no values"):
+        aggregate_ordered(pd.DataFrame({"region": [None, None]}, dtype=object), "region", None, "count")
+
+
+def _grid_counts(chart, x_edges, y_edges) -> np.ndarray:
+    counts = np.zeros((len(x_edges) - 1, len(y_edges) - 1), dtype=np.int64)
+    for cell in chart.values:
+        i = int(np.argmin(np.abs(x_edges - cell["x_start"])))
+        j = int(np.argmin(np.abs(y_edges - cell["y_start"])))
+        counts[i, j] = cell["count"]
+    return counts
+
+
+@pytest.mark.parametrize("make_xy", [
+    lambda rng: (rng.normal(0, 1, 50_000), rng.normal(5, 3, 50_000)),
+    # Values on the cell edges, and the maximum in the last cell
+    lambda rng: (rng.integers(0, 41, 20_000).astype(float), rng.integers(-30, 31, 20_000).astype(float)),
+])
+def test_density_grid_matches_histogram2d(make_xy):
+    x, y = make_xy(np.random.default_rng(11))
+    df = pd.DataFrame({"x": x, "y": y})
+    chart = aggregate_chart_data(df, "scatter", "x", "y", None, {"density": True, "density_bins": [20, 15]})
+    assert chart.mode == "density" and chart.metadata()["points"] == len(chart.values)
+
+    expected, x_edges, y_edges = np.histogram2d(x, y, bins=(20, 15))
+    np.testing.assert_array_equal(_grid_counts(chart, x_edges, y_edges), expected.astype(np.int64))
+    assert sum(cell["count"] for cell in chart.values) == len(df)
+    assert all(cell["count"] > 0 for cell in chart.values)
+
+
+def test_density_is_automatic_on_large_datasets_and_skips_invalid_rows():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({"x": rng.normal(size=60_000), "y": rng.normal(size=60_000)})
+    df.loc[:99, "x"] = np.nan
+    df.loc[100:109, "y"] = np.inf
+    chart = aggregate_chart_data(df, "scatter", "x", "y", None, {"overlay_points": 250})
+    assert chart.mode == "density"
+    assert sum(cell["count"] for cell in chart.values) == len(df) - 110
+    assert len(chart.overlay) == 250 and all(np.isfinite(point["x"]) for point in chart.overlay)
+
+    # Explicitly off, or below the threshold: sampled points
+    assert aggregate_chart_data(df, "scatter", "x", "y", None, {"density": False}).mode == "aggregate"
+    assert aggregate_chart_data(df.iloc[:1_000], "scatter", "x", "y", None).mode == "aggregate"
+
+
+def test_density_grid_size_is_capped_and_validated():
+    bins_x, bins_y = density_bins((1_000, 500))
+    assert bins_x * bins_y <= CHART_MAX_POINTS and bins_x > bins_y
+    assert density_bins(40) == (40, 40)
+    for bad in (0, -3, 2.5, True, (10,), (10, "a"), "20"):
+        with pytest.raises(ValueError):
+            density_bins(bad)
+
+    df = pd.DataFrame({"x": np.arange(100.0), "y": np.ones(100)})
+    chart = aggregate_chart_data(df, "scatter", "x", "y", None, {"density": True, "overlay_points": 10**6})
+    # A constant Y gets a unit-wide range: a single row of cells around it
+    assert len({(cell["y_start"], cell["y_end"]) for cell in chart.values}) == 1
+    assert all(cell["y_start"] <= 1.0 < cell["y_end"] for cell in chart.values)
+    assert len(chart.values) + len(chart.overlay) <= CHART_MAX_POINTS
+    with pytest.raises(ValueError):
+        aggregate_chart_data(df, "scatter", "x", "y", None, {"density": True, "overlay_points": -1})
@@ -0,0 +1,102 @@
+"""Header-only schema probes and persisted column intelligence."""
+
+import json
+import time
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.workspaces as workspaces_api
+import app.services.dataset_loader as dataset_loader
+from app.config import SCHEMA_PROBE_ROWS, get_column_intelligence_file_path, get_workspace_datasets_dir
+from app.main import app
+from app.services.dataset_loader import probe_dataset_schema
+
+
+def _write(workspace_id: str, name: str, text: str) -> None:
+    (get_workspace_datasets_dir(workspace_id) / name).write_text(text, encoding="utf-8")
+
+
+def test_probe_reads_the_header_and_a_sample(workspace_id):
+    rows = "".join(f"{i};2024-01-{i % 28 + 1:02d};{i * 0.5}\n" for i in range(SCHEMA_PROBE_ROWS))
+    # A text value after the sample isn't seen by the probe
+    _write(workspace_id, "wide.csv", "order_id;order_date;price\n" + rows + "x;2024-02-01;n/a\n")
+
+    schema = probe_dataset_schema("wide.csv", workspace_id)
+    assert list(schema) == ["order_id", "order_date", "price"]
+    assert schema["order_id"] == "int64" and schema["price"] == "float64"
+    assert list(probe_dataset_schema("wide.csv", workspace_id, sample_rows=0)) == list(schema)
+
+    with pytest.raises(FileNotFoundError):
+        probe_dataset_schema("missing.csv", workspace_id)
+    _write(workspace_id, "empty.csv", "")
+    with pytest.raises(ValueError):
+        probe_dataset_schema("empty.csv", workspace_id)
+
+
+@pytest.fixture
+def client(workspace_id, monkeypatch):
+    _write(workspace_id, "orders.csv", "order_id,city,price\n1,north,2.5\n2,south,3.0\n")
+
+    def no_full_load(*args, **kwargs):
+        raise AssertionError("column intelligence must not load the whole dataset")
+
+    monkeypatch.setattr(dataset_loader, "load_dataset", no_full_load)
+    monkeypatch.setattr(workspaces_api, "load_dataset", no_full_load)
+    return TestClient(app)
+
+
+def _post(client, workspace_id, dataset_id="orders.csv", regenerate=False):
+    return client.post(
+        f"/workspaces/{workspace_id}/column-intelligence", json={"datasetId": dataset_id, "regenerate": regenerate}
+    )
+
+
+def _get(client, workspace_id, **params):
+    return client.get(f"/workspaces/{workspace_id}/column-intelligence", params=params)
+
+
+def test_generate_persist_and_regenerate(workspace_id, client):
+    assert _get(client, workspace_id).status_code == 404
+    first = _post(client, workspace_id).json()["intelligence"]
+    assert [(col["name"], col["data_type"]) for col in first["columns"]] == [
+        ("order_id", "numeric"), ("city", "categorical"), ("price", "numeric"),
+    ]
+
+    time.sleep(0.01)
+    assert _post(client, workspace_id).json()["intelligence"] == first
+    assert _get(client, workspace_id, datasetId="orders.csv").json()["intelligence"] == first
+    regenerated = _post(client, workspace_id, regenerate=True).json()["intelligence"]
+    assert regenerated["generated_at"] > first["generated_at"]
+
+    assert _post(client, workspace_id, "missing.csv").status_code == 404
+
+
+def test_content_changes_keep_and_column_changes_drop_the_result(workspace_id, client):
+    first = _post(client, workspace_id).json()["intelligence"]
+    record_path = get_column_intelligence_file_path(workspace_id, "orders.csv")
+    old_fingerprint = json.loads(record_path.read_text())["fingerprint"]
+
+    # New rows, same columns: still valid, re-tagged with the new fingerprint
+    _write(workspace_id, "orders.csv", "order_id,city,price\n1,north,2.5\n2,south,3.0\n3,east,9.5\n")
+    assert _get(client, workspace_id, datasetId="orders.csv").json()["intelligence"] == first
+    assert json.loads(record_path.read_text())["fingerprint"] != old_fingerprint
+
+    # A changed column type invalidates it
+    _write(workspace_id, "orders.csv", "order_id,city,price\n1,north,cheap\n")
+    assert _get(client, workspace_id, datasetId="orders.csv").status_code == 404
+    columns = _post(client, workspace_id).json()["intelligence"]["columns"]
+    assert columns[2]["data_type"] == "categorical"
+
+
+def test_workspace_lookup_returns_the_latest_valid_result(workspace_id, client):
+    _write(workspace_id, "visits.csv", "visit_date,count\n2024-01-01,3\n")
+    orders = _post(client, workspace_id).json()["intelligence"]
+    time.sleep(0.01)
+    visits = _post(client, workspace_id, "visits.csv").json()["intelligence"]
+    assert _get(client, workspace_id).json()["intelligence"] == visits
+
+    # The latest one went stale: the previous one is served
+    _write(workspace_id, "visits.csv", "day,visitors,source\n1,2,web\n")
+    assert _get(client, workspace_id).json()["intelligence"] == orders
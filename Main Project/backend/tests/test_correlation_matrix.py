@@ -0,0 +1,73 @@
+"""The correlation matrix must match pandas pairwise-complete corr."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import get_workspace_datasets_dir
+from app.services.correlation_matrix import (
+    build_correlation_matrix,
+    coerce_numeric_columns,
+    get_correlation_matrix,
+    pairwise_correlation,
+)
+
+
+def _frame(rows: int = 5_000) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    base = rng.normal(size=rows)
+    df = pd.DataFrame({
+        "a": base * 1e6 + 3e9,  # large offset: sums must stay well conditioned
+        "b": base + rng.normal(scale=0.5, size=rows),
+        "c": rng.integers(0, 10, rows),
+        "d": -base + rng.normal(scale=2.0, size=rows),
+        "constant": 4.0,
+    })
+    # Missing values in different rows per column
+    for col, share in (("a", 0.1), ("b", 0.3), ("d", 0.05)):
+        df.loc[rng.random(rows) < share, col] = np.nan
+    # Only two complete pairs with "a"
+    df["sparse"] = np.nan
+    df.loc[df.index[df["a"].notna()][:2], "sparse"] = [1.0, 2.0]
+    return df
+
+
+def _pair_counts(df: pd.DataFrame) -> np.ndarray:
+    mask = df.notna().to_numpy(dtype=int)
+    return mask.T @ mask
+
+
+@pytest.mark.parametrize("chunk_rows", [100_000, 977])
+def test_pearson_matches_pandas(chunk_rows):
+    df = _frame()
+    r, n = pairwise_correlation(coerce_numeric_columns(df, df.columns), chunk_rows=chunk_rows)
+    expected = df.corr(method="pearson").to_numpy()
+
+    np.testing.assert_allclose(r, expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(np.isnan(r), np.isnan(expected))
+    np.testing.assert_array_equal(n, _pair_counts(df))
+
+
+def test_spearman_matches_pandas_without_missing_values():
+    df = _frame().drop(columns=["sparse"]).dropna()
+    matrix = build_correlation_matrix(df, list(df.columns), method="spearman")
+    np.testing.assert_allclose(matrix.r, df.corr(method="spearman").to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_non_numeric_values_are_missing():
+    df = pd.DataFrame({"x": ["1", "2", "n/a", "4", "5"], "y": [2.0, 4.1, 6.0, 7.9, 10.2]})
+    matrix = build_correlation_matrix(df, ["x", "y"])
+    expected = pd.to_numeric(df["x"], errors="coerce").corr(df["y"])
+    assert matrix.row("x")["y"] == (pytest.approx(expected), 4)
+
+
+def test_cached_matrix_round_trips(workspace_id):
+    df = _frame(500)
+    df.to_csv(get_workspace_datasets_dir(workspace_id) / "frame.csv", index=False)
+    columns = ["a", "b", "c", "d"]
+    built = get_correlation_matrix(workspace_id, "frame.csv", df, columns)
+    # A different (empty) frame: the cached matrix must be used
+    cached = get_correlation_matrix(workspace_id, "frame.csv", df.iloc[:0], columns)
+    assert cached.columns == built.columns
+    np.testing.assert_array_equal(cached.r, built.r)
+    np.testing.assert_array_equal(cached.n, built.n)
@@ -0,0 +1,77 @@
+"""Streaming dataset export endpoint."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.dataset_export as dataset_export
+from app.config import get_workspace_datasets_dir
+from app.main import app
+
+
+@pytest.fixture
+def dataset(workspace_id):
+    df = pd.DataFrame({
+        "id": np.arange(25),
+        "name": [f"n{i}" for i in range(25)],
+        "score": [float(i) / 2 if i % 4 else None for i in range(25)],
+    })
+    df.to_csv(get_workspace_datasets_dir(workspace_id) / "scores.csv", index=False)
+    return df
+
+
+def _export(workspace_id: str, **params):
+    client = TestClient(app)
+    return client.get(f"/workspaces/{workspace_id}/datasets/scores.csv/export", params=params)
+
+
+def _ndjson(response) -> list:
+    return [json.loads(line) for line in response.content.decode("utf-8").splitlines()]
+
+
+def test_default_format_follows_pyarrow(workspace_id, dataset):
+    response = _export(workspace_id)
+    assert response.status_code == 200, response.text
+    if dataset_export.HAS_PYARROW:
+        assert response.headers["content-disposition"].endswith('scores.parquet"')
+    else:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = _ndjson(response)
+        assert [record["id"] for record in records] == list(range(25))
+        assert records[0]["score"] is None
+
+
+def test_ndjson_streams_across_batches(workspace_id, dataset, monkeypatch):
+    # Several CSV chunks per export, the row range crossing chunk boundaries
+    monkeypatch.setattr(dataset_export, "EXPORT_BATCH_ROWS", 4)
+    response = _export(workspace_id, format="ndjson", columns="score,id", rows="3:18")
+    assert response.status_code == 200, response.text
+    records = _ndjson(response)
+    assert [list(record) for record in records] == [["score", "id"]] * 15
+    assert [record["id"] for record in records] == list(range(3, 18))
+    assert records[1]["score"] is None and records[2]["score"] == 2.5
+
+
+@pytest.mark.parametrize("params", [
+    {"format": "xlsx"},
+    {"format": "ndjson", "columns": "id,missing"},
+    {"format": "ndjson", "columns": "id,id"},
+    {"format": "ndjson", "rows": "10:5"},
+    {"format": "ndjson", "rows": "ten"},
+])
+def test_invalid_requests_are_rejected(workspace_id, dataset, params):
+    assert _export(workspace_id, **params).status_code == 400
+
+
+def test_arrow_formats_without_pyarrow_are_rejected(workspace_id, dataset, monkeypatch):
+    monkeypatch.setattr(dataset_export, "HAS_PYARROW", False)
+    response = _export(workspace_id, format="feather")
+    assert response.status_code == 400
+    assert "pyarrow" in response.json()["detail"]
+
+
+def test_missing_dataset_is_404(workspace_id):
+    assert _export(workspace_id, format="ndjson").status_code == 404
@@ -0,0 +1,122 @@
+"""Streaming single-request uploads and the resumable upload protocol."""
+
+import time
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.workspaces as workspaces_api
+from app.config import get_workspace_datasets_dir, get_workspace_uploads_dir
+from app.main import app
+from app.services.dataset_loader import load_dataset
+
+
+def _csv(rows: int, sep: str = ",") -> bytes:
+    lines = [sep.join(["id", "city", "price"])]
+    lines += [sep.join([str(i), f"city{i % 7}", f"{i * 1.5:.1f}"]) for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _wait_for_job(client: TestClient, job_id: str) -> dict:
+    # Wait for post-processing, which must not outlive the test's workspace
+    for _ in range(600):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def _leftovers(workspace_id: str) -> list:
+    return [path.name for path in get_workspace_uploads_dir(workspace_id).iterdir()]
+
+
+def test_multipart_upload_streams_to_the_dataset(workspace_id, monkeypatch):
+    # Small chunks, so the file field spans many parser writes
+    monkeypatch.setattr(workspaces_api, "UPLOAD_CHUNK_SIZE", 4096)
+    content = _csv(20_000, sep=";")
+    client = TestClient(app)
+    response = client.post(
+        f"/workspaces/{workspace_id}/datasets/upload",
+        data={"note": "ignored"},
+        files={"file": ("homes.csv", content, "text/csv")},
+    )
+    assert response.status_code == 200, response.text
+    info = response.json()
+    assert (info["id"], info["rows"], info["columns"], info["size"]) == ("homes.csv", 20_000, 3, len(content))
+    assert _wait_for_job(client, info["job_id"])["status"] == "succeeded"
+
+    # Stored byte for byte, then normalized to commas by the post-processing job
+    df = load_dataset("homes.csv", workspace_id)
+    assert list(df.columns) == ["id", "city", "price"]
+    assert len(df) == 20_000 and df["price"].iloc[-1] == pytest.approx(19_999 * 1.5)
+    assert _leftovers(workspace_id) == []
+
+
+@pytest.mark.parametrize("files, data, detail", [
+    ({"file": ("notes.txt", b"a,b\n1,2\n", "text/plain")}, None, "Only CSV"),
+    ({"file": ("../escape.csv", b"a,b\n1,2\n", "text/csv")}, None, "Invalid filename"),
+    ({"file": ("empty.csv", b"", "text/csv")}, None, "empty"),
+    ({"other": ("data.csv", b"a,b\n1,2\n", "text/csv")}, None, "Missing 'file'"),
+    ({"file": (None, b"not a file")}, None, "Only CSV"),
+])
+def test_invalid_uploads_are_rejected(workspace_id, files, data, detail):
+    client = TestClient(app)
+    response = client.post(f"/workspaces/{workspace_id}/datasets/upload", files=files, data=data)
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+    assert not any(get_workspace_datasets_dir(workspace_id).iterdir())
+    assert _leftovers(workspace_id) == []
+
+
+def test_non_multipart_body_is_rejected(workspace_id):
+    client = TestClient(app)
+    response = client.post(
+        f"/workspaces/{workspace_id}/datasets/upload", content=b"a,b\n1,2\n", headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 400
+
+
+def test_resumable_upload_out_of_order_with_retry(workspace_id):
+    content = _csv(5_000)
+    parts = [content[i:i + 20_000] for i in range(0, len(content), 20_000)]
+    client = TestClient(app)
+    base = f"/workspaces/{workspace_id}/uploads"
+    session = client.post(base, json={"filename": "big.csv", "total_size": len(content)}).json()
+    upload_url = f"{base}/{session['upload_id']}"
+
+    for number in reversed(range(1, len(parts) + 1)):
+        response = client.put(f"{upload_url}/parts/{number}", content=parts[number - 1])
+        assert response.status_code == 200, response.text
+        assert response.json()["size"] == len(parts[number - 1])
+    # Re-sending a part (e.g. after a lost response) replaces it
+    assert client.put(f"{upload_url}/parts/1", content=parts[0]).status_code == 200
+
+    state = client.get(upload_url).json()
+    assert sorted(part["part_number"] for part in state["parts"]) == list(range(1, len(parts) + 1))
+    assert state["received_bytes"] == len(content)
+
+    response = client.post(f"{upload_url}/complete", json={"total_parts": len(parts)})
+    assert response.status_code == 200, response.text
+    info = response.json()
+    assert (info["rows"], info["size"]) == (5_000, len(content))
+    _wait_for_job(client, info["job_id"])
+    assert (get_workspace_datasets_dir(workspace_id) / "big.csv").read_bytes() == content
+    assert client.get(upload_url).status_code == 404
+
+
+def test_resumable_upload_checks_parts_and_can_be_aborted(workspace_id):
+    client = TestClient(app)
+    base = f"/workspaces/{workspace_id}/uploads"
+    upload_url = f"{base}/{client.post(base, json={'filename': 'big.csv'}).json()['upload_id']}"
+    assert client.put(f"{upload_url}/parts/2", content=b"4,5,6\n").status_code == 200
+    assert client.put(f"{upload_url}/parts/0", content=b"x").status_code == 400
+
+    response = client.post(f"{upload_url}/complete", json={"total_parts": 2})
+    assert response.status_code == 400 and "missing parts" in response.json()["detail"]
+
+    assert client.delete(upload_url).status_code == 200
+    assert client.get(upload_url).status_code == 404
+    assert client.post(f"{upload_url}/complete", json={}).status_code == 404
+    assert _leftovers(workspace_id) == []
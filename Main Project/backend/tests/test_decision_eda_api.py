@@ -0,0 +1,27 @@
+"""Request-level tests for the decision EDA endpoints."""
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.config import get_workspace_datasets_dir
+from app.main import app
+from app.services.insight_storage import list_insight_snapshots, save_insight_snapshot
+
+
+def test_delete_insights_endpoint(workspace_id):
+    pd.DataFrame({"price": [1.0, 2.0, 3.0], "city": ["a", "b", "a"]}).to_csv(
+        get_workspace_datasets_dir(workspace_id) / "homes.csv", index=False
+    )
+    for run in range(2):
+        save_insight_snapshot(workspace_id, "homes.csv", "price", {"run": run}, {"summary": f"run {run}"})
+    assert len(list_insight_snapshots(workspace_id, "homes.csv", latest_only=False)) == 2
+
+    client = TestClient(app)
+    response = client.post(
+        "/api/decision-eda/insights/delete",
+        json={"workspace_id": workspace_id, "dataset_id": "homes.csv", "decision_metric": "price"},
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"success": True, "deleted_count": 2}
+    assert list_insight_snapshots(workspace_id, "homes.csv", latest_only=False) == []
@@ -0,0 +1,141 @@
+"""Batch decision EDA: shared computation, per-metric errors and memoized stats."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.decision_eda as decision_eda_api
+import app.services.decision_eda_service as decision_eda_service
+from app.config import get_decision_eda_cache_dir, get_workspace_datasets_dir
+from app.main import app
+from app.services.compute_executor import run_io
+from app.services.decision_eda_service import compute_decision_eda_batch, compute_decision_eda_stats
+from app.services.jobs import get_job
+
+
+def _homes(rows: int = 300, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    size = rng.normal(120, 25, rows).round(1)
+    df = pd.DataFrame({
+        "price": (size * 2.5 + rng.normal(0, 20, rows)).round(1),
+        "size": size,
+        "rooms": rng.integers(1, 6, rows).astype(float),
+        "city": rng.choice(["north", "south", "east"], rows),
+        "note": rng.choice(["a", "b", "c"], rows),
+    })
+    df.loc[rng.choice(rows, 10, replace=False), "price"] = np.nan
+    return df
+
+
+@pytest.fixture
+def dataset_id(workspace_id):
+    _homes().to_csv(get_workspace_datasets_dir(workspace_id) / "homes.csv", index=False)
+    return "homes.csv"
+
+
+def _no_loads(monkeypatch):
+    """Fail the test if the dataset (or its cube) is read again."""
+    def fail(*args, **kwargs):
+        raise AssertionError("dataset was loaded")
+    monkeypatch.setattr(decision_eda_service, "load_dataset", fail)
+    monkeypatch.setattr(decision_eda_service, "load_eda_cube", fail)
+
+
+@pytest.mark.parametrize("correlation_method", ["pearson", "spearman"])
+def test_batch_matches_single_metric_results(workspace_id, dataset_id, correlation_method):
+    batch = compute_decision_eda_batch(
+        workspace_id, dataset_id, ["size", "price", "city"], correlation_method=correlation_method
+    )
+
+    assert list(batch["results"]) == ["size", "price"]
+    assert set(batch["errors"]) == {"city"}
+    decision_eda_service._stats_cache.clear()
+    for path in get_decision_eda_cache_dir(workspace_id).glob("*.json"):
+        path.unlink()
+    for metric, stats in batch["results"].items():
+        single = compute_decision_eda_stats(workspace_id, dataset_id, metric, correlation_method=correlation_method)
+        assert single == stats, metric
+    with pytest.raises(ValueError):
+        compute_decision_eda_stats(workspace_id, dataset_id, "city", correlation_method=correlation_method)
+
+
+def test_missing_metric_is_reported_not_raised(workspace_id, dataset_id):
+    batch = compute_decision_eda_batch(workspace_id, dataset_id, ["price", "nope"])
+
+    assert list(batch["results"]) == ["price"]
+    assert "nope" in batch["errors"]
+
+
+def test_repeated_request_is_answered_from_memory_and_disk(workspace_id, dataset_id, monkeypatch):
+    first = compute_decision_eda_batch(
+        workspace_id, dataset_id, ["price", "size", "city"], correlation_method="spearman"
+    )
+    _no_loads(monkeypatch)
+
+    assert compute_decision_eda_batch(
+        workspace_id, dataset_id, ["price", "size", "city"], correlation_method="spearman"
+    ) == first
+    # As after a restart: only the on-disk tier is left
+    decision_eda_service._stats_cache.clear()
+    assert compute_decision_eda_batch(
+        workspace_id, dataset_id, ["price", "size", "city"], correlation_method="spearman"
+    ) == first
+    assert compute_decision_eda_stats(
+        workspace_id, dataset_id, "size", correlation_method="spearman"
+    ) == first["results"]["size"]
+
+
+def test_changed_dataset_is_recomputed(workspace_id, dataset_id):
+    before = compute_decision_eda_stats(workspace_id, dataset_id, "price")
+
+    _homes(seed=9).to_csv(get_workspace_datasets_dir(workspace_id) / dataset_id, index=False)
+    after = compute_decision_eda_stats(workspace_id, dataset_id, "price")
+
+    assert after != before
+    decision_eda_service._stats_cache.clear()
+    assert compute_decision_eda_stats(workspace_id, dataset_id, "price") == after
+
+
+def test_batch_endpoint(workspace_id, dataset_id, monkeypatch):
+    # Process pool workers don't see the temporary workspaces directory
+    monkeypatch.setattr(decision_eda_api, "run_cpu", run_io)
+    client = TestClient(app)
+    body = {"workspace_id": workspace_id, "dataset_id": dataset_id}
+
+    response = client.post("/api/decision-eda/batch", json={**body, "decision_metrics": ["price", "price", "city"]})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert list(data["results"]) == ["price"] and list(data["errors"]) == ["city"]
+    assert data["results"]["price"]["decision_metric"] == "price"
+
+    assert client.post("/api/decision-eda/batch", json={**body, "decision_metrics": []}).status_code == 400
+    too_many = [f"m{i}" for i in range(21)]
+    assert client.post("/api/decision-eda/batch", json={**body, "decision_metrics": too_many}).status_code == 400
+    response = client.post(
+        "/api/decision-eda/batch", json={**body, "dataset_id": "missing.csv", "decision_metrics": ["price"]}
+    )
+    assert response.status_code == 404
+    response = client.post(
+        "/api/decision-eda/batch", json={**body, "decision_metrics": ["price"], "correlation_method": "kendall"}
+    )
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_in_background(workspace_id, dataset_id):
+    client = TestClient(app)
+    response = client.post(
+        "/api/decision-eda/batch",
+        json={
+            "workspace_id": workspace_id,
+            "dataset_id": dataset_id,
+            "decision_metrics": ["size", "city"],
+            "background": True,
+        },
+    )
+
+    assert response.status_code == 202, response.text
+    job = get_job(response.json()["id"], workspace_id)
+    job._future.result(timeout=30)
+    assert job.status == "succeeded", job.error
+    assert list(job.result["results"]) == ["size"] and list(job.result["errors"]) == ["city"]
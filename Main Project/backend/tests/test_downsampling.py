@@ -0,0 +1,133 @@
+"""LTTB and min/max downsampling of trend series."""
+
+import ast
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.chart_aggregation import aggregate_chart_data
+from app.services.downsampling import downsample_indices, lttb_indices, minmax_indices, target_points
+
+# The intent-based chart service keeps its own copy of the kernels
+DATA_VIZ_MAIN = Path(__file__).resolve().parents[3] / "Data viz" / "backend" / "main.py"
+
+
+def _series(n: int = 20_000, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    x = np.sort(rng.uniform(0, 1_000, n))
+    y = np.sin(x / 40) + rng.normal(0, 0.1, n)
+    y[n // 3] = 25.0  # A spike
+    y[2 * n // 3] = -25.0  # An outage
+    return x, y
+
+
+def _reference_lttb(x, y, threshold):
+    """The textbook LTTB loop (Steinarsson 2013), one point at a time."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(math.floor(i * every)) + 1, int(math.floor((i + 1) * every)) + 1
+        avg_start, avg_end = end, min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return selected + [n - 1]
+
+
+@pytest.mark.parametrize("n, threshold", [(1_000, 50), (1_003, 97), (5_000, 1_400)])
+def test_lttb_matches_the_reference_algorithm(n, threshold):
+    x, y = _series(n)
+    # The reference uses X relative to the first point, like the kernel
+    expected = _reference_lttb(list(x - x[0]), list(y), threshold)
+    assert lttb_indices(x, y, threshold).tolist() == expected
+
+
+def test_lttb_keeps_ends_and_spikes():
+    x, y = _series()
+    keep = lttb_indices(x, y, 300)
+    assert len(keep) == 300 and keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert len(x) // 3 in keep and 2 * len(x) // 3 in keep
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = _series()
+    threshold = 202
+    keep = set(minmax_indices(x, y, threshold).tolist())
+    assert len(keep) <= threshold and {0, len(x) - 1} <= keep
+
+    buckets = np.minimum(((x - x[0]) / (x[-1] - x[0]) * 100).astype(int), 99)
+    frame = pd.DataFrame({"bucket": buckets, "y": y})
+    for _, group in frame.groupby("bucket"):
+        assert group["y"].idxmin() in keep and group["y"].idxmax() in keep
+
+
+def test_datetime_x_and_small_series():
+    x, y = _series(3_000)
+    dates = (np.datetime64("2024-01-01") + (x * 1e6).astype("timedelta64[us]")).astype("datetime64[ns]")
+    for method in ("lttb", "minmax"):
+        # Dates are downsampled as their epoch values
+        keep = downsample_indices(dates, y, 100, method)
+        np.testing.assert_array_equal(keep, downsample_indices(dates.view("int64"), y, 100, method))
+        assert 0 < len(keep) <= 100
+        # Series that fit are kept whole
+        np.testing.assert_array_equal(downsample_indices(x[:50], y[:50], 100, method), np.arange(50))
+    with pytest.raises(ValueError):
+        downsample_indices(x, y, 100, "every_other")
+
+
+def test_target_points_follow_the_width():
+    assert target_points(700, 5_000) == 1_400
+    assert target_points(10_000, 5_000) == 5_000
+    assert target_points(None, 5_000) == 5_000
+    assert target_points(1, 5_000) == 3
+
+
+def test_line_chart_is_downsampled_to_the_width():
+    x, y = _series()
+    df = pd.DataFrame({"t": pd.Timestamp("2024-01-01") + pd.to_timedelta(x, unit="s"), "v": y})
+    chart = aggregate_chart_data(df, "line", "t", "v", "max", {"width": 200, "downsample": "minmax"})
+    assert chart.truncated and chart.x_type == "temporal" and len(chart.values) <= 400
+    values = [point["v"] for point in chart.values]
+    assert max(values) == 25.0 and min(values) == -25.0
+    assert [point["t"] for point in chart.values] == sorted(point["t"] for point in chart.values)
+
+
+def _load_data_viz_kernels() -> dict:
+    """Exec the kernels and downsample_trend from Data viz's main.py (its other imports aren't installed)."""
+    tree = ast.parse(DATA_VIZ_MAIN.read_text(encoding="utf-8"))
+    names = {"lttb_indices", "minmax_indices", "downsample_trend", "TREND_POINTS_PER_PIXEL"}
+    nodes = [
+        node for node in tree.body
+        if (isinstance(node, ast.FunctionDef) and node.name in names)
+        or (isinstance(node, ast.Assign) and any(getattr(t, "id", None) in names for t in node.targets))
+    ]
+    namespace = {"np": np, "pd": pd}
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), str(DATA_VIZ_MAIN), "exec"), namespace)
+    return namespace
+
+
+@pytest.mark.skipif(not DATA_VIZ_MAIN.exists(), reason="Data viz service not checked out")
+def test_data_viz_copy_matches():
+    kernels = _load_data_viz_kernels()
+    x, y = _series()
+    for name, own in (("lttb_indices", lttb_indices), ("minmax_indices", minmax_indices)):
+        for threshold in (4, 101, 1_200):
+            np.testing.assert_array_equal(kernels[name](x, y, threshold), own(x, y, threshold), err_msg=name)
+
+    # Unsorted input is time-sorted before downsampling
+    shuffled = pd.DataFrame({"x": x, "y": y}).sample(frac=1, random_state=0)
+    trend = kernels["downsample_trend"](shuffled, "x", "y", width=100)
+    assert len(trend) == 100 * kernels["TREND_POINTS_PER_PIXEL"]
+    assert trend["x"].is_monotonic_increasing and trend["y"].max() == 25.0
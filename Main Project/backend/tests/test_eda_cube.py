@@ -0,0 +1,106 @@
+"""The incrementally updated EDA cube must match a cube rebuilt from the cleaned rows."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import get_workspace_datasets_dir
+from app.services.dataset_fingerprint import get_dataset_fingerprint
+from app.services.dataset_loader import load_dataset, save_dataset
+from app.services.decision_eda_service import DecisionEDAContext, build_eda_cube, update_eda_cube
+from app.services.duplicates import handle_duplicates
+from app.services.eda_cube import load_eda_cube, save_eda_cube
+from app.services.missing_values import handle_missing_values
+from app.services.outliers import handle_outliers
+
+
+def _homes(rows: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        "price": rng.normal(300, 40, rows).round(1),
+        "size": rng.normal(120, 25, rows).round(1),
+        "rooms": rng.integers(1, 6, rows).astype(float),
+        "city": rng.choice(["north", "south", "east", "west"], rows),
+        "kind": rng.choice(["flat", "house", "loft"], rows),
+    })
+    df.loc[rng.choice(rows, 30, replace=False), "price"] = np.nan
+    df.loc[rng.choice(rows, 20, replace=False), "rooms"] = np.nan
+    df.loc[rng.choice(rows, 15, replace=False), "city"] = np.nan
+    df.loc[rng.choice(rows, 6, replace=False), "size"] = [900.0, 850.0, 5.0, 1000.0, 2.0, 950.0]
+    # Exact duplicates of the first rows
+    return pd.concat([df, df.iloc[:12]], ignore_index=True)
+
+
+def _build_cube(workspace_id: str, dataset_id: str, df: pd.DataFrame):
+    context = DecisionEDAContext(workspace_id, dataset_id, df)
+    return build_eda_cube(context, get_dataset_fingerprint(workspace_id, dataset_id))
+
+
+def _segments(table) -> dict:
+    return {
+        label: (table.rows[i], table.counts[i], table.sums[i], table.squares[i])
+        for i, label in enumerate(table.labels)
+    }
+
+
+def _assert_same_cube(updated, rebuilt) -> None:
+    assert updated.rows == rebuilt.rows
+    assert updated.columns == rebuilt.columns
+    assert updated.column_types == rebuilt.column_types
+    assert updated.exclusions == rebuilt.exclusions
+    assert updated.numeric == rebuilt.numeric
+
+    # The pair sums depend on each cube's shift; the correlations don't
+    r_updated, n_updated = updated.correlations()
+    r_rebuilt, n_rebuilt = rebuilt.correlations()
+    np.testing.assert_array_equal(n_updated, n_rebuilt)
+    np.testing.assert_allclose(r_updated, r_rebuilt, rtol=1e-9, atol=1e-12)
+
+    assert updated.column_stats.keys() == rebuilt.column_stats.keys()
+    for col, stats in rebuilt.column_stats.items():
+        assert updated.column_stats[col] == pytest.approx(stats), col
+
+    assert updated.segments.keys() == rebuilt.segments.keys()
+    for col, table in rebuilt.segments.items():
+        expected = _segments(table)
+        actual = _segments(updated.segments[col])
+        assert actual.keys() == expected.keys(), col
+        for label, (rows, counts, sums, squares) in expected.items():
+            assert actual[label][0] == rows
+            np.testing.assert_array_equal(actual[label][1], counts)
+            np.testing.assert_allclose(actual[label][2], sums, rtol=1e-9)
+            np.testing.assert_allclose(actual[label][3], squares, rtol=1e-9)
+
+
+# (cleaning function, its arguments after the DataFrame, changed column)
+OPERATIONS = {
+    "drop missing": (handle_missing_values, ("price", "drop_rows"), "price"),
+    "fill mean": (handle_missing_values, ("price", "fill_mean"), "price"),
+    "fill constant": (handle_missing_values, ("city", "fill_custom", {"custom_value": "center"}), "city"),
+    "remove outliers": (handle_outliers, ("size", "IQR", "remove"), "size"),
+    "cap outliers": (handle_outliers, ("size", "IQR", "cap"), "size"),
+    "keep first duplicate": (handle_duplicates, ("keep_first",), None),
+    "remove all duplicates": (handle_duplicates, ("remove_all",), None),
+}
+
+
+@pytest.mark.parametrize("name", OPERATIONS)
+def test_incremental_update_matches_rebuild(workspace_id, name):
+    func, args, column = OPERATIONS[name]
+    _homes().to_csv(get_workspace_datasets_dir(workspace_id) / "homes.csv", index=False)
+    df_before = load_dataset("homes.csv", workspace_id)
+    assert save_eda_cube(workspace_id, "homes.csv", _build_cube(workspace_id, "homes.csv", df_before))
+
+    # As the cleaning endpoint applies an operation
+    df_after, affected_rows, _, affected_indices = func(df_before.copy(), *args)
+    assert affected_rows > 0
+    cleaned = save_dataset(df_after, "homes.csv", workspace_id=workspace_id, create_new_file=True)
+    assert update_eda_cube(
+        workspace_id, "homes.csv", cleaned, df_before, df_after,
+        changed_columns=[column] if column else [],
+        removed_rows=affected_indices if len(df_after) < len(df_before) else None,
+    )
+
+    updated = load_eda_cube(workspace_id, cleaned, get_dataset_fingerprint(workspace_id, cleaned), use_cache=False)
+    # Rebuilt from the same rows (a CSV round trip can move floats by an ulp)
+    _assert_same_cube(updated, _build_cube(workspace_id, cleaned, df_after))
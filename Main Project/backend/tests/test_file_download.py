@@ -0,0 +1,115 @@
+"""File downloads: byte ranges, ETags and conditional requests."""
+
+import json
+import os
+from email.utils import formatdate
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.file_transfer as file_transfer
+from app.config import get_workspace_datasets_dir, get_workspace_files_dir
+from app.main import app
+
+CONTENT = ("id,name,value\n" + "".join(f"{i},name{i},{i * 3}\n" for i in range(2000))).encode("utf-8")
+
+
+@pytest.fixture
+def client(workspace_id, monkeypatch):
+    # Several chunks per response
+    monkeypatch.setattr(file_transfer, "DOWNLOAD_CHUNK_SIZE", 1000)
+    (get_workspace_datasets_dir(workspace_id) / "data.csv").write_bytes(CONTENT)
+    return TestClient(app)
+
+
+def _get(client, workspace_id, file_id="data.csv", params=None, **headers):
+    return client.get(f"/workspaces/{workspace_id}/files/{file_id}/download", params=params, headers=headers)
+
+
+def test_full_download(workspace_id, client):
+    response = _get(client, workspace_id)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["content-length"] == str(len(CONTENT))
+    assert response.headers["accept-ranges"] == "bytes"
+    # Datasets have a strong ETag (content fingerprint)
+    assert response.headers["etag"].startswith('"')
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=10-1509", 10, 1509),
+    ("bytes=-25", len(CONTENT) - 25, len(CONTENT) - 1),
+    ("bytes=100-", 100, len(CONTENT) - 1),
+    ("bytes=0-999999999", 0, len(CONTENT) - 1),
+])
+def test_byte_ranges(workspace_id, client, header, start, end):
+    response = _get(client, workspace_id, range=header)
+    assert response.status_code == 206
+    assert response.content == CONTENT[start:end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+
+
+def test_unsupported_and_unsatisfiable_ranges(workspace_id, client):
+    # Several ranges or another unit: the full file
+    assert _get(client, workspace_id, range="bytes=0-1,5-9").content == CONTENT
+    assert _get(client, workspace_id, range="lines=1-2").status_code == 200
+
+    response = _get(client, workspace_id, range=f"bytes={len(CONTENT)}-")
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_conditional_requests(workspace_id, client):
+    first = _get(client, workspace_id)
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    assert _get(client, workspace_id, **{"if-none-match": etag}).status_code == 304
+    assert _get(client, workspace_id, **{"if-none-match": f'"other", W/{etag}'}).status_code == 304
+    assert _get(client, workspace_id, **{"if-modified-since": last_modified}).status_code == 304
+    # If-None-Match wins over If-Modified-Since
+    response = _get(client, workspace_id, **{"if-none-match": '"other"', "if-modified-since": last_modified})
+    assert response.status_code == 200
+
+    # A changed dataset gets a new ETag
+    path = get_workspace_datasets_dir(workspace_id) / "data.csv"
+    path.write_bytes(CONTENT + b"2000,name2000,6000\n")
+    os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+    response = _get(client, workspace_id, **{"if-none-match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+
+
+def test_if_range_resumes_only_unchanged_files(workspace_id, client):
+    etag = _get(client, workspace_id).headers["etag"]
+    response = _get(client, workspace_id, range="bytes=50-", **{"if-range": etag})
+    assert response.status_code == 206 and response.content == CONTENT[50:]
+
+    response = _get(client, workspace_id, range="bytes=50-", **{"if-range": '"stale"'})
+    assert response.status_code == 200 and response.content == CONTENT
+
+    old_date = formatdate(os.path.getmtime(get_workspace_datasets_dir(workspace_id) / "data.csv") - 3600, usegmt=True)
+    assert _get(client, workspace_id, range="bytes=50-", **{"if-range": old_date}).status_code == 200
+
+
+def test_weak_etag_for_other_files(workspace_id, client):
+    (get_workspace_files_dir(workspace_id) / "overview.json").write_text(json.dumps({"rows": 3}))
+    response = _get(client, workspace_id, "overview.json")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"') and response.json() == {"rows": 3}
+    assert _get(client, workspace_id, "overview.json", **{"if-none-match": etag}).status_code == 304
+    # A weak ETag never matches If-Range (strong comparison)
+    assert _get(client, workspace_id, "overview.json", range="bytes=0-1", **{"if-range": etag}).status_code == 200
+
+
+def test_gzip_on_request(workspace_id, client):
+    response = _get(client, workspace_id, params={"compress": True}, **{"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert response.content == CONTENT  # decoded by the client
+
+    # Ranges are always served uncompressed
+    ranged = _get(client, workspace_id, params={"compress": True}, range="bytes=0-9", **{"accept-encoding": "gzip"})
+    assert ranged.status_code == 206 and "content-encoding" not in ranged.headers
+
+
+def test_missing_file(workspace_id, client):
+    assert _get(client, workspace_id, "missing.csv").status_code == 404
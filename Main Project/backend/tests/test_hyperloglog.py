@@ -0,0 +1,74 @@
+"""Tests for the HyperLogLog distinct-count sketch."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.hyperloglog import HyperLogLog, hash_values
+
+
+def test_equal_values_hash_alike_across_dtypes():
+    ints = hash_values(pd.Series([1, 2, 3], dtype="int64"))
+    floats = hash_values(pd.Series([1.0, 2.0, 3.0]))
+    nullable = hash_values(pd.Series([1, 2, 3], dtype="Int64"))
+    objects = hash_values(pd.Series([1, 2.0, np.int32(3)], dtype=object))
+    assert (ints == floats).all()
+    assert (ints == nullable).all()
+    assert (ints == objects).all()
+    assert hash_values(pd.Series([-0.0]))[0] == hash_values(pd.Series([0]))[0]
+
+
+def test_mixed_object_column_hashes_numbers_canonically():
+    mixed = hash_values(pd.Series([1, "a"], dtype=object))
+    assert mixed[0] == hash_values(pd.Series([1.0]))[0]
+    assert mixed[1] == hash_values(pd.Series(["a"]))[0]
+
+
+def test_chunked_sketch_with_dtype_drift(tmp_path):
+    # A chunk with a missing value is read as float64, the others as int64
+    n = 200_000
+    values = pd.Series(np.arange(n), dtype="Int64")
+    values[n // 2 + 7] = pd.NA
+    path = tmp_path / "drift.csv"
+    pd.DataFrame({"v": values}).to_csv(path, index=False)
+
+    merged = HyperLogLog()
+    dtypes = set()
+    for chunk in pd.read_csv(path, chunksize=50_000):
+        dtypes.add(str(chunk["v"].dtype))
+        merged.merge(HyperLogLog.from_values(chunk["v"]))
+
+    assert dtypes == {"int64", "float64"}
+    assert abs(merged.estimate() - (n - 1)) <= 4 * merged.error * n
+
+
+def test_same_values_as_int_and_float_count_once():
+    values = np.arange(500_000)
+    sketch = HyperLogLog().update(pd.Series(values)).update(pd.Series(values.astype(float)))
+    assert abs(sketch.estimate() - len(values)) <= 4 * sketch.error * len(values)
+
+
+@pytest.mark.parametrize("distinct", [100, 5_000, 80_000, 1_000_000])
+def test_estimate_within_error_bound(distinct):
+    rng = np.random.default_rng(distinct)
+    # Every value at least once, in random order, with repeats
+    values = np.concatenate([np.arange(distinct), rng.integers(0, distinct, distinct // 2)])
+    rng.shuffle(values)
+    sketch = HyperLogLog.from_values(pd.Series(values).astype(str))
+    assert abs(sketch.estimate() - distinct) <= 4 * sketch.error * distinct
+
+
+def test_merged_chunks_match_single_sketch_and_survive_serialization():
+    values = pd.Series(np.arange(300_000)).astype(str)
+    whole = HyperLogLog.from_values(values)
+    merged = HyperLogLog()
+    for start in range(0, len(values), 70_000):
+        merged.merge(HyperLogLog.from_values(values[start:start + 70_000]))
+
+    # Registers are maxima, so merging is exact
+    assert (merged.registers == whole.registers).all()
+    restored = HyperLogLog.from_dict(json.loads(json.dumps(merged.to_dict())))
+    assert restored.estimate() == whole.estimate()
+    assert abs(whole.estimate() - len(values)) <= 4 * whole.error * len(values)
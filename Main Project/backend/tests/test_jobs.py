@@ -0,0 +1,113 @@
+"""Background jobs: lifecycle, cancellation, persistence and the jobs API."""
+
+import threading
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.jobs as jobs
+from app.config import get_workspace_datasets_dir, get_workspace_jobs_dir
+from app.main import app
+from app.services.jobs import Job, JobQueueFull, get_job, save_job, submit_job
+
+
+def _halves(job: Job, value: int) -> dict:
+    job.report(0.5, "halfway")
+    return {"value": value * 2}
+
+
+def _fails(job: Job) -> None:
+    raise RuntimeError("boom")
+
+
+def _blocks(job: Job, started: threading.Event, gate: threading.Event) -> str:
+    started.set()
+    gate.wait(10)
+    job.report(0.5)  # Raises JobCancelled if cancellation was requested
+    return "done"
+
+
+def _wait(job: Job) -> None:
+    job._future.result(timeout=10)
+
+
+def test_job_result_and_status_api(workspace_id):
+    job = submit_job("double", workspace_id, _halves, 21, params={"value": 21})
+    _wait(job)
+    assert (get_workspace_jobs_dir(workspace_id) / f"{job.id}.json").exists()
+
+    client = TestClient(app)
+    status = client.get(f"/jobs/{job.id}").json()
+    assert (status["status"], status["progress"], status["message"]) == ("succeeded", 1.0, "halfway")
+    assert status["result"] == {"value": 42}
+
+    listed = client.get("/jobs", params={"workspace_id": workspace_id}).json()["jobs"]
+    assert [item["id"] for item in listed] == [job.id]
+    assert listed[0]["result"] is None
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_failed_job_records_the_error(workspace_id):
+    job = submit_job("fail", workspace_id, _fails)
+    _wait(job)
+    assert (job.status, job.error) == ("failed", "boom")
+
+
+def test_cancel_queued_and_running_jobs(workspace_id):
+    gate = threading.Event()
+    blockers = []
+    try:
+        # Occupy every worker, so the next job stays queued
+        for _ in range(jobs._executor._max_workers):
+            started = threading.Event()
+            blockers.append(submit_job("block", workspace_id, _blocks, started, gate))
+            assert started.wait(10)
+        queued = submit_job("double", workspace_id, _halves, 1)
+        client = TestClient(app)
+
+        assert client.post(f"/jobs/{queued.id}/cancel").json()["status"] == "cancelled"
+        assert client.post(f"/jobs/{blockers[0].id}/cancel").json()["status"] == "running"
+    finally:
+        gate.set()
+    for job in blockers:
+        _wait(job)
+    assert [job.status for job in blockers] == ["cancelled"] + ["succeeded"] * (len(blockers) - 1)
+    assert queued.status == "cancelled" and queued.started_at is None
+
+
+def test_queue_limit(workspace_id, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_QUEUE_LIMIT", 0)
+    with pytest.raises(JobQueueFull):
+        submit_job("double", workspace_id, _halves, 1)
+
+
+def test_unfinished_job_from_before_a_restart_is_failed(workspace_id):
+    # Persisted as running, but not known to this process
+    save_job(Job("double", workspace_id, status="running"))
+    stored = next(get_workspace_jobs_dir(workspace_id).glob("*.json")).stem
+    job = get_job(stored, workspace_id)
+    assert job.status == "failed" and "restart" in job.error
+    assert get_job(stored).status == "failed"
+
+
+@pytest.fixture
+def outlier_dataset(workspace_id):
+    values = list(range(100)) + [10_000]
+    pd.DataFrame({"value": values}).to_csv(get_workspace_datasets_dir(workspace_id) / "values.csv", index=False)
+    return "values.csv"
+
+
+def test_outlier_analysis_in_the_background(workspace_id, outlier_dataset, monkeypatch):
+    client = TestClient(app)
+    url = f"/workspaces/{workspace_id}/datasets/{outlier_dataset}/outliers"
+    response = client.get(url, params={"background": True})
+    assert response.status_code == 202
+    job = get_job(response.json()["id"])
+    _wait(job)
+    assert job.status == "succeeded" and job.result["total_outliers"] == 1
+    # The job's result is cached for the next request
+    assert client.get(f"{url}/cached").json()["total_outliers"] == 1
+
+    monkeypatch.setattr(jobs, "JOB_QUEUE_LIMIT", 0)
+    assert client.get(url, params={"background": True, "force_recompute": True}).status_code == 503
@@ -0,0 +1,126 @@
+"""Tests for the append-only JSONL log and its offset index."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.operation_logs import append_operation_log
+from app.utils.jsonl_log import JSONLLog
+
+
+def _log(tmp_path, **kwargs) -> JSONLLog:
+    return JSONLLog(tmp_path / "ops.jsonl", tmp_path / "ops.idx", key_fields=("kind", "detail.column"), **kwargs)
+
+
+def _entries(count: int):
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "timestamp": (start + timedelta(minutes=i)).isoformat(),
+            "kind": "fill" if i % 3 else "drop",
+            "detail": {"column": f"c{i % 2}"},
+            "n": i,
+        }
+        for i in range(count)
+    ]
+
+
+def test_paging_and_filters(tmp_path):
+    log = _log(tmp_path)
+    entries = _entries(10)
+    for entry in entries:
+        log.append(entry)
+
+    page, total = log.read(offset=2, limit=3)
+    assert total == 10
+    assert [entry["n"] for entry in page] == [2, 3, 4]
+    page, total = log.read(limit=2, newest_first=True)
+    assert [entry["n"] for entry in page] == [9, 8]
+
+    page, total = log.read({"kind": "drop"})
+    assert [entry["n"] for entry in page] == [0, 3, 6, 9]
+    page, total = log.read({"kind": "fill", "detail.column": "c1"}, offset=1, limit=1)
+    assert total == 3 and [entry["n"] for entry in page] == [5]
+
+    page, total = log.read(since=entries[6]["timestamp"])
+    assert [entry["n"] for entry in page] == [7, 8, 9]
+
+    with pytest.raises(ValueError):
+        log.read({"n": 1})
+
+
+def test_index_is_rebuilt_when_lost(tmp_path):
+    log = _log(tmp_path)
+    for entry in _entries(5):
+        log.append(entry)
+    (tmp_path / "ops.idx").unlink()
+
+    # A new instance, as after a restart (parsed indexes are cached per path)
+    page, total = _log(tmp_path).read({"kind": "drop"})
+    assert total == 2 and [entry["n"] for entry in page] == [0, 3]
+
+
+def test_torn_last_line_is_ignored_then_cut_off(tmp_path):
+    log = _log(tmp_path)
+    entries = _entries(4)
+    for entry in entries[:3]:
+        log.append(entry)
+    # A crash in the middle of an append
+    with open(tmp_path / "ops.jsonl", "ab") as f:
+        f.write(b'{"timestamp": "2024-01-01T01:00:00", "kind": "dr')
+
+    page, total = log.read()
+    assert total == 3 and [entry["n"] for entry in page] == [0, 1, 2]
+
+    log.append(entries[3])
+    page, total = log.read()
+    assert [entry["n"] for entry in page] == [0, 1, 2, 3]
+    lines = (tmp_path / "ops.jsonl").read_bytes().splitlines()
+    assert [json.loads(line)["n"] for line in lines] == [0, 1, 2, 3]
+
+
+def test_legacy_json_is_migrated_once(tmp_path):
+    legacy = tmp_path / "ops.json"
+    entries = _entries(3)
+    legacy.write_text(json.dumps({"logs": entries}))
+    log = _log(tmp_path, legacy_path=legacy, legacy_entries=lambda data: data["logs"])
+
+    page, total = log.read()
+    assert page == entries and total == 3
+    assert not legacy.exists()
+
+    log.append(_entries(4)[3])
+    assert log.read()[1] == 4
+
+
+def test_unreadable_legacy_json_is_left_alone(tmp_path):
+    legacy = tmp_path / "ops.json"
+    legacy.write_text("{not json")
+    log = _log(tmp_path, legacy_path=legacy)
+
+    assert log.read() == ([], 0)
+    assert legacy.exists()
+
+
+def test_logs_endpoint_since_accepts_any_iso_format(workspace_id):
+    append_operation_log(workspace_id, "sales.csv", "missing_values", "price", "numeric", "drop", 3)
+    client = TestClient(app)
+    earlier = datetime.now() - timedelta(minutes=5)
+    later = datetime.now() + timedelta(minutes=5)
+
+    def count(since: str) -> int:
+        response = client.get("/dataset/sales.csv/logs", params={"workspace_id": workspace_id, "since": since})
+        assert response.status_code == 200, response.text
+        return len(response.json()["logs"])
+
+    # A space separator or an offset must not be compared character by character
+    assert count(earlier.strftime("%Y-%m-%d %H:%M")) == 1
+    assert count(later.strftime("%Y-%m-%d %H:%M")) == 0
+    assert count(earlier.astimezone().isoformat()) == 1
+    assert count(later.astimezone().isoformat()) == 0
+    assert client.get(
+        "/dataset/sales.csv/logs", params={"workspace_id": workspace_id, "since": "yesterday"}
+    ).status_code == 400
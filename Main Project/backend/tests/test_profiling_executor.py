@@ -0,0 +1,64 @@
+"""Column-parallel profiling must match a serial run, also under concurrent calls."""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.services.profiling_executor import map_in_processes, profile_columns
+
+
+def _summary(series: pd.Series, scale: float = 1.0) -> tuple:
+    total = float(series.sum()) * scale if series.dtype.kind == "f" else None
+    return series.name, int(series.notna().sum()), int(series.nunique()), total
+
+
+def _frame(cols: int, rows: int = 2000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f"c{i}": rng.normal(size=rows) for i in range(cols)})
+    df.iloc[::7, 0] = np.nan
+    return df
+
+
+def test_parallel_matches_serial():
+    df = _frame(6)
+    df["label"] = np.where(df["c1"] > 0, "up", "down")
+    column_args = {"c2": (2.0,)}
+    serial = profile_columns(df, _summary, column_args=column_args, workers=1)
+
+    for mode in ("thread", "process"):
+        parallel = profile_columns(df, _summary, column_args=column_args, workers=4, mode=mode)
+        assert list(parallel) == list(df.columns)
+        assert parallel == serial, mode
+
+
+def test_concurrent_calls_of_different_widths_share_the_pools():
+    # Each call caps its workers at its column count: 8 and 3
+    frames = [_frame(8, seed=1), _frame(3, seed=2)] * 4
+    expected = [profile_columns(df, _summary, workers=1) for df in frames]
+    results = [None] * len(frames)
+    errors = []
+    start = threading.Barrier(len(frames))
+
+    def run(i: int) -> None:
+        start.wait()
+        try:
+            for _ in range(5):
+                results[i] = profile_columns(frames[i], _summary, workers=8, mode="thread")
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(frames))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert results == expected
+
+
+def test_map_in_processes_keeps_argument_order():
+    series = [pd.Series(np.arange(n, dtype=float), name=f"s{n}") for n in range(1, 7)]
+    results = map_in_processes(_summary, [(s,) for s in series], workers=2)
+    assert results == [_summary(s) for s in series]
@@ -0,0 +1,69 @@
+"""Accuracy tests for the KLL quantile sketch."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.services.quantile_sketch import QuantileSketch
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def _rank_errors(sketch: QuantileSketch, values: np.ndarray):
+    """Distance between each requested rank and the rank of the answer."""
+    ordered = np.sort(values)
+    errors = []
+    for q, answer in zip(QUANTILES, sketch.quantiles(QUANTILES)):
+        low = np.searchsorted(ordered, answer, side="left") / len(ordered)
+        high = np.searchsorted(ordered, answer, side="right") / len(ordered)
+        errors.append(max(low - q, q - high, 0.0))
+    return errors
+
+
+def test_exact_until_first_compaction():
+    sketch = QuantileSketch()
+    values = np.random.default_rng(0).normal(size=sketch.k)
+    sketch.update(values)
+    assert sketch.is_exact and sketch.error == 0.0
+    assert sketch.quantiles(QUANTILES) == pytest.approx(np.quantile(values, QUANTILES).tolist())
+
+
+@pytest.mark.parametrize("distribution", ["normal", "lognormal", "integers"])
+def test_rank_error_within_bound(distribution):
+    rng = np.random.default_rng(1)
+    n = 1_000_000
+    values = {
+        "normal": lambda: rng.normal(size=n),
+        "lognormal": lambda: rng.lognormal(sigma=2.0, size=n),
+        "integers": lambda: rng.integers(0, 50, size=n).astype(float),
+    }[distribution]()
+    sketch = QuantileSketch.from_values(values)
+    assert not sketch.is_exact
+    assert max(_rank_errors(sketch, values)) <= 2 * sketch.error
+    assert (sketch.min, sketch.max, sketch.count) == (values.min(), values.max(), n)
+
+
+def test_merged_chunk_sketches_within_bound():
+    rng = np.random.default_rng(2)
+    # Chunks with different distributions, as in a file sorted by date
+    chunks = [rng.normal(loc, 1.0, 150_000) for loc in (0.0, 5.0, -3.0, 10.0)]
+    merged = QuantileSketch()
+    for chunk in chunks:
+        merged.merge(QuantileSketch.from_values(chunk))
+    values = np.concatenate(chunks)
+
+    assert merged.count == len(values)
+    assert max(_rank_errors(merged, values)) <= 2 * merged.error
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(merged.to_dict())))
+    assert restored.quantiles(QUANTILES) == merged.quantiles(QUANTILES)
+
+
+def test_missing_values_are_ignored():
+    values = np.random.default_rng(3).normal(size=200_000)
+    with_missing = values.copy()
+    with_missing[::10] = np.nan
+    sketch = QuantileSketch.from_values(with_missing)
+    kept = with_missing[~np.isnan(with_missing)]
+    assert sketch.count == len(kept)
+    assert max(_rank_errors(sketch, kept)) <= 2 * sketch.error
@@ -0,0 +1,82 @@
+"""Replaying the operation log must reproduce the live current_df."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.replay_engine as replay_engine
+from app.config import get_replay_checkpoint_dir, get_workspace_datasets_dir
+from app.services.replay_engine import rebuild_dataset_state
+from app.services.schema_service import clear_cache, clean_missing_values, get_current_df, load_dataset_to_cache
+
+# (column, strategy, constant value) applied in order; every one changes the state
+OPERATIONS = [
+    ("a", "fill_mean", None),
+    ("b", "fill_median", None),
+    ("city", "fill_constant", "unknown"),
+    ("c", "drop", None),
+    ("d", "fill_mode", None),
+    ("e", "fill_constant", -1),
+    ("f", "fill_mean", None),
+    ("g", "drop", None),
+    ("label", "fill_mode", None),
+    ("h", "fill_median", None),
+]
+
+
+@pytest.fixture
+def dataset_id(workspace_id):
+    rng = np.random.default_rng(3)
+    rows = 300
+    df = pd.DataFrame({col: rng.normal(50, 10, rows).round(2) for col in "abcdefgh"})
+    df["city"] = rng.choice(["north", "south", "east"], rows)
+    df["label"] = rng.choice(["x", "y"], rows)
+    for col in df.columns:
+        df.loc[rng.choice(rows, 12, replace=False), col] = np.nan
+    df.to_csv(get_workspace_datasets_dir(workspace_id) / "sales.csv", index=False)
+    return "sales.csv"
+
+
+def _apply_operations(workspace_id: str, dataset_id: str):
+    """Clean through the live path; returns the current_df after each operation."""
+    states = []
+    for column, strategy, constant in OPERATIONS:
+        df, affected, error = clean_missing_values(workspace_id, dataset_id, column, strategy, constant)
+        assert error is None and affected > 0, (column, strategy, error)
+        states.append(get_current_df(workspace_id, dataset_id).copy())
+    return states
+
+
+def test_rebuild_after_restart_matches_live_state(workspace_id, dataset_id, monkeypatch):
+    monkeypatch.setattr(replay_engine, "REPLAY_CHECKPOINT_INTERVAL", 3)
+    states = _apply_operations(workspace_id, dataset_id)
+    checkpoints = sorted(path.name for path in get_replay_checkpoint_dir(workspace_id, dataset_id).iterdir())
+    assert checkpoints == ["00000003.npz", "00000006.npz", "00000009.npz"]
+
+    # A cleared cache (or a restart) rebuilds current_df from checkpoint 9 + 1 operation
+    clear_cache(workspace_id)
+    assert load_dataset_to_cache(workspace_id, dataset_id)
+    pd.testing.assert_frame_equal(get_current_df(workspace_id, dataset_id), states[-1])
+
+
+@pytest.mark.parametrize("use_checkpoints", [True, False])
+def test_rebuild_reproduces_every_historical_state(workspace_id, dataset_id, monkeypatch, use_checkpoints):
+    monkeypatch.setattr(replay_engine, "REPLAY_CHECKPOINT_INTERVAL", 3 if use_checkpoints else 0)
+    states = _apply_operations(workspace_id, dataset_id)
+    for operations, state in enumerate(states, 1):
+        rebuilt, applied = rebuild_dataset_state(workspace_id, dataset_id, operations)
+        assert applied == operations
+        pd.testing.assert_frame_equal(rebuilt, state)
+
+
+def test_stale_checkpoint_is_ignored(workspace_id, dataset_id, monkeypatch):
+    monkeypatch.setattr(replay_engine, "REPLAY_CHECKPOINT_INTERVAL", 3)
+    states = _apply_operations(workspace_id, dataset_id)
+    # Checkpoint 6 replaced by a wrong state of another version of the raw dataset
+    replay_engine._save_checkpoint(
+        workspace_id, dataset_id, states[0], 6, "another fingerprint",
+        replay_engine._entry_timestamp(workspace_id, dataset_id, 6),
+    )
+
+    rebuilt, _ = rebuild_dataset_state(workspace_id, dataset_id, 7)
+    pd.testing.assert_frame_equal(rebuilt, states[6])
@@ -0,0 +1,98 @@
+"""Vectorized segment impacts against a pandas groupby reference."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.decision_eda_service import DATETIME_PROBE_VALUES, infer_column_type
+from app.services.segment_engine import compute_segment_impacts, factorize_column, top_k_segments
+
+
+def _reference_impact(segments: pd.Series, values: pd.Series, overall_mean: float, min_support: int, k: int):
+    """Per-group loop, as decision EDA computed it before the segment engine."""
+    groups = pd.DataFrame({"segment": segments, "value": values}).groupby("segment", sort=False)["value"]
+    stats = groups.agg(["count", "mean"])
+    stats = stats[stats["count"] >= min_support]
+    if len(stats) < 2:
+        return None
+    mean_diff = stats["mean"].max() - stats["mean"].min()
+    relative = abs(mean_diff / overall_mean) * 100 if overall_mean != 0 else abs(mean_diff)
+    top = stats["mean"].sort_values(ascending=False, kind="stable").iloc[:k]
+    bottom = stats["mean"].sort_values(ascending=True, kind="stable").iloc[:k]
+    return {
+        "mean_difference": round(float(mean_diff), 4),
+        "relative_impact_pct": round(float(relative), 2),
+        "top_segments": {str(label): round(float(mean), 4) for label, mean in top.items()},
+        "bottom_segments": {str(label): round(float(mean), 4) for label, mean in bottom.items()},
+        "segment_count": len(stats),
+    }
+
+
+@pytest.mark.parametrize("min_support, k", [(1, 3), (5, 3), (40, 5)])
+def test_impacts_match_groupby(min_support, k):
+    rng = np.random.default_rng(8)
+    rows = 5_000
+    df = pd.DataFrame({
+        "region": rng.choice(["north", "south", "east", "west", None], rows),
+        # Thousands of segments, many below the support threshold
+        "store": rng.integers(0, 2_000, rows).astype(str),
+        # Integer metric: many tied segment means
+        "metric": rng.integers(0, 4, rows).astype(float),
+    })
+    df.loc[rng.choice(rows, 300, replace=False), "metric"] = np.nan
+    analyzed = df["metric"].notna().to_numpy()
+    values = df.loc[analyzed, "metric"]
+
+    columns = {col: factorize_column(df[col]) for col in ("region", "store")}
+    impacts = compute_segment_impacts(columns, values.to_numpy(), analyzed, min_support, k)
+
+    expected = []
+    for col in ("region", "store"):
+        impact = _reference_impact(df.loc[analyzed, col], values, float(values.mean()), min_support, k)
+        if impact is not None:
+            expected.append({"factor": col, **impact, "type": "categorical"})
+    assert impacts == expected
+    assert len(impacts) >= 1
+
+
+def test_too_few_supported_segments():
+    codes, uniques = factorize_column(pd.Series(["a"] * 10 + ["b"] * 2))
+    values = np.arange(12, dtype=float)
+    assert compute_segment_impacts({"c": (codes, uniques)}, values, min_support=5) == []
+    assert len(compute_segment_impacts({"c": (codes, uniques)}, values, min_support=2)) == 1
+
+
+def test_top_k_breaks_ties_by_position():
+    means = np.array([1.0, 3.0, 3.0, 0.5, 3.0, 2.0])
+    assert top_k_segments(means, 2).tolist() == [1, 2]
+    assert top_k_segments(means, 2, largest=False).tolist() == [3, 0]
+    assert top_k_segments(means, 10).tolist() == [1, 2, 4, 5, 0, 3]
+    assert top_k_segments(np.array([]), 3).tolist() == []
+
+
+def test_column_type_inference():
+    rng = np.random.default_rng(4)
+    rows = 3_000
+    dates = pd.date_range("2020-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M")
+    df = pd.DataFrame({
+        "amount": rng.normal(size=rows),
+        "day": pd.Series(rng.choice(dates[:50], rows), dtype=object),
+        # More distinct values than are probed, all dates
+        "timestamp": pd.Series(dates, dtype=object),
+        # Many distinct values, none a date: rejected by the probe
+        "comment": pd.Series([f"note {i}" for i in range(rows)], dtype=object),
+        "ancient": pd.Series(rng.choice(["1500-01-01", "1600-06-01"], rows), dtype=object),
+        "parsed": pd.to_datetime(pd.Series(dates)),
+        "numeric_text": pd.Series(rng.integers(0, 9, rows).astype(str), dtype=object),
+    })
+    assert rows > DATETIME_PROBE_VALUES
+    types = {col: infer_column_type(df, col) for col in df.columns}
+    assert types == {
+        "amount": "numeric",
+        "day": "datetime",
+        "timestamp": "datetime",
+        "comment": "categorical",
+        "ancient": "categorical",
+        "parsed": "datetime",
+        "numeric_text": "numeric",
+    }
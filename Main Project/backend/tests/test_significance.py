@@ -0,0 +1,161 @@
+"""Resampling significance: batched statistics, intervals, p-values and the decision EDA option."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.significance as significance
+from app.config import SIGNIFICANCE_MAX_CI_SEGMENTS, get_workspace_datasets_dir
+from app.services.decision_eda_service import compute_decision_eda_stats
+from app.services.significance import SignificanceData, compute_significance
+
+
+def _data(rows: int = 1_000, seed: int = 1, min_support: int = 5) -> SignificanceData:
+    """Metric with a correlated factor, a noise factor, a shifting segment factor and a noise one."""
+    rng = np.random.default_rng(seed)
+    metric = rng.normal(0, 1, rows)
+    related = metric * 0.8 + rng.normal(0, 0.6, rows)
+    noise = rng.normal(0, 1, rows)
+    related[rng.choice(rows, 50, replace=False)] = np.nan
+    group = rng.integers(0, 3, rows)
+    metric = metric + group * 0.5
+    unrelated = rng.integers(0, 4, rows)
+    unrelated[rng.choice(rows, 30, replace=False)] = -1
+    return SignificanceData(metric, [related, noise], [group, unrelated], min_support=min_support)
+
+
+def _expected_statistics(metric, numeric, segments, min_support):
+    r = []
+    for values in numeric:
+        present = ~np.isnan(values)
+        r.append(np.corrcoef(metric[present], values[present])[0, 1])
+    differences = []
+    for codes in segments:
+        means = pd.Series(metric[codes >= 0]).groupby(codes[codes >= 0]).agg(["mean", "size"])
+        means = means[means["size"] >= min_support]["mean"]
+        differences.append(means.max() - means.min())
+    return np.array(r), np.array(differences)
+
+
+@pytest.mark.parametrize("dense_segments", [64, 0])
+def test_observed_statistics_match_direct_computation(monkeypatch, dense_segments):
+    # 0 sums every categorical factor per segment with np.add.reduceat
+    monkeypatch.setattr(significance, "_DENSE_SEGMENTS", dense_segments)
+    rng = np.random.default_rng(4)
+    metric = rng.normal(10, 3, 600)
+    numeric = [metric + rng.normal(0, 2, 600), rng.normal(0, 1, 600)]
+    numeric[0][:40] = np.nan
+    segments = [rng.integers(0, 5, 600), rng.integers(-1, 90, 600)]
+    data = SignificanceData(metric, numeric, segments, min_support=5)
+
+    r, differences = significance._factor_statistics(data, significance._observed_sums(data))
+
+    expected_r, expected_differences = _expected_statistics(metric, numeric, segments, 5)
+    np.testing.assert_allclose(r[0], expected_r, atol=1e-5)
+    np.testing.assert_allclose(differences[0], expected_differences, rtol=1e-4)
+
+
+@pytest.mark.parametrize("kind", ["_bootstrap_sums", "_permutation_sums"])
+def test_sparse_segments_match_one_hot_columns(monkeypatch, kind):
+    rng = np.random.default_rng(8)
+    metric = rng.normal(0, 1, 500)
+    args = (metric, [rng.normal(0, 1, 500)], [rng.integers(-1, 12, 500)])
+    dense = SignificanceData(*args, min_support=3)
+    monkeypatch.setattr(significance, "_DENSE_SEGMENTS", 0)
+    sparse = SignificanceData(*args, min_support=3)
+    assert sparse.sparse_segments and not dense.sparse_segments
+
+    resample = getattr(significance, kind)
+    dense_sums = resample(dense, 32, np.random.default_rng(2))
+    sparse_sums = resample(sparse, 32, np.random.default_rng(2))
+
+    np.testing.assert_allclose(sparse_sums, dense_sums, rtol=1e-4, atol=1e-3)
+
+
+def test_signal_and_noise_factors():
+    result = compute_significance(_data(), resamples=400, time_budget=60)
+
+    assert (result["bootstrap_resamples"], result["permutations"]) == (400, 400)
+    related, noise = result["numeric"]
+    low, high = related["confidence_interval"]
+    assert 0.5 < low < high < 1
+    assert related["p_value"] == pytest.approx(1 / 401, abs=1e-4)
+    low, high = noise["confidence_interval"]
+    assert low < 0 < high
+    assert noise["p_value"] > 0.05
+
+    group, unrelated = result["categorical"]
+    low, high = group["confidence_interval"]
+    assert 0.6 < low < 1.0 < high
+    assert group["p_value"] < 0.01
+    assert unrelated["p_value"] > 0.05
+
+
+def test_results_are_reproducible_for_a_seed():
+    first = compute_significance(_data(), resamples=100, time_budget=60, seed=3)
+    second = compute_significance(_data(), resamples=100, time_budget=60, seed=3)
+
+    assert first["numeric"] == second["numeric"]
+    assert first["categorical"] == second["categorical"]
+
+
+def test_many_segments_get_no_interval():
+    rng = np.random.default_rng(6)
+    metric = rng.normal(0, 1, 2_000)
+    segments = rng.integers(0, SIGNIFICANCE_MAX_CI_SEGMENTS + 5, 2_000)
+    few = rng.integers(0, SIGNIFICANCE_MAX_CI_SEGMENTS, 2_000)
+    data = SignificanceData(metric, [], [segments, few], min_support=5)
+
+    result = compute_significance(data, resamples=100, time_budget=60)
+
+    many, within = result["categorical"]
+    assert many["confidence_interval"] is None and many["p_value"] is not None
+    assert within["confidence_interval"] is not None
+
+
+def test_range_interval_reflects_bootstrap_quantiles():
+    bootstrap = np.array([[1.0, 5.0], [2.0, 6.0], [3.0, 7.0]])
+    observed = np.array([1.5, 2.0])
+
+    intervals = significance._range_interval(bootstrap, observed, np.array([3, 3]), confidence=1.0)
+
+    # [2 * 1.5 - 3, 2 * 1.5 - 1] and [max(4 - 7, 0), 4 - 5 clipped at 0]
+    assert intervals == [[0.0, 2.0], [0.0, 0.0]]
+    assert significance._range_interval(bootstrap, observed, np.array([3, 21]), confidence=1.0)[1] is None
+
+
+def test_time_budget_runs_at_least_one_block_of_each_kind():
+    result = compute_significance(_data(), resamples=100_000, time_budget=0)
+
+    # 1,000 rows: blocks of _MAX_BLOCK resamples
+    assert result["bootstrap_resamples"] == result["permutations"] == significance._MAX_BLOCK
+
+
+def test_worker_processes_split_the_resamples():
+    result = compute_significance(_data(), resamples=200, time_budget=60, workers=2)
+
+    assert (result["bootstrap_resamples"], result["permutations"]) == (200, 200)
+    assert result["numeric"][0]["p_value"] == pytest.approx(1 / 201, abs=1e-4)
+
+
+def test_decision_eda_significance_option(workspace_id):
+    rng = np.random.default_rng(2)
+    # Rounded, so the columns aren't excluded for high uniqueness
+    size = rng.integers(60, 180, 400).astype(float)
+    pd.DataFrame({
+        "price": (size * 2 + rng.normal(0, 20, 400)).round(-1),
+        "size": size,
+        "city": rng.choice(["north", "south", "east"], 400),
+    }).to_csv(get_workspace_datasets_dir(workspace_id) / "homes.csv", index=False)
+
+    stats = compute_decision_eda_stats(workspace_id, "homes.csv", "price", significance=True, significance_budget=5)
+
+    assert stats["significance"]["bootstrap_resamples"] > 0
+    for entry in stats["top_factors"] + stats["all_correlations"] + stats["all_segment_impacts"]:
+        assert "confidence_interval" in entry and "p_value" in entry, entry
+    size_entry = next(entry for entry in stats["all_correlations"] if entry["factor"] == "size")
+    assert size_entry["p_value"] < 0.01
+    # Memoized separately from the plain stats
+    assert "significance" not in compute_decision_eda_stats(workspace_id, "homes.csv", "price")
+    with pytest.raises(ValueError):
+        compute_decision_eda_stats(workspace_id, "homes.csv", "price", significance=True, significance_budget=0)
@@ -0,0 +1,154 @@
+"""Vizion rendering: column projection, the output cache and the isolated pool."""
+
+import asyncio
+import operator
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.workspaces as workspaces_api
+import app.services.vizion_runner as vizion_runner
+from app.config import get_vizion_cache_dir, get_workspace_datasets_dir
+from app.main import app
+from app.services.compute_executor import ComputeTimeout, run_isolated
+from app.services.vizion_runner import (
+    _normalize_dataframe,
+    load_cached_vizion_output,
+    project_dataframe,
+    referenced_columns,
+    save_vizion_output,
+    vizion_cache_key,
+)
+
+
+def test_projection_keeps_referenced_columns():
+    df = pd.DataFrame({"region": ["a"], "sales": [1], "cost": [2], 2024: [3], "notes": ["x"]})
+    params = {
+        "chart_type": "bar",
+        "x_column": "region",
+        "encoding": {"color": ["cost", "unknown"], "facet": {"field": "2024"}},
+        "title": "sales by region",  # Not a column name as a whole
+    }
+    assert referenced_columns(params, df.columns) == ["region", "cost", 2024]
+    assert list(project_dataframe(df, params).columns) == ["region", "cost", 2024]
+    # Nothing referenced: all columns
+    assert project_dataframe(df, {"chart_type": "bar"}) is df
+
+
+def test_normalization_sorts_columns_and_resets_only_other_indexes():
+    df = pd.DataFrame({"b": [1, 2], "a": [3, 4]})
+    normalized = _normalize_dataframe(df)
+    assert list(normalized.columns) == ["a", "b"]
+    in_order = df[["a", "b"]]
+    assert _normalize_dataframe(in_order) is in_order
+    assert list(_normalize_dataframe(in_order.iloc[::-1]).index) == [0, 1]
+
+
+def test_cache_key_is_canonical():
+    params = {"chart_type": "line", "x_column": "t", "params": {"width": 500, "downsample": "lttb"}}
+    reordered = {"params": {"downsample": "lttb", "width": 500}, "x_column": "t", "chart_type": "line"}
+    assert vizion_cache_key("fp1", params) == vizion_cache_key("fp1", reordered)
+    assert vizion_cache_key("fp2", params) != vizion_cache_key("fp1", params)
+    assert vizion_cache_key("fp1", {**params, "x_column": "u"}) != vizion_cache_key("fp1", params)
+
+
+def test_output_cache_tiers_and_pruning(workspace_id, monkeypatch):
+    monkeypatch.setattr(vizion_runner, "VIZION_DISK_CACHE_ENTRIES", 2)
+    outputs = {f"key{i}": {"vega_lite_spec": {"mark": "bar", "n": i}, "insight_text": ""} for i in range(3)}
+    for key, output in outputs.items():
+        save_vizion_output(workspace_id, key, output)
+        time.sleep(0.01)  # Distinct modification times
+    assert sorted(path.stem for path in get_vizion_cache_dir(workspace_id).glob("*.json")) == ["key1", "key2"]
+
+    # After a restart (empty memory tier) the disk tier still answers
+    vizion_runner._vizion_cache.clear()
+    assert load_cached_vizion_output(workspace_id, "key2") == outputs["key2"]
+    assert load_cached_vizion_output(workspace_id, "key0") is None
+    assert load_cached_vizion_output(workspace_id, "missing") is None
+
+
+def test_isolated_calls_time_out_and_the_pool_recovers():
+    async def scenario():
+        with pytest.raises(ComputeTimeout):
+            await run_isolated(time.sleep, 30, timeout=0.5)
+        # The stuck worker was killed; a fresh pool serves the next call
+        return await run_isolated(operator.add, 2, 3, timeout=60)
+
+    started = time.monotonic()
+    assert asyncio.run(scenario()) == 5
+    assert time.monotonic() - started < 30
+
+
+class FakeVizion:
+    """Stands in for run_isolated(run_vizion_worker, ...), recording what it gets."""
+
+    def __init__(self, rows: int = 3):
+        self.calls = []
+        self.rows = rows
+        self.timeout = False
+
+    async def __call__(self, func, params, df, timeout):
+        if self.timeout:
+            raise ComputeTimeout("Timed out")
+        self.calls.append((dict(params), list(df.columns)))
+        values = [{"x": i} for i in range(self.rows)]
+        return {"vega_lite_spec": {"mark": "bar", "data": {"values": values}, "title": "t"}, "insight_text": "hi"}
+
+
+@pytest.fixture
+def chart_client(workspace_id, monkeypatch):
+    rng = np.random.default_rng(1)
+    pd.DataFrame({
+        "region": rng.choice(["north", "south"], 200),
+        "sales": rng.normal(100, 10, 200).round(2),
+        "unused": np.arange(200),
+    }).to_csv(get_workspace_datasets_dir(workspace_id) / "sales.csv", index=False)
+    fake = FakeVizion()
+    monkeypatch.setattr(workspaces_api, "run_isolated", fake)
+    return TestClient(app), fake
+
+
+def _chart(client, workspace_id, **overrides):
+    body = {
+        "workspace_id": workspace_id,
+        "dataset_id": "sales.csv",
+        "goal": "compare",
+        "overrides": {"chart_type": "bar", "x": "region", "y": "sales", "aggregation": "sum", **overrides},
+    }
+    return client.post(f"/workspaces/{workspace_id}/datasets/sales.csv/chart", json=body)
+
+
+def test_chart_endpoint_projects_and_caches(workspace_id, chart_client):
+    client, fake = chart_client
+    first = _chart(client, workspace_id)
+    assert first.status_code == 200, first.text
+    assert fake.calls[0][1] == ["region", "sales"]
+
+    # Same dataset and parameters: cached, Vizion isn't called again
+    assert _chart(client, workspace_id).json() == first.json()
+    assert len(fake.calls) == 1
+    assert _chart(client, workspace_id, aggregation="avg").status_code == 200
+    assert len(fake.calls) == 2
+
+    # New dataset content: new fingerprint, new render
+    path = get_workspace_datasets_dir(workspace_id) / "sales.csv"
+    path.write_text(path.read_text() + "east,1.0,200\n")
+    assert _chart(client, workspace_id).status_code == 200
+    assert len(fake.calls) == 3
+
+
+def test_chart_endpoint_timeout_and_oversized_specs(workspace_id, chart_client):
+    client, fake = chart_client
+    fake.timeout = True
+    assert _chart(client, workspace_id).status_code == 504
+
+    # A spec inlining more rows than the cap is replaced by server-side aggregation
+    fake.timeout = False
+    fake.rows = workspaces_api.CHART_MAX_POINTS + 1
+    spec = _chart(client, workspace_id, aggregation="max").json()["vega_lite_spec"]
+    assert spec["usermeta"]["data4viz"]["aggregated"] is True
+    assert sorted(row["region"] for row in spec["data"]["values"]) == ["north", "south"]
+    assert spec["title"] == "t"
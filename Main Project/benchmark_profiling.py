@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark column-parallel profiling (overview + cleaning summary).
+
+Builds a wide synthetic dataset and times compute_overview and
+compute_cleaning_summary with 1, 4 and 16 workers. Also checks that the
+parallel results are identical to the serial ones.
+
+Usage:
+    python benchmark_profiling.py [--rows 200000] [--cols 64] [--workers 1 4 16]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Project root directory
+ROOT_DIR = Path(__file__).parent.absolute()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+# The shared pools are sized by PROFILE_WORKERS when first used, so they must be
+# large enough for the widest run; --workers only limits each run's tasks in flight
+os.environ.setdefault("DATA4VIZ_PROFILE_WORKERS", "16")
+
+from app.api.overview import compute_overview  # noqa: E402
+from app.services.cleaning_summary import compute_cleaning_summary  # noqa: E402
+from app.services.profiling_executor import shutdown_pools  # noqa: E402
+
+
+def create_wide_dataset(rows: int, cols: int, seed: int = 42) -> pd.DataFrame:
+    """Create a wide dataset mixing numeric, categorical and date-like columns."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(cols):
+        kind = i % 4
+        if kind == 0:
+            values = rng.normal(100, 15, rows)
+            values[rng.random(rows) < 0.05] = np.nan
+            data[f"num_{i}"] = values
+        elif kind == 1:
+            data[f"int_{i}"] = rng.integers(0, 1000, rows)
+        elif kind == 2:
+            data[f"cat_{i}"] = rng.choice([f"cat_{j}" for j in range(200)], rows)
+        else:
+            days = rng.integers(0, 3650, rows)
+            data[f"date_{i}"] = (pd.Timestamp("2015-01-01") + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d")
+    return pd.DataFrame(data)
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (seconds, result)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark column-parallel profiling")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--cols", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    print(f"📊 Building dataset: {args.rows:,} rows x {args.cols} columns")
+    df = create_wide_dataset(args.rows, args.cols)
+
+    baseline = None
+    print(f"\n{'workers':>8} {'overview (s)':>14} {'summary (s)':>13} {'speedup':>9}")
+    for workers in args.workers:
+        # Warm-up run on the same rows starts the same worker pool (threads or
+        # processes, chosen by row count) so pool startup isn't measured
+        compute_overview(df, workers=workers)
+
+        overview_time, overview = time_call(compute_overview, df, workers=workers)
+        summary_time, summary = time_call(compute_cleaning_summary, df, workers=workers)
+        total = overview_time + summary_time
+
+        if baseline is None:
+            baseline = (total, overview.model_dump(), summary)
+        elif (overview.model_dump(), summary) != baseline[1:]:
+            print(f"❌ Results with {workers} workers differ from serial results")
+            return 1
+
+        print(f"{workers:>8} {overview_time:>14.2f} {summary_time:>13.2f} {baseline[0] / total:>8.2f}x")
+
+    print("\n✅ Parallel results match serial results")
+    shutdown_pools()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
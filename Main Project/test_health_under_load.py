@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test /health latency while heavy dataset requests are in flight.
+
+Runs the FastAPI app in-process (httpx ASGI transport, single event loop,
+like one uvicorn worker), writes a large dataset into a temporary
+workspace, then fires concurrent overview refreshes and cleaning summaries
+while polling /health. Blocking work must run in the compute executor, so
+/health latency should stay low while the heavy requests are running.
+
+Usage:
+    python test_health_under_load.py [--rows 300000] [--requests 4] [--max-p95-ms 250]
+"""
+
+import argparse
+import asyncio
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+
+# Project root directory
+ROOT_DIR = Path(__file__).parent.absolute()
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from app.main import app  # noqa: E402
+from app.config import get_workspace_dir, get_workspace_datasets_dir  # noqa: E402
+
+WORKSPACE_ID = f"health-load-{int(time.time() * 1000)}"
+DATASET_ID = "load_test.csv"
+
+
+def create_dataset(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Create a dataset with numeric, categorical and date-like columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "value": rng.normal(100, 15, rows),
+        "count": rng.integers(0, 1000, rows),
+        "category": rng.choice([f"cat_{i}" for i in range(500)], rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "date": (pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D")).strftime("%Y-%m-%d"),
+    })
+
+
+async def poll_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    """
+    Call /health every interval until stopped; return latencies in milliseconds.
+
+    Latency is measured from when the call was due, so time the event loop
+    spent blocked (the poller couldn't even start the call) is included.
+    """
+    latencies = []
+    due = time.perf_counter()
+    while True:
+        response = await client.get("/health")
+        latencies.append((time.perf_counter() - due) * 1000)
+        assert response.status_code == 200, response.text
+        # Checked after the call, so a stall that ends with the load is still measured
+        if stop.is_set():
+            return latencies
+        due = max(due + interval, time.perf_counter())
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+
+async def heavy_request(client: httpx.AsyncClient, i: int) -> float:
+    """Run one heavy request; return its duration in seconds."""
+    start = time.perf_counter()
+    if i % 2 == 0:
+        response = await client.post(
+            "/api/overview/refresh",
+            params={"workspace_id": WORKSPACE_ID, "dataset_id": DATASET_ID},
+        )
+    else:
+        response = await client.post(
+            f"/workspaces/{WORKSPACE_ID}/cleaning/summary",
+            json={"dataset": DATASET_ID},
+        )
+    assert response.status_code == 200, response.text
+    return time.perf_counter() - start
+
+
+async def run(args) -> int:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=600) as client:
+        # Baseline: /health with nothing else running
+        stop = asyncio.Event()
+        baseline_task = asyncio.create_task(poll_health(client, stop, args.interval))
+        await asyncio.sleep(1.0)
+        stop.set()
+        baseline = await baseline_task
+
+        # Under load
+        stop = asyncio.Event()
+        health_task = asyncio.create_task(poll_health(client, stop, args.interval))
+        start = time.perf_counter()
+        durations = await asyncio.gather(*(heavy_request(client, i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        loaded = await health_task
+
+    def describe(latencies):
+        p95 = float(np.percentile(latencies, 95))
+        return f"n={len(latencies):4d}  p50={statistics.median(latencies):7.1f} ms  p95={p95:7.1f} ms  max={max(latencies):7.1f} ms", p95
+
+    baseline_text, _ = describe(baseline)
+    loaded_text, loaded_p95 = describe(loaded)
+    print(f"\n{args.requests} heavy requests finished in {elapsed:.2f}s (slowest {max(durations):.2f}s)")
+    print(f"/health idle:       {baseline_text}")
+    print(f"/health under load: {loaded_text}")
+
+    if loaded_p95 > args.max_p95_ms:
+        print(f"\n❌ /health p95 latency under load exceeds {args.max_p95_ms} ms")
+        return 1
+    print(f"\n✅ /health stayed responsive under load (p95 <= {args.max_p95_ms} ms)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /health latency under load")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.02, help="Seconds between /health calls")
+    parser.add_argument("--max-p95-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    print(f"📊 Writing dataset: {args.rows:,} rows -> workspace '{WORKSPACE_ID}'")
+    create_dataset(args.rows).to_csv(get_workspace_datasets_dir(WORKSPACE_ID) / DATASET_ID, index=False)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutil.rmtree(get_workspace_dir(WORKSPACE_ID), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
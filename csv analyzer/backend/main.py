@@ -74,6 +74,7 @@ async def plot(payload: dict):
     x = payload.get("x")
     y = payload.get("y")
     kind = payload.get("kind", "scatter")
+    density = payload.get("density")  # None = automatic for large datasets
 
     if not dataset_id or not x or not y:
         raise HTTPException(status_code=400, detail="dataset_id, x and y are required")
@@ -82,7 +83,7 @@ async def plot(payload: dict):
     if df is None:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    image_path = viz.create_plot(df, x, y, kind)
+    image_path = viz.create_plot(df, x, y, kind, density)
     return {"image_path": image_path}
 
 
@@ -1,5 +1,5 @@
 import os
-from typing import Literal
+from typing import Literal, Optional
 
 import matplotlib
 
@@ -7,22 +7,75 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt  # noqa: E402
 import seaborn as sns  # noqa: E402
 
+import numpy as np
 import pandas as pd
+from matplotlib.colors import LogNorm  # noqa: E402
 
 PLOTS_DIR = os.path.join(os.path.dirname(__file__), "plots")
 os.makedirs(PLOTS_DIR, exist_ok=True)
 
+# Scatter plots on more rows than this are drawn as a 2-D density grid
+DENSITY_MIN_ROWS = int(os.environ.get("CSV_ANALYZER_DENSITY_MIN_ROWS", 50_000))
+DENSITY_BINS = (120, 80)
+# Raw points drawn on top of the density grid
+DENSITY_OVERLAY_POINTS = 2_000
+
+
+def _density_plot(df: pd.DataFrame, x: str, y: str) -> None:
+    # Counts per grid cell (uniform bins, same as np.histogram2d) via bincount:
+    # cost is O(rows) with a small constant, the image size is fixed
+    xs = pd.to_numeric(df[x], errors="coerce").to_numpy(dtype=float)
+    ys = pd.to_numeric(df[y], errors="coerce").to_numpy(dtype=float)
+    valid = np.isfinite(xs) & np.isfinite(ys)
+    xs, ys = xs[valid], ys[valid]
+    if len(xs) == 0:
+        return
+
+    bins_x, bins_y = DENSITY_BINS
+    x_min, x_max = xs.min(), xs.max()
+    y_min, y_max = ys.min(), ys.max()
+    if x_max == x_min:
+        x_min, x_max = x_min - 0.5, x_max + 0.5
+    if y_max == y_min:
+        y_min, y_max = y_min - 0.5, y_max + 0.5
+    ix = np.minimum(((xs - x_min) * (bins_x / (x_max - x_min))).astype(np.int64), bins_x - 1)
+    iy = np.minimum(((ys - y_min) * (bins_y / (y_max - y_min))).astype(np.int64), bins_y - 1)
+    counts = np.bincount(ix * bins_y + iy, minlength=bins_x * bins_y).reshape(bins_x, bins_y)
+
+    grid = np.ma.masked_equal(counts.T, 0)
+    mesh = plt.pcolormesh(
+        np.linspace(x_min, x_max, bins_x + 1),
+        np.linspace(y_min, y_max, bins_y + 1),
+        grid,
+        norm=LogNorm(),
+        cmap="viridis",
+    )
+    plt.colorbar(mesh, label="rows")
+
+    # Sample of raw points for texture
+    rng = np.random.default_rng(0)
+    picked = rng.choice(len(xs), size=min(DENSITY_OVERLAY_POINTS, len(xs)), replace=False)
+    plt.scatter(xs[picked], ys[picked], s=1, c="black", alpha=0.3)
+    plt.xlabel(x)
+    plt.ylabel(y)
+
 
 def create_plot(
     df: pd.DataFrame,
     x: str,
     y: str,
     kind: Literal["scatter", "line", "bar"] = "scatter",
+    density: Optional[bool] = None,
 ) -> str:
     plt.clf()
     plt.figure(figsize=(6, 4))
 
-    if kind == "scatter":
+    if density is None:
+        density = len(df) >= DENSITY_MIN_ROWS
+
+    if kind == "scatter" and density:
+        _density_plot(df, x, y)
+    elif kind == "scatter":
         sns.scatterplot(data=df, x=x, y=y)
     elif kind == "line":
         sns.lineplot(data=df, x=x, y=y)